@@ -1,9 +1,13 @@
 """
 Documentação Swagger/OpenAPI para a API REST
 """
+import json
+
 from flask import Blueprint, render_template, jsonify
 from flask_swagger_ui import get_swaggerui_blueprint
 
+from utils.http_condicional import gerar_etag
+
 # Configuração do Swagger UI
 SWAGGER_URL = '/api/docs'
 API_URL = '/static/swagger.json'
@@ -38,10 +42,26 @@ openapi_spec = {
     "paths": {
         "/api/turmas": {
             "get": {
-                "summary": "Listar todas as turmas",
-                "description": "Retorna lista de todas as turmas com estatísticas",
+                "summary": "Listar turmas",
+                "description": "Retorna uma página de turmas com estatísticas, das mais recentes para as mais antigas. Para a próxima página, envie o next_cursor recebido no parâmetro cursor.",
                 "tags": ["Turmas"],
                 "security": [{"bearerAuth": []}],
+                "parameters": [
+                    {
+                        "name": "cursor",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "next_cursor da página anterior"
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer", "default": 50, "minimum": 1, "maximum": 100},
+                        "description": "Turmas por página"
+                    }
+                ],
                 "responses": {
                     "200": {
                         "description": "Lista de turmas retornada com sucesso",
@@ -57,12 +77,20 @@ openapi_spec = {
                                                 "$ref": "#/components/schemas/Turma"
                                             }
                                         },
-                                        "total": {"type": "integer"}
+                                        "total": {"type": "integer"},
+                                        "next_cursor": {
+                                            "type": "string",
+                                            "nullable": True,
+                                            "description": "Cursor da próxima página (nulo na última)"
+                                        }
                                     }
                                 }
                             }
                         }
                     },
+                    "400": {
+                        "description": "Cursor inválido"
+                    },
                     "401": {
                         "description": "Não autorizado"
                     },
@@ -357,6 +385,22 @@ def get_swagger_spec():
     return openapi_spec
 
 
+_swagger_etag = None
+
+
+def get_swagger_etag():
+    """
+    Retorna o ETag da especificação (calculado uma vez por processo)
+    
+    Returns:
+        str: Hash do conteúdo da especificação
+    """
+    global _swagger_etag
+    if _swagger_etag is None:
+        _swagger_etag = gerar_etag('swagger', json.dumps(openapi_spec, sort_keys=True))
+    return _swagger_etag
+
+
 def create_swagger_blueprint():
     """
     Cria e retorna o blueprint do Swagger
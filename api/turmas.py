@@ -5,50 +5,111 @@ from flask import request, jsonify
 from flask_restful import Resource, Api
 from services.turma_service import TurmaService
 from utils.database import get_db_manager
+from utils.http_condicional import cabecalhos, gerar_etag, nao_modificado
 from auth import admin_required, professor_required
 from flask_login import login_required, current_user
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tamanho padrão da página de GET /api/turmas (máximo: 100)
+TURMAS_POR_PAGINA = 50
 
-class TurmasAPI(Resource):
-    """API para operações com turmas"""
+
+def serializar_turma(turma) -> dict:
+    """
+    Converte uma linha de get_turmas_with_stats para o formato JSON da API
+    
+    Args:
+        turma: Linha (id, nome, serie, created_at, professor, total_alunos, total_aulas, media_progresso)
+        
+    Returns:
+        dict: Turma serializada
+    """
+    return {
+        'id': turma[0],
+        'nome': turma[1],
+        'serie': turma[2],
+        'created_at': turma[3].isoformat() if turma[3] else None,
+        'professor': turma[4],
+        'total_alunos': turma[5] or 0,
+        'total_aulas': turma[6] or 0,
+        'media_progresso': float(turma[7]) if turma[7] else 0
+    }
+
+
+class RecursoTurmas(Resource):
+    """Base dos recursos de turmas, com GET condicional pela versão das turmas"""
+    
+    # Versões de que a resposta depende (services.turma_service.GATILHOS_VERSAO)
+    VERSOES = ('turmas',)
     
     def __init__(self):
         self.db_manager = get_db_manager()
     
+    def condicional(self, conn, *partes):
+        """
+        Validadores da resposta e, se o cliente já tem esta versão, o 304
+        
+        Deve ser chamado antes das consultas do recurso: só lê a versão das
+        turmas (uma linha pela chave primária). Sem Last-Modified: a versão
+        pode mudar mais de uma vez no mesmo segundo, só o ETag a distingue.
+        
+        Args:
+            conn: Conexão com o banco
+            *partes: O que distingue a resposta (ID, página, limite)
+            
+        Returns:
+            tuple: (cabeçalhos da resposta completa, Response 304 ou None)
+        """
+        versoes = TurmaService(conn).versao(*self.VERSOES)
+        if versoes is None:
+            return {}, None
+        etag = gerar_etag(type(self).__name__, *versoes, *partes)
+        return cabecalhos(etag), nao_modificado(etag)
+
+
+class TurmasAPI(RecursoTurmas):
+    """API para operações com turmas"""
+    
+    # A lista traz a média de progresso de cada turma
+    VERSOES = ('turmas', 'progresso')
+    
     @login_required
     def get(self):
         """
-        GET /api/turmas
-        Lista todas as turmas com estatísticas
+        GET /api/turmas?cursor=<token>&limit=<n>
+        Lista as turmas com estatísticas, uma página por vez (mais recentes primeiro)
+        
+        A resposta traz next_cursor; repita a requisição com ?cursor=<next_cursor>
+        até que ele venha nulo.
         """
         try:
+            limite = request.args.get('limit', TURMAS_POR_PAGINA, type=int)
+            
             with self.db_manager.get_connection() as conn:
+                validadores, nao_modificada = self.condicional(conn, request.args.get('cursor'), limite)
+                if nao_modificada:
+                    return nao_modificada
+                
                 service = TurmaService(conn)
-                turmas = service.get_turmas_with_stats()
+                pagina = service.get_turmas_with_stats_page(request.args.get('cursor'), limite)
                 
                 # Converter para formato JSON
-                turmas_data = []
-                for turma in turmas:
-                    turmas_data.append({
-                        'id': turma[0],
-                        'nome': turma[1],
-                        'serie': turma[2],
-                        'created_at': turma[3].isoformat() if turma[3] else None,
-                        'professor': turma[4],
-                        'total_alunos': turma[5] or 0,
-                        'total_aulas': turma[6] or 0,
-                        'media_progresso': float(turma[7]) if turma[7] else 0
-                    })
+                turmas_data = [serializar_turma(turma) for turma in pagina.itens]
                 
                 return {
                     'success': True,
                     'data': turmas_data,
-                    'total': len(turmas_data)
-                }, 200
+                    'total': len(turmas_data),
+                    'next_cursor': pagina.proximo_cursor
+                }, 200, validadores
                 
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
         except Exception as e:
             logger.error(f"Erro na API de turmas: {e}")
             return {
@@ -102,12 +163,9 @@ class TurmasAPI(Resource):
             }, 500
 
 
-class TurmaAPI(Resource):
+class TurmaAPI(RecursoTurmas):
     """API para operações com uma turma específica"""
     
-    def __init__(self):
-        self.db_manager = get_db_manager()
-    
     @login_required
     def get(self, turma_id):
         """
@@ -116,6 +174,10 @@ class TurmaAPI(Resource):
         """
         try:
             with self.db_manager.get_connection() as conn:
+                validadores, nao_modificada = self.condicional(conn, turma_id)
+                if nao_modificada:
+                    return nao_modificada
+                
                 service = TurmaService(conn)
                 turma = service.get_turma_by_id(turma_id)
                 
@@ -128,7 +190,7 @@ class TurmaAPI(Resource):
                 return {
                     'success': True,
                     'data': turma
-                }, 200
+                }, 200, validadores
                 
         except Exception as e:
             logger.error(f"Erro ao buscar turma {turma_id}: {e}")
@@ -214,12 +276,9 @@ class TurmaAPI(Resource):
             }, 500
 
 
-class TurmaAlunosAPI(Resource):
+class TurmaAlunosAPI(RecursoTurmas):
     """API para operações com alunos de uma turma"""
     
-    def __init__(self):
-        self.db_manager = get_db_manager()
-    
     @login_required
     def get(self, turma_id):
         """
@@ -228,6 +287,10 @@ class TurmaAlunosAPI(Resource):
         """
         try:
             with self.db_manager.get_connection() as conn:
+                validadores, nao_modificada = self.condicional(conn, turma_id)
+                if nao_modificada:
+                    return nao_modificada
+                
                 service = TurmaService(conn)
                 alunos = service.get_turma_alunos(turma_id)
                 
@@ -235,7 +298,7 @@ class TurmaAlunosAPI(Resource):
                     'success': True,
                     'data': alunos,
                     'total': len(alunos)
-                }, 200
+                }, 200, validadores
                 
         except Exception as e:
             logger.error(f"Erro ao buscar alunos da turma {turma_id}: {e}")
@@ -245,11 +308,10 @@ class TurmaAlunosAPI(Resource):
             }, 500
 
 
-class TurmaProgressoAPI(Resource):
+class TurmaProgressoAPI(RecursoTurmas):
     """API para estatísticas de progresso de uma turma"""
     
-    def __init__(self):
-        self.db_manager = get_db_manager()
+    VERSOES = ('turmas', 'progresso')
     
     @login_required
     def get(self, turma_id):
@@ -259,6 +321,10 @@ class TurmaProgressoAPI(Resource):
         """
         try:
             with self.db_manager.get_connection() as conn:
+                validadores, nao_modificada = self.condicional(conn, turma_id)
+                if nao_modificada:
+                    return nao_modificada
+                
                 service = TurmaService(conn)
                 progresso = service.get_turma_progresso(turma_id)
                 
@@ -271,7 +337,7 @@ class TurmaProgressoAPI(Resource):
                 return {
                     'success': True,
                     'data': progresso
-                }, 200
+                }, 200, validadores
                 
         except Exception as e:
             logger.error(f"Erro ao buscar progresso da turma {turma_id}: {e}")
@@ -286,9 +352,9 @@ def register_turmas_api(api: Api):
     Registra os endpoints de turmas na API
     
     Args:
-        api (Api): Instância do Flask-RESTful API
+        api (Api): Instância do Flask-RESTful API, criada com prefix='/api'
     """
-    api.add_resource(TurmasAPI, '/api/turmas')
-    api.add_resource(TurmaAPI, '/api/turmas/<int:turma_id>')
-    api.add_resource(TurmaAlunosAPI, '/api/turmas/<int:turma_id>/alunos')
-    api.add_resource(TurmaProgressoAPI, '/api/turmas/<int:turma_id>/progresso')
+    api.add_resource(TurmasAPI, '/turmas')
+    api.add_resource(TurmaAPI, '/turmas/<int:turma_id>')
+    api.add_resource(TurmaAlunosAPI, '/turmas/<int:turma_id>/alunos')
+    api.add_resource(TurmaProgressoAPI, '/turmas/<int:turma_id>/progresso')
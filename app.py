@@ -16,7 +16,8 @@ def main():
         print("✅ Detectado ambiente Render")
         
         # Executar o startCommand do render.yaml
-        start_command = "python init_db_postgres.py && gunicorn --bind 0.0.0.0:$PORT --workers 1 --timeout 120 app_postgres:app"
+        # (as migrações pendentes são aplicadas pelo gunicorn.conf.py)
+        start_command = "gunicorn --bind 0.0.0.0:$PORT --workers 1 --timeout 120 app_postgres:app"
         
         print(f"🚀 Executando: {start_command}")
         
@@ -3,8 +3,8 @@ from flask_login import LoginManager, login_user, logout_user, login_required, c
 from flask_restful import Api
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import logging
 import os
-import sqlite3
 from dotenv import load_dotenv
 
 # Importar modelos e autenticação
@@ -13,11 +13,25 @@ from auth import admin_required, professor_required, aluno_required, content_cre
 
 # Importar API e Swagger
 from api.turmas import register_turmas_api
-from api.swagger import create_swagger_blueprint, get_swagger_spec
+from api.swagger import create_swagger_blueprint, get_swagger_etag, get_swagger_spec
+
+# Importar serviços
+from services.atividade_service import PONTOS_AULA, AtividadeDiariaService
+from services import fila_gamificacao, tempo_assistido
+from services.usuario_service import FiltroUsuarios, UsuarioService
+from services.turma_service import criar_versao_turmas
+from services.quiz_service import Correcao, QuizService, corrigir
+from utils import (alternativas, cache_conteudo, compressao, http_condicional, logging_config, metrics, profiler,
+                   sql_instrumentation)
+from utils.database import get_db_manager
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Logs estruturados (JSON em produção) escritos por uma thread dedicada
+logging_config.configurar_logging()
+logger = logging.getLogger(__name__)
+
 # Inicialização da aplicação
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -28,6 +42,23 @@ app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
+# Id de cada requisição nos logs e no cabeçalho X-Request-ID
+logging_config.init_app(app)
+
+# Contagem de consultas, tempo no banco e detecção de N+1 por requisição
+sql_instrumentation.init_app(app)
+
+# Métricas por endpoint em /metrics (formato Prometheus, apenas acesso local)
+metrics.init_app(app)
+
+# Profiler por amostragem sob demanda (?_profile=1 para administradores)
+profiler.init_app(app)
+
+# Compressão gzip/brotli das respostas e estáticos com hash. O Flask roda os
+# after_request na ordem inversa do registro: registrada depois das métricas e
+# do profiler, a compressão roda antes deles e entra na duração da requisição
+compressao.init_app(app)
+
 # Configuração do Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -45,8 +76,9 @@ app.register_blueprint(swagger_blueprint)
 # Rota para especificação OpenAPI
 @app.route('/static/swagger.json')
 def swagger_spec():
-    """Retorna a especificação OpenAPI"""
-    return get_swagger_spec()
+    """Retorna a especificação OpenAPI (304 se o cliente já tem esta versão)"""
+    etag = get_swagger_etag()
+    return http_condicional.nao_modificado(etag) or http_condicional.aplicar(get_swagger_spec(), etag)
 
 # Registrar endpoints da API
 register_turmas_api(api)
@@ -57,21 +89,56 @@ def load_user(user_id):
     db = get_db()
     return User.get_by_id(int(user_id), db)
 
+# Conexões SQLite (modo definido por SQLITE_MODE)
+db_manager = get_db_manager()
+
 def get_db():
-    """Conectar ao banco de dados SQLite"""
+    """Conectar ao banco de dados SQLite (conexão por thread com WAL se SQLITE_MODE=producao)"""
     if 'db' not in g:
-        g.db = sqlite3.connect('escola_para_todos.db')
-        g.db.row_factory = sqlite3.Row
+        g.db = db_manager.connect()
+        if not db_manager.producao:
+            metrics.incrementar('db_connections_opened_total')
     return g.db
 
 def close_db(e=None):
-    """Fechar conexão com o banco"""
+    """Devolver a conexão com o banco"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        db_manager.release(db)
 
 app.teardown_appcontext(close_db)
 
+def iniciar_servicos():
+    """
+    Prepara o banco e inicia as threads em segundo plano deste processo
+
+    Chamada por quem serve o app (bloco __main__ ou o hook post_worker_init do
+    gunicorn.conf.py), nunca na importação: importar o módulo em testes e
+    scripts não grava no banco nem inicia threads. Pode ser chamada mais de
+    uma vez; cada serviço só é iniciado uma vez por processo.
+    """
+    # Alternativas dos exercícios como array JSON (converte bancos antigos uma vez),
+    # versão das turmas usada pelo GET condicional da API e fila de gamificação
+    try:
+        db = db_manager.connect()
+        try:
+            alternativas.converter_sqlite(db)
+            criar_versao_turmas(db)
+            fila_gamificacao.criar_tabela(db)
+        finally:
+            db_manager.release(db)
+    except Exception:
+        logger.exception("Alternativas dos exercícios, versão das turmas ou fila de gamificação não atualizadas")
+
+    # Trabalhadores da fila de gamificação (GAMIFICACAO_WORKERS=0 quando rodam em gamificacao_worker.py)
+    try:
+        fila_gamificacao.iniciar_trabalhadores(db_manager)
+    except Exception:
+        logger.exception("Trabalhadores de gamificação não iniciados")
+
+    # Gravação periódica do tempo assistido (TEMPO_ASSISTIDO_FLUSH_S=0 grava a cada heartbeat)
+    tempo_assistido.iniciar(db_manager)
+
 # =====================================================
 # ROTAS PÚBLICAS
 # =====================================================
@@ -384,11 +451,12 @@ def editar_aula(aula_id):
             cur.execute('''
                 UPDATE aulas 
                 SET titulo = ?, descricao = ?, disciplina = ?, serie = ?, 
-                    link_video = ?, duracao_minutos = ?
+                    link_video = ?, duracao_minutos = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ? AND professor_id = ?
             ''', (titulo, descricao, disciplina, serie, link_video, duracao_minutos, aula_id, current_user.id))
             
             db.commit()
+            cache_conteudo.invalidar_aula(aula_id)
             flash('✅ Aula atualizada com sucesso!', 'success')
             return redirect(url_for('professor_aulas'))
             
@@ -437,6 +505,7 @@ def excluir_aula(aula_id):
         
         db.commit()
         cur.close()
+        cache_conteudo.invalidar_aula(aula_id)
         
         flash('✅ Aula excluída com sucesso!', 'success')
         
@@ -499,10 +568,10 @@ def criar_exercicio(aula_id):
     
     if request.method == 'POST':
         enunciado = request.form.get('enunciado')
-        alternativas = request.form.get('alternativas')
+        alternativas_texto = request.form.get('alternativas')
         resposta_correta = request.form.get('resposta_correta')
         
-        if not all([enunciado, alternativas, resposta_correta]):
+        if not all([enunciado, alternativas_texto, resposta_correta]):
             flash('❌ Por favor, preencha todos os campos.', 'error')
             return render_template('professor_criar_exercicio.html', aula=aula)
         
@@ -510,9 +579,11 @@ def criar_exercicio(aula_id):
             cur.execute('''
                 INSERT INTO exercicios (enunciado, alternativas, resposta_correta, aula_id)
                 VALUES (?, ?, ?, ?)
-            ''', (enunciado, alternativas, resposta_correta, aula_id))
+            ''', (enunciado, alternativas.serializar(alternativas_texto), resposta_correta, aula_id))
+            cur.execute('UPDATE aulas SET updated_at = CURRENT_TIMESTAMP WHERE id = ?', (aula_id,))
             
             db.commit()
+            cache_conteudo.invalidar_aula(aula_id)
             flash('✅ Exercício criado com sucesso!', 'success')
             return redirect(url_for('professor_exercicios', aula_id=aula_id))
             
@@ -530,12 +601,26 @@ def editar_exercicio(exercicio_id):
     db = get_db()
     cur = db.cursor()
     
+    # Buscar exercício (e a aula a que pertence) para edição
+    cur.execute('''
+        SELECT e.id, e.enunciado, e.alternativas, e.resposta_correta, e.aula_id,
+               a.titulo as aula_titulo
+        FROM exercicios e
+        JOIN aulas a ON e.aula_id = a.id
+        WHERE e.id = ? AND a.professor_id = ?
+    ''', (exercicio_id, current_user.id))
+    exercicio = cur.fetchone()
+    
+    if not exercicio:
+        flash('❌ Exercício não encontrado.', 'error')
+        return redirect(url_for('professor_aulas'))
+    
     if request.method == 'POST':
         enunciado = request.form.get('enunciado')
-        alternativas = request.form.get('alternativas')
+        alternativas_texto = request.form.get('alternativas')
         resposta_correta = request.form.get('resposta_correta')
         
-        if not all([enunciado, alternativas, resposta_correta]):
+        if not all([enunciado, alternativas_texto, resposta_correta]):
             flash('❌ Por favor, preencha todos os campos.', 'error')
             return render_template('professor_editar_exercicio.html', exercicio=exercicio)
         
@@ -543,32 +628,18 @@ def editar_exercicio(exercicio_id):
             cur.execute('''
                 UPDATE exercicios 
                 SET enunciado = ?, alternativas = ?, resposta_correta = ?
-                WHERE id = ? AND aula_id IN (
-                    SELECT id FROM aulas WHERE professor_id = ?
-                )
-            ''', (enunciado, alternativas, resposta_correta, exercicio_id, current_user.id))
+                WHERE id = ?
+            ''', (enunciado, alternativas.serializar(alternativas_texto), resposta_correta, exercicio_id))
+            cur.execute('UPDATE aulas SET updated_at = CURRENT_TIMESTAMP WHERE id = ?', (exercicio['aula_id'],))
             
             db.commit()
+            cache_conteudo.invalidar_aula(exercicio['aula_id'])
             flash('✅ Exercício atualizado com sucesso!', 'success')
             return redirect(url_for('professor_exercicios', aula_id=exercicio['aula_id']))
             
         except Exception as e:
             flash(f'❌ Erro ao atualizar exercício: {str(e)}', 'error')
     
-    # GET: buscar exercício para edição
-    cur.execute('''
-        SELECT e.id, e.enunciado, e.alternativas, e.resposta_correta, e.aula_id,
-               a.titulo as aula_titulo
-        FROM exercicios e
-        JOIN aulas a ON e.aula_id = a.id
-        WHERE e.id = ? AND a.professor_id = ?
-    ''', (exercicio_id, current_user.id))
-    exercicio = cur.fetchone()
-    
-    if not exercicio:
-        flash('❌ Exercício não encontrado.', 'error')
-        return redirect(url_for('professor_aulas'))
-    
     cur.close()
     
     return render_template('professor_editar_exercicio.html', exercicio=exercicio)
@@ -598,7 +669,9 @@ def excluir_exercicio(exercicio_id):
         
         # Excluir o exercício
         cur.execute('DELETE FROM exercicios WHERE id = ?', (exercicio_id,))
+        cur.execute('UPDATE aulas SET updated_at = CURRENT_TIMESTAMP WHERE id = ?', (aula_id,))
         db.commit()
+        cache_conteudo.invalidar_aula(aula_id)
         
         flash('✅ Exercício excluído com sucesso!', 'success')
         return redirect(url_for('professor_exercicios', aula_id=aula_id))
@@ -902,7 +975,11 @@ def relatorio_aluno(aluno_id):
     
     cur.close()
     
+    # Heatmap dos últimos 90 dias (linhas pré-agregadas)
+    heatmap_atividade = AtividadeDiariaService(db).get_heatmap(aluno_id, dias=90)
+    
     return render_template('professor_relatorio_aluno.html',
+                         heatmap_atividade=heatmap_atividade,
                          aluno=aluno_info,
                          progresso_aulas=progresso_aulas,
                          total_aulas=total_aulas,
@@ -1010,49 +1087,76 @@ def student_aula_view(aula_id):
     db = get_db()
     
     cur = db.cursor()
+    # Progresso do aluno e versão do conteúdo (sempre no banco)
     cur.execute('''
-        SELECT a.id, a.titulo, a.descricao, a.disciplina, a.serie, a.link_video,
-               p.status, p.pontuacao, p.tempo_assistido
+        SELECT a.updated_at, p.status, p.pontuacao, p.tempo_assistido
         FROM aulas a
         LEFT JOIN progresso p ON a.id = p.aula_id AND p.aluno_id = ?
         WHERE a.id = ?
     ''', (current_user.id, aula_id))
-    aula = cur.fetchone()
+    progresso = cur.fetchone()
     
-    if not aula:
+    if not progresso:
         flash('❌ Aula não encontrada.', 'error')
         return redirect(url_for('student_aulas'))
     
-    # Buscar exercícios da aula
-    cur.execute('''
-        SELECT id, enunciado, alternativas, resposta_correta
-        FROM exercicios
-        WHERE aula_id = ?
-        ORDER BY id
-    ''', (aula_id,))
-    exercicios = cur.fetchall()
+    # Mesma versão da aula e mesmo progresso: o navegador já tem a página
+    etag = http_condicional.etag_usuario(current_user, 'student_aula_view', aula_id, *progresso)
+    nao_modificada = http_condicional.nao_modificado(etag)
+    if nao_modificada:
+        cur.close()
+        return nao_modificada
     
+    # Aula e exercícios (cache de conteúdo)
+    def carregar_aula():
+        cur.execute('''
+            SELECT id, titulo, descricao, disciplina, serie, link_video
+            FROM aulas
+            WHERE id = ?
+        ''', (aula_id,))
+        aula = cur.fetchone()
+        if not aula:
+            return None
+        cur.execute('''
+            SELECT id, enunciado, alternativas, resposta_correta
+            FROM exercicios
+            WHERE aula_id = ?
+            ORDER BY id
+        ''', (aula_id,))
+        exercicios = [(e[0], e[1], alternativas.ler(e[2]), e[3]) for e in cur.fetchall()]
+        return (tuple(aula), exercicios), aula_id
+    
+    conteudo = cache_conteudo.obter('aula', aula_id, carregar_aula, progresso[0])
     cur.close()
     
-    return render_template('student_aula_view.html', 
-                         aula=aula, 
-                         exercicios=exercicios)
+    if not conteudo:
+        flash('❌ Aula não encontrada.', 'error')
+        return redirect(url_for('student_aulas'))
+    aula, exercicios = conteudo
+    
+    return http_condicional.aplicar(render_template('student_aula_view.html', 
+                                                    aula=aula + tuple(progresso[1:]), 
+                                                    exercicios=exercicios), etag)
 
 @app.route('/student/aula/<int:aula_id>/iniciar', methods=['POST'])
 @aluno_required
 def iniciar_aula(aula_id):
     """Iniciar uma aula (marcar como em andamento)"""
-    db = get_db()
+    # No modo producao gravar() roda na thread do escritor, sem contexto de requisição
+    aluno_id = current_user.id
     
-    try:
-        cur = db.cursor()
-        cur.execute('''
+    def gravar(conn):
+        conn.execute('''
             INSERT OR REPLACE INTO progresso (aluno_id, aula_id, status, ultima_atividade)
             VALUES (?, ?, 'em_andamento', CURRENT_TIMESTAMP)
-        ''', (current_user.id, aula_id))
-        db.commit()
-        cur.close()
-        
+        ''', (aluno_id, aula_id))
+        # Sequência e atividade diária ficam com a fila de gamificação
+        fila_gamificacao.enfileirar(conn, aluno_id, 'inicio_aula', aula_id)
+    
+    try:
+        db_manager.execute_transaction(gravar, get_db())
+        fila_gamificacao.notificar()
+
         flash('✅ Aula iniciada com sucesso!', 'success')
     except Exception as e:
         flash(f'❌ Erro ao iniciar aula: {str(e)}', 'error')
@@ -1178,9 +1282,7 @@ def student_turmas():
         return render_template('student_turmas.html', 
                              turmas_com_aulas=turmas_com_aulas)
     except Exception as e:
-        print(f"ERRO na rota student_turmas: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro na rota student_turmas")
         flash(f'❌ Erro ao carregar turmas: {str(e)}', 'error')
         return redirect(url_for('student_dashboard'))
     
@@ -1384,37 +1486,27 @@ def admin_dashboard():
         flash(f'❌ Erro ao carregar dashboard: {str(e)}', 'error')
     return redirect(url_for('splash'))
 
+# Usuários por página em /admin/usuarios
+USUARIOS_POR_PAGINA = 50
+
 @app.route('/admin/usuarios')
 @admin_required
 def admin_usuarios():
-    """Lista todos os usuários do sistema"""
+    """Lista os usuários do sistema (busca e filtros no servidor, paginado)"""
     try:
         db = get_db()
-        cursor = db.cursor()
         
-        # Buscar usuários com informações adicionais
-        cursor.execute("""
-            SELECT 
-                u.id, u.username, u.email, u.user_type, u.created_at,
-                u.first_name, u.last_name,
-                CASE 
-                    WHEN u.user_type = 'aluno' THEN (
-                        SELECT COUNT(*) FROM aluno_turma at 
-                        WHERE at.aluno_id = u.id AND (at.status = 'ativo' OR at.status IS NULL)
-                    )
-                    WHEN u.user_type = 'professor' THEN (
-                        SELECT COUNT(*) FROM turmas t 
-                        WHERE t.professor_id = u.id
-                    )
-                    ELSE 0
-                END as contador
-            FROM users u
-            ORDER BY u.created_at DESC
-        """)
-        usuarios = cursor.fetchall()
+        # Busca indexada com filtros; o contador só é calculado para os
+        # usuários da página
+        filtro = FiltroUsuarios.de_args(request.args)
+        pagina = UsuarioService(db).buscar(filtro, request.args.get('cursor'), USUARIOS_POR_PAGINA)
         
-        return render_template('admin_usuarios.html', usuarios=usuarios)
+        return render_template('admin_usuarios.html', usuarios=pagina.itens,
+                               proximo_cursor=pagina.proximo_cursor, filtro=filtro)
         
+    except ValueError:
+        flash('⚠️ Página inválida, voltando ao início da lista', 'warning')
+        return redirect(url_for('admin_usuarios'))
     except Exception as e:
         flash(f'❌ Erro ao carregar usuários: {str(e)}', 'error')
         return redirect(url_for('admin_dashboard'))
@@ -1812,13 +1904,7 @@ def student_gamificacao():
         if nivel_info and hasattr(nivel_info, 'keys'):
             nivel_info = list(nivel_info)
         
-        # Debug: verificar o que está sendo retornado
-        print(f"DEBUG - nivel_info type: {type(nivel_info)}")
-        print(f"DEBUG - nivel_info value: {nivel_info}")
-        if nivel_info:
-            print(f"DEBUG - nivel_info is iterable: {hasattr(nivel_info, '__iter__')}")
-            if hasattr(nivel_info, '__len__'):
-                print(f"DEBUG - nivel_info length: {len(nivel_info)}")
+        logger.debug("Nível do aluno %s: %s", current_user.id, nivel_info)
         
         # Buscar metas semanais ativas
         try:
@@ -1834,10 +1920,9 @@ def student_gamificacao():
                 ORDER BY m.data_fim ASC
             """, (current_user.id,))
             metas_semanais = cursor.fetchall()
-            print(f"DEBUG - metas_semanais type: {type(metas_semanais)}")
-            print(f"DEBUG - metas_semanais value: {metas_semanais}")
-        except Exception as e:
-            print(f"DEBUG - Erro ao buscar metas: {e}")
+            logger.debug("Metas semanais do aluno %s: %d", current_user.id, len(metas_semanais))
+        except Exception:
+            logger.warning("Erro ao buscar metas semanais do aluno %s", current_user.id, exc_info=True)
             metas_semanais = []
         
         # Buscar conquistas recentes
@@ -1889,10 +1974,7 @@ def student_gamificacao():
                              progresso_nivel=progresso_nivel)
                              
     except Exception as e:
-        import traceback
-        print(f"ERRO COMPLETO na gamificação: {str(e)}")
-        print(f"Traceback completo:")
-        traceback.print_exc()
+        logger.exception("Erro na rota student_gamificacao")
         flash(f'❌ Erro ao carregar gamificação: {str(e)}', 'error')
         return redirect(url_for('student_dashboard'))
 
@@ -1913,22 +1995,12 @@ def student_ranking():
         """, (current_user.id,))
         turmas = cursor.fetchall()
         
-        # Buscar ranking da semana atual para cada turma
+        # Ranking da semana atual de cada turma, a partir da atividade diária
         rankings = []
+        atividade = AtividadeDiariaService(db)
         if isinstance(turmas, list):
             for turma in turmas:
-                cursor.execute("""
-                    SELECT u.username, u.first_name, u.last_name, 
-                           COALESCE(rs.pontos_semana, 0) as pontos_semana,
-                           COALESCE(rs.posicao, 0) as posicao
-                    FROM users u
-                    JOIN aluno_turma at ON u.id = at.aluno_id
-                    LEFT JOIN ranking_semanal rs ON u.id = rs.aluno_id AND rs.turma_id = ?
-                    WHERE at.turma_id = ? AND (at.status = 'ativo' OR at.status IS NULL)
-                    ORDER BY pontos_semana DESC, u.first_name ASC
-                """, (turma[0], turma[0]))
-                
-                ranking_turma = cursor.fetchall()
+                ranking_turma = atividade.get_ranking_semanal(turma[0])
                 rankings.append({
                     'turma': turma,
                     'alunos': ranking_turma
@@ -2121,212 +2193,48 @@ def coletar_recompensa(meta_id):
         return redirect(url_for('student_metas'))
 
 # =====================================================
-# FUNÇÕES AUXILIARES DE GAMIFICAÇÃO
+# ATUALIZAR ROTAS EXISTENTES PARA INTEGRAR GAMIFICAÇÃO
 # =====================================================
 
-def atualizar_progresso_metas(aluno_id, tipo, valor=1):
-    """Atualizar progresso das metas semanais de um aluno"""
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        
-        # Buscar metas ativas do tipo especificado
-        cursor.execute("""
-            SELECT id, valor_meta, pontos_recompensa
-            FROM metas_semanais
-            WHERE tipo = ? AND ativa = 1 AND data_fim >= date('now')
-        """, (tipo,))
-        
-        metas = cursor.fetchall()
-        
-        for meta in metas:
-            meta_id = meta[0]
-            valor_meta = meta[1]
-            pontos_recompensa = meta[2]
-            
-            # Buscar ou criar progresso da meta
-            cursor.execute("""
-                SELECT id, valor_atual, concluida
-                FROM progresso_metas
-                WHERE meta_id = ? AND aluno_id = ?
-            """, (meta_id, aluno_id))
-            
-            progresso = cursor.fetchone()
-            
-            if progresso:
-                # Atualizar progresso existente
-                novo_valor = progresso[1] + valor
-                concluida = novo_valor >= valor_meta
-                
-                cursor.execute("""
-                    UPDATE progresso_metas
-                    SET valor_atual = ?, concluida = ?, 
-                        data_conclusao = CASE WHEN ? AND concluida = 0 THEN CURRENT_TIMESTAMP ELSE data_conclusao END
-                    WHERE id = ?
-                """, (novo_valor, concluida, concluida, progresso[0]))
-            else:
-                # Criar novo progresso
-                novo_valor = valor
-                concluida = novo_valor >= valor_meta
-                
-                cursor.execute("""
-                    INSERT INTO progresso_metas (aluno_id, meta_id, valor_atual, concluida, data_conclusao)
-                    VALUES (?, ?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE NULL END)
-                """, (aluno_id, meta_id, novo_valor, concluida, concluida))
-            
-            # Se a meta foi concluída, mostrar notificação
-            if concluida and not progresso or (progresso and not progresso[2]):
-                flash(f'🎯 Meta "{tipo}" concluída! Recompensa disponível.', 'success')
-        
-        db.commit()
-        cursor.close()
-        
-    except Exception as e:
-        print(f"Erro ao atualizar progresso de metas: {e}")
+def carregar_exercicio_aluno(db, exercicio_id):
+    """
+    Exercício com o título e a disciplina da aula, pelo cache de conteúdo
 
-def verificar_conquistas(aluno_id):
-    """Verificar e conceder conquistas automaticamente"""
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        
-        # Verificar conquista "Primeiro Passo"
-        cursor.execute("""
-            SELECT COUNT(*) FROM progresso 
-            WHERE aluno_id = ? AND status != 'nao_iniciado'
-        """, (aluno_id,))
-        aulas_iniciadas = cursor.fetchone()[0]
-        
-        if aulas_iniciadas >= 1:
-            cursor.execute("""
-                SELECT id FROM conquistas WHERE nome = 'Primeiro Passo'
-            """)
-            conquista = cursor.fetchone()
-            
-            if conquista:
-                # Verificar se já tem a conquista
-                cursor.execute("""
-                    SELECT id FROM aluno_conquista 
-                    WHERE aluno_id = ? AND conquista_id = ?
-                """, (aluno_id, conquista[0]))
-                
-                if not cursor.fetchone():
-                    # Conceder conquista
-                    cursor.execute("""
-                        INSERT INTO aluno_conquista (aluno_id, conquista_id)
-                        VALUES (?, ?)
-                    """, (aluno_id, conquista[0]))
-                    
-                    # Adicionar pontos
-                    cursor.execute("""
-                        INSERT INTO historico_pontos (aluno_id, pontos, tipo, descricao, referencia_id, referencia_tipo)
-                        VALUES (?, 50, 'conquista', 'Conquista: Primeiro Passo', ?, 'conquista')
-                    """, (aluno_id, conquista[0]))
-                    
-                    flash('🏆 Nova conquista desbloqueada: Primeiro Passo! +50 pontos', 'success')
-        
-        # Verificar conquista "Estudante Dedicado"
-        cursor.execute("""
-            SELECT COUNT(*) FROM progresso 
-            WHERE aluno_id = ? AND status = 'concluido'
-        """, (aluno_id,))
-        aulas_concluidas = cursor.fetchone()[0]
-        
-        if aulas_concluidas >= 5:
-            cursor.execute("""
-                SELECT id FROM conquistas WHERE nome = 'Estudante Dedicado'
-            """)
-            conquista = cursor.fetchone()
-            
-            if conquista:
-                cursor.execute("""
-                    SELECT id FROM aluno_conquista 
-                    WHERE aluno_id = ? AND conquista_id = ?
-                """, (aluno_id, conquista[0]))
-                
-                if not cursor.fetchone():
-                    cursor.execute("""
-                        INSERT INTO aluno_conquista (aluno_id, conquista_id)
-                        VALUES (?, ?)
-                    """, (aluno_id, conquista[0]))
-                    
-                    cursor.execute("""
-                        INSERT INTO historico_pontos (aluno_id, pontos, tipo, descricao, referencia_id, referencia_tipo)
-                        VALUES (?, 100, 'conquista', 'Conquista: Estudante Dedicado', ?, 'conquista')
-                    """, (aluno_id, conquista[0]))
-                    
-                    flash('🏆 Nova conquista desbloqueada: Estudante Dedicado! +100 pontos', 'success')
-        
-        db.commit()
-        cursor.close()
-        
-    except Exception as e:
-        print(f"Erro ao verificar conquistas: {e}")
-
-def atualizar_nivel_aluno(aluno_id):
-    """Atualizar nível do aluno baseado nos pontos totais"""
-    try:
-        db = get_db()
-        cursor = db.cursor()
-        
-        # Buscar pontos totais
-        cursor.execute("""
-            SELECT COALESCE(SUM(pontos), 0) as pontos_totais
-            FROM historico_pontos
-            WHERE aluno_id = ?
-        """, (aluno_id,))
-        
-        pontos_totais = cursor.fetchone()[0]
-        
-        # Calcular nível (cada nível requer 100 pontos)
-        nivel_atual = (pontos_totais // 100) + 1
-        pontos_nivel_atual = pontos_totais % 100
-        pontos_proximo_nivel = 100
-        
-        # Definir título e cor do nível
-        if nivel_atual == 1:
-            titulo = 'Iniciante'
-            cor = '#6c757d'
-            icone = 'fas fa-star'
-        elif nivel_atual == 2:
-            titulo = 'Aprendiz'
-            cor = '#28a745'
-            icone = 'fas fa-star'
-        elif nivel_atual == 3:
-            titulo = 'Estudante'
-            cor = '#007bff'
-            icone = 'fas fa-star'
-        elif nivel_atual == 4:
-            titulo = 'Avançado'
-            cor = '#6f42c1'
-            icone = 'fas fa-star'
-        elif nivel_atual == 5:
-            titulo = 'Mestre'
-            cor = '#fd7e14'
-            icone = 'fas fa-crown'
-        else:
-            titulo = f'Nível {nivel_atual}'
-            cor = '#dc3545'
-            icone = 'fas fa-crown'
-        
-        # Atualizar ou inserir nível
-        cursor.execute("""
-            INSERT OR REPLACE INTO niveis_aluno 
-            (aluno_id, nivel_atual, pontos_totais, pontos_nivel_atual, pontos_proximo_nivel, 
-             titulo_nivel, cor_nivel, icone_nivel, ultima_atualizacao)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (aluno_id, nivel_atual, pontos_totais, pontos_nivel_atual, pontos_proximo_nivel, 
-               titulo, cor, icone))
-        
-        db.commit()
-        cursor.close()
-        
-    except Exception as e:
-        print(f"Erro ao atualizar nível: {e}")
-
-# =====================================================
-# ATUALIZAR ROTAS EXISTENTES PARA INTEGRAR GAMIFICAÇÃO
-# =====================================================
+    Returns:
+        tuple: (id, enunciado, alternativas (lista), resposta_correta, aula_id,
+        titulo da aula, disciplina, pontos) ou None se não existe
+    """
+    # Versão do conteúdo: updated_at da aula (as rotas que editam exercícios
+    # também o atualizam), para que edições de outro worker valham na correção
+    cur = db.cursor()
+    cur.execute('''
+        SELECT a.updated_at
+        FROM exercicios e
+        JOIN aulas a ON e.aula_id = a.id
+        WHERE e.id = ?
+    ''', (exercicio_id,))
+    versao = cur.fetchone()
+    cur.close()
+    if not versao:
+        return None
+    
+    def carregar():
+        cur = db.cursor()
+        cur.execute('''
+            SELECT e.id, e.enunciado, e.alternativas, e.resposta_correta, e.aula_id,
+                   a.titulo, a.disciplina, e.pontos
+            FROM exercicios e
+            JOIN aulas a ON e.aula_id = a.id
+            WHERE e.id = ?
+        ''', (exercicio_id,))
+        exercicio = cur.fetchone()
+        cur.close()
+        if not exercicio:
+            return None
+        exercicio = tuple(exercicio)
+        return exercicio[:2] + (alternativas.ler(exercicio[2]),) + exercicio[3:], exercicio[4]
+    
+    return cache_conteudo.obter('exercicio', exercicio_id, carregar, versao[0])
 
 # Atualizar a rota de fazer exercício para incluir gamificação
 @app.route('/student/exercicio/<int:exercicio_id>', methods=['GET', 'POST'])
@@ -2338,49 +2246,36 @@ def fazer_exercicio(exercicio_id):
     if request.method == 'POST':
         resposta_aluno = request.form.get('resposta')
         
-        # Buscar exercício
-        cur = db.cursor()
-        cur.execute('''
-            SELECT e.id, e.enunciado, e.alternativas, e.resposta_correta, e.aula_id, e.pontos,
-                   a.titulo
-            FROM exercicios e
-            JOIN aulas a ON e.aula_id = a.id
-            WHERE e.id = ?
-        ''', (exercicio_id,))
-        exercicio = cur.fetchone()
-        
+        exercicio = carregar_exercicio_aluno(db, exercicio_id)
         if not exercicio:
             flash('❌ Exercício não encontrado.', 'error')
             return redirect(url_for('student_aulas'))
         
         # Verificar resposta
         correto = resposta_aluno == exercicio[3]
-        pontos_exercicio = exercicio[4] if correto else 0
+        pontos_exercicio = exercicio[7] if correto else 0
         
-        # Atualizar progresso
-        try:
-            cur.execute('''
+        # Atualizar progresso; pontos, metas, conquistas e nível ficam com a fila de gamificação.
+        # No modo producao gravar() roda na thread do escritor, sem contexto de requisição
+        aluno_id = current_user.id
+        
+        def gravar(conn):
+            conn.execute('''
                 INSERT OR REPLACE INTO progresso (aluno_id, aula_id, status, pontuacao, ultima_atividade)
                 VALUES (?, ?, 'em_andamento', ?, CURRENT_TIMESTAMP)
-            ''', (current_user.id, exercicio[4], pontos_exercicio))
+            ''', (aluno_id, exercicio[4], pontos_exercicio))
+            QuizService(conn).registrar_respostas(aluno_id, [Correcao(
+                exercicio_id=exercicio_id, resposta=resposta_aluno, correta=correto,
+                pontos=pontos_exercicio, resposta_correta=exercicio[3]
+            )])
+            fila_gamificacao.enfileirar(conn, aluno_id, 'exercicio', exercicio_id, pontos=pontos_exercicio,
+                                        correto=correto, descricao=f'Exercício correto: {exercicio[5]}')
+        
+        try:
+            db_manager.execute_transaction(gravar, db)
+            fila_gamificacao.notificar()
             
-            # Se acertou, adicionar pontos ao histórico e atualizar gamificação
             if correto:
-                # Adicionar ao histórico de pontos
-                cur.execute('''
-                    INSERT INTO historico_pontos (aluno_id, pontos, tipo, descricao, referencia_id, referencia_tipo)
-                    VALUES (?, ?, 'exercicio', ?, ?, 'exercicio')
-                ''', (current_user.id, pontos_exercicio, f'Exercício correto: {exercicio[6]}', exercicio_id))
-                
-                # Atualizar progresso de metas
-                atualizar_progresso_metas(current_user.id, 'exercicios')
-                
-                # Verificar conquistas
-                verificar_conquistas(current_user.id)
-                
-                # Atualizar nível
-                atualizar_nivel_aluno(current_user.id)
-                
                 flash(f'✅ Resposta correta! +{pontos_exercicio} pontos!', 'success')
             else:
                 flash(f'❌ Resposta incorreta. A resposta correta era: {exercicio[3]}', 'error')
@@ -2388,33 +2283,86 @@ def fazer_exercicio(exercicio_id):
         except Exception as e:
             flash(f'❌ Erro ao salvar progresso: {str(e)}', 'error')
         
-        cur.close()
-        
         return redirect(url_for('fazer_exercicio', exercicio_id=exercicio_id))
     
     # GET: mostrar exercício
-    cur = db.cursor()
-    cur.execute('''
-        SELECT e.id, e.enunciado, e.alternativas, e.resposta_correta, e.aula_id,
-               a.titulo, a.disciplina, e.pontos
-        FROM exercicios e
-        JOIN aulas a ON e.aula_id = a.id
-        WHERE e.id = ?
-    ''', (exercicio_id,))
-    exercicio = cur.fetchone()
-    
+    exercicio = carregar_exercicio_aluno(db, exercicio_id)
     if not exercicio:
         flash('❌ Exercício não encontrado.', 'error')
         return redirect(url_for('student_aulas'))
     
-    # Converter alternativas de string para lista
-    alternativas = exercicio[2].split('|') if exercicio[2] else []
+    return render_template('student_exercicio.html', 
+                         exercicio=exercicio, 
+                         alternativas=exercicio[2])
+
+@app.route('/student/aula/<int:aula_id>/quiz', methods=['GET', 'POST'])
+@aluno_required
+def student_quiz(aula_id):
+    """Responder todos os exercícios de uma aula em um único envio"""
+    db = get_db()
     
+    cur = db.cursor()
+    cur.execute('SELECT id, titulo, disciplina, updated_at FROM aulas WHERE id = ?', (aula_id,))
+    aula = cur.fetchone()
     cur.close()
     
-    return render_template('student_exercicio.html', 
-                         exercicio=exercicio, 
-                         alternativas=alternativas)
+    if not aula:
+        flash('❌ Aula não encontrada.', 'error')
+        return redirect(url_for('student_aulas'))
+    
+    service = QuizService(db)
+    gabarito = service.carregar_gabarito(aula_id, aula[3])
+    if not gabarito:
+        flash('ℹ️ Esta aula ainda não tem exercícios.', 'info')
+        return redirect(url_for('student_aula_view', aula_id=aula_id))
+    
+    resultado = None
+    if request.method == 'POST':
+        # Correção em memória; respostas, progresso e eventos em uma transação
+        respostas = {item.exercicio_id: request.form.get(f'resposta_{item.exercicio_id}') for item in gabarito}
+        resultado = corrigir(aula_id, gabarito, respostas)
+        
+        if not resultado.correcoes:
+            flash('⚠️ Responda ao menos um exercício.', 'warning')
+            resultado = None
+        else:
+            # No modo producao a transação roda na thread do escritor, sem contexto de requisição
+            aluno_id = current_user.id
+            try:
+                db_manager.execute_transaction(
+                    lambda conn: QuizService(conn).registrar(aluno_id, resultado, aula[1]), db
+                )
+                fila_gamificacao.notificar()
+                flash(f'✅ {resultado.acertos} de {len(resultado.correcoes)} respostas corretas! '
+                      f'+{resultado.pontos} pontos', 'success')
+            except Exception as e:
+                flash(f'❌ Erro ao salvar respostas: {str(e)}', 'error')
+                resultado = None
+    
+    return render_template('student_quiz.html',
+                         aula=aula,
+                         gabarito=gabarito,
+                         resultado=resultado,
+                         correcoes=resultado.por_exercicio() if resultado else {})
+
+@app.route('/student/aula/<int:aula_id>/heartbeat', methods=['POST'])
+@aluno_required
+def heartbeat_aula(aula_id):
+    """Somar o tempo assistido desde o heartbeat anterior (JSON {"segundos": n})"""
+    dados = request.get_json(silent=True) or {}
+    try:
+        segundos = float(dados.get('segundos', 0))
+    except (TypeError, ValueError):
+        return {'erro': 'segundos inválido'}, 400
+    if not 0 < segundos < float('inf'):
+        return {'erro': 'segundos inválido'}, 400
+    
+    resultado = tempo_assistido.registrar(current_user.id, aula_id, segundos)
+    if not tempo_assistido.em_execucao():
+        # Sem a gravação periódica, cada heartbeat é gravado na requisição
+        tempo_assistido.descarregar(get_db(), [(current_user.id, aula_id)], motivo='requisicao')
+    
+    return '', 429 if resultado == 'descartado' else 204
 
 # Atualizar a rota de concluir aula para incluir gamificação
 @app.route('/student/aula/<int:aula_id>/concluir', methods=['POST'])
@@ -2423,32 +2371,27 @@ def concluir_aula(aula_id):
     """Concluir uma aula com sistema de gamificação"""
     db = get_db()
     
-    try:
-        cur = db.cursor()
-        cur.execute('''
+    # No modo producao gravar() roda na thread do escritor, sem contexto de requisição
+    aluno_id = current_user.id
+    
+    # Tempo assistido ainda em memória entra antes da conclusão
+    tempo_assistido.descarregar_aula(db, aluno_id, aula_id)
+    
+    # Pontos, metas, conquistas e nível ficam com a fila de gamificação
+    pontos_aula = PONTOS_AULA
+    
+    def gravar(conn):
+        conn.execute('''
             UPDATE progresso 
             SET status = 'concluido', ultima_atividade = CURRENT_TIMESTAMP
             WHERE aluno_id = ? AND aula_id = ?
-        ''', (current_user.id, aula_id))
-        
-        # Adicionar pontos por concluir aula
-        pontos_aula = 25
-        cur.execute('''
-            INSERT INTO historico_pontos (aluno_id, pontos, tipo, descricao, referencia_id, referencia_tipo)
-            VALUES (?, ?, 'aula', 'Aula concluída', ?, 'aula')
-        ''', (current_user.id, pontos_aula, aula_id))
-        
-        # Atualizar progresso de metas
-        atualizar_progresso_metas(current_user.id, 'aulas')
-        
-        # Verificar conquistas
-        verificar_conquistas(current_user.id)
-        
-        # Atualizar nível
-        atualizar_nivel_aluno(current_user.id)
-        
-        db.commit()
-        cur.close()
+        ''', (aluno_id, aula_id))
+        fila_gamificacao.enfileirar(conn, aluno_id, 'aula', aula_id, pontos=pontos_aula,
+                                    descricao='Aula concluída')
+    
+    try:
+        db_manager.execute_transaction(gravar, db)
+        fila_gamificacao.notificar()
         
         flash(f'🎉 Parabéns! Aula concluída com sucesso! +{pontos_aula} pontos', 'success')
     except Exception as e:
@@ -2920,6 +2863,10 @@ if __name__ == '__main__':
     # Configurar debug baseado no ambiente
     debug = os.getenv('FLASK_DEBUG', '0') == '1'
     
+    # Com o reloader, só o processo filho serve as requisições
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_servicos()
+    
     app.run(
         host=host,
         port=port,
@@ -1,55 +1,85 @@
 from flask import Flask, render_template, redirect, url_for, flash, request, session, g, abort, jsonify
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_restful import Api
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import logging
 import os
-import traceback
 import sys
+import threading
+
+# Carregar variáveis de ambiente
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Logs estruturados (JSON em produção) escritos por uma thread dedicada
+from utils import logging_config
+logging_config.configurar_logging()
+logger = logging.getLogger(__name__)
 
 # Tratamento de erros de import
 try:
     import psycopg
+    from psycopg.pq import TransactionStatus
     from psycopg.rows import dict_row
     PSYCOPG_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️ psycopg não disponível: {e}")
+    logger.warning(f"psycopg não disponível: {e}")
     PSYCOPG_AVAILABLE = False
 
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+
+from services.usuario_service import FiltroUsuarios, UsuarioService
+from utils import (cache_conteudo, compressao, consultas_preparadas, http_condicional, metrics, profiler, roteamento_db,
+                   sql_instrumentation)
+from utils.roteamento_db import somente_leitura
+from utils.sql_instrumentation import InstrumentedPsycopgCursor
+
 try:
     from models_postgres import User
     MODELS_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️ models_postgres não disponível: {e}")
+    logger.warning(f"models_postgres não disponível: {e}")
     MODELS_AVAILABLE = False
 
 try:
     from auth import admin_required, professor_required, aluno_required, content_creator_required, user_management_required, analytics_required, guest_required
     AUTH_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️ auth não disponível: {e}")
+    logger.warning(f"auth não disponível: {e}")
     AUTH_AVAILABLE = False
 
-try:
-    from api.turmas import register_turmas_api
-    API_TURMAS_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ api.turmas não disponível: {e}")
-    API_TURMAS_AVAILABLE = False
+def _flag_ativa(nome, padrao='true'):
+    """Lê uma flag booleana do ambiente"""
+    return os.getenv(nome, padrao).strip().lower() in ('1', 'true', 'yes', 'on')
 
-try:
-    from api.swagger import create_swagger_blueprint, get_swagger_spec
-    SWAGGER_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ api.swagger não disponível: {e}")
-    SWAGGER_AVAILABLE = False
+# Subsistemas opcionais: desativá-los evita importá-los na inicialização
+# (reduz o cold start em máquinas que escalam para zero)
+ENABLE_REST_API = _flag_ativa('ENABLE_REST_API')
+ENABLE_SWAGGER = _flag_ativa('ENABLE_SWAGGER')
+ENABLE_AI = _flag_ativa('ENABLE_AI')
 
-# Carregar variáveis de ambiente
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    print("⚠️ python-dotenv não disponível")
+API_TURMAS_AVAILABLE = False
+if ENABLE_REST_API:
+    try:
+        from flask_restful import Api
+        from api.turmas import register_turmas_api
+        API_TURMAS_AVAILABLE = True
+    except ImportError as e:
+        logger.warning(f"api.turmas não disponível: {e}")
+
+SWAGGER_AVAILABLE = False
+if ENABLE_SWAGGER:
+    try:
+        from api.swagger import create_swagger_blueprint
+        SWAGGER_AVAILABLE = True
+    except ImportError as e:
+        logger.warning(f"api.swagger não disponível: {e}")
 
 # Inicialização da aplicação
 app = Flask(__name__)
@@ -61,6 +91,24 @@ app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
+# Id de cada requisição nos logs e no cabeçalho X-Request-ID
+logging_config.init_app(app)
+
+# Contagem de consultas, tempo no banco e detecção de N+1 por requisição
+sql_instrumentation.init_app(app)
+
+# Métricas por endpoint em /metrics (formato Prometheus, apenas acesso local)
+metrics.init_app(app)
+
+# Profiler por amostragem sob demanda (?_profile=1 para administradores)
+if AUTH_AVAILABLE:
+    profiler.init_app(app)
+
+# Compressão gzip/brotli das respostas e estáticos com hash. O Flask roda os
+# after_request na ordem inversa do registro: registrada depois das métricas e
+# do profiler, a compressão roda antes deles e entra na duração da requisição
+compressao.init_app(app)
+
 # Configuração do Flask-Login (se disponível)
 if AUTH_AVAILABLE:
     login_manager = LoginManager()
@@ -69,29 +117,29 @@ if AUTH_AVAILABLE:
     login_manager.login_message = '🔐 Por favor, faça login para acessar esta página.'
     login_manager.login_message_category = 'info'
 else:
-    print("⚠️ Flask-Login não configurado - auth não disponível")
+    logger.warning("Flask-Login não configurado - auth não disponível")
 
 # Configuração da API REST (se disponível)
 if API_TURMAS_AVAILABLE:
     api = Api(app, prefix='/api')
     # Registrar endpoints da API
     register_turmas_api(api)
-else:
-    print("⚠️ API REST não configurada - api.turmas não disponível")
+elif ENABLE_REST_API:
+    logger.warning("API REST não configurada - api.turmas não disponível")
 
 # Configuração do Swagger (se disponível)
 if SWAGGER_AVAILABLE:
     swagger_blueprint = create_swagger_blueprint()
     app.register_blueprint(swagger_blueprint)
-else:
-    print("⚠️ Swagger não configurado - api.swagger não disponível")
+elif ENABLE_SWAGGER:
+    logger.warning("Swagger não configurado - api.swagger não disponível")
 
 def create_default_users():
     """Cria usuários padrão se não existirem"""
     try:
         db = get_db()
         if not db:
-            print("⚠️ Não foi possível conectar ao banco para criar usuários padrão")
+            logger.warning("Não foi possível conectar ao banco para criar usuários padrão")
             return
         
         cur = db.cursor()
@@ -101,11 +149,11 @@ def create_default_users():
         user_count = cur.fetchone()['count']
         
         if user_count > 1:  # Se já tem mais de 1 usuário, não precisa criar
-            print(f"✅ Usuários já existem no banco ({user_count} usuários)")
+            logger.info(f"Usuários já existem no banco ({user_count} usuários)")
             cur.close()
             return
         
-        print("🔧 Criando usuários padrão...")
+        logger.info("Criando usuários padrão...")
         
         # Usuários padrão
         default_users = [
@@ -131,18 +179,16 @@ def create_default_users():
                     INSERT INTO users (username, password_hash, user_type, first_name, last_name, email, is_active)
                     VALUES (%s, %s, %s, %s, %s, %s, true)
                 """, (username, hashed_password, user_type, first_name, last_name, email))
-                print(f"   ✅ Criado: {username} ({user_type})")
+                logger.info(f"Criado: {username} ({user_type})")
             else:
-                print(f"   🔄 Já existe: {username}")
+                logger.info(f"Já existe: {username}")
         
         db.commit()
         cur.close()
-        print("🎉 Usuários padrão criados com sucesso!")
+        logger.info("Usuários padrão criados com sucesso!")
         
     except Exception as e:
-        print(f"❌ Erro ao criar usuários padrão: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Erro ao criar usuários padrão: {e}")
 
 # Funções auxiliares para os templates
 @app.context_processor
@@ -168,8 +214,12 @@ def utility_processor():
 # Rota para especificação OpenAPI
 @app.route('/static/swagger.json')
 def swagger_spec():
-    """Retorna a especificação OpenAPI"""
-    return get_swagger_spec()
+    """Retorna a especificação OpenAPI (importada apenas quando solicitada; 304 se não mudou)"""
+    if not SWAGGER_AVAILABLE:
+        abort(404)
+    from api.swagger import get_swagger_etag, get_swagger_spec
+    etag = get_swagger_etag()
+    return http_condicional.nao_modificado(etag) or http_condicional.aplicar(get_swagger_spec(), etag)
 
 # Registrar endpoints da API
 # register_turmas_api(api) # Moved to above
@@ -180,36 +230,109 @@ def load_user(user_id):
     db = get_db()
     return User.get_by_id(int(user_id), db)
 
-def get_db():
-    """Conectar ao banco de dados PostgreSQL"""
-    if 'db' not in g:
-        try:
-            # Usar DATABASE_URL do Render ou configuração local
-            database_url = os.getenv('DATABASE_URL')
-            if database_url:
-                # Render usa DATABASE_URL
-                g.db = psycopg.connect(database_url, row_factory=dict_row)
-                print("✅ Conectado ao PostgreSQL (Render)")
-            else:
-                # Configuração local
-                g.db = psycopg.connect(
-                    host=os.getenv('DB_HOST', 'localhost'),
-                    dbname=os.getenv('DB_NAME', 'escola_para_todos'),
-                    user=os.getenv('DB_USER', 'postgres'),
-                    password=os.getenv('DB_PASSWORD', 'postgres'),
-                    row_factory=dict_row
+# Conexões mantidas abertas entre requisições, por pool (0 = uma conexão por
+# requisição). Com o pool as consultas preparadas de utils.consultas_preparadas
+# são reaproveitadas pelas requisições seguintes na mesma conexão.
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+def _configurar_replica(conn):
+    """Conexões com a réplica recusam escritas, mesmo se o DSN apontar para o primário"""
+    consultas_preparadas.configurar_conexao(conn)
+    conn.read_only = True
+
+def _get_pool(papel):
+    """Pool de conexões do processo para 'primario' ou 'replica' (None se desativado)"""
+    pool = _pools.get(papel)
+    if pool is None and ConnectionPool is not None and DB_POOL_MAX_SIZE > 0:
+        with _pool_lock:
+            pool = _pools.get(papel)
+            if pool is None:
+                replica = papel == 'replica'
+                pool = ConnectionPool(
+                    roteamento_db.dsn_replica() if replica else roteamento_db.dsn_primario(),
+                    min_size=min(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+                    max_size=DB_POOL_MAX_SIZE,
+                    kwargs={'row_factory': dict_row, 'cursor_factory': InstrumentedPsycopgCursor},
+                    configure=_configurar_replica if replica else consultas_preparadas.configurar_conexao,
+                    name=papel,
+                    open=True
                 )
-                print("✅ Conectado ao PostgreSQL (local)")
+                metrics.registrar_pool('postgres' if papel == 'primario' else 'postgres_replica', pool.get_stats)
+                logger.info(f"Pool de conexões PostgreSQL ({papel}) aberto (até {DB_POOL_MAX_SIZE} conexões)")
+                _pools[papel] = pool
+    return pool
+
+def _conectar(papel):
+    """Conexão da requisição com o primário (g.db) ou com a réplica (g.db_leitura)"""
+    chave = 'db' if papel == 'primario' else 'db_leitura'
+    if chave not in g:
+        pool = _get_pool(papel)
+        if pool is not None:
+            conn = pool.getconn()
+            g.setdefault('db_pools', {})[chave] = pool
+        else:
+            replica = papel == 'replica'
+            conn = psycopg.connect(roteamento_db.dsn_replica() if replica else roteamento_db.dsn_primario(),
+                                   row_factory=dict_row, cursor_factory=InstrumentedPsycopgCursor)
+            (_configurar_replica if replica else consultas_preparadas.configurar_conexao)(conn)
+            logger.info(f"Conectado ao PostgreSQL ({papel})")
+            metrics.incrementar('db_connections_opened_total')
+        setattr(g, chave, conn)
+    return g.get(chave)
+
+def get_db(intencao=None):
+    """
+    Conectar ao banco de dados PostgreSQL
+
+    Leituras (intenção declarada com @somente_leitura ou passada aqui) vão
+    para a réplica, se configurada, exceto logo após uma escrita do próprio
+    usuário; escritas vão sempre para o primário.
+    """
+    intencao = intencao or roteamento_db.intencao_atual()
+    if (intencao == roteamento_db.INTENCAO_LEITURA and roteamento_db.dsn_replica()
+            and not g.get('replica_indisponivel') and not roteamento_db.leitura_no_primario(session)):
+        try:
+            return _conectar('replica')
         except Exception as e:
-            print(f"❌ Erro ao conectar ao banco: {e}")
-            g.db = None
-    return g.db
+            logger.warning(f"Réplica indisponível, lendo do primário: {e}")
+            g.replica_indisponivel = True
+    try:
+        return _conectar('primario')
+    except Exception as e:
+        logger.error(f"Erro ao conectar ao banco: {e}")
+        g.db = None
+        return None
 
 def close_db(e=None):
-    """Fechar conexão com o banco"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
+    """Fechar as conexões com o banco (ou devolvê-las ao pool)"""
+    pools = g.pop('db_pools', {})
+    for chave in ('db', 'db_leitura'):
+        db = g.pop(chave, None)
+        if db is None:
+            continue
+        if chave in pools:
+            # Leituras deixam a transação implícita aberta; desfeita aqui, o pool
+            # não precisa desfazê-la (com um aviso no log) a cada requisição
+            if db.info.transaction_status != TransactionStatus.IDLE:
+                try:
+                    db.rollback()
+                except Exception:
+                    logger.warning("Falha ao desfazer a transação antes de devolver a conexão", exc_info=True)
+            pools[chave].putconn(db)
+        else:
+            db.close()
+
+@app.after_request
+def marcar_escrita(response):
+    """Após uma requisição que altera dados, as leituras do usuário voltam ao primário por alguns segundos"""
+    if (roteamento_db.dsn_replica() and request.method not in roteamento_db.METODOS_SEGUROS
+            and g.get('db') is not None and current_user.is_authenticated):
+        roteamento_db.marcar_escrita(session)
+    return response
 
 app.teardown_appcontext(close_db)
 
@@ -220,7 +343,7 @@ app.teardown_appcontext(close_db)
 @app.route('/')
 def splash():
     """Página inicial da aplicação"""
-    print("🔍 DEBUG: Rota splash chamada")
+    logger.debug("Rota splash chamada")
     return render_template('splash.html')
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -235,40 +358,39 @@ def login():
             username = request.form['username']
             password = request.form['password']
             
-            print(f"🔍 DEBUG: Tentativa de login - Username: '{username}', Senha: '{password[:3]}...'")
+            logger.debug("Tentativa de login: %s", username)
             
             db = get_db()
             if not db:
-                print("❌ DEBUG: Falha na conexão com banco de dados")
+                logger.error("Falha na conexão com banco de dados")
                 flash('❌ Erro de conexão com banco de dados', 'error')
                 return render_template('login.html')
             
-            print("✅ DEBUG: Conexão com banco estabelecida")
+            logger.debug("Conexão com banco estabelecida")
             
             # Usar o método authenticate que verifica a senha
-            print(f"🔐 DEBUG: Chamando User.authenticate('{username}', '***', db)")
             user = User.authenticate(username, password, db)
             
             if user:
-                print(f"✅ DEBUG: Usuário autenticado com sucesso: {user.username} ({user.user_type})")
+                logger.debug("Usuário autenticado com sucesso: %s (%s)", user.username, user.user_type)
                 login_user(user)
                 flash(f'🎉 Bem-vindo, {user.first_name}!', 'success')
                 
                 # Redirecionar baseado no tipo de usuário
                 if user.is_admin:
-                    print("🔄 DEBUG: Redirecionando para admin_dashboard")
+                    logger.debug("Redirecionando para admin_dashboard")
                     return redirect(url_for('admin_dashboard'))
                 elif user.is_professor:
-                    print("🔄 DEBUG: Redirecionando para professor_dashboard")
+                    logger.debug("Redirecionando para professor_dashboard")
                     return redirect(url_for('professor_dashboard'))
                 else:
-                    print("🔄 DEBUG: Redirecionando para student_dashboard")
+                    logger.debug("Redirecionando para student_dashboard")
                     return redirect(url_for('student_dashboard'))
             else:
-                print(f"❌ DEBUG: Falha na autenticação para username: '{username}'")
+                logger.info("Falha na autenticação para username: '%s'", username)
                 flash('❌ Usuário ou senha incorretos!', 'error')
         except Exception as e:
-            print(f"❌ Erro no login: {e}")
+            logger.error(f"Erro no login: {e}")
             flash('❌ Erro interno no sistema', 'error')
     
     return render_template('login.html')
@@ -351,24 +473,24 @@ def admin_dashboard():
         cur = db.cursor()
         
         # Contar usuários por tipo
-        cur.execute('SELECT user_type, COUNT(*) FROM users GROUP BY user_type')
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_USUARIOS_POR_TIPO)
         user_stats_raw = cur.fetchall()
         user_stats = {row['user_type']: row['count'] for row in user_stats_raw}
         
         # Contar turmas
-        cur.execute('SELECT COUNT(*) FROM turmas')
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_TOTAL_TURMAS)
         turmas_count = cur.fetchone()['count']
         
         # Contar aulas
-        cur.execute('SELECT COUNT(*) FROM aulas')
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_TOTAL_AULAS)
         aulas_count = cur.fetchone()['count']
         
         # Contar matrículas
-        cur.execute('SELECT COUNT(*) FROM matriculas')
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_TOTAL_MATRICULAS)
         matriculas_count = cur.fetchone()['count']
         
         # Contar exercícios
-        cur.execute('SELECT COUNT(*) FROM exercicios')
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_TOTAL_EXERCICIOS)
         exercicios_count = cur.fetchone()['count']
         
         cur.close()
@@ -388,7 +510,7 @@ def admin_dashboard():
         return render_template('admin_dashboard.html', stats=stats)
         
     except Exception as e:
-        print(f"❌ Erro no dashboard admin: {e}")
+        logger.error(f"Erro no dashboard admin: {e}")
         # Retornar com estatísticas vazias em caso de erro
         stats = {
             'total_users': 0,
@@ -402,46 +524,51 @@ def admin_dashboard():
         }
         return render_template('admin_dashboard.html', stats=stats)
 
+# Usuários por página em /admin/usuarios
+USUARIOS_POR_PAGINA = 50
+
 @app.route('/admin/usuarios')
 @admin_required
 def admin_usuarios():
-    """Gerenciamento de usuários"""
+    """Gerenciamento de usuários (busca e filtros no servidor, paginado)"""
+    # Toda renderização recebe o filtro (o template monta os links com ele)
+    filtro = FiltroUsuarios.de_args(request.args)
     try:
         db = get_db()
         if not db:
             flash('Erro de conexão com o banco de dados', 'error')
-            return render_template('admin_usuarios.html', usuarios=[])
+            return render_template('admin_usuarios.html', usuarios=[], proximo_cursor=None, filtro=filtro)
         
-        cur = db.cursor()
-        
-        # Buscar todos os usuários
-        cur.execute("""
-            SELECT id, username, email, user_type, first_name, last_name, is_active, created_at, updated_at
-            FROM users
-            ORDER BY created_at DESC
-        """)
-        usuarios = cur.fetchall()
-        cur.close()
+        # Busca indexada com filtros; o contador só é calculado para os
+        # usuários da página
+        pagina = UsuarioService(db).buscar(filtro, request.args.get('cursor'), USUARIOS_POR_PAGINA)
         
-        return render_template('admin_usuarios.html', usuarios=usuarios)
+        return render_template('admin_usuarios.html', usuarios=pagina.itens,
+                               proximo_cursor=pagina.proximo_cursor, filtro=filtro)
         
+    except ValueError:
+        flash('Página inválida, voltando ao início da lista', 'warning')
+        return redirect(url_for('admin_usuarios'))
     except Exception as e:
         flash(f'Erro ao carregar usuários: {e}', 'error')
-        return render_template('admin_usuarios.html', usuarios=[])
+        return render_template('admin_usuarios.html', usuarios=[], proximo_cursor=None, filtro=filtro)
 
 @app.route('/admin/relatorios')
+@somente_leitura
 @admin_required
 def admin_relatorios():
     """Relatórios administrativos"""
     return render_template('admin_relatorios.html')
 
 @app.route('/admin/relatorio/usuarios')
+@somente_leitura
 @admin_required
 def admin_relatorio_usuarios():
     """Relatório de usuários"""
     return render_template('admin_relatorio_usuarios.html')
 
 @app.route('/admin/relatorio/turmas')
+@somente_leitura
 @admin_required
 def admin_relatorio_turmas():
     """Relatório de turmas"""
@@ -663,51 +790,27 @@ def professor_dashboard():
         professor_id = current_user.id
         
         # Contar aulas do professor
-        cur.execute('SELECT COUNT(*) FROM aulas WHERE professor_id = %s', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_TOTAL_AULAS, (professor_id,))
         total_aulas = cur.fetchone()['count']
         
         # Contar turmas do professor
-        cur.execute('SELECT COUNT(*) FROM turmas WHERE professor_id = %s', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_TOTAL_TURMAS, (professor_id,))
         total_turmas = cur.fetchone()['count']
         
         # Contar alunos matriculados nas turmas do professor
-        cur.execute('''
-            SELECT COUNT(DISTINCT m.aluno_id) 
-            FROM matriculas m 
-            JOIN turmas t ON m.turma_id = t.id 
-            WHERE t.professor_id = %s
-        ''', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_TOTAL_ALUNOS, (professor_id,))
         total_alunos = cur.fetchone()['count']
         
         # Contar exercícios do professor
-        cur.execute('''
-            SELECT COUNT(*) 
-            FROM exercicios e 
-            JOIN aulas a ON e.aula_id = a.id 
-            WHERE a.professor_id = %s
-        ''', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_TOTAL_EXERCICIOS, (professor_id,))
         total_exercicios = cur.fetchone()['count']
         
-        cur.close()
-        
         # Buscar aulas do professor
-        cur.execute('''
-            SELECT id, titulo, disciplina, serie, created_at 
-            FROM aulas 
-            WHERE professor_id = %s 
-            ORDER BY created_at DESC 
-            LIMIT 5
-        ''', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_AULAS_RECENTES, (professor_id,))
         aulas = cur.fetchall()
         
         # Buscar turmas do professor
-        cur.execute('''
-            SELECT id, nome, serie, created_at 
-            FROM turmas 
-            WHERE professor_id = %s 
-            ORDER BY created_at DESC 
-            LIMIT 5
-        ''', (professor_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.PROFESSOR_TURMAS_RECENTES, (professor_id,))
         turmas = cur.fetchall()
         
         cur.close()
@@ -725,7 +828,7 @@ def professor_dashboard():
         return render_template('professor_dashboard.html', data=data)
         
     except Exception as e:
-        print(f"❌ Erro no dashboard professor: {e}")
+        logger.error(f"Erro no dashboard professor: {e}")
         # Retornar com dados vazios em caso de erro
         data = {
             'total_aulas': 0,
@@ -764,7 +867,7 @@ def professor_turmas():
         return render_template('professor_turmas.html', turmas=turmas)
         
     except Exception as e:
-        print(f"❌ Erro ao buscar turmas do professor: {e}")
+        logger.error(f"Erro ao buscar turmas do professor: {e}")
         return render_template('professor_turmas.html', turmas=[])
 
 @app.route('/professor/aulas')
@@ -790,22 +893,25 @@ def professor_aulas():
         return render_template('professor_aulas.html', aulas=aulas)
         
     except Exception as e:
-        print(f"❌ Erro ao buscar aulas do professor: {e}")
+        logger.error(f"Erro ao buscar aulas do professor: {e}")
         return render_template('professor_aulas.html', aulas=[])
 
 @app.route('/professor/relatorios')
+@somente_leitura
 @professor_required
 def professor_relatorios():
     """Relatórios do professor"""
     return render_template('professor_relatorios.html')
 
 @app.route('/professor/relatorio/turma/<int:turma_id>')
+@somente_leitura
 @professor_required
 def professor_relatorio_turma(turma_id):
     """Relatório de turma específica"""
     return render_template('professor_relatorio_turma.html', turma_id=turma_id)
 
 @app.route('/professor/relatorio/aluno/<int:aluno_id>')
+@somente_leitura
 @professor_required
 def professor_relatorio_aluno(aluno_id):
     """Relatório de aluno específico"""
@@ -849,7 +955,7 @@ def professor_criar_turma():
             return redirect(url_for('professor_gerenciar_turma', turma_id=turma_id))
             
         except Exception as e:
-            print(f"❌ Erro ao criar turma: {e}")
+            logger.error(f"Erro ao criar turma: {e}")
             flash('❌ Erro ao criar turma!', 'error')
     
     return render_template('professor_criar_turma.html')
@@ -918,7 +1024,7 @@ def professor_gerenciar_turma(turma_id):
                              stats=stats)
         
     except Exception as e:
-        print(f"❌ Erro ao gerenciar turma: {e}")
+        logger.error(f"Erro ao gerenciar turma: {e}")
         flash('❌ Erro ao carregar dados da turma!', 'error')
         return redirect(url_for('professor_turmas'))
 
@@ -967,7 +1073,7 @@ def professor_adicionar_aluno(turma_id):
         flash(f'✅ {aluno["first_name"]} {aluno["last_name"]} matriculado com sucesso!', 'success')
         
     except Exception as e:
-        print(f"❌ Erro ao adicionar aluno: {e}")
+        logger.error(f"Erro ao adicionar aluno: {e}")
         flash('❌ Erro ao matricular aluno!', 'error')
     
     return redirect(url_for('professor_gerenciar_turma', turma_id=turma_id))
@@ -1003,7 +1109,7 @@ def professor_remover_aluno(turma_id, aluno_id):
         flash(f'✅ {aluno["first_name"]} {aluno["last_name"]} removido da turma!', 'success')
         
     except Exception as e:
-        print(f"❌ Erro ao remover aluno: {e}")
+        logger.error(f"Erro ao remover aluno: {e}")
         flash('❌ Erro ao remover aluno!', 'error')
     
     return redirect(url_for('professor_gerenciar_turma', turma_id=turma_id))
@@ -1056,7 +1162,7 @@ def professor_editar_turma(turma_id):
         return render_template('professor_editar_turma.html', turma=turma)
         
     except Exception as e:
-        print(f"❌ Erro ao editar turma: {e}")
+        logger.error(f"Erro ao editar turma: {e}")
         flash('❌ Erro ao carregar dados da turma!', 'error')
         return redirect(url_for('professor_turmas'))
 
@@ -1092,7 +1198,7 @@ def professor_excluir_turma(turma_id):
         return redirect(url_for('professor_turmas'))
         
     except Exception as e:
-        print(f"❌ Erro ao excluir turma: {e}")
+        logger.error(f"Erro ao excluir turma: {e}")
         flash('❌ Erro ao excluir turma!', 'error')
         return redirect(url_for('professor_gerenciar_turma', turma_id=turma_id))
 
@@ -1118,54 +1224,35 @@ def professor_editar_aula(aula_id):
 def student_dashboard():
     """Dashboard do aluno"""
     try:
-        print(f"🔍 DEBUG: Iniciando student_dashboard para usuário {current_user.id} ({current_user.user_type})")
+        logger.debug("Iniciando student_dashboard para usuário %s (%s)", current_user.id, current_user.user_type)
         
         db = get_db()
         cur = db.cursor()
         
         # Estatísticas básicas - simplificadas
         try:
-            cur.execute("""
-                SELECT COUNT(*) as total_aulas
-                FROM aulas a
-                JOIN matriculas m ON a.turma_id = m.turma_id
-                WHERE m.aluno_id = %s AND m.status = 'ativa' AND a.is_active = true
-            """, (current_user.id,))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_TOTAL_AULAS, (current_user.id,))
             total_aulas = cur.fetchone()['total_aulas']
         except:
             total_aulas = 0
         
         # Aulas em progresso - simplificadas
         try:
-            cur.execute("""
-                SELECT COUNT(*) as aulas_em_progresso
-                FROM progresso_alunos
-                WHERE aluno_id = %s AND status = 'em_progresso'
-            """, (current_user.id,))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_AULAS_EM_PROGRESSO, (current_user.id,))
             aulas_em_progresso = cur.fetchone()['aulas_em_progresso']
         except:
             aulas_em_progresso = 0
         
         # Aulas concluídas - simplificadas
         try:
-            cur.execute("""
-                SELECT COUNT(*) as aulas_concluidas
-                FROM progresso_alunos
-                WHERE aluno_id = %s AND status = 'concluida'
-            """, (current_user.id,))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_AULAS_CONCLUIDAS, (current_user.id,))
             aulas_concluidas = cur.fetchone()['aulas_concluidas']
         except:
             aulas_concluidas = 0
         
         # Total de pontos - simplificadas
         try:
-            cur.execute("""
-                SELECT COALESCE(SUM(e.pontos), 0) as total_pontos
-                FROM progresso_alunos pa
-                JOIN aulas a ON pa.aula_id = a.id
-                JOIN exercicios e ON a.id = e.aula_id
-                WHERE pa.aluno_id = %s AND pa.status = 'concluida'
-            """, (current_user.id,))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_TOTAL_PONTOS, (current_user.id,))
             total_pontos = cur.fetchone()['total_pontos']
         except:
             total_pontos = 0
@@ -1175,28 +1262,14 @@ def student_dashboard():
         
         # Aulas disponíveis - simplificadas
         try:
-            cur.execute("""
-                SELECT a.id, a.titulo, a.descricao, a.duracao_minutos, 
-                       t.nome as turma_nome, COALESCE(pa.status, 'não iniciada') as progresso_status
-                FROM aulas a
-                JOIN turmas t ON a.turma_id = t.id
-                JOIN matriculas m ON t.id = m.turma_id
-                LEFT JOIN progresso_alunos pa ON a.id = pa.aula_id AND pa.aluno_id = %s
-                WHERE m.aluno_id = %s AND m.status = 'ativa' AND a.is_active = true
-                ORDER BY a.titulo
-            """, (current_user.id, current_user.id))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_AULAS_DISPONIVEIS, (current_user.id, current_user.id))
             aulas_disponiveis = cur.fetchall()
         except:
             aulas_disponiveis = []
         
         # Turmas matriculadas - simplificadas
         try:
-            cur.execute("""
-                SELECT t.id, t.nome, t.descricao
-                FROM turmas t
-                JOIN matriculas m ON t.id = m.turma_id
-                WHERE m.aluno_id = %s AND m.status = 'ativa'
-            """, (current_user.id,))
+            consultas_preparadas.executar(cur, consultas_preparadas.ALUNO_TURMAS, (current_user.id,))
             turmas_matriculadas = cur.fetchall()
         except:
             turmas_matriculadas = []
@@ -1213,13 +1286,11 @@ def student_dashboard():
             'turmas_matriculadas': turmas_matriculadas
         }
         
-        print(f"✅ DEBUG: Dashboard carregado com sucesso, renderizando template")
+        logger.debug("Dashboard carregado com sucesso, renderizando template")
         return render_template('student_dashboard.html', data=data)
         
     except Exception as e:
-        print(f"❌ Erro no dashboard do aluno: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Erro no dashboard do aluno: {e}")
         
         # Retornar dados vazios em caso de erro
         data = {
@@ -1260,6 +1331,7 @@ def student_exercicio(exercicio_id):
     return render_template('student_exercicio.html', exercicio_id=exercicio_id)
 
 @app.route('/student/progresso')
+@somente_leitura
 @aluno_required
 def student_progresso():
     """Progresso do aluno"""
@@ -1372,7 +1444,7 @@ def student_progresso():
         return render_template('student_progresso.html', data=data)
         
     except Exception as e:
-        print(f"❌ Erro ao buscar dados de progresso: {e}")
+        logger.error(f"Erro ao buscar dados de progresso: {e}")
         # Retornar com dados vazios em caso de erro
         data = {
             'total_aulas': 0,
@@ -1398,6 +1470,7 @@ def student_conquistas():
     return render_template('student_conquistas.html')
 
 @app.route('/student/ranking')
+@somente_leitura
 @aluno_required
 def student_ranking():
     """Ranking dos alunos"""
@@ -1513,7 +1586,7 @@ def student_gamificacao():
                              progresso_nivel=progresso_nivel)
         
     except Exception as e:
-        print(f"❌ Erro ao buscar dados de gamificação: {e}")
+        logger.error(f"Erro ao buscar dados de gamificação: {e}")
         return render_template('student_gamificacao.html',
                              total_pontos=0,
                              total_conquistas=0,
@@ -1552,11 +1625,13 @@ def change_password():
 # =====================================================
 
 @app.route('/forum')
+@somente_leitura
 def forum():
     """Fórum da comunidade"""
     return render_template('forum.html')
 
 @app.route('/forum/topico/<int:topico_id>')
+@somente_leitura
 def forum_topico(topico_id):
     """Tópico específico do fórum"""
     return render_template('forum_topico.html', topico_id=topico_id)
@@ -1568,6 +1643,7 @@ def forum_novo_topico():
     return render_template('forum_novo_topico.html')
 
 @app.route('/forum/busca')
+@somente_leitura
 def forum_busca():
     """Busca no fórum"""
     return render_template('forum_busca.html')
@@ -1595,41 +1671,45 @@ def ver_aula(aula_id):
         db = get_db()
         cur = db.cursor()
         
-        # Buscar dados da aula
-        cur.execute("""
-            SELECT a.*, t.nome as turma_nome, u.first_name, u.last_name
-            FROM aulas a
-            LEFT JOIN turmas t ON a.turma_id = t.id
-            LEFT JOIN users u ON a.professor_id = u.id
-            WHERE a.id = %s AND a.is_active = true
-        """, (aula_id,))
+        # Progresso do aluno e versão do conteúdo (sempre no banco)
+        consultas_preparadas.executar(cur, consultas_preparadas.PROGRESSO_NA_AULA, (current_user.id, aula_id))
         
-        aula = cur.fetchone()
-        if not aula:
+        progresso_raw = cur.fetchone()
+        if not progresso_raw:
             flash('❌ Aula não encontrada!', 'error')
             return redirect(url_for('student_dashboard'))
         
-        # Buscar exercícios da aula
-        cur.execute("""
-            SELECT id, titulo, pergunta, opcoes, resposta_correta, tipo, pontos
-            FROM exercicios
-            WHERE aula_id = %s AND is_active = true
-            ORDER BY id
-        """, (aula_id,))
-        
-        exercicios = cur.fetchall()
-        
-        # Buscar progresso do aluno
-        cur.execute("""
-            SELECT status, data_inicio, data_conclusao, tempo_gasto
-            FROM progresso_alunos
-            WHERE aluno_id = %s AND aula_id = %s
-        """, (current_user.id, aula_id))
-        
-        progresso_raw = cur.fetchone()
+        # Mesma versão do conteúdo (aula, exercícios, turma e próximas aulas) e
+        # mesmo progresso: o navegador já tem a página
+        etag = http_condicional.etag_usuario(current_user, 'ver_aula', aula_id, *progresso_raw.values())
+        nao_modificada = http_condicional.nao_modificado(etag)
+        if nao_modificada:
+            cur.close()
+            return nao_modificada
+        
+        # Aula, exercícios e próximas aulas da mesma turma (cache de conteúdo)
+        def carregar_aula():
+            consultas_preparadas.executar(cur, consultas_preparadas.AULA_POR_ID, (aula_id,))
+            aula = cur.fetchone()
+            if not aula:
+                return None
+            consultas_preparadas.executar(cur, consultas_preparadas.EXERCICIOS_DA_AULA, (aula_id,))
+            exercicios = cur.fetchall()
+            consultas_preparadas.executar(cur, consultas_preparadas.PROXIMAS_AULAS,
+                                          (aula['turma_id'], aula['ordem'] or 0))
+            return (aula, exercicios, cur.fetchall()), aula_id
+        
+        versao = (progresso_raw['aula_updated_at'], progresso_raw['exercicios_updated_at'],
+                  progresso_raw['turma_updated_at'], progresso_raw['professor_updated_at'],
+                  progresso_raw['aulas_turma_updated_at'], progresso_raw['aulas_turma_total'])
+        conteudo = cache_conteudo.obter('aula', aula_id, carregar_aula, versao)
+        if not conteudo:
+            flash('❌ Aula não encontrada!', 'error')
+            return redirect(url_for('student_dashboard'))
+        aula, exercicios, proximas_aulas = conteudo
         
         # Calcular percentual de progresso
-        if progresso_raw:
+        if progresso_raw['status']:
             if progresso_raw['status'] == 'concluida':
                 percentual = 100
             elif progresso_raw['status'] == 'em_progresso':
@@ -1640,36 +1720,25 @@ def ver_aula(aula_id):
             percentual = 0
             
         progresso = {
-            'status': progresso_raw['status'] if progresso_raw else 'não iniciada',
+            'status': progresso_raw['status'] or 'não iniciada',
             'percentual': percentual,
-            'tempo_gasto': progresso_raw['tempo_gasto'] if progresso_raw and progresso_raw['tempo_gasto'] else 0
+            'tempo_gasto': progresso_raw['tempo_gasto'] or 0
         }
         
-        # Buscar próximas aulas da mesma turma
-        cur.execute("""
-            SELECT id, titulo, disciplina, duracao_minutos
-            FROM aulas
-            WHERE turma_id = %s AND ordem > %s AND is_active = true
-            ORDER BY ordem
-            LIMIT 5
-        """, (aula.turma_id, aula.ordem or 0))
-        
-        proximas_aulas = cur.fetchall()
-        
         # Calcular total de pontos dos exercícios
         total_pontos = sum(ex['pontos'] for ex in exercicios)
         
         cur.close()
         
-        return render_template('lesson.html', 
-                             aula=aula, 
-                             exercicios=exercicios, 
-                             progresso=progresso,
-                             proximas_aulas=proximas_aulas,
-                             total_pontos=total_pontos)
+        return http_condicional.aplicar(render_template('lesson.html', 
+                                                        aula=aula, 
+                                                        exercicios=exercicios, 
+                                                        progresso=progresso,
+                                                        proximas_aulas=proximas_aulas,
+                                                        total_pontos=total_pontos), etag)
                              
     except Exception as e:
-        print(f"Erro ao carregar aula: {e}")
+        logger.error(f"Erro ao carregar aula: {e}")
         flash('❌ Erro ao carregar a aula!', 'error')
         return redirect(url_for('student_dashboard'))
 
@@ -1681,13 +1750,13 @@ def ver_aula(aula_id):
 def kids_dashboard():
     """Dashboard para educação infantil (0-5 anos)"""
     try:
-        print(f"🔍 DEBUG: kids_dashboard chamado para usuário {current_user.id}")
+        logger.debug("kids_dashboard chamado para usuário %s", current_user.id)
         
         db = get_db()
         cur = db.cursor()
         
         # Buscar aulas específicas para educação infantil
-        print("🔍 Executando query para kids_dashboard...")
+        logger.debug("Executando query para kids_dashboard...")
         try:
             # Query corrigida para usar as colunas que realmente existem
             cur.execute("""
@@ -1700,10 +1769,10 @@ def kids_dashboard():
                 AND (t.nome ILIKE '%infantil%' OR t.nome ILIKE '%pré%' OR t.nome ILIKE '%pre%' OR t.nome ILIKE '%básico%')
                 ORDER BY a.id
             """)
-            print("✅ Query executada com sucesso!")
+            logger.debug("Query executada com sucesso!")
             aulas_infantil = cur.fetchall()
         except Exception as query_error:
-            print(f"❌ Erro na query: {query_error}")
+            logger.error(f"Erro na query: {query_error}")
             # Tenta uma query mais simples
             try:
                 cur.execute("""
@@ -1714,9 +1783,9 @@ def kids_dashboard():
                     AND (t.nome ILIKE '%infantil%' OR t.nome ILIKE '%pré%' OR t.nome ILIKE '%pre%' OR t.nome ILIKE '%básico%')
                 """)
                 count = cur.fetchone()['count']
-                print(f"📊 Total de aulas infantis: {count}")
+                logger.debug("Total de aulas infantis: %s", count)
             except:
-                print("⚠️ Query de contagem também falhou")
+                logger.warning("Query de contagem também falhou")
             # Se não encontrar aulas, retorna lista vazia
             aulas_infantil = []
         
@@ -1744,9 +1813,7 @@ def kids_dashboard():
                              conquistas=conquistas)
         
     except Exception as e:
-        import traceback
-        print(f"❌ ERRO DETALHADO no kids_dashboard: {e}")
-        traceback.print_exc()
+        logger.exception(f"Erro no kids_dashboard: {e}")
         flash('❌ Erro ao carregar dashboard infantil!', 'error')
         return render_template('kids_dashboard.html', aulas_infantil=[], progresso_categorias={}, conquistas=[])
 
@@ -1757,13 +1824,13 @@ def kids_dashboard():
 def anos_iniciais():
     """Dashboard para anos iniciais (1º ao 5º ano) - Ensino Fundamental"""
     try:
-        print(f"🔍 DEBUG: anos_iniciais chamado para usuário {current_user.id}")
+        logger.debug("anos_iniciais chamado para usuário %s", current_user.id)
         
         db = get_db()
         cur = db.cursor()
         
         # Buscar aulas específicas para anos iniciais (1º ao 5º ano)
-        print("🔍 Executando query para anos_iniciais...")
+        logger.debug("Executando query para anos_iniciais...")
         try:
             # Query corrigida para usar as colunas que realmente existem
             cur.execute("""
@@ -1778,10 +1845,10 @@ def anos_iniciais():
                 ORDER BY t.nome, a.id DESC
                 LIMIT 15
             """)
-            print("✅ Query anos_iniciais executada com sucesso!")
+            logger.debug("Query anos_iniciais executada com sucesso!")
             aulas_anos_iniciais = cur.fetchall()
         except Exception as query_error:
-            print(f"❌ Erro na query anos_iniciais: {query_error}")
+            logger.error(f"Erro na query anos_iniciais: {query_error}")
             # Tenta uma query mais simples
             try:
                 cur.execute("""
@@ -1793,9 +1860,9 @@ def anos_iniciais():
                          OR t.nome ILIKE '%primeiro%' OR t.nome ILIKE '%segundo%' OR t.nome ILIKE '%terceiro%' OR t.nome ILIKE '%quarto%' OR t.nome ILIKE '%quinto%')
                 """)
                 count = cur.fetchone()['count']
-                print(f"📊 Total de aulas anos iniciais: {count}")
+                logger.debug("Total de aulas anos iniciais: %s", count)
             except:
-                print("⚠️ Query de contagem também falhou")
+                logger.warning("Query de contagem também falhou")
             # Se não encontrar aulas, retorna lista vazia
             aulas_anos_iniciais = []
         
@@ -1824,9 +1891,7 @@ def anos_iniciais():
                              conquistas=conquistas_anos_iniciais)
                              
     except Exception as e:
-        import traceback
-        print(f"❌ ERRO DETALHADO no anos_iniciais: {e}")
-        traceback.print_exc()
+        logger.exception(f"Erro no anos_iniciais: {e}")
         flash('❌ Erro ao carregar dashboard dos Anos Iniciais!', 'error')
         return redirect(url_for('student_dashboard'))
 
@@ -1837,13 +1902,13 @@ def anos_iniciais():
 def anos_finais():
     """Dashboard para anos finais (6º ao 9º ano) - Ensino Fundamental"""
     try:
-        print(f"🔍 DEBUG: anos_finais chamado para usuário {current_user.id}")
+        logger.debug("anos_finais chamado para usuário %s", current_user.id)
         
         db = get_db()
         cur = db.cursor()
         
         # Buscar aulas específicas para anos finais (6º ao 9º ano)
-        print("🔍 Executando query para anos_finais...")
+        logger.debug("Executando query para anos_finais...")
         try:
             # Query corrigida para usar as colunas que realmente existem
             cur.execute("""
@@ -1858,10 +1923,10 @@ def anos_finais():
                 ORDER BY t.nome, a.id DESC
                 LIMIT 15
             """)
-            print("✅ Query anos_finais executada com sucesso!")
+            logger.debug("Query anos_finais executada com sucesso!")
             aulas_anos_finais = cur.fetchall()
         except Exception as query_error:
-            print(f"❌ Erro na query anos_finais: {query_error}")
+            logger.error(f"Erro na query anos_finais: {query_error}")
             # Tenta uma query mais simples
             try:
                 cur.execute("""
@@ -1873,9 +1938,9 @@ def anos_finais():
                          OR t.nome ILIKE '%sexto%' OR t.nome ILIKE '%sétimo%' OR t.nome ILIKE '%oitavo%' OR t.nome ILIKE '%nono%')
                 """)
                 count = cur.fetchone()['count']
-                print(f"📊 Total de aulas anos finais: {count}")
+                logger.debug("Total de aulas anos finais: %s", count)
             except:
-                print("⚠️ Query de contagem também falhou")
+                logger.warning("Query de contagem também falhou")
             # Se não encontrar aulas, retorna lista vazia
             aulas_anos_finais = []
         
@@ -1910,9 +1975,7 @@ def anos_finais():
                              conquistas=conquistas_anos_finais)
                              
     except Exception as e:
-        import traceback
-        print(f"❌ ERRO DETALHADO no anos_finais: {e}")
-        traceback.print_exc()
+        logger.exception(f"Erro no anos_finais: {e}")
         flash('❌ Erro ao carregar dashboard dos Anos Finais!', 'error')
         return redirect(url_for('student_dashboard'))
 
@@ -1924,30 +1987,34 @@ def ver_exercicio(exercicio_id):
         db = get_db()
         cur = db.cursor()
         
-        # Buscar dados do exercício
-        cur.execute("""
-            SELECT e.*, a.titulo as aula_titulo, a.id as aula_id
-            FROM exercicios e
-            JOIN aulas a ON e.aula_id = a.id
-            WHERE e.id = %s AND e.is_active = true
-        """, (exercicio_id,))
-        
-        exercicio = cur.fetchone()
-        if not exercicio:
-            flash('❌ Exercício não encontrado!', 'error')
-            return redirect(url_for('student_dashboard'))
-        
-        # Buscar progresso do aluno na aula
-        cur.execute("""
-            SELECT status, data_inicio, data_conclusao, tempo_gasto
-            FROM progresso_alunos
-            WHERE aluno_id = %s AND aula_id = %s
-        """, (current_user.id, exercicio.aula_id))
+        # Progresso do aluno na aula e versão do conteúdo (sempre no banco)
+        consultas_preparadas.executar(cur, consultas_preparadas.PROGRESSO_NO_EXERCICIO, (current_user.id, exercicio_id))
         
         progresso_raw = cur.fetchone()
+        if not progresso_raw:
+            flash('❌ Exercício não encontrado!', 'error')
+            return redirect(url_for('student_dashboard'))
+        aula_id = progresso_raw['aula_id']
+        
+        # Exercício e próximos exercícios da mesma aula (cache de conteúdo)
+        def carregar_exercicio():
+            consultas_preparadas.executar(cur, consultas_preparadas.EXERCICIO_POR_ID, (exercicio_id,))
+            exercicio = cur.fetchone()
+            if not exercicio:
+                return None
+            consultas_preparadas.executar(cur, consultas_preparadas.PROXIMOS_EXERCICIOS,
+                                          (exercicio['aula_id'], exercicio_id))
+            return (exercicio, cur.fetchall()), exercicio['aula_id']
+        
+        conteudo = cache_conteudo.obter('exercicio', exercicio_id, carregar_exercicio,
+                                        (progresso_raw['aula_updated_at'], progresso_raw['exercicios_updated_at']))
+        if not conteudo:
+            flash('❌ Exercício não encontrado!', 'error')
+            return redirect(url_for('student_dashboard'))
+        exercicio, proximos_exercicios = conteudo
         
         # Calcular percentual de progresso
-        if progresso_raw:
+        if progresso_raw['status']:
             if progresso_raw['status'] == 'concluida':
                 percentual = 100
             elif progresso_raw['status'] == 'em_progresso':
@@ -1958,22 +2025,13 @@ def ver_exercicio(exercicio_id):
             percentual = 0
             
         progresso = {
-            'status': progresso_raw['status'] if progresso_raw else 'não iniciada',
+            'status': progresso_raw['status'] or 'não iniciada',
             'percentual': percentual,
-            'tempo_gasto': progresso_raw['tempo_gasto'] if progresso_raw and progresso_raw['tempo_gasto'] else 0
+            'tempo_gasto': progresso_raw['tempo_gasto'] or 0
         }
         
         # Buscar estatísticas do aluno
-        cur.execute("""
-            SELECT 
-                COUNT(CASE WHEN ra.resposta_correta = true THEN 1 END) as acertos,
-                COUNT(CASE WHEN ra.resposta_correta = false THEN 1 END) as erros,
-                COALESCE(SUM(CASE WHEN ra.resposta_correta = true THEN e.pontos END), 0) as pontos_ganhos,
-                COUNT(CASE WHEN ra.resposta_correta = true THEN 1 END) as sequencia
-            FROM exercicios e
-            LEFT JOIN respostas_alunos ra ON e.id = ra.exercicio_id AND ra.aluno_id = %s
-            WHERE e.aula_id = %s
-        """, (current_user.id, exercicio.aula_id))
+        consultas_preparadas.executar(cur, consultas_preparadas.ESTATISTICAS_EXERCICIOS_AULA, (current_user.id, aula_id))
         
         stats_raw = cur.fetchone()
         stats = {
@@ -1983,17 +2041,6 @@ def ver_exercicio(exercicio_id):
             'sequencia': stats_raw['sequencia'] or 0
         }
         
-        # Buscar próximos exercícios da mesma aula
-        cur.execute("""
-            SELECT id, titulo, tipo, pontos
-            FROM exercicios
-            WHERE aula_id = %s AND id != %s AND is_active = true
-            ORDER BY id
-            LIMIT 5
-        """, (exercicio.aula_id, exercicio_id))
-        
-        proximos_exercicios = cur.fetchall()
-        
         cur.close()
         
         return render_template('exercise.html', 
@@ -2003,7 +2050,7 @@ def ver_exercicio(exercicio_id):
                              proximos_exercicios=proximos_exercicios)
                              
     except Exception as e:
-        print(f"Erro ao carregar exercício: {e}")
+        logger.error(f"Erro ao carregar exercício: {e}")
         flash('❌ Erro ao carregar o exercício!', 'error')
         return redirect(url_for('student_dashboard'))
 
@@ -2013,11 +2060,9 @@ def ver_exercicio(exercicio_id):
 @aluno_required
 def test_redirect():
     """Rota de teste para verificar redirecionamento"""
-    print(f"🔍 DEBUG: ===== TESTE DE REDIRECIONAMENTO =====")
-    print(f"🔍 DEBUG: Usuário ID: {current_user.id}")
-    print(f"🔍 DEBUG: Usuário Type: {current_user.user_type}")
-    print(f"🔍 DEBUG: is_aluno: {current_user.is_aluno}")
-    print(f"🔍 DEBUG: ===== FIM TESTE =====")
+    logger.debug("Usuário ID: %s", current_user.id)
+    logger.debug("Usuário Type: %s", current_user.user_type)
+    logger.debug("is_aluno: %s", current_user.is_aluno)
     
     return f"""
     <h1>Teste de Redirecionamento</h1>
@@ -2038,19 +2083,29 @@ def test_redirect():
 # ROTAS PARA IA DE RECOMENDAÇÃO
 # =====================================================
 
-try:
-    from services.ai_recommendation_service import get_recommendations_for_student, get_learning_insights_for_student
-    AI_SERVICE_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ Serviço de IA não disponível: {e}")
-    AI_SERVICE_AVAILABLE = False
+AI_SERVICE_AVAILABLE = ENABLE_AI
+
+def load_ai_service():
+    """Importa o serviço de IA na primeira requisição que o utiliza"""
+    global AI_SERVICE_AVAILABLE
+    if not AI_SERVICE_AVAILABLE:
+        return None
+    try:
+        import services.ai_recommendation_service as ai_service
+        return ai_service
+    except ImportError as e:
+        logger.warning(f"Serviço de IA não disponível: {e}")
+        AI_SERVICE_AVAILABLE = False
+        return None
 
 @app.route('/api/ai/recommendations/<int:aluno_id>')
+@somente_leitura
 @login_required
 @aluno_required
 def get_ai_recommendations(aluno_id):
     """API para obter recomendações personalizadas de IA"""
-    if not AI_SERVICE_AVAILABLE:
+    ai_service = load_ai_service()
+    if not ai_service:
         return jsonify({'success': False, 'error': 'Serviço de IA não disponível'}), 503
     
     try:
@@ -2058,7 +2113,8 @@ def get_ai_recommendations(aluno_id):
         if current_user.id != aluno_id:
             return jsonify({'success': False, 'error': 'Acesso negado'}), 403
         
-        recommendations = get_recommendations_for_student(aluno_id, limit=10)
+        recommendations = ai_service.get_recommendations_for_student(
+            aluno_id, limit=10, db_url=roteamento_db.dsn_leitura(session))
         
         # Converter para formato JSON
         recommendations_data = []
@@ -2079,15 +2135,17 @@ def get_ai_recommendations(aluno_id):
         })
         
     except Exception as e:
-        print(f"Erro ao obter recomendações de IA: {e}")
+        logger.error(f"Erro ao obter recomendações de IA: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/ai/insights/<int:aluno_id>')
+@somente_leitura
 @login_required
 @aluno_required
 def get_ai_insights(aluno_id):
     """API para obter insights de aprendizado de IA"""
-    if not AI_SERVICE_AVAILABLE:
+    ai_service = load_ai_service()
+    if not ai_service:
         return jsonify({'success': False, 'error': 'Serviço de IA não disponível'}), 503
     
     try:
@@ -2095,7 +2153,7 @@ def get_ai_insights(aluno_id):
         if current_user.id != aluno_id:
             return jsonify({'success': False, 'error': 'Acesso negado'}), 403
         
-        insights = get_learning_insights_for_student(aluno_id)
+        insights = ai_service.get_learning_insights_for_student(aluno_id, db_url=roteamento_db.dsn_leitura(session))
         
         return jsonify({
             'success': True, 
@@ -2103,15 +2161,17 @@ def get_ai_insights(aluno_id):
         })
         
     except Exception as e:
-        print(f"Erro ao obter insights de IA: {e}")
+        logger.error(f"Erro ao obter insights de IA: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/ai/learning-path/<int:aluno_id>')
+@somente_leitura
 @login_required
 @aluno_required
 def get_adaptive_learning_path(aluno_id):
     """API para obter caminho de aprendizado adaptativo"""
-    if not AI_SERVICE_AVAILABLE:
+    ai_service = load_ai_service()
+    if not ai_service:
         return jsonify({'success': False, 'error': 'Serviço de IA não disponível'}), 503
     
     try:
@@ -2119,8 +2179,7 @@ def get_adaptive_learning_path(aluno_id):
         if current_user.id != aluno_id:
             return jsonify({'success': False, 'error': 'Acesso negado'}), 403
         
-        from services.ai_recommendation_service import AIRecommendationService
-        service = AIRecommendationService()
+        service = ai_service.AIRecommendationService(db_url=roteamento_db.dsn_leitura(session))
         learning_path = service.get_adaptive_learning_path(aluno_id)
         
         # Converter para formato JSON
@@ -2142,7 +2201,7 @@ def get_adaptive_learning_path(aluno_id):
         })
         
     except Exception as e:
-        print(f"Erro ao obter caminho de aprendizado: {e}")
+        logger.error(f"Erro ao obter caminho de aprendizado: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 if __name__ == '__main__':
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Ponto de entrada ASGI da aplicação
+
+As rotas /api/ai/* são atendidas pelo serviço de IA assíncrono, que executa as
+consultas independentes em paralelo sobre um pool de conexões assíncronas.
+Todas as demais rotas continuam sendo servidas pelo app Flask (WSGI).
+
+Uso:
+    uvicorn asgi:application --host 0.0.0.0 --port $PORT
+"""
+
+import logging
+import re
+from http.cookies import SimpleCookie
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app_postgres import app
+from services.ai_recommendation_service_async import (
+    AsyncAIRecommendationService, close_async_pool
+)
+from utils import roteamento_db
+
+logger = logging.getLogger(__name__)
+
+AI_ROUTE = re.compile(r'^/api/ai/(recommendations|insights|learning-path)/(\d+)$')
+
+wsgi_application = WsgiToAsgi(app)
+ai_service = AsyncAIRecommendationService()
+# As rotas de IA só leem: usam a réplica, se configurada (utils.roteamento_db)
+ai_service_leitura = AsyncAIRecommendationService(replica=True)
+
+
+def _session_data(scope):
+    """Decodifica o cookie de sessão do Flask (dicionário vazio se ausente ou inválido)"""
+    headers = dict(scope.get('headers') or [])
+    cookie = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    morsel = cookie.get(app.config['SESSION_COOKIE_NAME'])
+    if not morsel:
+        return {}
+
+    serializer = app.session_interface.get_signing_serializer(app)
+    try:
+        return serializer.loads(
+            morsel.value, max_age=int(app.permanent_session_lifetime.total_seconds())
+        )
+    except Exception:
+        return {}
+
+
+def _current_user_id(data):
+    """ID do usuário logado segundo os dados da sessão"""
+    user_id = data.get('_user_id')
+    return int(user_id) if user_id and str(user_id).isdigit() else None
+
+
+def _learning_path_to_dict(item):
+    """Converte um LearningPath no formato JSON usado pela API"""
+    return {
+        'aula_id': item.aula_id,
+        'titulo': item.titulo,
+        'descricao': item.descricao,
+        'dificuldade': item.dificuldade,
+        'pontuacao': item.pontuacao,
+        'razao': item.razao,
+        'ordem': item.ordem
+    }
+
+
+async def _send_json(send, status, payload):
+    """Envia uma resposta JSON serializada pelo provedor JSON do Flask"""
+    body = app.json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_redirect(send, location):
+    """Redireciona como os decoradores login_required/aluno_required"""
+    await send({
+        'type': 'http.response.start',
+        'status': 302,
+        'headers': [(b'location', location.encode('utf-8')), (b'content-length', b'0')]
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def ai_application(scope, receive, send, rota, aluno_id):
+    """Atende as rotas /api/ai/* com o serviço assíncrono"""
+    session_data = _session_data(scope)
+    user_id = _current_user_id(session_data)
+    if user_id is None:
+        await _send_redirect(send, f"/login?next={scope['path']}")
+        return
+
+    user = await ai_service._fetch(
+        "SELECT user_type, is_active FROM users WHERE id = %s", (user_id,), one=True
+    )
+    if not user or not user['is_active']:
+        await _send_redirect(send, f"/login?next={scope['path']}")
+        return
+    if user['user_type'] != 'aluno':
+        await _send_redirect(send, '/')
+        return
+
+    # Verificar se o aluno está acessando seus próprios dados
+    if user_id != aluno_id:
+        await _send_json(send, 403, {'success': False, 'error': 'Acesso negado'})
+        return
+
+    # Logo após uma escrita do próprio aluno, lê do primário
+    service = ai_service if roteamento_db.leitura_no_primario(session_data) else ai_service_leitura
+    try:
+        if rota == 'recommendations':
+            recommendations = await service.get_personalized_recommendations(aluno_id, limit=10)
+            payload = {'success': True,
+                       'recommendations': [_learning_path_to_dict(r) for r in recommendations]}
+        elif rota == 'insights':
+            insights = await service.get_learning_insights(aluno_id)
+            payload = {'success': True, 'insights': insights}
+        else:
+            learning_path = await service.get_adaptive_learning_path(aluno_id)
+            payload = {'success': True,
+                       'learning_path': [_learning_path_to_dict(i) for i in learning_path]}
+    except Exception as e:
+        logger.exception("Erro na rota assíncrona de IA (%s)", rota)
+        await _send_json(send, 500, {'success': False, 'error': str(e)})
+        return
+
+    await _send_json(send, 200, payload)
+
+
+async def application(scope, receive, send):
+    """Aplicação ASGI: IA assíncrona + app Flask para o restante"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_async_pool()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        match = AI_ROUTE.match(scope['path'])
+        if match:
+            await ai_application(scope, receive, send, match.group(1), int(match.group(2)))
+            return
+
+    await wsgi_application(scope, receive, send)
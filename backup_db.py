@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script para criar e restaurar backups online do banco de dados
+
+Uso:
+    python backup_db.py --destino backups                          # PostgreSQL (DATABASE_URL)
+    python backup_db.py --destino backups --sqlite escola_para_todos.db
+    python backup_db.py --destino backups --sqlite escola_para_todos.db --comprimir --manter 7
+    python backup_db.py --restaurar backups/postgres_20240301T120000 --confirmar
+    python backup_db.py --restaurar backups/escola_20240301T120000.db.gz --sqlite escola_para_todos.db --confirmar
+
+Cada backup é uma cópia completa. Ele não bloqueia a aplicação: no SQLite a
+cópia é feita em passos pela API de backup online; no PostgreSQL cada tabela é
+exportada com COPY dentro de um único snapshot somente leitura, junto com as
+sequências e a versão do esquema (migrações). A restauração substitui todos os
+dados do banco de destino e por isso exige --confirmar.
+"""
+
+import argparse
+import os
+import sys
+
+from utils.backup import (backup_postgres, backup_sqlite, nome_backup, restaurar_postgres, restaurar_sqlite,
+                          rotacionar)
+
+
+def restaurar(args) -> int:
+    """Restaura o backup indicado em --restaurar"""
+    if not args.confirmar:
+        print("❌ A restauração substitui todos os dados do banco; repita com --confirmar")
+        return 1
+
+    if args.sqlite:
+        resultado = restaurar_sqlite(args.restaurar, args.sqlite)
+    else:
+        from init_db_postgres import get_db_connection
+        db = get_db_connection()
+        try:
+            resultado = restaurar_postgres(db, args.restaurar)
+        finally:
+            db.close()
+    print(f"✅ Backup restaurado: {resultado}")
+    return 0
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Cria ou restaura um backup online do banco de dados')
+    parser.add_argument('--destino', default='backups',
+                        help='Diretório dos backups (padrão: backups)')
+    parser.add_argument('--sqlite', metavar='ARQUIVO',
+                        help='Usar banco SQLite em vez do PostgreSQL')
+    parser.add_argument('--comprimir', action='store_true',
+                        help='Comprimir com gzip (sempre ligado no PostgreSQL)')
+    parser.add_argument('--manter', type=int, default=0,
+                        help='Manter apenas os N backups mais recentes (padrão: todos)')
+    parser.add_argument('--paginas', type=int,
+                        help='SQLite: páginas copiadas por passo (padrão: BACKUP_PAGINAS_POR_PASSO)')
+    parser.add_argument('--restaurar', metavar='BACKUP',
+                        help='Restaurar este backup (arquivo do SQLite ou diretório do PostgreSQL)')
+    parser.add_argument('--confirmar', action='store_true',
+                        help='Confirma que a restauração pode substituir os dados do banco')
+    args = parser.parse_args()
+
+    if args.restaurar:
+        try:
+            return restaurar(args)
+        except Exception as e:
+            print(f"❌ {e}")
+            return 1
+
+    os.makedirs(args.destino, exist_ok=True)
+    try:
+        if args.sqlite:
+            prefixo = os.path.splitext(os.path.basename(args.sqlite))[0]
+            destino = os.path.join(args.destino, nome_backup(prefixo, '.db'))
+            resultado = backup_sqlite(args.sqlite, destino, comprimir=args.comprimir, paginas=args.paginas)
+        else:
+            from init_db_postgres import get_db_connection
+            prefixo = 'postgres'
+            db = get_db_connection()
+            try:
+                resultado = backup_postgres(db, os.path.join(args.destino, nome_backup(prefixo)))
+            finally:
+                db.close()
+        print(f"✅ Backup criado em {resultado}")
+
+        for removido in rotacionar(args.destino, prefixo + '_', args.manter):
+            print(f"🗑️  Backup antigo removido: {removido}")
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Benchmarks package for Escola para Todos
+# Contains load, latency and startup measurements (not run by the test suite)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark do serviço de IA: versão síncrona x assíncrona sob carga concorrente
+
+Dispara o mesmo número de chamadas a get_learning_insights (ou às recomendações)
+com o mesmo nível de concorrência nas duas versões e reporta p50, p99 e vazão.
+A versão síncrona usa uma thread por requisição em andamento (como os workers
+do gunicorn); a assíncrona usa um único event loop. As duas usam um pool de
+conexões aberto e aquecido antes da medição, com o mesmo tamanho máximo (--pool),
+para que a diferença medida seja a das consultas concorrentes e não a de abrir
+conexões. Uma requisição síncrona usa uma conexão por vez; uma assíncrona, até 4.
+
+Uso:
+    DATABASE_URL=... python -m benchmarks.bench_ai_async --alunos 1 2 3
+    DATABASE_URL=... python -m benchmarks.bench_ai_async --requisicoes 500 --concorrencia 50 --pool 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from benchmarks.estatisticas import percentil
+from services.ai_recommendation_service import AIRecommendationService
+from services.ai_recommendation_service_async import AsyncAIRecommendationService
+
+
+def resumo(nome, latencias, duracao):
+    """Imprime p50/p99/média e vazão de uma rodada"""
+    print(f"{nome:<8} n={len(latencias):<5} "
+          f"p50={percentil(latencias, 50):8.1f}ms  "
+          f"p99={percentil(latencias, 99):8.1f}ms  "
+          f"média={statistics.mean(latencias) * 1000:8.1f}ms  "
+          f"vazão={len(latencias) / duracao:7.1f} req/s")
+
+
+def rodar_sync(alunos, requisicoes, concorrencia, operacao, tamanho_pool):
+    """Executa as chamadas com o serviço síncrono em um pool de threads"""
+    with ConnectionPool(os.getenv('DATABASE_URL'), min_size=tamanho_pool, max_size=tamanho_pool,
+                        kwargs={'row_factory': dict_row}, open=False) as pool:
+        pool.wait()
+        chamada = getattr(AIRecommendationService(pool=pool), operacao)
+
+        def uma(i):
+            inicio = time.perf_counter()
+            chamada(alunos[i % len(alunos)])
+            return time.perf_counter() - inicio
+
+        # Aquecimento fora da medição (caches do servidor)
+        chamada(alunos[0])
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            latencias = list(executor.map(uma, range(requisicoes)))
+        return latencias, time.perf_counter() - inicio
+
+
+async def rodar_async(alunos, requisicoes, concorrencia, operacao, tamanho_pool):
+    """Executa as chamadas com o serviço assíncrono limitado por um semáforo"""
+    async with AsyncConnectionPool(os.getenv('DATABASE_URL'), min_size=tamanho_pool, max_size=tamanho_pool,
+                                   kwargs={'row_factory': dict_row}, open=False) as pool:
+        await pool.wait()
+        chamada = getattr(AsyncAIRecommendationService(pool=pool), operacao)
+        semaforo = asyncio.Semaphore(concorrencia)
+
+        async def uma(i):
+            async with semaforo:
+                inicio = time.perf_counter()
+                await chamada(alunos[i % len(alunos)])
+                return time.perf_counter() - inicio
+
+        # Aquecimento fora da medição (caches do servidor)
+        await chamada(alunos[0])
+
+        inicio = time.perf_counter()
+        latencias = await asyncio.gather(*(uma(i) for i in range(requisicoes)))
+        return list(latencias), time.perf_counter() - inicio
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Compara o serviço de IA síncrono e assíncrono')
+    parser.add_argument('--alunos', type=int, nargs='+', default=[1],
+                        help='IDs de alunos usados nas chamadas (em rodízio)')
+    parser.add_argument('--requisicoes', type=int, default=200)
+    parser.add_argument('--concorrencia', type=int, default=20)
+    parser.add_argument('--operacao', default='get_learning_insights',
+                        choices=['get_learning_insights', 'get_personalized_recommendations'])
+    parser.add_argument('--pool', type=int,
+                        help='Conexões de cada pool, o mesmo para as duas versões (padrão: --concorrencia)')
+    args = parser.parse_args()
+    tamanho_pool = args.pool or args.concorrencia
+
+    print(f"📊 {args.operacao}: {args.requisicoes} requisições, concorrência {args.concorrencia}, "
+          f"pool de {tamanho_pool} conexões")
+
+    latencias, duracao = rodar_sync(args.alunos, args.requisicoes, args.concorrencia, args.operacao, tamanho_pool)
+    resumo('sync', latencias, duracao)
+
+    latencias, duracao = asyncio.run(
+        rodar_async(args.alunos, args.requisicoes, args.concorrencia, args.operacao, tamanho_pool)
+    )
+    resumo('async', latencias, duracao)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
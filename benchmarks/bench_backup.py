@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark do impacto de um backup na latência das requisições (SQLite)
+
+Cria um banco temporário com progresso de alunos (mais uma tabela de
+preenchimento para deixar o arquivo com o tamanho desejado) e mantém threads
+fazendo leituras e escritas pelo DatabaseManager em modo produção, enquanto um
+backup é feito de cada uma das formas abaixo. Reporta p50/p99/máximo por tipo
+de operação durante o backup e a vazão do backup.
+
+    sem_backup   referência, sem backup em andamento
+    copia        shutil.copy2 do arquivo (antigo backup_database; não é consistente com WAL)
+    um_passo     API de backup copiando o banco inteiro em um único passo
+    em_passos    API de backup em passos com pausa (utils.backup.backup_sqlite)
+
+Uso:
+    python -m benchmarks.bench_backup
+    python -m benchmarks.bench_backup --mb 200 --threads 16 --paginas 128 --pausa-ms 2
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.bench_sqlite import ESCRITA, LEITURA, preparar_banco
+from benchmarks.estatisticas import percentil
+from utils.backup import backup_sqlite
+from utils.database import DatabaseManager
+
+CENARIOS = ('sem_backup', 'copia', 'um_passo', 'em_passos')
+
+
+def preencher(caminho, megabytes, semente):
+    """Acrescenta linhas de preenchimento até o banco ter ~megabytes"""
+    rng = random.Random(semente)
+    db = sqlite3.connect(caminho)
+    db.execute("CREATE TABLE preenchimento (id INTEGER PRIMARY KEY, dados BLOB)")
+    linhas = megabytes * 256  # 4 KB por linha
+    for inicio in range(0, linhas, 1000):
+        db.executemany("INSERT INTO preenchimento (dados) VALUES (?)",
+                       [(rng.randbytes(4096),) for _ in range(min(1000, linhas - inicio))])
+    db.commit()
+    db.close()
+
+
+def carga(manager, parar, threads, fracao_escritas, alunos, aulas, semente):
+    """Dispara threads de leitura/escrita até `parar`; retorna a função que coleta as latências"""
+    latencias = defaultdict(list)
+    lock = threading.Lock()
+
+    def trabalhador(indice):
+        rng = random.Random(semente + indice)
+        locais = defaultdict(list)
+        while not parar.is_set():
+            tipo = 'escrita' if rng.random() < fracao_escritas else 'leitura'
+            aluno = rng.randint(1, alunos)
+            inicio = time.perf_counter()
+            if tipo == 'escrita':
+                manager.execute_update(ESCRITA, (aluno, rng.randint(1, aulas), rng.randint(5, 60)))
+            else:
+                manager.execute_query(LEITURA, (aluno,))
+            locais[tipo].append(time.perf_counter() - inicio)
+        with lock:
+            for tipo, valores in locais.items():
+                latencias[tipo].extend(valores)
+
+    ts = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+
+    def coletar():
+        for t in ts:
+            t.join()
+        return latencias
+
+    return coletar
+
+
+def fazer_backup(cenario, caminho, destino, paginas, pausa, duracao):
+    """Executa o backup do cenário; retorna (bytes, segundos) ou None sem backup"""
+    inicio = time.perf_counter()
+    if cenario == 'sem_backup':
+        time.sleep(duracao)
+        return None
+    if cenario == 'copia':
+        shutil.copy2(caminho, destino)
+    elif cenario == 'um_passo':
+        origem, copia = sqlite3.connect(caminho), sqlite3.connect(destino)
+        origem.backup(copia)
+        copia.close()
+        origem.close()
+    else:
+        backup_sqlite(caminho, destino, paginas=paginas, pausa=pausa)
+    return os.path.getsize(destino), time.perf_counter() - inicio
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Mede a latência das requisições durante um backup')
+    parser.add_argument('--mb', type=int, default=100, help='Tamanho aproximado do banco')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--escritas', type=float, default=0.2, help='Fração de escritas')
+    parser.add_argument('--paginas', type=int, default=256, help='Páginas por passo (em_passos)')
+    parser.add_argument('--pausa-ms', type=float, default=5, help='Pausa entre passos (em_passos)')
+    parser.add_argument('--alunos', type=int, default=500)
+    parser.add_argument('--aulas', type=int, default=40)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger('utils.sql_instrumentation').setLevel(logging.ERROR)
+    logging.getLogger('utils.backup').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'escola.db')
+        preparar_banco(caminho, args.alunos, args.aulas)
+        preencher(caminho, args.mb, args.semente)
+        print(f"📊 banco de {os.path.getsize(caminho) / 1024 / 1024:.0f} MB, {args.threads} threads, "
+              f"{args.escritas:.0%} escritas, {args.paginas} páginas/passo, pausa {args.pausa_ms:g} ms")
+        print(f"\n{'cenário':<11} {'tipo':<8} {'n':>7} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'backup':>12}")
+
+        manager = DatabaseManager(caminho, modo='producao')
+        duracao_referencia = 2.0
+        for cenario in CENARIOS:
+            destino = os.path.join(diretorio, f'backup_{cenario}.db')
+            parar = threading.Event()
+            coletar = carga(manager, parar, args.threads, args.escritas, args.alunos, args.aulas, args.semente)
+            try:
+                backup = fazer_backup(cenario, caminho, destino, args.paginas, args.pausa_ms / 1000,
+                                      duracao_referencia)
+            finally:
+                parar.set()
+                latencias = coletar()
+
+            vazao = f"{backup[0] / backup[1] / 1024 / 1024:.0f} MB/s" if backup else '-'
+            for tipo in ('leitura', 'escrita'):
+                valores = latencias[tipo]
+                if valores:
+                    print(f"{cenario:<11} {tipo:<8} {len(valores):>7} {percentil(valores, 50):>8.2f} "
+                          f"{percentil(valores, 99):>8.2f} {max(valores) * 1000:>8.2f} {vazao:>12}")
+            if os.path.exists(destino):
+                os.remove(destino)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca de usuários da administração (SQLite + FTS5)
+
+Cria um banco temporário com N usuários (1 milhão por padrão), os índices de
+init_db e a tabela users_fts, e mede p50/p99 de UsuarioService.buscar para
+buscas típicas: primeira página, página funda, filtros, termo raro, termo
+comum e termo curto (prefixo).
+
+Uso:
+    python -m benchmarks.bench_busca_usuarios
+    python -m benchmarks.bench_busca_usuarios --usuarios 200000 --repeticoes 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.estatisticas import percentil
+from services.usuario_service import FiltroUsuarios, UsuarioService, criar_indice_busca_sqlite
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela', 'João',
+         'Larissa', 'Mateus', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago', 'Valentina', 'Yuri']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes']
+
+
+def preparar_banco(caminho, usuarios, semente):
+    """Cria users, aluno_turma e turmas com os índices de init_db e a busca FTS5"""
+    rng = random.Random(semente)
+    db = sqlite3.connect(caminho)
+    db.executescript("""
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL, first_name TEXT NOT NULL, last_name TEXT NOT NULL,
+            user_type TEXT NOT NULL, is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE turmas (id INTEGER PRIMARY KEY, professor_id INTEGER);
+        CREATE TABLE aluno_turma (aluno_id INTEGER, turma_id INTEGER, status TEXT);
+    """)
+    inicio = datetime(2020, 1, 1)
+    lote = []
+    for i in range(1, usuarios + 1):
+        nome, sobrenome = rng.choice(NOMES), rng.choice(SOBRENOMES)
+        tipo = 'aluno' if rng.random() < 0.95 else ('professor' if rng.random() < 0.9 else 'admin')
+        criado = inicio + timedelta(seconds=i * 60 + rng.randint(0, 59))
+        lote.append((f'{nome.lower()}.{sobrenome.lower()}{i}', f'u{i}@escola{i % 50}.com', 'x', nome, sobrenome,
+                     tipo, int(rng.random() < 0.97), criado.strftime('%Y-%m-%d %H:%M:%S')))
+        if len(lote) == 50000:
+            db.executemany("INSERT INTO users (username, email, password_hash, first_name, last_name, user_type, "
+                           "is_active, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lote)
+            lote = []
+    if lote:
+        db.executemany("INSERT INTO users (username, email, password_hash, first_name, last_name, user_type, "
+                       "is_active, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lote)
+    db.executescript("""
+        CREATE INDEX idx_users_type ON users(user_type);
+        CREATE INDEX idx_users_tipo_id ON users(user_type, id DESC);
+        CREATE INDEX idx_aluno_turma_aluno ON aluno_turma(aluno_id);
+        CREATE INDEX idx_turmas_professor ON turmas(professor_id);
+        ANALYZE;
+    """)
+    db.commit()
+    criar_indice_busca_sqlite(db)
+    db.close()
+
+
+def medir(service, filtro, repeticoes, paginas=1):
+    """Latências (s) de `repeticoes` buscas, seguindo `paginas` cursores em cada uma"""
+    latencias = []
+    for _ in range(repeticoes):
+        cursor = None
+        for _ in range(paginas):
+            inicio = time.perf_counter()
+            pagina = service.buscar(filtro, cursor, 50)
+            latencias.append(time.perf_counter() - inicio)
+            cursor = pagina.proximo_cursor
+            if cursor is None:
+                break
+    return latencias
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Mede a busca de usuários da administração')
+    parser.add_argument('--usuarios', type=int, default=1_000_000)
+    parser.add_argument('--repeticoes', type=int, default=30)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'usuarios.db')
+        inicio = time.perf_counter()
+        preparar_banco(caminho, args.usuarios, args.semente)
+        print(f"📊 {args.usuarios} usuários, banco de {os.path.getsize(caminho) / 1024 / 1024:.0f} MB "
+              f"criado em {time.perf_counter() - inicio:.0f}s")
+
+        db = sqlite3.connect(caminho)
+        service = UsuarioService(db)
+        cenarios = [
+            ('primeira página', FiltroUsuarios(), 1),
+            ('20 páginas seguidas', FiltroUsuarios(), 20),
+            ('tipo=professor', FiltroUsuarios(user_type='professor'), 1),
+            ('inativos', FiltroUsuarios(is_active=False), 1),
+            ('termo raro', FiltroUsuarios(termo=f'u{args.usuarios // 2}@'), 1),
+            ('termo comum', FiltroUsuarios(termo='silva'), 1),
+            ('termo comum + tipo', FiltroUsuarios(termo='oliveira', user_type='professor'), 1),
+            ('prefixo curto', FiltroUsuarios(termo='ma'), 1),
+        ]
+
+        print(f"\n{'cenário':<22} {'n':>5} {'p50 ms':>8} {'p99 ms':>8}")
+        for nome, filtro, paginas in cenarios:
+            medir(service, filtro, 2, paginas)  # aquecimento do cache de páginas
+            latencias = medir(service, filtro, args.repeticoes, paginas)
+            print(f"{nome:<22} {len(latencias):>5} {percentil(latencias, 50):>8.2f} {percentil(latencias, 99):>8.2f}")
+        db.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
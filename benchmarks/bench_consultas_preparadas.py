@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark das consultas quentes com e sem preparação (PostgreSQL)
+
+Executa cada consulta registrada em utils.consultas_preparadas várias vezes
+em uma conexão com a preparação desligada e em outra com ela ligada, e
+imprime p50/p99 de cada modo junto com o tempo de planejamento que o servidor
+relata no EXPLAIN ANALYZE da consulta em texto (o custo evitado a cada
+execução quando a consulta está preparada).
+
+Os parâmetros vêm de um aluno, professor, aula e exercício existentes no banco
+(veja benchmarks/generate_dataset.py). Para comparar as rotas inteiras, use
+benchmarks/load_test.py com e sem --sem-preparadas.
+
+Uso:
+    DATABASE_URL=... python -m benchmarks.bench_consultas_preparadas
+    DATABASE_URL=... python -m benchmarks.bench_consultas_preparadas --repeticoes 500 -k aluno
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+
+from benchmarks.estatisticas import percentil
+from utils import consultas_preparadas
+
+# Parâmetros de cada consulta a partir da amostra do banco
+PARAMETROS = {
+    'usuario_por_id': lambda a: (a['aluno_id'],),
+    'usuario_login': lambda a: (a['username'],),
+    'admin_usuarios_por_tipo': lambda a: (),
+    'admin_total_turmas': lambda a: (),
+    'admin_total_aulas': lambda a: (),
+    'admin_total_matriculas': lambda a: (),
+    'admin_total_exercicios': lambda a: (),
+    'professor_total_aulas': lambda a: (a['professor_id'],),
+    'professor_total_turmas': lambda a: (a['professor_id'],),
+    'professor_total_alunos': lambda a: (a['professor_id'],),
+    'professor_total_exercicios': lambda a: (a['professor_id'],),
+    'professor_aulas_recentes': lambda a: (a['professor_id'],),
+    'professor_turmas_recentes': lambda a: (a['professor_id'],),
+    'aluno_total_aulas': lambda a: (a['aluno_id'],),
+    'aluno_aulas_em_progresso': lambda a: (a['aluno_id'],),
+    'aluno_aulas_concluidas': lambda a: (a['aluno_id'],),
+    'aluno_total_pontos': lambda a: (a['aluno_id'],),
+    'aluno_aulas_disponiveis': lambda a: (a['aluno_id'], a['aluno_id']),
+    'aluno_turmas': lambda a: (a['aluno_id'],),
+    'aula_por_id': lambda a: (a['aula_id'],),
+    'exercicios_da_aula': lambda a: (a['aula_id'],),
+    'progresso_na_aula': lambda a: (a['aluno_id'], a['aula_id']),
+    'proximas_aulas': lambda a: (a['turma_id'], 0),
+    'exercicio_por_id': lambda a: (a['exercicio_id'],),
+    'progresso_no_exercicio': lambda a: (a['aluno_id'], a['exercicio_id']),
+    'estatisticas_exercicios_aula': lambda a: (a['aluno_id'], a['exercicio_aula_id']),
+    'proximos_exercicios': lambda a: (a['exercicio_aula_id'], a['exercicio_id']),
+}
+
+
+def conectar(preparar: bool):
+    """Abre uma conexão configurada como as do app, com a preparação ligada ou não"""
+    consultas_preparadas.definir_ativas(preparar)
+    conn = psycopg.connect(os.getenv('DATABASE_URL'), row_factory=dict_row, autocommit=True)
+    consultas_preparadas.configurar_conexao(conn)
+    return conn
+
+
+def obter_amostra(conn) -> dict:
+    """Ids existentes usados como parâmetros"""
+    cur = conn.cursor()
+    amostra = {}
+    cur.execute("SELECT id, username FROM users WHERE user_type = 'aluno' ORDER BY id LIMIT 1")
+    aluno = cur.fetchone()
+    cur.execute("SELECT id FROM users WHERE user_type = 'professor' ORDER BY id LIMIT 1")
+    professor = cur.fetchone()
+    cur.execute("SELECT id, turma_id FROM aulas ORDER BY id LIMIT 1")
+    aula = cur.fetchone()
+    cur.execute("SELECT id, aula_id FROM exercicios ORDER BY id LIMIT 1")
+    exercicio = cur.fetchone()
+    cur.close()
+    if not (aluno and professor and aula and exercicio):
+        raise RuntimeError("O banco precisa ter ao menos um aluno, um professor, uma aula e um exercício")
+    amostra.update(aluno_id=aluno['id'], username=aluno['username'], professor_id=professor['id'],
+                   aula_id=aula['id'], turma_id=aula['turma_id'],
+                   exercicio_id=exercicio['id'], exercicio_aula_id=exercicio['aula_id'])
+    return amostra
+
+
+def tempo_planejamento(conn, nome: str, params: tuple) -> float:
+    """Tempo de planejamento (ms) da consulta em texto, segundo o EXPLAIN ANALYZE"""
+    cur = conn.cursor()
+    cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + consultas_preparadas.obter(nome), params, prepare=False)
+    plano = cur.fetchone()['QUERY PLAN'][0]
+    cur.close()
+    return plano['Planning Time']
+
+
+def medir(conn, preparar: bool, nome: str, params: tuple, repeticoes: int) -> list:
+    """Latências (s) de `repeticoes` execuções da consulta registrada"""
+    consultas_preparadas.definir_ativas(preparar)
+    cur = conn.cursor()
+    consultas_preparadas.executar(cur, nome, params).fetchall()  # prepara (se ligado) e aquece o cache
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        consultas_preparadas.executar(cur, nome, params).fetchall()
+        latencias.append(time.perf_counter() - inicio)
+    cur.close()
+    return latencias
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Compara as consultas quentes com e sem preparação')
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('-k', help='Mede só as consultas cujo nome contém este texto')
+    args = parser.parse_args()
+
+    if not os.getenv('DATABASE_URL'):
+        print("❌ Defina DATABASE_URL")
+        return 1
+
+    nomes = [n for n in consultas_preparadas.nomes() if not args.k or args.k in n]
+    sem_parametros = [n for n in nomes if n not in PARAMETROS]
+    for nome in sem_parametros:
+        print(f"⚠️  {nome}: sem parâmetros de exemplo em PARAMETROS, ignorada")
+    nomes = [n for n in nomes if n in PARAMETROS]
+
+    sem, com = conectar(False), conectar(True)
+    try:
+        amostra = obter_amostra(sem)
+        print(f"\n{'consulta':<30} {'plan ms':>8} {'sem p50':>8} {'sem p99':>8} {'com p50':>8} {'com p99':>8} {'ganho':>7}")
+        total_sem = total_com = 0.0
+        for nome in nomes:
+            params = PARAMETROS[nome](amostra)
+            planejamento = tempo_planejamento(sem, nome, params)
+            lat_sem = medir(sem, False, nome, params, args.repeticoes)
+            lat_com = medir(com, True, nome, params, args.repeticoes)
+            p50_sem, p50_com = percentil(lat_sem, 50), percentil(lat_com, 50)
+            total_sem += p50_sem
+            total_com += p50_com
+            print(f"{nome:<30} {planejamento:>8.3f} {p50_sem:>8.3f} {percentil(lat_sem, 99):>8.3f} "
+                  f"{p50_com:>8.3f} {percentil(lat_com, 99):>8.3f} {1 - p50_com / p50_sem:>7.1%}")
+        if nomes:
+            print(f"\n📊 Soma das medianas: {total_sem:.2f}ms sem preparação, {total_com:.2f}ms com "
+                  f"({1 - total_com / total_sem:.1%} a menos)")
+    finally:
+        sem.close()
+        com.close()
+        consultas_preparadas.definir_ativas(True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark do envio de respostas: gamificação na requisição x fila
+
+Cria um banco SQLite temporário com o schema de init_db e dispara threads que
+enviam respostas de exercícios como a rota fazer_exercicio, em dois modos:
+
+Síncrono: grava o progresso e aplica pontos, sequência, atividade diária,
+metas, conquistas e nível na mesma transação (como era feito na rota).
+Fila: grava o progresso e um evento em eventos_gamificacao; os trabalhadores
+da fila aplicam o resto em segundo plano.
+
+Reporta p50/p99 do envio e, no modo fila, quanto tempo os trabalhadores
+levaram para esvaziá-la depois da última resposta.
+
+Uso:
+    python -m benchmarks.bench_gamificacao
+    python -m benchmarks.bench_gamificacao --threads 16 --respostas 200 --trabalhadores 2
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.estatisticas import percentil
+from services import fila_gamificacao
+from services.gamificacao_service import EventoGamificacao, GamificacaoService
+from utils.database import DatabaseManager
+
+PROGRESSO = """
+    INSERT OR REPLACE INTO progresso (aluno_id, aula_id, status, pontuacao, ultima_atividade)
+    VALUES (?, ?, 'em_andamento', ?, CURRENT_TIMESTAMP)
+"""
+
+
+def preparar_banco(diretorio, alunos):
+    """Cria o banco com o schema de init_db, conquistas e uma meta de exercícios"""
+    import init_db
+    anterior = os.getcwd()
+    os.chdir(diretorio)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db.create_database()
+    finally:
+        os.chdir(anterior)
+
+    caminho = os.path.join(diretorio, 'escola_para_todos.db')
+    db = sqlite3.connect(caminho)
+    db.executemany("INSERT INTO users (id, username, email, password_hash, first_name, last_name, user_type) "
+                   "VALUES (?, ?, ?, 'x', 'Aluno', ?, 'aluno')",
+                   [(i, f'aluno{i}', f'aluno{i}@escola.test', str(i)) for i in range(1, alunos + 1)])
+    db.executemany("INSERT INTO conquistas (nome, descricao) VALUES (?, ?)",
+                   [('Primeiro Passo', 'Iniciou a primeira aula'), ('Estudante Dedicado', 'Concluiu 5 aulas')])
+    db.execute("INSERT INTO metas_semanais (nome, descricao, tipo, valor_meta, data_inicio, data_fim) "
+               "VALUES ('Exercícios', 'Resolver exercícios', 'exercicios', 20, ?, ?)",
+               (date.today().isoformat(), (date.today() + timedelta(days=7)).isoformat()))
+    db.commit()
+    db.close()
+    return caminho
+
+
+def rodar(modo, caminho, threads, respostas, alunos, semente):
+    """Envia as respostas e retorna (latências, duração)"""
+    manager = DatabaseManager(caminho, modo='producao')
+    latencias = []
+    lock = threading.Lock()
+
+    def cliente(indice):
+        rng = random.Random(semente + indice)
+        db = manager.connect()
+        locais = []
+        for _ in range(respostas):
+            aluno, exercicio = rng.randint(1, alunos), rng.randint(1, 500)
+            correto = rng.random() < 0.7
+            pontos = 10 if correto else 0
+            inicio = time.perf_counter()
+            db.execute(PROGRESSO, (aluno, exercicio // 10 + 1, pontos))
+            if modo == 'fila':
+                fila_gamificacao.enfileirar(db, aluno, 'exercicio', exercicio, pontos=pontos, correto=correto,
+                                            descricao=f'Exercício correto: {exercicio}')
+                db.commit()
+                fila_gamificacao.notificar()
+            else:
+                GamificacaoService(db).processar(aluno, [EventoGamificacao(
+                    aluno_id=aluno, tipo='exercicio', referencia_id=exercicio, pontos=pontos, correto=correto,
+                    descricao=f'Exercício correto: {exercicio}')])
+                db.commit()
+            locais.append(time.perf_counter() - inicio)
+        manager.release(db)
+        with lock:
+            latencias.extend(locais)
+
+    inicio = time.perf_counter()
+    ts = [threading.Thread(target=cliente, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return latencias, time.perf_counter() - inicio
+
+
+def esperar_fila(caminho, limite_s=300):
+    """Espera os trabalhadores esvaziarem a fila e retorna o tempo gasto"""
+    db = sqlite3.connect(caminho)
+    inicio = time.perf_counter()
+    try:
+        while fila_gamificacao.pendentes(db) and time.perf_counter() - inicio < limite_s:
+            time.sleep(0.05)
+    finally:
+        db.close()
+    return time.perf_counter() - inicio
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Compara a gamificação na requisição com a fila')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--respostas', type=int, default=200, help='Respostas por thread')
+    parser.add_argument('--alunos', type=int, default=200)
+    parser.add_argument('--trabalhadores', type=int, default=1)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger('utils.sql_instrumentation').setLevel(logging.ERROR)
+
+    print(f"📊 {args.threads} threads × {args.respostas} respostas, {args.alunos} alunos")
+    print(f"\n{'modo':<10} {'n':>7} {'resp/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'fila s':>8}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for modo in ('sincrono', 'fila'):
+            pasta = os.path.join(diretorio, modo)
+            os.makedirs(pasta)
+            caminho = preparar_banco(pasta, args.alunos)
+            if modo == 'fila':
+                fila_gamificacao.iniciar_trabalhadores(DatabaseManager(caminho, modo='producao'),
+                                                       args.trabalhadores)
+            latencias, duracao = rodar(modo, caminho, args.threads, args.respostas, args.alunos, args.semente)
+            drenagem = ''
+            if modo == 'fila':
+                drenagem = f'{esperar_fila(caminho):.2f}'
+                fila_gamificacao.parar_trabalhadores()
+            print(f"{modo:<10} {len(latencias):>7} {len(latencias) / duracao:>9.0f} "
+                  f"{percentil(latencias, 50):>8.2f} {percentil(latencias, 99):>8.2f} {drenagem:>8}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
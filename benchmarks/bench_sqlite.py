@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark do DatabaseManager com SQLite: modo simples x modo produção
+
+Cria um banco temporário com progresso de alunos e dispara threads que fazem
+leituras (consulta de progresso) e escritas pequenas (registro de progresso)
+pelo DatabaseManager, como os endpoints da API fazem. Reporta vazão, p50/p99
+por tipo de operação e quantas operações falharam com "database is locked".
+
+Modo simples: uma conexão por operação, journal padrão, sem busy_timeout.
+Modo produção: conexão por thread, WAL, pragmas e escritor único com group commit.
+
+Uso:
+    python -m benchmarks.bench_sqlite
+    python -m benchmarks.bench_sqlite --threads 32 --operacoes 500 --escritas 0.3
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.estatisticas import percentil
+from utils.database import DatabaseManager
+
+LEITURA = "SELECT aula_id, status, tempo_assistido FROM progresso WHERE aluno_id = ? ORDER BY aula_id"
+ESCRITA = """
+    INSERT INTO progresso (aluno_id, aula_id, status, tempo_assistido) VALUES (?, ?, 'em_andamento', ?)
+    ON CONFLICT (aluno_id, aula_id) DO UPDATE SET tempo_assistido = tempo_assistido + excluded.tempo_assistido
+"""
+
+
+def preparar_banco(caminho, alunos, aulas):
+    """Cria a tabela e um progresso inicial"""
+    db = sqlite3.connect(caminho)
+    db.execute("""
+        CREATE TABLE progresso (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            aluno_id INTEGER NOT NULL,
+            aula_id INTEGER NOT NULL,
+            status TEXT,
+            tempo_assistido INTEGER DEFAULT 0,
+            UNIQUE (aluno_id, aula_id)
+        )
+    """)
+    db.executemany("INSERT INTO progresso (aluno_id, aula_id, status, tempo_assistido) VALUES (?, ?, 'concluido', 600)",
+                   [(a, b) for a in range(1, alunos + 1) for b in range(1, aulas // 2 + 1)])
+    db.commit()
+    db.close()
+
+
+def rodar(modo, caminho, threads, operacoes, fracao_escritas, alunos, aulas, semente):
+    """Executa a carga em um modo e retorna (latências por tipo, erros por tipo, duração)"""
+    manager = DatabaseManager(caminho, modo=modo)
+    latencias = defaultdict(list)
+    erros = defaultdict(int)
+    lock = threading.Lock()
+
+    def trabalhador(indice):
+        rng = random.Random(semente + indice)
+        locais = defaultdict(list)
+        falhas = defaultdict(int)
+        for _ in range(operacoes):
+            tipo = 'escrita' if rng.random() < fracao_escritas else 'leitura'
+            aluno = rng.randint(1, alunos)
+            inicio = time.perf_counter()
+            try:
+                if tipo == 'escrita':
+                    manager.execute_update(ESCRITA, (aluno, rng.randint(1, aulas), rng.randint(5, 60)))
+                else:
+                    manager.execute_query(LEITURA, (aluno,))
+            except sqlite3.OperationalError:
+                falhas[tipo] += 1
+                continue
+            locais[tipo].append(time.perf_counter() - inicio)
+        with lock:
+            for tipo, valores in locais.items():
+                latencias[tipo].extend(valores)
+            for tipo, n in falhas.items():
+                erros[tipo] += n
+
+    inicio = time.perf_counter()
+    ts = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Compara os modos simples e produção do DatabaseManager')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--operacoes', type=int, default=300, help='Operações por thread')
+    parser.add_argument('--escritas', type=float, default=0.2, help='Fração de escritas')
+    parser.add_argument('--alunos', type=int, default=500)
+    parser.add_argument('--aulas', type=int, default=40)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    # O log de consultas lentas dispararia em todas as esperas por lock do modo simples
+    logging.getLogger('utils.sql_instrumentation').setLevel(logging.ERROR)
+
+    print(f"📊 {args.threads} threads × {args.operacoes} operações, {args.escritas:.0%} escritas")
+    print(f"\n{'modo':<10} {'tipo':<8} {'n':>7} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'locked':>7}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for modo in ('simples', 'producao'):
+            caminho = os.path.join(diretorio, f'{modo}.db')
+            preparar_banco(caminho, args.alunos, args.aulas)
+            latencias, erros, duracao = rodar(modo, caminho, args.threads, args.operacoes, args.escritas,
+                                              args.alunos, args.aulas, args.semente)
+            for tipo in ('leitura', 'escrita'):
+                valores = latencias[tipo]
+                if not valores and not erros[tipo]:
+                    continue
+                print(f"{modo:<10} {tipo:<8} {len(valores):>7} {len(valores) / duracao:>9.0f} "
+                      f"{percentil(valores, 50):>8.2f} {percentil(valores, 99):>8.2f} {erros[tipo]:>7}")
+            total = sum(len(v) for v in latencias.values())
+            print(f"{modo:<10} {'total':<8} {total:>7} {total / duracao:>9.0f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+Funções estatísticas compartilhadas pelos benchmarks
+"""
+
+
+def percentil(amostras, p):
+    """Percentil p (0-100) por interpolação linear, em milissegundos"""
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return 0.0
+    k = (len(ordenadas) - 1) * p / 100
+    base = int(k)
+    topo = min(base + 1, len(ordenadas) - 1)
+    return (ordenadas[base] + (ordenadas[topo] - ordenadas[base]) * (k - base)) * 1000
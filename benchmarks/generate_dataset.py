@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+Gerador de base sintética para testes de capacidade
+
+Cria escolas com professores, turmas, alunos, aulas, exercícios e meses de
+atividade com distribuições assimétricas (poucos alunos muito engajados e uma
+cauda longa de pouco engajados, picos no horário escolar, atividade mais densa
+nos meses recentes, aulas populares com mais tópicos no fórum).
+
+As linhas são geradas em fluxo, tabela a tabela, e carregadas com COPY no
+PostgreSQL ou com executemany em uma única transação no SQLite. Cada aluno tem
+um gerador aleatório próprio derivado da semente, então o plano de estudo dele
+é o mesmo ao gerar o progresso e as respostas.
+
+Usuários criados: admin{n}, prof{n} e aluno{n}, todos com a senha "senha123".
+A base padrão (2 escolas: 2 administradores, 8 professores, 16 turmas, 480
+alunos, 320 aulas, 1600 exercícios) tem os usuários e as faixas de ids de
+benchmarks/load_profile.json.
+
+Uso:
+    DATABASE_URL=... python -m benchmarks.generate_dataset
+    python -m benchmarks.generate_dataset --sqlite escola_para_todos.db --meses 3
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from utils.database import adapt_query, row_to_dict
+
+SENHA_PADRAO = 'senha123'
+
+DISCIPLINAS = ['Matemática', 'Português', 'Ciências', 'História', 'Geografia', 'Inglês']
+DIFICULDADES = [('Fácil', 'facil'), ('Médio', 'medio'), ('Difícil', 'dificil')]
+ALTERNATIVAS = json.dumps(['A', 'B', 'C', 'D'])
+
+# Peso relativo de cada hora do dia (horário escolar e início da noite)
+PESO_HORAS = [0, 0, 0, 0, 0, 0, 1, 3, 8, 10, 10, 8, 4, 5, 9, 10, 9, 7, 6, 7, 6, 4, 2, 1]
+PESO_HORAS_ACUMULADO = list(itertools.accumulate(PESO_HORAS))
+
+TAMANHO_LOTE = 10000
+
+
+@dataclass
+class Parametros:
+    """Dimensões da base gerada"""
+    escolas: int = 2            # um administrador por escola
+    professores: int = 4        # por escola
+    turmas: int = 2             # por professor
+    alunos: int = 30            # por turma
+    aulas: int = 20             # por turma
+    exercicios: int = 5         # por aula
+    meses: int = 6
+    topicos: float = 0.5        # média de tópicos do fórum por aula
+    semente: int = 42
+
+
+class GeradorDataset:
+    """Gera as linhas de cada tabela a partir dos parâmetros e dos ids iniciais"""
+
+    def __init__(self, params: Parametros, ids_iniciais: dict, agora: datetime = None):
+        self.p = params
+        self.base = ids_iniciais
+        self.agora = (agora or datetime.utcnow()).replace(microsecond=0)
+        self.janela = timedelta(days=30 * params.meses)
+        self.senha_hash = generate_password_hash(SENHA_PADRAO)
+
+        self.n_admins = params.escolas
+        self.n_professores = params.escolas * params.professores
+        self.n_turmas = self.n_professores * params.turmas
+        self.n_alunos = self.n_turmas * params.alunos
+        self.n_aulas = self.n_turmas * params.aulas
+
+    # ------------------------------------------------------------------
+    # Identificadores (determinísticos, a partir do id inicial de cada tabela)
+    # ------------------------------------------------------------------
+
+    def professor_id(self, indice):
+        return self.base['users'] + self.n_admins + indice
+
+    def aluno_id(self, turma, k):
+        return self.base['users'] + self.n_admins + self.n_professores + turma * self.p.alunos + k
+
+    def turma_id(self, turma):
+        return self.base['turmas'] + turma
+
+    def aula_id(self, turma, j):
+        return self.base['aulas'] + turma * self.p.aulas + j
+
+    def exercicio_id(self, turma, j, x):
+        return self.base['exercicios'] + (turma * self.p.aulas + j) * self.p.exercicios + x
+
+    def professor_da_turma(self, turma):
+        return turma // self.p.turmas
+
+    # ------------------------------------------------------------------
+    # Distribuições
+    # ------------------------------------------------------------------
+
+    def _rng(self, *chave):
+        """Gerador próprio de uma entidade (reprodutível entre as tabelas)"""
+        return random.Random(':'.join(map(str, (self.p.semente,) + chave)))
+
+    def _momento(self, rng, recente=1.5):
+        """Instante na janela de atividade, mais denso nos meses recentes e no horário escolar"""
+        dias_atras = self.janela.days * (rng.random() ** recente)
+        dia = self.agora - timedelta(days=dias_atras)
+        hora = rng.choices(range(24), cum_weights=PESO_HORAS_ACUMULADO)[0]
+        segundos = int(rng.random() * 3600)
+        momento = dia.replace(hour=hora, minute=segundos // 60, second=segundos % 60)
+        return min(momento, self.agora)
+
+    def plano_aluno(self, turma, k):
+        """
+        Plano de estudo de um aluno: aulas iniciadas, em ordem, com datas
+
+        Returns:
+            Tuple[float, List[tuple]]: (habilidade, [(j, concluida, inicio, fim, minutos)])
+        """
+        rng = self._rng('aluno', turma, k)
+        engajamento = min(rng.paretovariate(1.2), 10.0)
+        habilidade = rng.betavariate(3, 2)
+        iniciadas = min(self.p.aulas, int(self.p.aulas * engajamento / 4))
+
+        inicios = sorted(self._momento(rng) for _ in range(iniciadas))
+        plano = []
+        for j, inicio in enumerate(inicios):
+            concluida = rng.random() < (0.8 if j < iniciadas - 1 else 0.4)
+            minutos = max(1, int(rng.lognormvariate(3.4, 0.5)))
+            fim = min(inicio + timedelta(minutes=minutos), self.agora) if concluida else None
+            plano.append((j, concluida, inicio, fim, minutos))
+        return habilidade, plano
+
+    def respostas_aluno(self, turma, k):
+        """Tentativas de exercícios de um aluno: (aula j, exercício x, correta, momento, segundos)"""
+        habilidade, plano = self.plano_aluno(turma, k)
+        rng = self._rng('respostas', turma, k)
+        for j, concluida, inicio, _fim, _minutos in plano:
+            momento = inicio
+            for x in range(self.p.exercicios):
+                if rng.random() > (0.85 if concluida else 0.3):
+                    continue
+                for _tentativa in range(3):
+                    momento += timedelta(seconds=20 + int(rng.random() * 280))
+                    correta = rng.random() < habilidade
+                    yield j, x, correta, min(momento, self.agora), 5 + int(rng.random() * 235)
+                    if correta:
+                        break
+
+    # ------------------------------------------------------------------
+    # Linhas comuns
+    # ------------------------------------------------------------------
+
+    def usuarios(self):
+        """(id, username, email, first_name, last_name, user_type)"""
+        grupos = [('admin', 'admin', self.n_admins),
+                  ('prof', 'professor', self.n_professores),
+                  ('aluno', 'aluno', self.n_alunos)]
+        user_id = self.base['users']
+        for prefixo, tipo, quantidade in grupos:
+            for n in range(1, quantidade + 1):
+                username = f'{prefixo}{n}'
+                yield (user_id, username, f'{username}@dataset.escola', prefixo.title(), str(n), tipo)
+                user_id += 1
+
+    def topicos(self):
+        """(id, aula_id, autor_id, titulo, momento, visualizacoes, respostas) — aulas populares concentram tópicos"""
+        topico_id = self.base['forum_topicos']
+        for turma in range(self.n_turmas):
+            rng = self._rng('forum', turma)
+            for j in range(self.p.aulas):
+                # Popularidade decai com a ordem da aula (Zipf)
+                media = self.p.topicos * self.p.aulas / ((j + 1) * sum(1 / r for r in range(1, self.p.aulas + 1)))
+                quantidade = int(media) + (1 if rng.random() < media - int(media) else 0)
+                for _ in range(quantidade):
+                    autor = self.aluno_id(turma, rng.randrange(self.p.alunos))
+                    respostas = min(int(rng.expovariate(1 / 3)), 50)
+                    yield (topico_id, self.aula_id(turma, j), autor, f'Dúvida sobre a aula {j + 1}',
+                           self._momento(rng), int(rng.lognormvariate(3, 1)), respostas, turma)
+                    topico_id += 1
+
+    def respostas_forum(self):
+        """(id, topico_id, autor_id, momento)"""
+        resposta_id = self.base['forum_respostas']
+        for topico_id, _aula, _autor, _titulo, momento, _vis, respostas, turma in self.topicos():
+            rng = self._rng('forum_respostas', topico_id)
+            for _ in range(respostas):
+                if rng.random() < 0.2:
+                    autor = self.professor_id(self.professor_da_turma(turma))
+                else:
+                    autor = self.aluno_id(turma, rng.randrange(self.p.alunos))
+                momento = min(momento + timedelta(minutes=int(rng.expovariate(1 / 240))), self.agora)
+                yield resposta_id, topico_id, autor, momento
+                resposta_id += 1
+
+
+class CarregadorPostgres:
+    """Carrega as tabelas do app_postgres com COPY"""
+
+    TABELAS = ['users', 'turmas', 'matriculas', 'aulas', 'exercicios', 'progresso_alunos',
+               'respostas_alunos', 'forum_topicos', 'forum_respostas']
+
+    def __init__(self, db):
+        self.db = db
+
+    def ids_iniciais(self):
+        cur = self.db.cursor()
+        ids = {}
+        for tabela in self.TABELAS:
+            cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 AS proximo FROM {tabela}")
+            row = cur.fetchone()
+            ids[tabela] = row['proximo'] if isinstance(row, dict) else row[0]
+        return ids
+
+    @staticmethod
+    def _campo(valor):
+        if valor is None:
+            return '\\N'
+        if isinstance(valor, bool):
+            return 't' if valor else 'f'
+        if isinstance(valor, datetime):
+            return valor.isoformat(sep=' ')
+        return str(valor)
+
+    def copiar(self, tabela, colunas, linhas):
+        """COPY ... FROM STDIN em blocos de texto"""
+        cur = self.db.cursor()
+        total = 0
+        with cur.copy(f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN") as copy:
+            bloco = []
+            for linha in linhas:
+                bloco.append('\t'.join(self._campo(v) for v in linha))
+                if len(bloco) >= TAMANHO_LOTE:
+                    copy.write('\n'.join(bloco) + '\n')
+                    total += len(bloco)
+                    bloco = []
+            if bloco:
+                copy.write('\n'.join(bloco) + '\n')
+                total += len(bloco)
+        return total
+
+    def carregar(self, g: GeradorDataset):
+        p = g.p
+        yield 'users', self.copiar('users', [
+            'id', 'username', 'email', 'password_hash', 'first_name', 'last_name', 'user_type', 'is_active'
+        ], ((i, u, e, g.senha_hash, f, l, t, True) for i, u, e, f, l, t in g.usuarios()))
+
+        yield 'turmas', self.copiar('turmas', ['id', 'nome', 'descricao', 'professor_id', 'max_alunos'], (
+            (g.turma_id(t), f'Escola {g.professor_da_turma(t) // p.professores + 1} - Turma {t + 1}',
+             'Turma gerada para testes de capacidade', g.professor_id(g.professor_da_turma(t)), p.alunos)
+            for t in range(g.n_turmas)
+        ))
+
+        yield 'matriculas', self.copiar('matriculas', ['id', 'aluno_id', 'turma_id', 'status'], (
+            (g.base['matriculas'] + t * p.alunos + k, g.aluno_id(t, k), g.turma_id(t), 'ativa')
+            for t in range(g.n_turmas) for k in range(p.alunos)
+        ))
+
+        yield 'aulas', self.copiar('aulas', [
+            'id', 'titulo', 'descricao', 'conteudo', 'turma_id', 'professor_id', 'ordem',
+            'disciplina', 'duracao_minutos', 'dificuldade'
+        ], (
+            (g.aula_id(t, j), f'Aula {j + 1}', 'Aula gerada', 'Conteúdo da aula', g.turma_id(t),
+             g.professor_id(g.professor_da_turma(t)), j + 1, DISCIPLINAS[t % len(DISCIPLINAS)],
+             45, DIFICULDADES[min(j * 3 // p.aulas, 2)][0])
+            for t in range(g.n_turmas) for j in range(p.aulas)
+        ))
+
+        yield 'exercicios', self.copiar('exercicios', [
+            'id', 'aula_id', 'titulo', 'pergunta', 'tipo', 'opcoes', 'resposta_correta', 'pontos'
+        ], (
+            (g.exercicio_id(t, j, x), g.aula_id(t, j), f'Exercício {x + 1}', 'Qual é a alternativa correta?',
+             'multipla_escolha', ALTERNATIVAS, 'A', 10)
+            for t in range(g.n_turmas) for j in range(p.aulas) for x in range(p.exercicios)
+        ))
+
+        def progresso():
+            progresso_id = g.base['progresso_alunos']
+            for t in range(g.n_turmas):
+                for k in range(p.alunos):
+                    for j, concluida, inicio, fim, minutos in g.plano_aluno(t, k)[1]:
+                        yield (progresso_id, g.aluno_id(t, k), g.aula_id(t, j),
+                               'concluida' if concluida else 'em_progresso',
+                               inicio, fim, minutos, inicio, fim or inicio)
+                        progresso_id += 1
+
+        yield 'progresso_alunos', self.copiar('progresso_alunos', [
+            'id', 'aluno_id', 'aula_id', 'status', 'data_inicio', 'data_conclusao', 'tempo_gasto',
+            'created_at', 'updated_at'
+        ], progresso())
+
+        def respostas():
+            resposta_id = g.base['respostas_alunos']
+            for t in range(g.n_turmas):
+                for k in range(p.alunos):
+                    for j, x, correta, momento, segundos in g.respostas_aluno(t, k):
+                        yield (resposta_id, g.aluno_id(t, k), g.exercicio_id(t, j, x),
+                               'A' if correta else 'B', correta, 10 if correta else 0, segundos, momento)
+                        resposta_id += 1
+
+        yield 'respostas_alunos', self.copiar('respostas_alunos', [
+            'id', 'aluno_id', 'exercicio_id', 'resposta', 'esta_correta', 'pontos_ganhos',
+            'tempo_resposta', 'created_at'
+        ], respostas())
+
+        yield 'forum_topicos', self.copiar('forum_topicos', [
+            'id', 'titulo', 'conteudo', 'autor_id', 'aula_id', 'tipo', 'status', 'visualizacoes', 'data_criacao'
+        ], ((i, titulo, 'Não entendi esta parte da aula.', autor, aula, 'duvida', 'aberto', vis, momento)
+            for i, aula, autor, titulo, momento, vis, _r, _t in g.topicos()))
+
+        yield 'forum_respostas', self.copiar('forum_respostas', [
+            'id', 'topico_id', 'autor_id', 'conteudo', 'data_criacao'
+        ], ((i, topico, autor, 'Veja o exemplo da aula.', momento)
+            for i, topico, autor, momento in g.respostas_forum()))
+
+    def finalizar(self):
+        """Ajusta as sequências SERIAL para depois dos ids gerados"""
+        cur = self.db.cursor()
+        for tabela in self.TABELAS:
+            cur.execute(f"""
+                SELECT setval(pg_get_serial_sequence('{tabela}', 'id'),
+                              (SELECT COALESCE(MAX(id), 1) FROM {tabela}))
+            """)
+
+
+class CarregadorSQLite:
+    """Carrega as tabelas do app_old (init_db.py) com executemany"""
+
+    TABELAS = ['users', 'turmas', 'aluno_turma', 'aulas', 'exercicios', 'progresso',
+               'historico_pontos', 'forum_topicos', 'forum_respostas']
+
+    def __init__(self, db):
+        self.db = db
+
+    def ids_iniciais(self):
+        ids = {}
+        for tabela in self.TABELAS:
+            ids[tabela] = self.db.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabela}").fetchone()[0]
+        # Nomes usados pelo gerador
+        ids['matriculas'] = ids['aluno_turma']
+        ids['progresso_alunos'] = ids['progresso']
+        ids['respostas_alunos'] = ids['historico_pontos']
+        return ids
+
+    def inserir(self, tabela, colunas, linhas):
+        """executemany em blocos (a transação é única, aberta por quem chama)"""
+        sql = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+        total = 0
+        bloco = []
+        for linha in linhas:
+            bloco.append(tuple(v.isoformat(sep=' ') if isinstance(v, datetime) else v for v in linha))
+            if len(bloco) >= TAMANHO_LOTE:
+                self.db.executemany(sql, bloco)
+                total += len(bloco)
+                bloco = []
+        if bloco:
+            self.db.executemany(sql, bloco)
+            total += len(bloco)
+        return total
+
+    def carregar(self, g: GeradorDataset):
+        p = g.p
+        yield 'users', self.inserir('users', [
+            'id', 'username', 'email', 'password_hash', 'first_name', 'last_name', 'user_type', 'is_active'
+        ], ((i, u, e, g.senha_hash, f, l, t, 1) for i, u, e, f, l, t in g.usuarios()))
+
+        yield 'turmas', self.inserir('turmas', ['id', 'nome', 'serie', 'professor_id'], (
+            (g.turma_id(t), f'Escola {g.professor_da_turma(t) // p.professores + 1} - Turma {t + 1}',
+             f'{t % 9 + 1}º ano', g.professor_id(g.professor_da_turma(t)))
+            for t in range(g.n_turmas)
+        ))
+
+        yield 'aluno_turma', self.inserir('aluno_turma', ['id', 'aluno_id', 'turma_id', 'status'], (
+            (g.base['aluno_turma'] + t * p.alunos + k, g.aluno_id(t, k), g.turma_id(t), 'ativo')
+            for t in range(g.n_turmas) for k in range(p.alunos)
+        ))
+
+        yield 'aulas', self.inserir('aulas', [
+            'id', 'titulo', 'descricao', 'disciplina', 'serie', 'professor_id', 'duracao_minutos', 'dificuldade'
+        ], (
+            (g.aula_id(t, j), f'Aula {j + 1}', 'Aula gerada', DISCIPLINAS[t % len(DISCIPLINAS)],
+             f'{t % 9 + 1}º ano', g.professor_id(g.professor_da_turma(t)), 45,
+             DIFICULDADES[min(j * 3 // p.aulas, 2)][1])
+            for t in range(g.n_turmas) for j in range(p.aulas)
+        ))
+
+        yield 'exercicios', self.inserir('exercicios', [
+            'id', 'enunciado', 'alternativas', 'resposta_correta', 'aula_id', 'pontos', 'tipo'
+        ], (
+            (g.exercicio_id(t, j, x), 'Qual é a alternativa correta?', ALTERNATIVAS, 'A',
+             g.aula_id(t, j), 10, 'multipla_escolha')
+            for t in range(g.n_turmas) for j in range(p.aulas) for x in range(p.exercicios)
+        ))
+
+        def progresso():
+            progresso_id = g.base['progresso']
+            for t in range(g.n_turmas):
+                for k in range(p.alunos):
+                    for j, concluida, inicio, fim, minutos in g.plano_aluno(t, k)[1]:
+                        yield (progresso_id, g.aluno_id(t, k), g.aula_id(t, j),
+                               'concluido' if concluida else 'em_andamento',
+                               minutos * 60, fim or inicio, inicio)
+                        progresso_id += 1
+
+        yield 'progresso', self.inserir('progresso', [
+            'id', 'aluno_id', 'aula_id', 'status', 'tempo_assistido', 'ultima_atividade', 'created_at'
+        ], progresso())
+
+        def pontos():
+            historico_id = g.base['historico_pontos']
+            for t in range(g.n_turmas):
+                for k in range(p.alunos):
+                    for j, x, correta, momento, _segundos in g.respostas_aluno(t, k):
+                        if correta:
+                            yield (historico_id, g.aluno_id(t, k), 10, 'exercicio', f'Exercício {x + 1}',
+                                   g.exercicio_id(t, j, x), 'exercicio', momento)
+                            historico_id += 1
+
+        yield 'historico_pontos', self.inserir('historico_pontos', [
+            'id', 'aluno_id', 'pontos', 'tipo', 'descricao', 'referencia_id', 'referencia_tipo', 'data_ganho'
+        ], pontos())
+
+        yield 'forum_topicos', self.inserir('forum_topicos', [
+            'id', 'titulo', 'conteudo', 'autor_id', 'aula_id', 'tipo', 'status', 'visualizacoes', 'data_criacao'
+        ], ((i, titulo, 'Não entendi esta parte da aula.', autor, aula, 'pergunta', 'aberto', vis, momento)
+            for i, aula, autor, titulo, momento, vis, _r, _t in g.topicos()))
+
+        yield 'forum_respostas', self.inserir('forum_respostas', [
+            'id', 'topico_id', 'autor_id', 'conteudo', 'data_criacao'
+        ], ((i, topico, autor, 'Veja o exemplo da aula.', momento)
+            for i, topico, autor, momento in g.respostas_forum()))
+
+    def finalizar(self):
+        pass
+
+
+def gerar(db, params: Parametros, agregados: bool = True, agora: datetime = None) -> dict:
+    """
+    Gera e carrega a base em uma única transação
+
+    Args:
+        db: Conexão sqlite3 ou psycopg
+        params (Parametros): Dimensões da base
+        agregados (bool): Reconstruir atividade_diaria e streaks_alunos ao final
+        agora (datetime): Fim da janela de atividade (padrão: agora)
+
+    Returns:
+        dict: Linhas carregadas por tabela
+    """
+    sqlite = isinstance(db, sqlite3.Connection)
+    carregador = CarregadorSQLite(db) if sqlite else CarregadorPostgres(db)
+    totais = {}
+
+    try:
+        if sqlite:
+            db.execute("PRAGMA synchronous = OFF")
+            db.execute("BEGIN")
+        gerador = GeradorDataset(params, carregador.ids_iniciais(), agora)
+        _verificar_usuarios_livres(db, gerador)
+
+        for tabela, total in _cronometrar(carregador.carregar(gerador)):
+            totais[tabela] = total
+
+        carregador.finalizar()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if agregados:
+        from services.atividade_service import AtividadeDiariaService
+        from services.streak_service import StreakService
+        inicio = time.perf_counter()
+        totais['atividade_diaria'] = AtividadeDiariaService(db).rebuild()
+        print(f"   atividade_diaria      {totais['atividade_diaria']:>12,} linhas  "
+              f"{time.perf_counter() - inicio:6.1f}s")
+        inicio = time.perf_counter()
+        totais['streaks_alunos'] = StreakService(db).rebuild()
+        print(f"   streaks_alunos        {totais['streaks_alunos']:>12,} linhas  "
+              f"{time.perf_counter() - inicio:6.1f}s")
+
+    return totais
+
+
+def _verificar_usuarios_livres(db, gerador: GeradorDataset):
+    """Falha antes de carregar se algum username gerado já existir no banco"""
+    nomes = ['admin1', 'prof1', 'aluno1', f'aluno{gerador.n_alunos}']
+    cursor = db.cursor()
+    cursor.execute(adapt_query(
+        f"SELECT username FROM users WHERE username IN ({', '.join(['%s'] * len(nomes))})", db
+    ), nomes)
+    existentes = [row_to_dict(cursor, row)['username'] for row in cursor.fetchall()]
+    if existentes:
+        raise ValueError(f"Usuários já existem no banco ({', '.join(existentes)}); "
+                         f"use um banco vazio para gerar a base")
+
+
+def _cronometrar(etapas):
+    """Imprime linhas, tempo e vazão de cada tabela à medida que são carregadas"""
+    inicio = time.perf_counter()
+    for tabela, total in etapas:
+        duracao = time.perf_counter() - inicio
+        print(f"   {tabela:<20} {total:>12,} linhas  {duracao:6.1f}s  {total / max(duracao, 1e-9):>10,.0f} linhas/s")
+        yield tabela, total
+        inicio = time.perf_counter()
+
+
+def main():
+    """Função principal"""
+    padrao = Parametros()
+    parser = argparse.ArgumentParser(description='Gera uma base sintética para testes de capacidade')
+    parser.add_argument('--escolas', type=int, default=padrao.escolas)
+    parser.add_argument('--professores', type=int, default=padrao.professores, help='Por escola')
+    parser.add_argument('--turmas', type=int, default=padrao.turmas, help='Por professor')
+    parser.add_argument('--alunos', type=int, default=padrao.alunos, help='Por turma')
+    parser.add_argument('--aulas', type=int, default=padrao.aulas, help='Por turma')
+    parser.add_argument('--exercicios', type=int, default=padrao.exercicios, help='Por aula')
+    parser.add_argument('--meses', type=int, default=padrao.meses, help='Meses de atividade')
+    parser.add_argument('--topicos', type=float, default=padrao.topicos, help='Média de tópicos do fórum por aula')
+    parser.add_argument('--semente', type=int, default=padrao.semente)
+    parser.add_argument('--sqlite', metavar='ARQUIVO', help='Carregar em um banco SQLite (esquema do init_db.py)')
+    parser.add_argument('--sem-agregados', action='store_true', help='Não reconstruir atividade_diaria e streaks_alunos')
+    args = parser.parse_args()
+
+    params = Parametros(args.escolas, args.professores, args.turmas, args.alunos, args.aulas,
+                        args.exercicios, args.meses, args.topicos, args.semente)
+
+    if args.sqlite:
+        db = sqlite3.connect(args.sqlite, isolation_level=None)
+    else:
+        from init_db_postgres import get_db_connection
+        db = get_db_connection()
+
+    print(f"🏫 Gerando base: {params}")
+    inicio = time.perf_counter()
+    try:
+        totais = gerar(db, params, agregados=not args.sem_agregados)
+    except Exception as e:
+        print(f"❌ Erro ao gerar base: {e}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"✅ {sum(totais.values()):,} linhas em {time.perf_counter() - inicio:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP ponta a ponta com orçamento de latência por rota
+
+Sobe a aplicação (ou usa uma já em execução com --url), faz login de alunos,
+professores e administradores simulados e executa concorrentemente as jornadas
+definidas no perfil (por padrão benchmarks/load_profile.json), por exemplo
+dashboard → aula → exercício → fórum → ranking.
+
+Ao final imprime vazão, p50/p95/p99 e bytes recebidos por rota e compara com
+os orçamentos do perfil; o código de saída é 1 se algum orçamento for estourado.
+Por padrão as requisições aceitam gzip e br, como um navegador.
+
+O banco deve estar populado com os usuários e ids do perfil (a base padrão de
+benchmarks/generate_dataset.py). As jornadas do perfil padrão usam rotas do
+app_postgres (/aula/<id>, /exercicio/<id>, /professor/turma/<id>/gerenciar);
+ao iniciar um app localmente, o teste recusa perfis com rotas que o app não
+tem em vez de medir 404.
+
+Uso:
+    DATABASE_URL=... python -m benchmarks.load_test --duracao 60
+    python -m benchmarks.load_test --url http://localhost:5000 --json resultado.json
+    DATABASE_URL=... python -m benchmarks.load_test --sem-preparadas   # consultas quentes sem preparação
+    DATABASE_URL=... python -m benchmarks.load_test --accept-encoding ''   # bytes sem compressão
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from http.cookiejar import CookieJar
+
+from benchmarks.estatisticas import percentil
+
+PERFIL_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_profile.json')
+
+
+class _SemRedirecionamento(urllib.request.HTTPRedirectHandler):
+    """Não segue redirecionamentos: cada rota é medida isoladamente"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Coletor:
+    """Acumula latências e status por rota (compartilhado entre threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.erros = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def registrar(self, rota, status, segundos, erro=False, tamanho=0):
+        with self._lock:
+            self.latencias[rota].append(segundos)
+            self.bytes[rota] += tamanho
+            self.status[rota][status] += 1
+            if erro:
+                self.erros[rota] += 1
+
+
+class UsuarioVirtual:
+    """Um usuário simulado com sua própria sessão (cookies)"""
+
+    def __init__(self, base_url, tipo, username, password, coletor, timeout=30, accept_encoding=''):
+        self.base_url = base_url.rstrip('/')
+        self.tipo = tipo
+        self.username = username
+        self.password = password
+        self.coletor = coletor
+        self.timeout = timeout
+        self.accept_encoding = accept_encoding
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _SemRedirecionamento()
+        )
+
+    def requisitar(self, rota, caminho, dados=None):
+        """Faz uma requisição e registra latência e status"""
+        corpo = urllib.parse.urlencode(dados).encode() if dados is not None else None
+        # O corpo não é descomprimido: o tamanho lido é o que passou pela rede
+        cabecalhos = {'Accept-Encoding': self.accept_encoding} if self.accept_encoding else {}
+        requisicao = urllib.request.Request(self.base_url + caminho, data=corpo, headers=cabecalhos)
+        inicio = time.perf_counter()
+        try:
+            with self.opener.open(requisicao, timeout=self.timeout) as resposta:
+                tamanho = len(resposta.read())
+                status, location = resposta.status, ''
+        except urllib.error.HTTPError as e:
+            tamanho = len(e.read())
+            status, location = e.code, e.headers.get('Location', '')
+        except Exception:
+            self.coletor.registrar(rota, 'falha', time.perf_counter() - inicio, erro=True)
+            return None, ''
+
+        duracao = time.perf_counter() - inicio
+        # Redirecionar para o login no meio da jornada significa sessão perdida
+        perdeu_sessao = rota != '/login' and status in (301, 302) and '/login' in location
+        self.coletor.registrar(rota, status, duracao, erro=status >= 500 or perdeu_sessao, tamanho=tamanho)
+        return status, location
+
+    def login(self):
+        """Autentica o usuário; retorna False se o login falhar"""
+        status, location = self.requisitar('/login', '/login', {
+            'username': self.username, 'password': self.password
+        })
+        return status == 302 and '/login' not in location
+
+    def executar_jornada(self, jornada, ids, rng, pensar):
+        """Percorre uma vez as rotas da jornada"""
+        for rota in jornada:
+            valores = {nome: rng.randint(minimo, maximo) for nome, (minimo, maximo) in ids.items()}
+            self.requisitar(rota, rota.format(**valores))
+            if pensar:
+                time.sleep(rng.uniform(0, pensar))
+
+
+def expandir_usuarios(perfil):
+    """Lista (tipo, username, password) a partir dos padrões do perfil"""
+    usuarios = []
+    for grupo in perfil['usuarios']:
+        for n in range(1, grupo['quantidade'] + 1):
+            usuarios.append((grupo['tipo'], grupo['username'].format(n=n), grupo['password']))
+    return usuarios
+
+
+def rodar(base_url, perfil, duracao, pensar=0.0, semente=None, accept_encoding=''):
+    """
+    Executa a carga: uma thread por usuário do perfil, em jornadas contínuas
+
+    Returns:
+        Tuple[Coletor, float, int]: Coletor, duração real em segundos e logins com falha
+    """
+    coletor = Coletor()
+    fim = time.monotonic() + duracao
+    falhas_login = []
+
+    def trabalhador(indice, tipo, username, password):
+        rng = random.Random(None if semente is None else semente + indice)
+        usuario = UsuarioVirtual(base_url, tipo, username, password, coletor, accept_encoding=accept_encoding)
+        if not usuario.login():
+            falhas_login.append(username)
+            return
+        jornada = perfil['jornadas'][tipo]
+        while time.monotonic() < fim:
+            usuario.executar_jornada(jornada, perfil.get('ids', {}), rng, pensar)
+
+    threads = [
+        threading.Thread(target=trabalhador, args=(i, *u), daemon=True)
+        for i, u in enumerate(expandir_usuarios(perfil))
+    ]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return coletor, time.perf_counter() - inicio, len(falhas_login)
+
+
+def resumir(coletor, duracao):
+    """Calcula as estatísticas por rota"""
+    resumo = {}
+    for rota, latencias in sorted(coletor.latencias.items()):
+        resumo[rota] = {
+            'n': len(latencias),
+            'rps': round(len(latencias) / duracao, 1),
+            'p50': round(percentil(latencias, 50), 1),
+            'p95': round(percentil(latencias, 95), 1),
+            'p99': round(percentil(latencias, 99), 1),
+            'taxa_erro': round(coletor.erros[rota] / len(latencias), 4),
+            'kb_medio': round(coletor.bytes[rota] / len(latencias) / 1024, 1),
+            'status': {str(k): v for k, v in coletor.status[rota].items()},
+        }
+    return resumo
+
+
+def verificar_orcamentos(resumo, orcamentos):
+    """
+    Compara o resumo com os orçamentos do perfil
+
+    Returns:
+        List[str]: Descrição de cada orçamento estourado
+    """
+    violacoes = []
+    padrao = orcamentos.get('*', {})
+    for rota, dados in resumo.items():
+        limites = {**padrao, **orcamentos.get(rota, {})}
+        for metrica, limite in limites.items():
+            if metrica in dados and dados[metrica] > limite:
+                violacoes.append(f"{rota}: {metrica}={dados[metrica]} > {limite}")
+    return violacoes
+
+
+def imprimir(resumo, duracao):
+    """Imprime a tabela de resultados"""
+    total = sum(d['n'] for d in resumo.values())
+    kb_total = sum(d['kb_medio'] * d['n'] for d in resumo.values())
+    print(f"\n{'Rota':<42} {'n':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'erro':>6} {'KB':>7}")
+    for rota, d in resumo.items():
+        print(f"{rota:<42} {d['n']:>6} {d['rps']:>7} {d['p50']:>8} {d['p95']:>8} "
+              f"{d['p99']:>8} {d['taxa_erro']:>6.1%} {d['kb_medio']:>7}")
+    print(f"\n📊 {total} requisições em {duracao:.1f}s ({total / duracao:.1f} req/s), "
+          f"{kb_total / 1024:.1f} MB recebidos")
+
+
+def rotas_ausentes(app, perfil):
+    """
+    Rotas das jornadas do perfil que o app não atende com GET
+
+    Returns:
+        List[str]: Rotas (como escritas no perfil) sem regra correspondente
+    """
+    from werkzeug.exceptions import MethodNotAllowed, NotFound
+    from werkzeug.routing import RequestRedirect
+
+    adaptador = app.url_map.bind('localhost')
+    valores = {nome: minimo for nome, (minimo, _) in perfil.get('ids', {}).items()}
+    ausentes = []
+    for rota in sorted({r for jornada in perfil['jornadas'].values() for r in jornada}):
+        try:
+            adaptador.match(rota.format(**valores), method='GET')
+        except RequestRedirect:
+            pass
+        except (NotFound, MethodNotAllowed):
+            ausentes.append(rota)
+    return ausentes
+
+
+def iniciar_servidor(app):
+    """Sobe o app em uma thread local e retorna (url, servidor)"""
+    from werkzeug.serving import make_server
+
+    # O log de acesso por requisição distorceria as medições
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_port}", servidor
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Teste de carga HTTP com orçamentos por rota')
+    parser.add_argument('--perfil', default=PERFIL_PADRAO, help='Arquivo JSON com usuários, jornadas e orçamentos')
+    parser.add_argument('--url', help='URL de um servidor já em execução (senão o app é iniciado localmente)')
+    parser.add_argument('--app', default='app_postgres',
+                        help='Módulo do app iniciado localmente (precisa ter as rotas das jornadas do perfil)')
+    parser.add_argument('--duracao', type=float, default=30, help='Duração da carga em segundos')
+    parser.add_argument('--pensar', type=float, default=0.0, help='Pausa máxima aleatória entre passos (s)')
+    parser.add_argument('--semente', type=int, help='Semente para ids aleatórios reprodutíveis')
+    parser.add_argument('--accept-encoding', default='gzip, br',
+                        help="Cabeçalho Accept-Encoding enviado ('' para medir sem compressão)")
+    parser.add_argument('--json', metavar='ARQUIVO', help='Grava o resumo em JSON')
+    parser.add_argument('--sem-preparadas', action='store_true',
+                        help='Inicia o app com PREPARED_STATEMENTS=false (para comparar)')
+    args = parser.parse_args()
+
+    with open(args.perfil, encoding='utf-8') as f:
+        perfil = json.load(f)
+
+    servidor = None
+    base_url = args.url
+    if not base_url:
+        if args.sem_preparadas:
+            os.environ['PREPARED_STATEMENTS'] = 'false'
+        app = importlib.import_module(args.app).app
+        ausentes = rotas_ausentes(app, perfil)
+        if ausentes:
+            print(f"❌ {args.app} não tem as rotas do perfil: {', '.join(ausentes)}")
+            return 2
+        base_url, servidor = iniciar_servidor(app)
+        print(f"🚀 {args.app} iniciado em {base_url}")
+
+    try:
+        coletor, duracao, falhas_login = rodar(base_url, perfil, args.duracao, args.pensar, args.semente,
+                                              args.accept_encoding)
+    finally:
+        if servidor:
+            servidor.shutdown()
+
+    resumo = resumir(coletor, duracao)
+    imprimir(resumo, duracao)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'duracao': duracao, 'rotas': resumo}, f, indent=2, ensure_ascii=False)
+
+    violacoes = verificar_orcamentos(resumo, perfil.get('orcamentos', {}))
+    if falhas_login:
+        violacoes.append(f"{falhas_login} usuário(s) não conseguiram fazer login")
+
+    if violacoes:
+        print("\n❌ Orçamentos estourados:")
+        for v in violacoes:
+            print(f"   - {v}")
+        return 1
+
+    print("\n✅ Todas as rotas dentro do orçamento")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
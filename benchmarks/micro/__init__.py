@@ -0,0 +1,2 @@
+# Microbenchmarks (pytest-benchmark) da lógica pura dos serviços
+# Executar com: python -m benchmarks.microbench
@@ -0,0 +1,125 @@
+"""
+Entradas dos microbenchmarks
+
+Todas as entradas são geradas com semente fixa, em vários tamanhos, para que
+as rodadas salvas como baseline sejam comparáveis entre si.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.ai_recommendation_service import AIRecommendationService, StudentProfile
+
+SEMENTE = 20240301
+
+# Tamanhos dos lotes processados em cada rodada
+TAMANHOS = [10, 100, 1000]
+
+DIFICULDADES = ['Fácil', 'Médio', 'Difícil', 'Muito Difícil']
+NIVEIS = ['Iniciante', 'Básico', 'Intermediário', 'Avançado']
+TURMAS = [f'Turma {i}' for i in range(1, 21)]
+
+
+def rng(*chave):
+    """Gerador reprodutível para uma entrada"""
+    return random.Random(':'.join(map(str, (SEMENTE,) + chave)))
+
+
+@pytest.fixture(params=TAMANHOS, ids=lambda n: f'n={n}')
+def tamanho(request):
+    return request.param
+
+
+@pytest.fixture(scope='session')
+def service():
+    return AIRecommendationService()
+
+
+@pytest.fixture
+def profile():
+    r = rng('perfil')
+    return StudentProfile(
+        aluno_id=1,
+        progresso_medio=62.5,
+        aulas_concluidas=12,
+        pontos_totais=1340,
+        streak_atual=4,
+        nivel_atual='Intermediário',
+        areas_fortes=r.sample(TURMAS, 3),
+        areas_fracas=r.sample(TURMAS, 3),
+        ultima_atividade=datetime(2024, 3, 1, 10, 0),
+        maior_streak=9
+    )
+
+
+@pytest.fixture
+def aulas(tamanho):
+    """Linhas de AULAS_DISPONIVEIS_QUERY"""
+    r = rng('aulas', tamanho)
+    return [{
+        'id': i,
+        'titulo': f'Aula {i}',
+        'descricao': 'Descrição da aula',
+        'dificuldade': r.choice(DIFICULDADES),
+        'turma_nome': r.choice(TURMAS),
+        'total_alunos': r.choice([None, 0, r.randint(1, 60)]),
+        'media_progresso': r.uniform(0, 100)
+    } for i in range(1, tamanho + 1)]
+
+
+@pytest.fixture
+def pares_dificuldade(tamanho):
+    """(dificuldade, nível do aluno), incluindo níveis desconhecidos"""
+    r = rng('dificuldade', tamanho)
+    return [(r.choice(DIFICULDADES), r.choice(NIVEIS + ['Desconhecido'])) for _ in range(tamanho)]
+
+
+@pytest.fixture
+def metricas_nivel(tamanho):
+    """(progresso_medio, aulas_concluidas)"""
+    r = rng('nivel', tamanho)
+    return [(r.uniform(0, 100), r.randint(0, 40)) for _ in range(tamanho)]
+
+
+@pytest.fixture
+def pontos(tamanho):
+    """Pontos totais com cauda longa (a maioria nos primeiros níveis)"""
+    r = rng('pontos', tamanho)
+    return [int(r.paretovariate(1.1) * 50) for _ in range(tamanho)]
+
+
+@pytest.fixture
+def condicoes(tamanho):
+    """Filtros de build_where_clause: campos simples, listas (IN) e None"""
+    r = rng('condicoes', tamanho)
+    lotes = []
+    for _ in range(tamanho):
+        filtros = {}
+        for campo in r.sample(['id', 'turma_id', 'aluno_id', 'status', 'serie', 'professor_id'], r.randint(1, 6)):
+            escolha = r.random()
+            if escolha < 0.2:
+                filtros[campo] = None
+            elif escolha < 0.5:
+                filtros[campo] = [r.randint(1, 1000) for _ in range(r.randint(1, 20))]
+            else:
+                filtros[campo] = r.randint(1, 1000)
+        lotes.append(filtros)
+    return lotes
+
+
+@pytest.fixture
+def linhas_turmas(tamanho):
+    """Linhas de TurmaService.get_turmas_with_stats"""
+    r = rng('turmas', tamanho)
+    inicio = datetime(2024, 1, 1)
+    return [(
+        i,
+        f'Turma {i}',
+        f'{r.randint(1, 9)}º ano',
+        inicio + timedelta(days=r.randint(0, 365)) if r.random() > 0.05 else None,
+        f'Professor {r.randint(1, 50)}',
+        r.choice([None, r.randint(1, 40)]),
+        r.choice([None, r.randint(1, 60)]),
+        r.choice([None, r.uniform(0, 100)])
+    ) for i in range(1, tamanho + 1)]
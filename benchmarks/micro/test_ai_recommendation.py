@@ -0,0 +1,40 @@
+"""
+Microbenchmarks da pontuação de recomendações do serviço de IA
+"""
+import pytest
+
+pytestmark = pytest.mark.benchmark(group='ai')
+
+
+def test_calculate_recommendation_score(benchmark, service, profile, aulas):
+    """Pontuação de todas as aulas disponíveis para um perfil"""
+    pontuar = service._calculate_recommendation_score
+
+    resultado = benchmark(lambda: [pontuar(aula, profile) for aula in aulas])
+
+    assert len(resultado) == len(aulas)
+
+
+def test_is_difficulty_appropriate(benchmark, service, pares_dificuldade):
+    """Verificação de dificuldade por nível"""
+    verificar = service._is_difficulty_appropriate
+
+    resultado = benchmark(lambda: [verificar(d, n) for d, n in pares_dificuldade])
+
+    assert len(resultado) == len(pares_dificuldade)
+
+
+def test_determine_level(benchmark, service, metricas_nivel):
+    """Classificação do nível a partir do progresso"""
+    determinar = service._determine_level
+
+    resultado = benchmark(lambda: [determinar(p, c) for p, c in metricas_nivel])
+
+    assert len(resultado) == len(metricas_nivel)
+
+
+def test_rank_aulas(benchmark, service, profile, aulas):
+    """Ranking completo (pontuação, razão e ordenação)"""
+    resultado = benchmark(service._rank_aulas, aulas, profile, 10)
+
+    assert len(resultado) == min(10, len(aulas))
@@ -0,0 +1,23 @@
+"""
+Microbenchmarks de montagem de consultas e serialização da API de turmas
+"""
+from api.turmas import serializar_turma
+from utils.database import build_where_clause
+
+
+def test_build_where_clause(benchmark, condicoes):
+    """Cláusulas WHERE com igualdade, IN e valores nulos"""
+    benchmark.group = 'database'
+
+    resultado = benchmark(lambda: [build_where_clause(c) for c in condicoes])
+
+    assert len(resultado) == len(condicoes)
+
+
+def test_serializar_turmas(benchmark, linhas_turmas):
+    """Laço de formatação JSON de TurmasAPI.get"""
+    benchmark.group = 'api'
+
+    resultado = benchmark(lambda: [serializar_turma(t) for t in linhas_turmas])
+
+    assert len(resultado) == len(linhas_turmas)
@@ -0,0 +1,15 @@
+"""
+Microbenchmarks do cálculo de nível usado por atualizar_nivel_aluno
+"""
+import pytest
+
+from services.nivel_service import calcular_nivel
+
+pytestmark = pytest.mark.benchmark(group='gamificacao')
+
+
+def test_calcular_nivel(benchmark, pontos):
+    """Nível, título, cor e ícone para cada total de pontos"""
+    resultado = benchmark(lambda: [calcular_nivel(p) for p in pontos])
+
+    assert len(resultado) == len(pontos)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks da lógica pura dos serviços (pytest-benchmark)
+
+Executa benchmarks/micro com entradas de semente fixa em vários tamanhos.
+As rodadas podem ser salvas como baseline em benchmarks/micro/baselines e
+comparadas depois; a comparação falha (código de saída diferente de zero) se a
+mediana de algum benchmark piorar além do limite. A mediana é usada por ser
+menos sensível a pausas ocasionais da máquina do que a média.
+
+Uso:
+    python -m benchmarks.microbench                        # só executa
+    python -m benchmarks.microbench --salvar baseline      # executa e salva
+    python -m benchmarks.microbench --comparar             # compara com a última salva
+    python -m benchmarks.microbench --comparar 0001 --limite 10
+    python -m benchmarks.microbench -k where               # filtra benchmarks
+
+Requer requirements_bench.txt.
+"""
+
+import argparse
+import os
+import sys
+
+import pytest
+
+DIRETORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'micro')
+BASELINES = os.path.join(DIRETORIO, 'baselines')
+
+
+def montar_argumentos(args) -> list:
+    """Traduz as opções da linha de comando para os argumentos do pytest"""
+    argumentos = [
+        DIRETORIO, '-q', '-p', 'no:cacheprovider',
+        '--benchmark-only',
+        f'--benchmark-storage=file://{BASELINES}',
+        '--benchmark-sort=fullname',
+        '--benchmark-columns=min,mean,median,stddev,ops,rounds',
+    ]
+    if args.k:
+        argumentos += ['-k', args.k]
+    if args.salvar:
+        argumentos.append(f'--benchmark-save={args.salvar}')
+    if args.comparar is not None:
+        argumentos.append('--benchmark-compare' + (f'={args.comparar}' if args.comparar else ''))
+        argumentos.append(f'--benchmark-compare-fail=median:{args.limite:g}%')
+    return argumentos
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Microbenchmarks da lógica pura dos serviços')
+    parser.add_argument('--salvar', metavar='NOME', help='Salva a rodada como baseline com este nome')
+    parser.add_argument('--comparar', metavar='ID', nargs='?', const='',
+                        help='Compara com uma baseline salva (padrão: a mais recente)')
+    parser.add_argument('--limite', type=float, default=15,
+                        help='Piora máxima aceita na mediana, em %% (padrão: 15)')
+    parser.add_argument('-k', help='Expressão de filtro do pytest')
+    args = parser.parse_args()
+
+    codigo = int(pytest.main(montar_argumentos(args)))
+    if codigo and args.comparar is not None:
+        print(f"\n❌ Regressão acima de {args.limite:g}% (ou benchmarks com falha) em relação à baseline")
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Perfil de inicialização do app_postgres (tempo de import e memória)
+
+Cada cenário roda em um interpretador novo, como em um cold start:
+
+- importa, em ordem, os módulos que a aplicação carrega e mede o tempo e o
+  aumento de RSS de cada um;
+- mede a primeira requisição (GET /) pelo test client do Flask;
+- coleta os maiores imports cumulativos com ``python -X importtime``.
+
+O relatório é gravado em benchmarks/reports/startup_profile.md (e .json), que
+ficam versionados; ``--compare`` mostra a diferença para o relatório salvo.
+
+Uso:
+    python -m benchmarks.startup_profile            # gera o relatório
+    python -m benchmarks.startup_profile --compare  # compara com o versionado
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_DIR = os.path.join(ROOT, 'benchmarks', 'reports')
+REPORT_JSON = os.path.join(REPORT_DIR, 'startup_profile.json')
+REPORT_MD = os.path.join(REPORT_DIR, 'startup_profile.md')
+
+# Módulos na ordem em que a aplicação os carrega; o tempo de cada um exclui
+# o que já foi importado pelos anteriores
+MODULOS = [
+    'flask',
+    'flask_login',
+    'psycopg',
+    'auth',
+    'models_postgres',
+    'flask_restful',
+    'api.turmas',
+    'api.swagger',
+    'app_postgres',
+]
+
+# Cenário -> (variáveis de ambiente, módulos que a aplicação deixa de importar)
+CENARIOS = {
+    'padrao': ({}, []),
+    'minimo': ({'ENABLE_REST_API': 'false', 'ENABLE_SWAGGER': 'false', 'ENABLE_AI': 'false'},
+               ['flask_restful', 'api.turmas', 'api.swagger']),
+}
+
+# Executado no interpretador filho
+_SONDA = r'''
+import importlib, json, os, sys, time
+
+def rss_kb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+modulos = json.loads(sys.argv[1])
+inicio = time.perf_counter()
+resultado = {'rss_inicial_kb': rss_kb(), 'modulos': []}
+
+for nome in modulos:
+    rss, t0 = rss_kb(), time.perf_counter()
+    try:
+        importlib.import_module(nome)
+        erro = None
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    resultado['modulos'].append({
+        'modulo': nome,
+        'ms': round((time.perf_counter() - t0) * 1000, 1),
+        'rss_kb': rss_kb() - rss,
+        'erro': erro,
+    })
+
+resultado['import_total_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+
+app = sys.modules['app_postgres'].app
+t0 = time.perf_counter()
+status = app.test_client().get('/').status_code
+resultado['primeira_requisicao_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+resultado['primeira_requisicao_status'] = status
+resultado['rss_final_kb'] = rss_kb()
+print(json.dumps(resultado))
+'''
+
+
+def _ambiente(extra):
+    """Ambiente do processo filho (sem banco: mede só a inicialização)"""
+    env = dict(os.environ, **extra)
+    env.setdefault('DATABASE_URL', '')
+    return env
+
+
+def medir_cenario(extra_env, pular):
+    """Roda a sonda em um interpretador novo e retorna as medições"""
+    modulos = [m for m in MODULOS if m not in pular]
+    saida = subprocess.run(
+        [sys.executable, '-c', _SONDA, json.dumps(modulos)],
+        cwd=ROOT, env=_ambiente(extra_env), capture_output=True, text=True, check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def maiores_imports(extra_env, limite=15):
+    """Maiores imports diretos do app_postgres segundo ``-X importtime``"""
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app_postgres'],
+        cwd=ROOT, env=_ambiente(extra_env), capture_output=True, text=True
+    )
+
+    imports = []
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        proprio, cumulativo, nome = linha.split(':', 1)[1].split('|')
+        # Apenas os imports feitos diretamente pelo app_postgres (um nível de
+        # recuo), para não contar o mesmo tempo duas vezes
+        profundidade = (len(nome) - len(nome.lstrip()) - 1) // 2
+        if profundidade != 1:
+            continue
+        imports.append({'modulo': nome.strip(), 'cumulativo_ms': int(cumulativo) / 1000,
+                        'proprio_ms': int(proprio) / 1000})
+
+    imports.sort(key=lambda i: i['cumulativo_ms'], reverse=True)
+    return imports[:limite]
+
+
+def gerar_relatorio():
+    """Mede todos os cenários"""
+    return {
+        'python': sys.version.split()[0],
+        'cenarios': {
+            nome: {**medir_cenario(env, pular), 'maiores_imports': maiores_imports(env)}
+            for nome, (env, pular) in CENARIOS.items()
+        }
+    }
+
+
+def _markdown(relatorio):
+    """Formata o relatório em Markdown"""
+    linhas = [
+        '# Perfil de inicialização do app_postgres',
+        '',
+        'Gerado por `python -m benchmarks.startup_profile` '
+        f"(Python {relatorio['python']}). Cenário `minimo` desliga "
+        '`ENABLE_REST_API`, `ENABLE_SWAGGER` e `ENABLE_AI`.',
+    ]
+    for nome, dados in relatorio['cenarios'].items():
+        linhas += [
+            '',
+            f'## Cenário `{nome}`',
+            '',
+            f"- Import total: **{dados['import_total_ms']} ms**",
+            f"- Primeira requisição (GET /): **{dados['primeira_requisicao_ms']} ms** "
+            f"(status {dados['primeira_requisicao_status']})",
+            f"- RSS: {dados['rss_inicial_kb'] // 1024} MB → {dados['rss_final_kb'] // 1024} MB",
+            '',
+            '| Módulo | Tempo (ms) | RSS (+KB) |',
+            '|---|---:|---:|',
+        ]
+        for m in dados['modulos']:
+            tempo = m['ms'] if not m['erro'] else f"{m['ms']} ({m['erro']})"
+            linhas.append(f"| `{m['modulo']}` | {tempo} | {m['rss_kb']} |")
+        linhas += ['', '| Imports diretos do app (`-X importtime`) | Cumulativo (ms) |', '|---|---:|']
+        for i in dados['maiores_imports']:
+            linhas.append(f"| `{i['modulo']}` | {i['cumulativo_ms']:.1f} |")
+    return '\n'.join(linhas) + '\n'
+
+
+def comparar(atual, salvo):
+    """Imprime a variação do relatório atual em relação ao versionado"""
+    for nome, dados in atual['cenarios'].items():
+        anterior = salvo['cenarios'].get(nome)
+        if not anterior:
+            continue
+        print(f"📊 Cenário {nome}")
+        for chave in ('import_total_ms', 'primeira_requisicao_ms'):
+            print(f"   {chave:<24} {anterior[chave]:>8} → {dados[chave]:>8} ms")
+        print(f"   {'rss_final_kb':<24} {anterior['rss_final_kb']:>8} → {dados['rss_final_kb']:>8} KB")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Mede o tempo de import e a memória na inicialização')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compara com o relatório versionado em vez de sobrescrevê-lo')
+    args = parser.parse_args()
+
+    relatorio = gerar_relatorio()
+
+    if args.compare:
+        with open(REPORT_JSON, encoding='utf-8') as f:
+            comparar(relatorio, json.load(f))
+        return 0
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(REPORT_JSON, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    with open(REPORT_MD, 'w', encoding='utf-8') as f:
+        f.write(_markdown(relatorio))
+
+    print(f"✅ Relatório gravado em {os.path.relpath(REPORT_MD, ROOT)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Gera os arquivos estáticos com hash no nome e suas versões pré-comprimidas
+
+Cada arquivo de static/ é copiado para static/dist/ com o hash do conteúdo no
+nome (css/base.css -> dist/css/base.3f2a9c1e7b40.css). Os de tipo
+comprimível com pelo menos COMPRESSAO_MIN_BYTES ganham ao lado a versão .gz
+(nível máximo) e, se o pacote brotli estiver instalado, a .br. O
+static/dist/manifest.json liga o nome original ao nome com hash e é lido por
+utils.compressao na inicialização do app.
+
+Roda no build da imagem (Dockerfile); em desenvolvimento, sem o build, os
+arquivos são servidos pelo nome original.
+
+Uso:
+    python build_static.py
+    python build_static.py --static caminho/para/static
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+from typing import Dict
+
+from utils.compressao import (COMPRESSAO_MIN_BYTES, COMPRESSAO_TIPOS, DIRETORIO_DIST, EXTENSOES, MANIFESTO,
+                              brotli)
+
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+def nome_com_hash(relativo: str, dados: bytes) -> str:
+    """css/base.css -> dist/css/base.<hash>.css"""
+    raiz, extensao = os.path.splitext(relativo)
+    resumo = hashlib.sha256(dados).hexdigest()[:12]
+    return f"{DIRETORIO_DIST}/{raiz}.{resumo}{extensao}"
+
+
+def precomprimir(caminho: str, dados: bytes) -> Dict[str, int]:
+    """
+    Grava as versões .gz e .br de um arquivo, se ficarem menores
+
+    Returns:
+        Dict[str, int]: Tamanho de cada versão gravada por codificação
+    """
+    versoes = {'gzip': gzip.compress(dados, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versoes['br'] = brotli.compress(dados, quality=11)
+
+    gravadas = {}
+    for codificacao, comprimido in versoes.items():
+        if len(comprimido) < len(dados):
+            with open(caminho + EXTENSOES[codificacao], 'wb') as f:
+                f.write(comprimido)
+            gravadas[codificacao] = len(comprimido)
+    return gravadas
+
+
+def construir(pasta: str = PASTA_STATIC) -> Dict[str, str]:
+    """
+    Recria static/dist a partir dos arquivos de static/
+
+    Args:
+        pasta (str): Pasta static do app
+
+    Returns:
+        Dict[str, str]: Manifesto (nome original -> nome com hash)
+    """
+    destino = os.path.join(pasta, DIRETORIO_DIST)
+    shutil.rmtree(destino, ignore_errors=True)
+
+    manifesto = {}
+    for raiz, diretorios, arquivos in os.walk(pasta):
+        if os.path.abspath(raiz) == os.path.abspath(pasta):
+            diretorios[:] = [d for d in diretorios if d != DIRETORIO_DIST]
+        diretorios.sort()
+        for arquivo in sorted(arquivos):
+            origem = os.path.join(raiz, arquivo)
+            relativo = os.path.relpath(origem, pasta).replace(os.sep, '/')
+            with open(origem, 'rb') as f:
+                dados = f.read()
+
+            manifesto[relativo] = nome_com_hash(relativo, dados)
+            caminho = os.path.join(pasta, *manifesto[relativo].split('/'))
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, 'wb') as f:
+                f.write(dados)
+
+            tipo = mimetypes.guess_type(arquivo)[0]
+            texto = f"   {relativo} -> {manifesto[relativo]} ({len(dados)} B"
+            if tipo in COMPRESSAO_TIPOS and len(dados) >= COMPRESSAO_MIN_BYTES:
+                for codificacao, tamanho in precomprimir(caminho, dados).items():
+                    texto += f", {codificacao} {tamanho} B"
+            print(texto + ")")
+
+    os.makedirs(destino, exist_ok=True)
+    with open(os.path.join(destino, MANIFESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    return manifesto
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Gera os estáticos com hash e pré-comprimidos')
+    parser.add_argument('--static', default=PASTA_STATIC, help='Pasta static do app')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.static):
+        print(f"❌ Pasta não encontrada: {args.static}")
+        return 1
+
+    manifesto = construir(args.static)
+    aviso = '' if brotli is not None else ' (sem .br: pacote brotli não instalado)'
+    print(f"✅ {len(manifesto)} arquivos em {os.path.join(args.static, DIRETORIO_DIST)}{aviso}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
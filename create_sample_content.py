@@ -8,6 +8,9 @@ from psycopg.rows import dict_row
 from datetime import datetime
 import json
 
+from services.atividade_service import AtividadeDiariaService
+from services.streak_service import StreakService
+
 def create_sample_content():
     """Criar conteúdo de exemplo no banco"""
     
@@ -126,7 +129,11 @@ def create_sample_content():
             (3, %s, 'concluida', NOW(), NOW())
             ON CONFLICT DO NOTHING
         ''', (aula_ids[0], aula_ids[1], aula_ids[2]))
-        
+
+        # Sequência e atividade diária do aluno, na mesma transação do progresso
+        StreakService(db).registrar_atividade(3, commit=False)
+        AtividadeDiariaService(db).registrar(3, aulas=1, commit=False)
+
         db.commit()
         cur.close()
         db.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script para processar a fila de gamificação fora do processo web
+
+Uso:
+    python gamificacao_worker.py --sqlite escola_para_todos.db               # roda até Ctrl+C
+    python gamificacao_worker.py --sqlite escola_para_todos.db --trabalhadores 4
+    python gamificacao_worker.py --sqlite escola_para_todos.db --uma-vez     # esvazia a fila e sai
+
+Use com GAMIFICACAO_WORKERS=0 no app para que só este processo aplique os
+eventos; os dois modos podem conviver, já que cada evento é aplicado uma vez.
+"""
+
+import argparse
+import sys
+import time
+
+from services import fila_gamificacao
+from utils.database import DatabaseManager
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Processa a fila de gamificação')
+    parser.add_argument('--sqlite', metavar='ARQUIVO', default='escola_para_todos.db',
+                        help='Banco SQLite (padrão: escola_para_todos.db)')
+    parser.add_argument('--trabalhadores', type=int, default=1,
+                        help='Threads de processamento (padrão: 1)')
+    parser.add_argument('--uma-vez', action='store_true',
+                        help='Processar o que estiver na fila e sair')
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.sqlite)
+    try:
+        if args.uma_vez:
+            db = db_manager.connect()
+            try:
+                fila_gamificacao.criar_tabela(db)
+                inicio = time.perf_counter()
+                total = 0
+                while True:
+                    reivindicados = fila_gamificacao.processar_pendentes(db, 'gamificacao-cli')
+                    if not reivindicados:
+                        break
+                    total += reivindicados
+                restantes = fila_gamificacao.pendentes(db)
+            finally:
+                db_manager.release(db)
+            print(f"✅ {total} eventos processados em {time.perf_counter() - inicio:.1f}s "
+                  f"({restantes} aguardando nova tentativa)")
+            return 0
+
+        quantidade = fila_gamificacao.iniciar_trabalhadores(db_manager, args.trabalhadores)
+        print(f"✅ {quantidade} trabalhador(es) processando {args.sqlite} (Ctrl+C para parar)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            fila_gamificacao.parar_trabalhadores()
+            print("✅ Trabalhadores parados")
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Configuração do gunicorn (carregada automaticamente a partir do diretório atual)
+
+As migrações pendentes do PostgreSQL são aplicadas no processo master antes
+de os workers subirem, sem um interpretador separado. Quando o esquema já está
+atual isso custa uma única consulta. Só rodam servindo o app_postgres ou com
+DATABASE_URL definida: o app SQLite não precisa de um PostgreSQL acessível.
+
+Servindo o app SQLite (app_old), cada worker chama app_old.iniciar_servicos()
+depois de carregar o app: o preparo do banco e as threads em segundo plano
+não acontecem na importação do módulo.
+"""
+import os
+import sys
+
+
+def _usa_postgres(server) -> bool:
+    """Se o app servido usa o PostgreSQL (app_postgres ou DATABASE_URL definida)"""
+    app_uri = getattr(server.app, 'app_uri', None) or server.cfg.wsgi_app or ''
+    return app_uri.split(':')[0] == 'app_postgres' or bool(os.getenv('DATABASE_URL'))
+
+
+def on_starting(server):
+    """Aplicar migrações pendentes antes de iniciar os workers"""
+    if not _usa_postgres(server):
+        server.log.info("App SQLite: migrações do PostgreSQL ignoradas")
+        return
+
+    from init_db_postgres import get_db_connection
+    from migrations.runner import migrar
+
+    db = get_db_connection()
+    try:
+        aplicadas = migrar(db)
+        if aplicadas:
+            server.log.info("Migrações aplicadas: %s", ", ".join(m.name for m in aplicadas))
+        else:
+            server.log.info("Esquema do banco atualizado")
+    finally:
+        db.close()
+
+
+def post_worker_init(worker):
+    """Iniciar os serviços em segundo plano do app SQLite neste worker"""
+    app_old = sys.modules.get('app_old')
+    if app_old is not None:
+        app_old.iniciar_servicos()
@@ -9,6 +9,11 @@ import sys
 import sqlite3
 from werkzeug.security import generate_password_hash
 
+from services.usuario_service import criar_indice_busca_sqlite
+from services.fila_gamificacao import criar_tabela as criar_fila_gamificacao
+from utils.alternativas import converter_sqlite as converter_alternativas
+from services.turma_service import criar_versao_turmas
+
 def create_database():
     """Criar banco de dados SQLite e todas as tabelas"""
     print("🗄️  Criando banco de dados SQLite...")
@@ -89,7 +94,7 @@ def create_database():
             CREATE TABLE IF NOT EXISTS exercicios (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 enunciado TEXT NOT NULL,
-                alternativas TEXT NOT NULL, -- JSON como TEXT para SQLite
+                alternativas TEXT NOT NULL, -- array JSON (validado pelos triggers de utils.alternativas)
                 resposta_correta TEXT NOT NULL,
                 aula_id INTEGER NOT NULL,
                 pontos INTEGER DEFAULT 10,
@@ -323,11 +328,58 @@ def create_database():
             )
         ''')
         
+        # 20. Tabela Streaks dos Alunos
+        print("🔥 Criando tabela Streaks dos Alunos...")
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS streaks_alunos (
+                aluno_id INTEGER PRIMARY KEY,
+                streak_atual INTEGER NOT NULL DEFAULT 0,
+                maior_streak INTEGER NOT NULL DEFAULT 0,
+                ultima_atividade DATE,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (aluno_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # 21. Tabela Atividade Diária
+        print("📅 Criando tabela Atividade Diária...")
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS atividade_diaria (
+                aluno_id INTEGER NOT NULL,
+                data DATE NOT NULL,
+                aulas INTEGER NOT NULL DEFAULT 0,
+                exercicios INTEGER NOT NULL DEFAULT 0,
+                pontos INTEGER NOT NULL DEFAULT 0,
+                minutos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (aluno_id, data),
+                FOREIGN KEY (aluno_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # 22. Tabela Respostas dos Alunos
+        print("✏️  Criando tabela Respostas dos Alunos...")
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS respostas_alunos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                aluno_id INTEGER NOT NULL,
+                exercicio_id INTEGER NOT NULL,
+                resposta TEXT,
+                esta_correta BOOLEAN,
+                pontos_ganhos INTEGER DEFAULT 0,
+                tempo_resposta INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (aluno_id) REFERENCES users (id),
+                FOREIGN KEY (exercicio_id) REFERENCES exercicios (id)
+            )
+        ''')
+        
         # Criar índices para melhor performance
         print("🔍 Criando índices...")
         cur.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_users_type ON users(user_type)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_users_tipo_id ON users(user_type, id DESC)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_turmas_created_at_id ON turmas(created_at DESC, id DESC)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_turmas_professor ON turmas(professor_id)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_aluno_turma_aluno ON aluno_turma(aluno_id)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_aluno_turma_turma ON aluno_turma(turma_id)')
@@ -346,8 +398,22 @@ def create_database():
         cur.execute('CREATE INDEX IF NOT EXISTS idx_forum_topicos_data ON forum_topicos(data_criacao)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_forum_respostas_topico ON forum_respostas(topico_id)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_forum_votos_usuario ON forum_votos(usuario_id)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_atividade_diaria_data ON atividade_diaria(data, aluno_id)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_respostas_alunos_aluno ON respostas_alunos(aluno_id, exercicio_id)')
             
         db.commit()
+        
+        # Busca de usuários da administração (FTS5 com trigramas)
+        criar_indice_busca_sqlite(db)
+        
+        # Fila dos efeitos de gamificação (processada pelos trabalhadores)
+        criar_fila_gamificacao(db)
+        
+        # Alternativas dos exercícios validadas como array JSON
+        converter_alternativas(db)
+        
+        # Versão das turmas (GET condicional da API)
+        criar_versao_turmas(db)
         print("✅ Tabelas criadas com sucesso!")
         
     except Exception as e:
@@ -443,9 +509,9 @@ def insert_sample_data():
         aula_id = cur.fetchone()[0]
         
         exercicios_data = [
-            ('Qual é o resultado de 2x + 3 quando x = 4?', '7|8|9|11', '11', aula_id, 10),
-            ('Resolva: 3x - 6 = 12', 'x = 4|x = 5|x = 6|x = 7', 'x = 6', aula_id, 15),
-            ('Simplifique: 5x + 2x', '7x|10x|5x²|7x²', '7x', aula_id, 10)
+            ('Qual é o resultado de 2x + 3 quando x = 4?', '["7", "8", "9", "11"]', '11', aula_id, 10),
+            ('Resolva: 3x - 6 = 12', '["x = 4", "x = 5", "x = 6", "x = 7"]', 'x = 6', aula_id, 15),
+            ('Simplifique: 5x + 2x', '["7x", "10x", "5x²", "7x²"]', '7x', aula_id, 10)
         ]
         
         for ex_data in exercicios_data:
@@ -688,6 +754,7 @@ def main():
         print("   • aulas - Aulas com vídeos")
         print("   • exercicios - Exercícios das aulas")
         print("   • progresso - Progresso dos alunos")
+        print("   • respostas_alunos - Respostas aos exercícios")
         print("   • conquistas - Sistema de conquistas")
         print("   • disciplinas - Organização por matéria")
         print("   • metas_semanais - Metas semanais")
@@ -695,6 +762,7 @@ def main():
         print("   • ranking_semanal - Ranking dos alunos")
         print("   • historico_pontos - Histórico de pontos")
         print("   • niveis_aluno - Sistema de níveis")
+        print("   • eventos_gamificacao - Fila de efeitos de gamificação")
         print()
         print("🔑 Credenciais de teste:")
         print("   👨‍💼 Admin: admin / admin123")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Executor de migrações versionadas do PostgreSQL
+
+Cada arquivo em migrations/versions/ (NNNN_descricao.sql ou .py com uma função
+upgrade(cur)) é uma versão do esquema. A tabela schema_version guarda a versão,
+o nome e o checksum de cada migração aplicada. Na inicialização:
+
+- se não há migrações pendentes, uma única consulta é feita e o executor sai;
+- caso contrário, as pendentes são aplicadas em ordem, cada uma em sua própria
+  transação, sob um advisory lock (várias instâncias subindo ao mesmo tempo não
+  aplicam a mesma migração duas vezes);
+- uma migração já aplicada cujo arquivo mudou interrompe a inicialização.
+
+Uso:
+    python -m migrations.runner            # aplica as pendentes
+    python -m migrations.runner --status   # lista aplicadas e pendentes
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'versions')
+
+# Chave do advisory lock (arbitrária, mas fixa para todas as instâncias)
+MIGRATION_LOCK_KEY = 20240301
+
+_ARQUIVO_MIGRACAO = re.compile(r'^(\d+)_(\w+)\.(sql|py)$')
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INTEGER
+    )
+"""
+
+
+class MigrationError(Exception):
+    """Erro de consistência entre as migrações em disco e as aplicadas"""
+
+
+@dataclass
+class Migracao:
+    """Uma migração versionada em disco"""
+    version: int
+    name: str
+    path: str
+    checksum: str
+
+    @property
+    def is_python(self) -> bool:
+        return self.path.endswith('.py')
+
+
+def carregar_migracoes(diretorio: str = MIGRATIONS_DIR) -> List[Migracao]:
+    """
+    Lê as migrações do diretório, ordenadas por versão
+
+    Args:
+        diretorio (str): Diretório com os arquivos NNNN_nome.sql|py
+
+    Returns:
+        List[Migracao]: Migrações com checksum SHA-256 do conteúdo
+    """
+    migracoes = {}
+    for arquivo in sorted(os.listdir(diretorio)):
+        match = _ARQUIVO_MIGRACAO.match(arquivo)
+        if not match:
+            continue
+
+        version = int(match.group(1))
+        if version in migracoes:
+            raise MigrationError(f"Versão {version} duplicada: {arquivo} e {migracoes[version].name}")
+
+        caminho = os.path.join(diretorio, arquivo)
+        with open(caminho, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+
+        migracoes[version] = Migracao(version, arquivo, caminho, checksum)
+
+    return [migracoes[v] for v in sorted(migracoes)]
+
+
+def migracoes_pendentes(migracoes: List[Migracao], aplicadas: Dict[int, str]) -> List[Migracao]:
+    """
+    Compara as migrações em disco com as aplicadas
+
+    Args:
+        migracoes (List[Migracao]): Migrações em disco
+        aplicadas (Dict[int, str]): Versão -> checksum registrados em schema_version
+
+    Returns:
+        List[Migracao]: Migrações ainda não aplicadas, em ordem
+
+    Raises:
+        MigrationError: Se uma migração aplicada foi alterada ou removida
+    """
+    em_disco = {m.version: m for m in migracoes}
+
+    for version, checksum in aplicadas.items():
+        migracao = em_disco.get(version)
+        if migracao is None:
+            raise MigrationError(f"Migração {version} aplicada no banco não existe em disco")
+        if migracao.checksum != checksum.strip():
+            raise MigrationError(f"Migração {migracao.name} foi alterada depois de aplicada")
+
+    return [m for m in migracoes if m.version not in aplicadas]
+
+
+def versoes_aplicadas(cur) -> Dict[int, str]:
+    """Lê schema_version (vazio se a tabela ainda não existe)"""
+    cur.execute("SELECT to_regclass('schema_version') IS NOT NULL AS existe")
+    if not _valor(cur.fetchone(), 'existe'):
+        return {}
+
+    cur.execute("SELECT version, checksum FROM schema_version")
+    return {_valor(row, 'version', 0): _valor(row, 'checksum', 1) for row in cur.fetchall()}
+
+
+def _valor(row, chave, indice=0):
+    """Lê uma coluna de linhas dict_row ou tuplas"""
+    return row[chave] if isinstance(row, dict) else row[indice]
+
+
+def _aplicar(db, migracao: Migracao) -> int:
+    """Aplica uma migração e a registra, na mesma transação"""
+    inicio = time.perf_counter()
+    cur = db.cursor()
+
+    if migracao.is_python:
+        spec = importlib.util.spec_from_file_location(f"migracao_{migracao.version}", migracao.path)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        modulo.upgrade(cur)
+    else:
+        with open(migracao.path, encoding='utf-8') as f:
+            cur.execute(f.read())
+
+    duracao_ms = int((time.perf_counter() - inicio) * 1000)
+    cur.execute("""
+        INSERT INTO schema_version (version, name, checksum, duration_ms)
+        VALUES (%s, %s, %s, %s)
+    """, (migracao.version, migracao.name, migracao.checksum, duracao_ms))
+    db.commit()
+    cur.close()
+    return duracao_ms
+
+
+def migrar(db, diretorio: str = MIGRATIONS_DIR, ate: Optional[int] = None) -> List[Migracao]:
+    """
+    Aplica as migrações pendentes
+
+    Args:
+        db: Conexão psycopg
+        diretorio (str): Diretório das migrações
+        ate (Optional[int]): Última versão a aplicar (padrão: todas); usado ao
+            restaurar um backup no esquema em que ele foi feito
+
+    Returns:
+        List[Migracao]: Migrações aplicadas nesta execução (vazia se o esquema já estava atual)
+    """
+    migracoes = [m for m in carregar_migracoes(diretorio) if ate is None or m.version <= ate]
+
+    # Caminho rápido: uma leitura, sem lock, quando nada está pendente
+    cur = db.cursor()
+    pendentes = migracoes_pendentes(migracoes, versoes_aplicadas(cur))
+    db.commit()
+    if not pendentes:
+        cur.close()
+        return []
+
+    cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+    try:
+        cur.execute(SCHEMA_VERSION_DDL)
+        db.commit()
+
+        # Outra instância pode ter aplicado enquanto esperávamos o lock
+        pendentes = migracoes_pendentes(migracoes, versoes_aplicadas(cur))
+        db.commit()
+
+        for migracao in pendentes:
+            try:
+                duracao_ms = _aplicar(db, migracao)
+            except Exception:
+                db.rollback()
+                raise
+            print(f"✅ Migração {migracao.name} aplicada em {duracao_ms} ms")
+
+        return pendentes
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        db.commit()
+        cur.close()
+
+
+def status(db, diretorio: str = MIGRATIONS_DIR) -> None:
+    """Imprime as migrações aplicadas e pendentes"""
+    cur = db.cursor()
+    aplicadas = versoes_aplicadas(cur)
+    cur.close()
+
+    for migracao in carregar_migracoes(diretorio):
+        marca = '✅' if migracao.version in aplicadas else '⏳'
+        print(f"{marca} {migracao.name}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Aplica as migrações pendentes do PostgreSQL')
+    parser.add_argument('--status', action='store_true', help='Apenas lista aplicadas e pendentes')
+    args = parser.parse_args()
+
+    from init_db_postgres import get_db_connection
+
+    inicio = time.perf_counter()
+    db = get_db_connection()
+    try:
+        if args.status:
+            status(db)
+            return 0
+
+        aplicadas = migrar(db)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if aplicadas:
+            print(f"🎉 {len(aplicadas)} migração(ões) aplicada(s) em {duracao_ms:.0f} ms")
+        else:
+            print(f"✅ Esquema atualizado ({duracao_ms:.0f} ms)")
+        return 0
+    except Exception as e:
+        print(f"❌ Erro ao aplicar migrações: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -60,7 +60,7 @@ CREATE TABLE IF NOT EXISTS aulas (
 CREATE TABLE IF NOT EXISTS exercicios (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     enunciado TEXT NOT NULL,
-    alternativas TEXT NOT NULL, -- JSON como TEXT para SQLite
+    alternativas TEXT NOT NULL CHECK (json_type(CASE WHEN json_valid(alternativas) THEN alternativas END) IS 'array'), -- array JSON de textos
     resposta_correta TEXT NOT NULL,
     aula_id INTEGER NOT NULL,
     pontos INTEGER DEFAULT 10,
@@ -116,6 +116,28 @@ CREATE TABLE IF NOT EXISTS disciplinas (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 10. TABELA STREAKS_ALUNOS (Sequência de dias de estudo)
+CREATE TABLE IF NOT EXISTS streaks_alunos (
+    aluno_id INTEGER PRIMARY KEY,
+    streak_atual INTEGER NOT NULL DEFAULT 0,
+    maior_streak INTEGER NOT NULL DEFAULT 0,
+    ultima_atividade DATE, -- dia no fuso da escola (SCHOOL_TIMEZONE)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (aluno_id) REFERENCES users (id)
+);
+
+-- 11. TABELA ATIVIDADE_DIARIA (Atividade agregada por aluno e dia)
+CREATE TABLE IF NOT EXISTS atividade_diaria (
+    aluno_id INTEGER NOT NULL,
+    data DATE NOT NULL, -- dia no fuso da escola (SCHOOL_TIMEZONE)
+    aulas INTEGER NOT NULL DEFAULT 0,
+    exercicios INTEGER NOT NULL DEFAULT 0,
+    pontos INTEGER NOT NULL DEFAULT 0,
+    minutos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (aluno_id, data),
+    FOREIGN KEY (aluno_id) REFERENCES users (id)
+);
+
 -- =====================================================
 -- ÍNDICES PARA MELHORAR PERFORMANCE
 -- =====================================================
@@ -146,6 +168,9 @@ CREATE INDEX IF NOT EXISTS idx_progresso_aluno ON progresso(aluno_id);
 CREATE INDEX IF NOT EXISTS idx_progresso_aula ON progresso(aula_id);
 CREATE INDEX IF NOT EXISTS idx_progresso_status ON progresso(status);
 
+-- Índices para atividade_diaria (rankings e relatórios por período)
+CREATE INDEX IF NOT EXISTS idx_atividade_diaria_data ON atividade_diaria(data, aluno_id);
+
 -- Índices para aluno_conquista
 CREATE INDEX IF NOT EXISTS idx_aluno_conquista_aluno ON aluno_conquista(aluno_id);
 CREATE INDEX IF NOT EXISTS idx_aluno_conquista_conquista ON aluno_conquista(conquista_id);
@@ -200,6 +225,16 @@ ESTRUTURA DO BANCO:
    - Cores e ícones para UI
    - Descrições para contexto
 
+9. STREAKS_ALUNOS: Sequência de dias de estudo
+   - Atualizada incrementalmente a cada atividade do aluno
+   - Sequência atual, maior sequência e último dia ativo
+   - Recalculada a partir de atividade_diaria com rebuild_atividade_diaria.py
+
+10. ATIVIDADE_DIARIA: Atividade agregada por aluno e dia
+   - Aulas, exercícios, pontos e minutos somados a cada escrita
+   - Base para tendências, heatmaps e rankings semanais
+   - Reconstruível com rebuild_atividade_diaria.py
+
 RELACIONAMENTOS:
 - users (1) ←→ (N) turmas (professor)
 - users (N) ←→ (N) turmas (alunos via aluno_turma)
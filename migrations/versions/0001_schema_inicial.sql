@@ -0,0 +1,154 @@
+-- Esquema inicial (equivalente ao antigo init_db_postgres.create_tables)
+
+-- Tabela de usuários
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    user_type VARCHAR(20) NOT NULL DEFAULT 'aluno',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de turmas
+CREATE TABLE IF NOT EXISTS turmas (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(100) NOT NULL,
+    descricao TEXT,
+    professor_id INTEGER REFERENCES users(id),
+    max_alunos INTEGER DEFAULT 30,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de aulas
+CREATE TABLE IF NOT EXISTS aulas (
+    id SERIAL PRIMARY KEY,
+    titulo VARCHAR(200) NOT NULL,
+    conteudo TEXT NOT NULL,
+    turma_id INTEGER REFERENCES turmas(id),
+    ordem INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de matrículas
+CREATE TABLE IF NOT EXISTS matriculas (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    turma_id INTEGER REFERENCES turmas(id),
+    data_matricula TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status VARCHAR(20) DEFAULT 'ativa',
+    UNIQUE(aluno_id, turma_id)
+);
+
+-- Tabela de progresso
+CREATE TABLE IF NOT EXISTS progresso (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    aula_id INTEGER REFERENCES aulas(id),
+    status VARCHAR(20) DEFAULT 'não iniciada',
+    data_inicio TIMESTAMP,
+    data_conclusao TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de exercícios
+CREATE TABLE IF NOT EXISTS exercicios (
+    id SERIAL PRIMARY KEY,
+    aula_id INTEGER REFERENCES aulas(id),
+    pergunta TEXT NOT NULL,
+    tipo VARCHAR(20) DEFAULT 'multipla_escolha',
+    opcoes JSONB,
+    resposta_correta TEXT,
+    pontos INTEGER DEFAULT 10,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de respostas dos exercícios
+CREATE TABLE IF NOT EXISTS respostas_exercicios (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    exercicio_id INTEGER REFERENCES exercicios(id),
+    resposta TEXT,
+    esta_correta BOOLEAN,
+    pontos_ganhos INTEGER DEFAULT 0,
+    data_resposta TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de fórum
+CREATE TABLE IF NOT EXISTS forum_topicos (
+    id SERIAL PRIMARY KEY,
+    titulo VARCHAR(200) NOT NULL,
+    conteudo TEXT NOT NULL,
+    autor_id INTEGER REFERENCES users(id),
+    aula_id INTEGER REFERENCES aulas(id),
+    tipo VARCHAR(20) DEFAULT 'duvida',
+    status VARCHAR(20) DEFAULT 'aberto',
+    visualizacoes INTEGER DEFAULT 0,
+    ativo BOOLEAN DEFAULT TRUE,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de respostas do fórum
+CREATE TABLE IF NOT EXISTS forum_respostas (
+    id SERIAL PRIMARY KEY,
+    topico_id INTEGER REFERENCES forum_topicos(id),
+    autor_id INTEGER REFERENCES users(id),
+    conteudo TEXT NOT NULL,
+    ativo BOOLEAN DEFAULT TRUE,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de tags do fórum
+CREATE TABLE IF NOT EXISTS forum_tags (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(50) UNIQUE NOT NULL,
+    cor VARCHAR(7) DEFAULT '#007bff',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de relacionamento tags-tópicos
+CREATE TABLE IF NOT EXISTS forum_topicos_tags (
+    topico_id INTEGER REFERENCES forum_topicos(id),
+    tag_id INTEGER REFERENCES forum_tags(id),
+    PRIMARY KEY (topico_id, tag_id)
+);
+
+-- Tabela de conquistas
+CREATE TABLE IF NOT EXISTS conquistas (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(100) NOT NULL,
+    descricao TEXT,
+    icone VARCHAR(100),
+    pontos_necessarios INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de conquistas dos usuários
+CREATE TABLE IF NOT EXISTS usuario_conquistas (
+    usuario_id INTEGER REFERENCES users(id),
+    conquista_id INTEGER REFERENCES conquistas(id),
+    data_conquista TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (usuario_id, conquista_id)
+);
+
+-- Tabela de pontos dos usuários
+CREATE TABLE IF NOT EXISTS usuario_pontos (
+    usuario_id INTEGER REFERENCES users(id) PRIMARY KEY,
+    pontos_totais INTEGER DEFAULT 0,
+    nivel INTEGER DEFAULT 1,
+    data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
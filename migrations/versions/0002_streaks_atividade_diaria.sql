@@ -0,0 +1,23 @@
+-- Sequência de estudos e atividade diária pré-agregada
+
+-- Tabela de sequência de estudos (streak) dos alunos
+CREATE TABLE IF NOT EXISTS streaks_alunos (
+    aluno_id INTEGER REFERENCES users(id) PRIMARY KEY,
+    streak_atual INTEGER NOT NULL DEFAULT 0,
+    maior_streak INTEGER NOT NULL DEFAULT 0,
+    ultima_atividade DATE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tabela de atividade diária (agregada incrementalmente)
+CREATE TABLE IF NOT EXISTS atividade_diaria (
+    aluno_id INTEGER REFERENCES users(id),
+    data DATE NOT NULL,
+    aulas INTEGER NOT NULL DEFAULT 0,
+    exercicios INTEGER NOT NULL DEFAULT 0,
+    pontos INTEGER NOT NULL DEFAULT 0,
+    minutos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (aluno_id, data)
+);
+
+CREATE INDEX IF NOT EXISTS idx_atividade_diaria_data ON atividade_diaria(data, aluno_id);
@@ -0,0 +1,67 @@
+"""
+Dados iniciais: usuário administrador, conquistas básicas e tags do fórum
+(equivalente ao antigo init_db_postgres.insert_initial_data)
+"""
+from datetime import datetime
+
+from werkzeug.security import generate_password_hash
+
+
+def upgrade(cur):
+    """Inserir dados iniciais"""
+    # Verificar se já existe usuário admin
+    cur.execute('SELECT COUNT(*) as count FROM users WHERE user_type = %s', ('admin',))
+    admin_count = cur.fetchone()['count']
+
+    if admin_count == 0:
+        # Criar usuário administrador
+        admin_password = generate_password_hash('admin123')
+        now = datetime.utcnow()
+
+        cur.execute('''
+            INSERT INTO users (username, email, password_hash, first_name, last_name, user_type, is_active, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        ''', ('admin', 'admin@educa-facil.com', admin_password, 'Administrador', 'Sistema', 'admin', True, now, now))
+
+        admin_id = cur.fetchone()['id']
+
+        # Inserir conquistas básicas
+        conquistas = [
+            ('Primeiro Login', 'Realizou o primeiro login na plataforma', '🎯', 0),
+            ('Aluno Dedicado', 'Completou 5 aulas', '📚', 50),
+            ('Professor Ativo', 'Criou 3 aulas', '👨‍🏫', 100),
+            ('Colaborador', 'Participou do fórum 10 vezes', '💬', 75),
+            ('Mestre', 'Alcançou 1000 pontos', '👑', 1000)
+        ]
+
+        cur.executemany('''
+            INSERT INTO conquistas (nome, descricao, icone, pontos_necessarios)
+            VALUES (%s, %s, %s, %s)
+        ''', conquistas)
+
+        # Inserir pontos iniciais para o admin
+        cur.execute('''
+            INSERT INTO usuario_pontos (usuario_id, pontos_totais, nivel)
+            VALUES (%s, %s, %s)
+        ''', (admin_id, 0, 1))
+
+        print("✅ Usuário administrador criado!")
+        print("   Username: admin")
+        print("   Senha: admin123")
+        print("   Email: admin@educa-facil.com")
+
+    # Inserir tags básicas do fórum
+    tags = [
+        ('Dúvida', '#007bff'),
+        ('Sugestão', '#28a745'),
+        ('Bug', '#dc3545'),
+        ('Recurso', '#ffc107'),
+        ('Geral', '#6c757d')
+    ]
+
+    cur.executemany('''
+        INSERT INTO forum_tags (nome, cor)
+        VALUES (%s, %s)
+        ON CONFLICT (nome) DO NOTHING
+    ''', tags)
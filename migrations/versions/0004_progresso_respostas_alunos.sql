@@ -0,0 +1,46 @@
+-- Tabelas e colunas usadas pelo app_postgres que não existiam no esquema inicial
+
+-- Colunas de aulas e exercícios consultadas pelos dashboards e pela IA
+ALTER TABLE aulas ADD COLUMN IF NOT EXISTS descricao TEXT;
+ALTER TABLE aulas ADD COLUMN IF NOT EXISTS professor_id INTEGER REFERENCES users(id);
+ALTER TABLE aulas ADD COLUMN IF NOT EXISTS disciplina VARCHAR(100);
+ALTER TABLE aulas ADD COLUMN IF NOT EXISTS duracao_minutos INTEGER DEFAULT 45;
+ALTER TABLE aulas ADD COLUMN IF NOT EXISTS dificuldade VARCHAR(20) DEFAULT 'Médio';
+ALTER TABLE exercicios ADD COLUMN IF NOT EXISTS titulo VARCHAR(200);
+
+-- Progresso dos alunos nas aulas
+CREATE TABLE IF NOT EXISTS progresso_alunos (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    aula_id INTEGER REFERENCES aulas(id),
+    status VARCHAR(20) DEFAULT 'não_iniciada',
+    data_inicio TIMESTAMP,
+    data_conclusao TIMESTAMP,
+    tempo_gasto INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Respostas dos alunos aos exercícios
+CREATE TABLE IF NOT EXISTS respostas_alunos (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    exercicio_id INTEGER REFERENCES exercicios(id),
+    resposta TEXT,
+    esta_correta BOOLEAN,
+    pontos_ganhos INTEGER DEFAULT 0,
+    tempo_resposta INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Conquistas obtidas pelos alunos
+CREATE TABLE IF NOT EXISTS conquistas_alunos (
+    id SERIAL PRIMARY KEY,
+    aluno_id INTEGER REFERENCES users(id),
+    conquista_id INTEGER REFERENCES conquistas(id),
+    data_conquista TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_progresso_alunos_aluno ON progresso_alunos(aluno_id, aula_id);
+CREATE INDEX IF NOT EXISTS idx_respostas_alunos_aluno ON respostas_alunos(aluno_id, exercicio_id);
+CREATE INDEX IF NOT EXISTS idx_matriculas_turma ON matriculas(turma_id, status);
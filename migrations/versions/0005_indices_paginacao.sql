@@ -0,0 +1,8 @@
+-- Paginação por chave (created_at, id) da listagem de turmas
+-- (a de usuários pagina pelo id; seus índices estão na 0006)
+
+-- A chave de paginação não pode ser nula
+UPDATE turmas SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE turmas ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_turmas_created_at_id ON turmas(created_at DESC, id DESC);
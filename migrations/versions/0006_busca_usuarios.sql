@@ -0,0 +1,15 @@
+-- Busca de usuários da administração por trecho do nome, usuário ou email
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- A expressão deve ser idêntica a services.usuario_service.TEXTO_BUSCA_POSTGRES
+CREATE INDEX IF NOT EXISTS idx_users_busca_trgm ON users USING gin (
+    (lower(username || ' ' || email || ' ' || first_name || ' ' || last_name)) gin_trgm_ops
+);
+
+-- Busca por prefixo (termos curtos, sem trigramas)
+CREATE INDEX IF NOT EXISTS idx_users_username_prefixo ON users (lower(username) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefixo ON users (lower(email) text_pattern_ops);
+
+-- Listagem filtrada por tipo, na ordem da paginação (id, ordem de cadastro)
+CREATE INDEX IF NOT EXISTS idx_users_tipo_id ON users (user_type, id DESC);
@@ -0,0 +1,32 @@
+"""
+Alternativas dos exercícios como objeto JSONB {letra: texto}
+
+Exercícios cujo opcoes era um texto JSON (json.dumps gravado duas vezes), um
+array ou o formato antigo 'a|b|c' são convertidos, e uma CHECK constraint
+impede que voltem a ser gravados fora do formato
+"""
+import json
+
+from utils import alternativas
+
+
+def upgrade(cur):
+    """Converter as alternativas e restringir o tipo da coluna"""
+    cur.execute("""
+        SELECT id, opcoes FROM exercicios
+        WHERE opcoes IS NOT NULL AND jsonb_typeof(opcoes) <> 'object'
+    """)
+    linhas = cur.fetchall()
+
+    for linha in linhas:
+        opcoes = alternativas.como_opcoes(linha['opcoes'])
+        cur.execute('UPDATE exercicios SET opcoes = %s::jsonb WHERE id = %s',
+                    (json.dumps(opcoes, ensure_ascii=False), linha['id']))
+
+    cur.execute("""
+        ALTER TABLE exercicios ADD CONSTRAINT exercicios_opcoes_objeto
+        CHECK (opcoes IS NULL OR jsonb_typeof(opcoes) = 'object')
+    """)
+
+    if linhas:
+        print(f"✅ Alternativas de {len(linhas)} exercícios convertidas para objeto JSONB")
@@ -0,0 +1,19 @@
+"""
+Preenche atividade_diaria e streaks_alunos a partir do histórico
+
+As duas tabelas (0002) só recebiam as atividades registradas depois de
+criadas; progresso_alunos e respostas_alunos anteriores ficavam de fora e a
+sequência de quem já estudava aparecia zerada
+"""
+from services.atividade_service import AtividadeDiariaService
+from services.streak_service import StreakService
+
+
+def upgrade(cur):
+    """Reconstruir a atividade diária e, a partir dela, as sequências"""
+    db = cur.connection
+    dias = AtividadeDiariaService(db).rebuild(commit=False)
+    alunos = StreakService(db).rebuild(commit=False)
+
+    if dias:
+        print(f"✅ Atividade diária reconstruída: {dias} linhas, sequências de {alunos} alunos")
@@ -0,0 +1,2 @@
+-- Aulas de uma turma em ordem: próximas aulas e versão delas na página da aula
+CREATE INDEX IF NOT EXISTS idx_aulas_turma_ordem ON aulas(turma_id, ordem);
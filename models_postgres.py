@@ -4,6 +4,8 @@ import psycopg
 from psycopg.rows import dict_row
 from datetime import datetime
 
+from utils import consultas_preparadas
+
 class User(UserMixin):
     """Modelo de usuário com Flask-Login"""
     
@@ -102,10 +104,7 @@ class User(UserMixin):
     def get_by_id(user_id, db):
         """Busca usuário por ID"""
         cur = db.cursor()
-        cur.execute('''
-            SELECT id, username, email, first_name, last_name, user_type, is_active, created_at, updated_at
-            FROM users WHERE id = %s
-        ''', (user_id,))
+        consultas_preparadas.executar(cur, consultas_preparadas.USUARIO_POR_ID, (user_id,))
         user_data = cur.fetchone()
         cur.close()
         
@@ -148,14 +147,8 @@ class User(UserMixin):
         """Autentica usuário"""
         cur = db.cursor()
         
-        # Detectar tipo de banco e usar sintaxe correta
-        db_type = User._detect_db_type(db)
-        placeholder = '%s' if db_type == 'postgresql' else '?'
-        
-        cur.execute(f'''
-            SELECT id, username, email, first_name, last_name, user_type, is_active, created_at, updated_at, password_hash
-            FROM users WHERE username = {placeholder}
-        ''', (username,))
+        # executar adapta os placeholders quando a conexão é SQLite
+        consultas_preparadas.executar(cur, consultas_preparadas.USUARIO_LOGIN, (username,))
             
         user_data = cur.fetchone()
         cur.close()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir a tabela atividade_diaria a partir do histórico bruto
+e, a partir dela, as sequências de estudo (streaks_alunos)
+
+Uso:
+    python rebuild_atividade_diaria.py                     # PostgreSQL (DATABASE_URL)
+    python rebuild_atividade_diaria.py --desde 2024-03-01  # apenas a partir de uma data
+    python rebuild_atividade_diaria.py --sqlite escola_para_todos.db
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from datetime import date
+
+from services.atividade_service import AtividadeDiariaService
+from services.streak_service import StreakService
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Reconstrói as tabelas atividade_diaria e streaks_alunos')
+    parser.add_argument('--desde', type=date.fromisoformat,
+                        help='Reconstruir apenas a partir desta data (AAAA-MM-DD)')
+    parser.add_argument('--sqlite', metavar='ARQUIVO',
+                        help='Usar banco SQLite em vez do PostgreSQL')
+    args = parser.parse_args()
+
+    if args.sqlite:
+        db = sqlite3.connect(args.sqlite)
+    else:
+        from init_db_postgres import get_db_connection
+        db = get_db_connection()
+
+    try:
+        inicio = time.perf_counter()
+        total = AtividadeDiariaService(db).rebuild(desde=args.desde)
+        print(f"✅ atividade_diaria reconstruída: {total} linhas em {time.perf_counter() - inicio:.1f}s")
+
+        inicio = time.perf_counter()
+        alunos = StreakService(db).rebuild()
+        print(f"✅ streaks_alunos reconstruída: {alunos} alunos em {time.perf_counter() - inicio:.1f}s")
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,65 @@
-import math
-import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import psycopg
 from psycopg.rows import dict_row
+import logging
 import os
 
+from services.streak_service import (
+    DIAS_ATIVOS_QUERY, SCHOOL_TIMEZONE, StreakService, StreakInfo, streak_de_dias, streak_vigente
+)
+from services.atividade_service import AtividadeDiariaService
+
+logger = logging.getLogger(__name__)
+
+# Consultas compartilhadas entre a versão síncrona e a assíncrona do serviço
+PERFIL_QUERY = """
+    SELECT 
+        u.id,
+        COALESCE(AVG(pa.progresso), 0) as progresso_medio,
+        COUNT(CASE WHEN pa.status = 'concluida' THEN 1 END) as aulas_concluidas,
+        COALESCE(SUM(pa.pontos), 0) as pontos_totais,
+        MAX(pa.updated_at) as ultima_atividade
+    FROM users u
+    LEFT JOIN progresso_alunos pa ON pa.aluno_id = u.id
+    WHERE u.id = %s AND u.tipo = 'aluno'
+    GROUP BY u.id
+"""
+
+AREAS_QUERY = """
+    SELECT 
+        t.nome as turma_nome,
+        AVG(pa.progresso) as media_progresso,
+        COUNT(CASE WHEN pa.status = 'concluida' THEN 1 END) as aulas_concluidas
+    FROM progresso_alunos pa
+    JOIN aulas a ON a.id = pa.aula_id
+    JOIN turmas t ON t.id = a.turma_id
+    WHERE pa.aluno_id = %s
+    GROUP BY t.id, t.nome
+    ORDER BY media_progresso DESC
+"""
+
+AULAS_DISPONIVEIS_QUERY = """
+    SELECT 
+        a.id,
+        a.titulo,
+        a.descricao,
+        a.dificuldade,
+        t.nome as turma_nome,
+        COUNT(pa.id) as total_alunos,
+        AVG(pa.progresso) as media_progresso
+    FROM aulas a
+    JOIN turmas t ON t.id = a.turma_id
+    LEFT JOIN progresso_alunos pa ON pa.aula_id = a.id
+    WHERE a.id NOT IN (
+        SELECT aula_id FROM progresso_alunos 
+        WHERE aluno_id = %s AND status = 'concluida'
+    )
+    GROUP BY a.id, a.titulo, a.descricao, a.dificuldade, t.nome
+    ORDER BY a.created_at DESC
+"""
+
 @dataclass
 class LearningPath:
     """Representa um caminho de aprendizado"""
@@ -30,15 +83,22 @@ class StudentProfile:
     areas_fortes: List[str]
     areas_fracas: List[str]
     ultima_atividade: datetime
+    maior_streak: int = 0
 
 class AIRecommendationService:
     """Serviço de IA para recomendações personalizadas"""
     
-    def __init__(self):
-        self.db_url = os.getenv('DATABASE_URL')
+    def __init__(self, db_url: str = None, pool=None):
+        # As consultas só leem: quem chama pode apontar para a réplica (utils.roteamento_db)
+        self.db_url = db_url or os.getenv('DATABASE_URL')
+        # psycopg_pool.ConnectionPool (com row_factory=dict_row) opcional; sem ele
+        # cada consulta abre uma conexão nova
+        self.pool = pool
     
     def _get_db_connection(self):
-        """Obtém conexão com o banco PostgreSQL"""
+        """Obtém conexão com o banco PostgreSQL (do pool, se houver; use com with)"""
+        if self.pool is not None:
+            return self.pool.connection()
         return psycopg.connect(self.db_url, row_factory=dict_row)
     
     def get_student_profile(self, aluno_id: int) -> StudentProfile:
@@ -47,93 +107,71 @@ class AIRecommendationService:
             with self._get_db_connection() as conn:
                 with conn.cursor() as cur:
                     # Buscar métricas básicas do aluno
-                    cur.execute("""
-                        SELECT 
-                            u.id,
-                            COALESCE(AVG(pa.progresso), 0) as progresso_medio,
-                            COUNT(CASE WHEN pa.status = 'concluida' THEN 1 END) as aulas_concluidas,
-                            COALESCE(SUM(pa.pontos), 0) as pontos_totais,
-                            MAX(pa.updated_at) as ultima_atividade
-                        FROM users u
-                        LEFT JOIN progresso_alunos pa ON pa.aluno_id = u.id
-                        WHERE u.id = %s AND u.tipo = 'aluno'
-                        GROUP BY u.id
-                    """, (aluno_id,))
+                    cur.execute(PERFIL_QUERY, (aluno_id,))
                     
                     result = cur.fetchone()
                     if not result:
                         return None
                     
-                    # Calcular streak atual (dias consecutivos de atividade)
-                    cur.execute("""
-                        SELECT COUNT(DISTINCT DATE(pa.updated_at)) as streak
-                        FROM progresso_alunos pa
-                        WHERE pa.aluno_id = %s 
-                        AND pa.updated_at >= CURRENT_DATE - INTERVAL '30 days'
-                        ORDER BY pa.updated_at DESC
-                    """, (aluno_id,))
-                    
-                    streak_result = cur.fetchone()
-                    streak_atual = streak_result['streak'] if streak_result else 0
-                    
-                    # Determinar nível atual
-                    progresso_medio = result['progresso_medio'] or 0
-                    aulas_concluidas = result['aulas_concluidas'] or 0
-                    nivel_atual = self._determine_level(progresso_medio, aulas_concluidas)
+                    # Streak atual (dias consecutivos), mantido incrementalmente
+                    streak = StreakService(conn).get_streak(aluno_id)
+                    if streak.ultima_atividade is None:
+                        # Sem linha em streaks_alunos: calcula a partir do histórico
+                        cur.execute(DIAS_ATIVOS_QUERY, (SCHOOL_TIMEZONE, aluno_id, aluno_id))
+                        streak = streak_de_dias(aluno_id, [row['dia'] for row in cur.fetchall()])
                     
                     # Analisar áreas fortes e fracas
                     areas_fortes, areas_fracas = self._analyze_learning_areas(aluno_id)
                     
-                    return StudentProfile(
-                        aluno_id=result['id'],
-                        progresso_medio=progresso_medio,
-                        aulas_concluidas=aulas_concluidas,
-                        pontos_totais=result['pontos_totais'] or 0,
-                        streak_atual=streak_atual,
-                        nivel_atual=nivel_atual,
-                        areas_fortes=areas_fortes,
-                        areas_fracas=areas_fracas,
-                        ultima_atividade=result['ultima_atividade']
-                    )
-        except Exception as e:
-            print(f"Erro ao obter perfil do aluno: {e}")
+                    return self._build_profile(result, streak, areas_fortes, areas_fracas)
+        except Exception:
+            logger.exception("Erro ao obter perfil do aluno %s", aluno_id)
             return None
     
+    def _build_profile(self, result: dict, streak: StreakInfo,
+                       areas_fortes: List[str], areas_fracas: List[str]) -> StudentProfile:
+        """Monta o perfil a partir das métricas, da sequência e das áreas do aluno"""
+        progresso_medio = result['progresso_medio'] or 0
+        aulas_concluidas = result['aulas_concluidas'] or 0
+        
+        return StudentProfile(
+            aluno_id=result['id'],
+            progresso_medio=progresso_medio,
+            aulas_concluidas=aulas_concluidas,
+            pontos_totais=result['pontos_totais'] or 0,
+            streak_atual=streak_vigente(streak),
+            maior_streak=streak.maior_streak,
+            nivel_atual=self._determine_level(progresso_medio, aulas_concluidas),
+            areas_fortes=areas_fortes,
+            areas_fracas=areas_fracas,
+            ultima_atividade=result['ultima_atividade']
+        )
+    
     def _analyze_learning_areas(self, aluno_id: int) -> Tuple[List[str], List[str]]:
         """Analisa áreas fortes e fracas do aluno"""
         try:
             with self._get_db_connection() as conn:
                 with conn.cursor() as cur:
                     # Buscar performance por turma (área de conhecimento)
-                    cur.execute("""
-                        SELECT 
-                            t.nome as turma_nome,
-                            AVG(pa.progresso) as media_progresso,
-                            COUNT(CASE WHEN pa.status = 'concluida' THEN 1 END) as aulas_concluidas
-                        FROM progresso_alunos pa
-                        JOIN aulas a ON a.id = pa.aula_id
-                        JOIN turmas t ON t.id = a.turma_id
-                        WHERE pa.aluno_id = %s
-                        GROUP BY t.id, t.nome
-                        ORDER BY media_progresso DESC
-                    """, (aluno_id,))
-                    
-                    areas = cur.fetchall()
-                    
-                    areas_fortes = []
-                    areas_fracas = []
-                    
-                    for area in areas:
-                        if area['media_progresso'] and area['media_progresso'] > 70:
-                            areas_fortes.append(area['turma_nome'])
-                        elif area['media_progresso'] and area['media_progresso'] < 50:
-                            areas_fracas.append(area['turma_nome'])
-                    
-                    return areas_fortes, areas_fracas
-        except Exception as e:
-            print(f"Erro ao analisar áreas de aprendizado: {e}")
+                    cur.execute(AREAS_QUERY, (aluno_id,))
+                    return self._classify_areas(cur.fetchall())
+        except Exception:
+            logger.exception("Erro ao analisar áreas de aprendizado do aluno %s", aluno_id)
             return [], []
     
+    def _classify_areas(self, areas: List[dict]) -> Tuple[List[str], List[str]]:
+        """Separa as áreas em fortes (>70%) e fracas (<50%)"""
+        areas_fortes = []
+        areas_fracas = []
+        
+        for area in areas:
+            if area['media_progresso'] and area['media_progresso'] > 70:
+                areas_fortes.append(area['turma_nome'])
+            elif area['media_progresso'] and area['media_progresso'] < 50:
+                areas_fracas.append(area['turma_nome'])
+        
+        return areas_fortes, areas_fracas
+    
     def _determine_level(self, progresso_medio: float, aulas_concluidas: int) -> str:
         """Determina o nível atual do aluno"""
         if aulas_concluidas < 5:
@@ -157,52 +195,34 @@ class AIRecommendationService:
             with self._get_db_connection() as conn:
                 with conn.cursor() as cur:
                     # Buscar aulas disponíveis
-                    cur.execute("""
-                        SELECT 
-                            a.id,
-                            a.titulo,
-                            a.descricao,
-                            a.dificuldade,
-                            t.nome as turma_nome,
-                            COUNT(pa.id) as total_alunos,
-                            AVG(pa.progresso) as media_progresso
-                        FROM aulas a
-                        JOIN turmas t ON t.id = a.turma_id
-                        LEFT JOIN progresso_alunos pa ON pa.aula_id = a.id
-                        WHERE a.id NOT IN (
-                            SELECT aula_id FROM progresso_alunos 
-                            WHERE aluno_id = %s AND status = 'concluida'
-                        )
-                        GROUP BY a.id, a.titulo, a.descricao, a.dificuldade, t.nome
-                        ORDER BY a.created_at DESC
-                    """, (aluno_id,))
+                    cur.execute(AULAS_DISPONIVEIS_QUERY, (aluno_id,))
+                    return self._rank_aulas(cur.fetchall(), profile, limit)
                     
-                    aulas = cur.fetchall()
-                    
-                    # Calcular pontuação para cada aula
-                    recomendacoes = []
-                    for i, aula in enumerate(aulas):
-                        score = self._calculate_recommendation_score(aula, profile)
-                        razao = self._generate_recommendation_reason(aula, profile, score)
-                        
-                        recomendacoes.append(LearningPath(
-                            aula_id=aula['id'],
-                            titulo=aula['titulo'],
-                            descricao=aula['descricao'],
-                            dificuldade=aula['dificuldade'],
-                            pontuacao=score,
-                            razao=razao,
-                            ordem=i + 1
-                        ))
-                    
-                    # Ordenar por pontuação e retornar top N
-                    recomendacoes.sort(key=lambda x: x.pontuacao, reverse=True)
-                    return recomendacoes[:limit]
-                    
-        except Exception as e:
-            print(f"Erro ao obter recomendações: {e}")
+        except Exception:
+            logger.exception("Erro ao obter recomendações do aluno %s", aluno_id)
             return []
     
+    def _rank_aulas(self, aulas: List[dict], profile: StudentProfile, limit: int) -> List[LearningPath]:
+        """Pontua as aulas disponíveis para o perfil e retorna as N melhores"""
+        recomendacoes = []
+        for i, aula in enumerate(aulas):
+            score = self._calculate_recommendation_score(aula, profile)
+            razao = self._generate_recommendation_reason(aula, profile, score)
+            
+            recomendacoes.append(LearningPath(
+                aula_id=aula['id'],
+                titulo=aula['titulo'],
+                descricao=aula['descricao'],
+                dificuldade=aula['dificuldade'],
+                pontuacao=score,
+                razao=razao,
+                ordem=i + 1
+            ))
+        
+        # Ordenar por pontuação e retornar top N
+        recomendacoes.sort(key=lambda x: x.pontuacao, reverse=True)
+        return recomendacoes[:limit]
+    
     def _calculate_recommendation_score(self, aula: dict, profile: StudentProfile) -> float:
         """Calcula pontuação para uma aula baseada no perfil do aluno"""
         score = 0.0
@@ -260,8 +280,10 @@ class AIRecommendationService:
     def get_adaptive_learning_path(self, aluno_id: int, objetivo: str = None) -> List[LearningPath]:
         """Gera caminho de aprendizado adaptativo"""
         recomendacoes = self.get_personalized_recommendations(aluno_id, limit=15)
-        
-        # Organizar em sequência progressiva
+        return self._build_learning_path(recomendacoes)
+    
+    def _build_learning_path(self, recomendacoes: List[LearningPath]) -> List[LearningPath]:
+        """Organiza as recomendações em sequência progressiva"""
         caminho = []
         for i, rec in enumerate(recomendacoes):
             rec.ordem = i + 1
@@ -277,50 +299,42 @@ class AIRecommendationService:
                 return {}
             
             with self._get_db_connection() as conn:
-                with conn.cursor() as cur:
-                    # Tendência de progresso (últimos 7 dias)
-                    cur.execute("""
-                        SELECT 
-                            DATE(pa.updated_at) as data,
-                            AVG(pa.progresso) as media_dia
-                        FROM progresso_alunos pa
-                        WHERE pa.aluno_id = %s 
-                        AND pa.updated_at >= CURRENT_DATE - INTERVAL '7 days'
-                        GROUP BY DATE(pa.updated_at)
-                        ORDER BY data
-                    """, (aluno_id,))
-                    
-                    tendencia = cur.fetchall()
-                    
-                    # Próximo objetivo sugerido
-                    proximo_objetivo = self._suggest_next_goal(profile)
-                    
-                    return {
-                        'perfil': {
-                            'nivel': profile.nivel_atual,
-                            'progresso_medio': round(profile.progresso_medio, 1),
-                            'aulas_concluidas': profile.aulas_concluidas,
-                            'pontos_totais': profile.pontos_totais,
-                            'streak_atual': profile.streak_atual
-                        },
-                        'areas': {
-                            'fortes': profile.areas_fortes,
-                            'fracas': profile.areas_fracas
-                        },
-                        'tendencia': [
-                            {
-                                'data': str(t['data']),
-                                'progresso': round(t['media_dia'] or 0, 1)
-                            } for t in tendencia
-                        ],
-                        'proximo_objetivo': proximo_objetivo,
-                        'ultima_atividade': str(profile.ultima_atividade) if profile.ultima_atividade else None
-                    }
-                    
-        except Exception as e:
-            print(f"Erro ao obter insights: {e}")
+                # Tendência dos últimos 7 dias a partir da atividade pré-agregada
+                tendencia = AtividadeDiariaService(conn).get_tendencia(aluno_id, dias=7)
+                return self._build_insights(profile, tendencia)
+                
+        except Exception:
+            logger.exception("Erro ao obter insights do aluno %s", aluno_id)
             return {}
     
+    def _build_insights(self, profile: StudentProfile, tendencia: List[dict]) -> Dict:
+        """Monta o dicionário de insights a partir do perfil e da tendência"""
+        return {
+            'perfil': {
+                'nivel': profile.nivel_atual,
+                'progresso_medio': round(profile.progresso_medio, 1),
+                'aulas_concluidas': profile.aulas_concluidas,
+                'pontos_totais': profile.pontos_totais,
+                'streak_atual': profile.streak_atual,
+                'maior_streak': profile.maior_streak
+            },
+            'areas': {
+                'fortes': profile.areas_fortes,
+                'fracas': profile.areas_fracas
+            },
+            'tendencia': [
+                {
+                    'data': str(t['data']),
+                    'aulas': t['aulas'],
+                    'exercicios': t['exercicios'],
+                    'pontos': t['pontos'],
+                    'minutos': t['minutos']
+                } for t in tendencia
+            ],
+            'proximo_objetivo': self._suggest_next_goal(profile),
+            'ultima_atividade': str(profile.ultima_atividade) if profile.ultima_atividade else None
+        }
+    
     def _suggest_next_goal(self, profile: StudentProfile) -> str:
         """Sugere próximo objetivo para o aluno"""
         if profile.aulas_concluidas < 5:
@@ -335,13 +349,13 @@ class AIRecommendationService:
             return "Continue explorando novos conteúdos"
 
 
-def get_recommendations_for_student(aluno_id: int, limit: int = 10) -> List[LearningPath]:
+def get_recommendations_for_student(aluno_id: int, limit: int = 10, db_url: str = None) -> List[LearningPath]:
     """Função helper para obter recomendações"""
-    service = AIRecommendationService()
+    service = AIRecommendationService(db_url)
     return service.get_personalized_recommendations(aluno_id, limit)
 
 
-def get_learning_insights_for_student(aluno_id: int) -> Dict:
+def get_learning_insights_for_student(aluno_id: int, db_url: str = None) -> Dict:
     """Função helper para obter insights"""
-    service = AIRecommendationService()
+    service = AIRecommendationService(db_url)
     return service.get_learning_insights(aluno_id)
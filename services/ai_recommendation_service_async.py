@@ -0,0 +1,158 @@
+"""
+Versão assíncrona do serviço de recomendações de IA
+Usa conexões assíncronas do psycopg com um pool compartilhado e executa as
+consultas independentes (perfil, sequência, áreas, tendência, aulas) em
+paralelo com asyncio.gather, em vez de uma após a outra
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from services.ai_recommendation_service import (
+    AIRecommendationService, LearningPath, StudentProfile,
+    PERFIL_QUERY, AREAS_QUERY, AULAS_DISPONIVEIS_QUERY
+)
+from services.streak_service import (
+    DIAS_ATIVOS_QUERY, SCHOOL_TIMEZONE, STREAK_QUERY, streak_de_dias, streak_from_row
+)
+from services.atividade_service import TENDENCIA_QUERY, janela_tendencia
+from utils import metrics, roteamento_db
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do pool assíncrono: cada requisição usa até 4 conexões simultâneas
+# (perfil, sequência e áreas do perfil mais a tendência ou as aulas disponíveis)
+AI_POOL_MIN_SIZE = int(os.getenv('AI_POOL_MIN_SIZE', '1'))
+AI_POOL_MAX_SIZE = int(os.getenv('AI_POOL_MAX_SIZE', '10'))
+
+# Pools por papel: 'primario' (DATABASE_URL) e 'replica' (DATABASE_REPLICA_URL)
+_pools: Dict[str, AsyncConnectionPool] = {}
+_pool_lock = asyncio.Lock()
+
+
+async def get_async_pool(replica: bool = False) -> AsyncConnectionPool:
+    """
+    Obtém o pool assíncrono de conexões, abrindo-o na primeira chamada
+
+    Args:
+        replica (bool): Usar a réplica de leitura, se configurada
+
+    Returns:
+        AsyncConnectionPool: Pool compartilhado pelo processo
+    """
+    papel = 'replica' if replica and roteamento_db.dsn_replica() else 'primario'
+    if papel not in _pools:
+        async with _pool_lock:
+            if papel not in _pools:
+                pool = AsyncConnectionPool(
+                    roteamento_db.dsn_replica() if papel == 'replica' else os.getenv('DATABASE_URL'),
+                    min_size=AI_POOL_MIN_SIZE,
+                    max_size=AI_POOL_MAX_SIZE,
+                    kwargs={'row_factory': dict_row},
+                    open=False
+                )
+                await pool.open()
+                metrics.registrar_pool('ai_async' if papel == 'primario' else 'ai_async_replica', pool.get_stats)
+                _pools[papel] = pool
+    return _pools[papel]
+
+
+async def close_async_pool() -> None:
+    """Fecha os pools assíncronos (usado no desligamento do servidor ASGI)"""
+    while _pools:
+        _, pool = _pools.popitem()
+        await pool.close()
+
+
+class AsyncAIRecommendationService(AIRecommendationService):
+    """Serviço de IA com I/O assíncrono e consultas concorrentes"""
+
+    def __init__(self, pool: Optional[AsyncConnectionPool] = None, replica: bool = False):
+        super().__init__()
+        self.pool = pool
+        self.replica = replica
+
+    async def _fetch(self, query: str, params: tuple, one: bool = False):
+        """Executa uma consulta em uma conexão própria do pool"""
+        pool = self.pool or await get_async_pool(self.replica)
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                if one:
+                    return await cur.fetchone()
+                return await cur.fetchall()
+
+    async def get_student_profile(self, aluno_id: int) -> StudentProfile:
+        """Obtém o perfil completo do aluno (métricas, sequência e áreas em paralelo)"""
+        try:
+            result, streak_row, areas = await asyncio.gather(
+                self._fetch(PERFIL_QUERY, (aluno_id,), one=True),
+                self._fetch(STREAK_QUERY, (aluno_id,), one=True),
+                self._fetch(AREAS_QUERY, (aluno_id,))
+            )
+            if not result:
+                return None
+
+            streak = streak_from_row(aluno_id, streak_row)
+            if streak.ultima_atividade is None:
+                # Sem linha em streaks_alunos: calcula a partir do histórico
+                dias = await self._fetch(DIAS_ATIVOS_QUERY, (SCHOOL_TIMEZONE, aluno_id, aluno_id))
+                streak = streak_de_dias(aluno_id, [row['dia'] for row in dias])
+
+            areas_fortes, areas_fracas = self._classify_areas(areas)
+            return self._build_profile(result, streak, areas_fortes, areas_fracas)
+        except Exception:
+            logger.exception("Erro ao obter perfil do aluno %s", aluno_id)
+            return None
+
+    async def get_personalized_recommendations(self, aluno_id: int, limit: int = 10) -> List[LearningPath]:
+        """Obtém recomendações personalizadas (perfil e aulas disponíveis em paralelo)"""
+        try:
+            profile, aulas = await asyncio.gather(
+                self.get_student_profile(aluno_id),
+                self._fetch(AULAS_DISPONIVEIS_QUERY, (aluno_id,))
+            )
+            if not profile:
+                return []
+
+            return self._rank_aulas(aulas, profile, limit)
+        except Exception:
+            logger.exception("Erro ao obter recomendações do aluno %s", aluno_id)
+            return []
+
+    async def get_adaptive_learning_path(self, aluno_id: int, objetivo: str = None) -> List[LearningPath]:
+        """Gera caminho de aprendizado adaptativo"""
+        recomendacoes = await self.get_personalized_recommendations(aluno_id, limit=15)
+        return self._build_learning_path(recomendacoes)
+
+    async def get_learning_insights(self, aluno_id: int) -> Dict:
+        """Obtém insights de aprendizado (perfil e tendência em paralelo)"""
+        inicio, fim = janela_tendencia(7)
+        try:
+            profile, tendencia = await asyncio.gather(
+                self.get_student_profile(aluno_id),
+                self._fetch(TENDENCIA_QUERY, (aluno_id, inicio, fim))
+            )
+            if not profile:
+                return {}
+
+            return self._build_insights(profile, tendencia)
+        except Exception:
+            logger.exception("Erro ao obter insights do aluno %s", aluno_id)
+            return {}
+
+
+async def get_recommendations_for_student_async(aluno_id: int, limit: int = 10) -> List[LearningPath]:
+    """Função helper assíncrona para obter recomendações"""
+    service = AsyncAIRecommendationService()
+    return await service.get_personalized_recommendations(aluno_id, limit)
+
+
+async def get_learning_insights_for_student_async(aluno_id: int) -> Dict:
+    """Função helper assíncrona para obter insights"""
+    service = AsyncAIRecommendationService()
+    return await service.get_learning_insights(aluno_id)
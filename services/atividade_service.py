@@ -0,0 +1,402 @@
+"""
+Serviço de agregação diária de atividade dos alunos
+Mantém a tabela atividade_diaria (uma linha por aluno e dia) atualizada a cada
+escrita, para que tendências, heatmaps e rankings semanais leiam linhas
+pré-agregadas em vez do histórico bruto
+
+Contadores, iguais na escrita incremental (registrar) e no rebuild:
+- aulas: aulas concluídas (eventos 'aula' da fila de gamificação; no
+  histórico, os bônus de aula em historico_pontos no SQLite e data_conclusao
+  de progresso_alunos no PostgreSQL);
+- exercicios e pontos: respostas e pontos dos exercícios (respostas_alunos),
+  mais os pontos das aulas concluídas (o bônus gravado no SQLite; no
+  PostgreSQL, que não tem historico_pontos, PONTOS_AULA por aula);
+- minutos: tempo assistido (heartbeats). O histórico só guarda o total por
+  aula, então o rebuild atribui os minutos ao dia da última atividade na
+  aula; os totais coincidem, e o dia também quando a aula foi vista em um dia.
+  Num rebuild parcial (desde), os minutos dessas aulas já contados nos dias
+  mantidos são descontados (distribuir_minutos);
+- uma linha zerada marca um dia de estudo sem contadores (aula iniciada).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+from collections import defaultdict
+import logging
+
+from utils.database import adapt_query, inserir_varios, is_sqlite_connection, row_to_dict
+from services.streak_service import SCHOOL_TIMEZONE, data_local, get_school_timezone
+
+logger = logging.getLogger(__name__)
+
+CONTADORES = ('aulas', 'exercicios', 'pontos', 'minutos')
+
+# Pontos por aula concluída (o bônus que a fila de gamificação grava)
+PONTOS_AULA = 25
+
+SOMAR_CONFLITO = """
+    ON CONFLICT (aluno_id, data) DO UPDATE SET
+        aulas = atividade_diaria.aulas + excluded.aulas,
+        exercicios = atividade_diaria.exercicios + excluded.exercicios,
+        pontos = atividade_diaria.pontos + excluded.pontos,
+        minutos = atividade_diaria.minutos + excluded.minutos
+"""
+
+TENDENCIA_QUERY = """
+    SELECT data, aulas, exercicios, pontos, minutos
+    FROM atividade_diaria
+    WHERE aluno_id = %s AND data BETWEEN %s AND %s
+    ORDER BY data
+"""
+
+
+def janela_tendencia(dias: int, hoje: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Calcula o primeiro e o último dia de uma janela de tendência
+
+    Args:
+        dias (int): Tamanho da janela em dias (incluindo hoje)
+        hoje (Optional[date]): Dia de referência (padrão: hoje no fuso da escola)
+
+    Returns:
+        Tuple[date, date]: (início, fim) da janela
+    """
+    hoje = hoje or data_local()
+    return hoje - timedelta(days=dias - 1), hoje
+
+
+def inicio_do_dia_utc(dia: date) -> datetime:
+    """
+    Meia-noite de um dia no fuso da escola, como timestamp UTC sem fuso
+
+    É o formato em que o banco grava os instantes (CURRENT_TIMESTAMP), para
+    filtrar o histórico a partir de um dia sem converter cada linha.
+    """
+    meia_noite = datetime.combine(dia, time.min, tzinfo=get_school_timezone())
+    return meia_noite.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def distribuir_minutos(janela: Sequence[tuple],
+                       ja_contados: Dict[int, int]) -> Dict[Tuple[int, date], int]:
+    """
+    Minutos assistidos por (aluno, dia) a partir dos totais de cada aula
+
+    Cada aula entra no dia da sua última atividade. Os minutos dessas aulas já
+    contados em dias que o rebuild manteve são descontados primeiro das aulas
+    com atividade mais antiga, que são as que podem ter começado antes do corte.
+
+    Args:
+        janela (Sequence[tuple]): (aluno_id, momento, dia, minutos) das aulas
+            com atividade a partir do início do rebuild
+        ja_contados (Dict[int, int]): aluno_id -> minutos dessas aulas já
+            contados nos dias anteriores (vazio num rebuild completo)
+
+    Returns:
+        Dict[Tuple[int, date], int]: Minutos por (aluno, dia) de cada dia da
+        janela, inclusive os zerados (dias de estudo sem minutos)
+    """
+    descontar = dict(ja_contados)
+    minutos: Dict[Tuple[int, date], int] = defaultdict(int)
+    for aluno_id, _, dia, valor in sorted(janela, key=lambda linha: (linha[0], str(linha[1]))):
+        desconto = min(valor, max(descontar.get(aluno_id, 0), 0))
+        descontar[aluno_id] = descontar.get(aluno_id, 0) - desconto
+        minutos[(aluno_id, dia)] += valor - desconto
+    return dict(minutos)
+
+
+class AtividadeDiariaService:
+    """Serviço para escrita incremental e leitura da atividade diária"""
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def registrar(self, aluno_id: int, aulas: int = 0, exercicios: int = 0,
+                  pontos: int = 0, minutos: int = 0,
+                  momento: Optional[datetime] = None, commit: bool = True) -> None:
+        """
+        Soma contadores na linha do aluno para o dia da atividade
+
+        Args:
+            aluno_id (int): ID do aluno
+            aulas (int): Aulas concluídas
+            exercicios (int): Exercícios respondidos
+            pontos (int): Pontos ganhos
+            minutos (int): Minutos assistidos
+            momento (Optional[datetime]): Instante da atividade (padrão: agora)
+            commit (bool): False para gravar dentro da transação de quem chama
+        """
+        try:
+            inserir_varios(self.db.cursor(), 'atividade_diaria', ('aluno_id', 'data') + CONTADORES,
+                           [(aluno_id, data_local(momento).isoformat(), aulas, exercicios, pontos, minutos)],
+                           conflito=SOMAR_CONFLITO)
+            if commit:
+                self.db.commit()
+
+        except Exception as e:
+            if commit:
+                self.db.rollback()
+            raise Exception(f"Erro ao registrar atividade diária do aluno {aluno_id}: {str(e)}")
+
+    def registrar_minutos(self, minutos: Dict[Tuple[int, date], int]) -> int:
+        """
+        Soma minutos assistidos de vários alunos e dias em um único upsert (sem commit)
+
+        Args:
+            minutos (Dict[Tuple[int, date], int]): (aluno_id, dia) -> minutos
+
+        Returns:
+            int: Linhas gravadas
+        """
+        linhas: Sequence[tuple] = [
+            (aluno_id, dia.isoformat(), 0, 0, 0, valor)
+            for (aluno_id, dia), valor in minutos.items() if valor > 0
+        ]
+        return inserir_varios(self.db.cursor(), 'atividade_diaria', ('aluno_id', 'data') + CONTADORES,
+                              linhas, conflito=SOMAR_CONFLITO)
+
+    def get_tendencia(self, aluno_id: int, dias: int = 7, hoje: Optional[date] = None) -> List[Dict]:
+        """
+        Busca a atividade diária do aluno nos últimos dias
+
+        Args:
+            aluno_id (int): ID do aluno
+            dias (int): Tamanho da janela em dias (incluindo hoje)
+            hoje (Optional[date]): Dia de referência (padrão: hoje no fuso da escola)
+
+        Returns:
+            List[Dict]: Uma entrada por dia com atividade, em ordem cronológica
+        """
+        inicio, fim = janela_tendencia(dias, hoje)
+
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(adapt_query(TENDENCIA_QUERY, self.db),
+                           (aluno_id, inicio.isoformat(), fim.isoformat()))
+            return [row_to_dict(cursor, row) for row in cursor.fetchall()]
+
+        except Exception as e:
+            raise Exception(f"Erro ao buscar tendência do aluno {aluno_id}: {str(e)}")
+
+    def get_heatmap(self, aluno_id: int, dias: int = 365, hoje: Optional[date] = None) -> Dict[str, int]:
+        """
+        Monta o heatmap de atividade (dia -> pontos) do aluno
+
+        Args:
+            aluno_id (int): ID do aluno
+            dias (int): Tamanho da janela em dias
+            hoje (Optional[date]): Dia de referência
+
+        Returns:
+            Dict[str, int]: Pontos por dia (ISO), apenas dias com atividade
+        """
+        return {
+            str(row['data'])[:10]: row['pontos'] or 0
+            for row in self.get_tendencia(aluno_id, dias, hoje)
+        }
+
+    def get_ranking_semanal(self, turma_id: int, hoje: Optional[date] = None) -> List[Tuple]:
+        """
+        Calcula o ranking da semana (segunda a domingo) de uma turma
+
+        Args:
+            turma_id (int): ID da turma
+            hoje (Optional[date]): Dia de referência
+
+        Returns:
+            List[Tuple]: (username, first_name, last_name, pontos_semana, posicao)
+        """
+        hoje = hoje or data_local()
+        inicio = hoje - timedelta(days=hoje.weekday())
+
+        if is_sqlite_connection(self.db):
+            membros = """
+                SELECT aluno_id FROM aluno_turma
+                WHERE turma_id = %s AND (status = 'ativo' OR status IS NULL)
+            """
+        else:
+            membros = """
+                SELECT aluno_id FROM matriculas
+                WHERE turma_id = %s AND status = 'ativa'
+            """
+
+        try:
+            cursor = self.db.cursor()
+
+            query = f"""
+                SELECT u.username, u.first_name, u.last_name,
+                       COALESCE(SUM(ad.pontos), 0) as pontos_semana
+                FROM users u
+                LEFT JOIN atividade_diaria ad
+                    ON ad.aluno_id = u.id AND ad.data BETWEEN %s AND %s
+                WHERE u.id IN ({membros})
+                GROUP BY u.id, u.username, u.first_name, u.last_name
+                ORDER BY pontos_semana DESC, u.first_name ASC
+            """
+
+            cursor.execute(adapt_query(query, self.db), (inicio.isoformat(), hoje.isoformat(), turma_id))
+
+            ranking = []
+            for posicao, row in enumerate(cursor.fetchall(), start=1):
+                row = row_to_dict(cursor, row)
+                ranking.append((row['username'], row['first_name'], row['last_name'],
+                                row['pontos_semana'], posicao))
+            return ranking
+
+        except Exception as e:
+            raise Exception(f"Erro ao calcular ranking semanal da turma {turma_id}: {str(e)}")
+
+    def rebuild(self, desde: Optional[date] = None, commit: bool = True) -> int:
+        """
+        Reconstrói a tabela a partir do histórico bruto
+
+        Args:
+            desde (Optional[date]): Reconstrói apenas a partir deste dia (padrão: tudo)
+            commit (bool): False para gravar dentro da transação de quem chama
+                (migrações)
+
+        Returns:
+            int: Número de linhas (aluno, dia) gravadas
+        """
+        try:
+            cursor = self.db.cursor()
+
+            if desde:
+                cursor.execute(adapt_query("DELETE FROM atividade_diaria WHERE data >= %s", self.db),
+                               (desde.isoformat(),))
+            else:
+                cursor.execute("DELETE FROM atividade_diaria")
+
+            if is_sqlite_connection(self.db):
+                total = self._rebuild_sqlite(cursor, desde)
+            else:
+                total = self._rebuild_postgres(cursor, desde)
+
+            if commit:
+                self.db.commit()
+            logger.info(f"atividade_diaria reconstruída: {total} linhas")
+            return total
+
+        except Exception as e:
+            if commit:
+                self.db.rollback()
+            raise Exception(f"Erro ao reconstruir atividade diária: {str(e)}")
+
+    def _minutos_ja_contados(self, cursor, desde: date, anteriores_query: str,
+                             inicio) -> Dict[int, int]:
+        """
+        Minutos das aulas da janela já contados nos dias mantidos, por aluno
+
+        São os minutos mantidos (dias antes de desde) menos os das aulas cuja
+        última atividade é anterior ao corte, que ficaram inteiras nesses dias.
+        """
+        cursor.execute(adapt_query("""
+            SELECT aluno_id, SUM(minutos) as minutos FROM atividade_diaria
+            WHERE data < %s GROUP BY aluno_id
+        """, self.db), (desde.isoformat(),))
+        contados = {row['aluno_id']: row['minutos'] or 0
+                    for row in (row_to_dict(cursor, r) for r in cursor.fetchall())}
+
+        cursor.execute(adapt_query(anteriores_query, self.db), (inicio,))
+        for row in (row_to_dict(cursor, r) for r in cursor.fetchall()):
+            contados[row['aluno_id']] = contados.get(row['aluno_id'], 0) - (row['minutos'] or 0)
+        return contados
+
+    def _rebuild_postgres(self, cursor, desde: Optional[date]) -> int:
+        """Agrega progresso_alunos e respostas_alunos direto no PostgreSQL; os minutos em Python"""
+        inicio = inicio_do_dia_utc(desde) if desde else None
+
+        def dia(coluna):
+            return f"(({coluna}) AT TIME ZONE 'UTC' AT TIME ZONE %(fuso)s)::date"
+
+        def filtro(coluna):
+            # Aplicado em cada fonte, antes da agregação (usa os índices de data)
+            return f"{coluna} >= %(inicio)s" if desde else f"{coluna} IS NOT NULL"
+
+        cursor.execute(f"""
+            INSERT INTO atividade_diaria (aluno_id, data, aulas, exercicios, pontos, minutos)
+            SELECT aluno_id, data, SUM(aulas), SUM(exercicios), SUM(pontos), 0
+            FROM (
+                SELECT pa.aluno_id, {dia('pa.updated_at')} as data,
+                       0 as aulas, 0 as exercicios, 0 as pontos
+                FROM progresso_alunos pa
+                WHERE {filtro('pa.updated_at')}
+                UNION ALL
+                SELECT pa.aluno_id, {dia('pa.data_conclusao')}, 1, 0, %(pontos_aula)s
+                FROM progresso_alunos pa
+                WHERE {filtro('pa.data_conclusao')}
+                UNION ALL
+                SELECT ra.aluno_id, {dia('ra.created_at')}, 0, 1, COALESCE(ra.pontos_ganhos, 0)
+                FROM respostas_alunos ra
+                WHERE {filtro('ra.created_at')}
+            ) bruto
+            WHERE aluno_id IS NOT NULL
+            GROUP BY aluno_id, data
+        """, {'fuso': SCHOOL_TIMEZONE, 'inicio': inicio, 'pontos_aula': PONTOS_AULA})
+
+        # Minutos: tempo_gasto (em minutos) de cada aula, no dia da última atividade,
+        # somados às linhas acima (a primeira fonte já marca esses dias)
+        cursor.execute(f"""
+            SELECT aluno_id, updated_at, COALESCE(tempo_gasto, 0) as minutos
+            FROM progresso_alunos pa
+            WHERE aluno_id IS NOT NULL AND {filtro('pa.updated_at')}
+        """, {'inicio': inicio})
+        janela = [(row['aluno_id'], row['updated_at'], data_local(row['updated_at']), row['minutos'])
+                  for row in (row_to_dict(cursor, r) for r in cursor.fetchall())]
+        ja_contados = self._minutos_ja_contados(cursor, desde, """
+            SELECT aluno_id, SUM(COALESCE(tempo_gasto, 0)) as minutos FROM progresso_alunos
+            WHERE updated_at < %s GROUP BY aluno_id
+        """, inicio) if desde else {}
+        self.registrar_minutos(distribuir_minutos(janela, ja_contados))
+
+        cursor.execute("SELECT COUNT(*) as total FROM atividade_diaria WHERE data >= %s",
+                       ((desde or date.min).isoformat(),))
+        return row_to_dict(cursor, cursor.fetchone())['total']
+
+    def _rebuild_sqlite(self, cursor, desde: Optional[date]) -> int:
+        """Agrega progresso, respostas_alunos e historico_pontos em Python (o SQLite não converte fusos)"""
+        totais = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+        inicio = inicio_do_dia_utc(desde).strftime('%Y-%m-%d %H:%M:%S') if desde else ''
+
+        def acumular(aluno_id, momento, **valores):
+            dia = data_local(datetime.fromisoformat(str(momento)))
+            linha = totais[(aluno_id, dia)]
+            for chave, valor in valores.items():
+                linha[chave] += valor or 0
+
+        # Filtrado na consulta, antes de agregar; '' é menor que qualquer data.
+        # Minutos: o total de cada aula, descontado o que os dias mantidos já contam
+        cursor.execute("""
+            SELECT aluno_id, ultima_atividade, tempo_assistido FROM progresso
+            WHERE ultima_atividade >= ?
+        """, (inicio,))
+        janela = [(aluno_id, momento, data_local(datetime.fromisoformat(str(momento))), (segundos or 0) // 60)
+                  for aluno_id, momento, segundos in cursor.fetchall()]
+        ja_contados = self._minutos_ja_contados(cursor, desde, """
+            SELECT aluno_id, SUM(COALESCE(tempo_assistido, 0) / 60) as minutos FROM progresso
+            WHERE ultima_atividade < %s GROUP BY aluno_id
+        """, inicio) if desde else {}
+        for (aluno_id, dia), minutos in distribuir_minutos(janela, ja_contados).items():
+            totais[(aluno_id, dia)]['minutos'] += minutos
+
+        cursor.execute("""
+            SELECT aluno_id, created_at, pontos_ganhos FROM respostas_alunos
+            WHERE created_at >= ?
+        """, (inicio,))
+        for aluno_id, momento, pontos in cursor.fetchall():
+            acumular(aluno_id, momento, exercicios=1, pontos=pontos)
+
+        # Aulas concluídas: o bônus que a fila de gamificação grava para cada uma
+        cursor.execute("""
+            SELECT aluno_id, data_ganho, pontos FROM historico_pontos
+            WHERE referencia_tipo = 'aula' AND data_ganho >= ?
+        """, (inicio,))
+        for aluno_id, momento, pontos in cursor.fetchall():
+            acumular(aluno_id, momento, aulas=1, pontos=pontos)
+
+        cursor.executemany("""
+            INSERT INTO atividade_diaria (aluno_id, data, aulas, exercicios, pontos, minutos)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (aluno_id, dia.isoformat(), *(linha[c] for c in CONTADORES))
+            for (aluno_id, dia), linha in totais.items()
+        ])
+        return len(totais)
@@ -0,0 +1,347 @@
+"""
+Fila durável dos efeitos de gamificação (SQLite)
+
+Iniciar uma aula, responder um exercício ou concluí-la grava só o progresso e
+uma linha em eventos_gamificacao, na mesma transação da requisição. Pontos, sequência,
+atividade diária, metas, conquistas e nível são aplicados depois por
+trabalhadores em threads (GAMIFICACAO_WORKERS por processo) ou pelo script
+gamificacao_worker.py.
+
+Cada trabalhador reivindica os eventos de até GAMIFICACAO_LOTE alunos de uma
+vez (status 'processando', com um token e um prazo de GAMIFICACAO_LEASE_S
+segundos) e processa cada aluno em uma única transação: apaga os eventos
+reivindicados por ele e aplica os efeitos. Se o prazo venceu e outro
+trabalhador reivindicou os eventos, o DELETE não encontra todas as linhas e a
+transação é desfeita; assim cada evento é aplicado uma única vez, mesmo após
+uma queda no meio do lote. Eventos com erro voltam para a fila e, após
+GAMIFICACAO_MAX_TENTATIVAS, ficam com status 'falhou' para análise.
+"""
+import os
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from utils import metrics
+from utils.database import inserir_varios
+from services.gamificacao_service import EventoGamificacao, GamificacaoService
+
+logger = logging.getLogger(__name__)
+
+GAMIFICACAO_WORKERS = int(os.getenv('GAMIFICACAO_WORKERS', '1'))
+GAMIFICACAO_LOTE = int(os.getenv('GAMIFICACAO_LOTE', '50'))
+GAMIFICACAO_INTERVALO_S = float(os.getenv('GAMIFICACAO_INTERVALO_S', '1'))
+GAMIFICACAO_LEASE_S = float(os.getenv('GAMIFICACAO_LEASE_S', '60'))
+GAMIFICACAO_MAX_TENTATIVAS = int(os.getenv('GAMIFICACAO_MAX_TENTATIVAS', '5'))
+
+CRIAR_TABELA = """
+    CREATE TABLE IF NOT EXISTS eventos_gamificacao (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        aluno_id INTEGER NOT NULL,
+        tipo TEXT NOT NULL CHECK (tipo IN ('exercicio', 'aula', 'inicio_aula')),
+        referencia_id INTEGER NOT NULL,
+        pontos INTEGER NOT NULL DEFAULT 0,
+        correto BOOLEAN NOT NULL DEFAULT 0,
+        descricao TEXT NOT NULL DEFAULT '',
+        criado_em REAL NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pendente' CHECK (status IN ('pendente', 'processando', 'falhou')),
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        reivindicado_por TEXT,
+        expira_em REAL,
+        erro TEXT,
+        FOREIGN KEY (aluno_id) REFERENCES users (id)
+    )
+"""
+CRIAR_INDICE = 'CREATE INDEX IF NOT EXISTS idx_eventos_gamificacao_status ON eventos_gamificacao(status, id)'
+
+COLUNAS_EVENTO = ('aluno_id', 'tipo', 'referencia_id', 'pontos', 'correto', 'descricao', 'criado_em')
+
+# Eventos disponíveis: pendentes já liberados para nova tentativa ou com o prazo vencido
+DISPONIVEL = """
+    ((status = 'pendente' AND (expira_em IS NULL OR expira_em <= :agora))
+     OR (status = 'processando' AND expira_em <= :agora))
+"""
+
+REIVINDICAR_QUERY = f"""
+    UPDATE eventos_gamificacao
+    SET status = 'processando', reivindicado_por = :token, expira_em = :expira_em,
+        tentativas = tentativas + 1
+    WHERE {DISPONIVEL}
+      AND aluno_id IN (
+          SELECT aluno_id FROM eventos_gamificacao
+          WHERE {DISPONIVEL}
+            AND aluno_id NOT IN (
+                SELECT aluno_id FROM eventos_gamificacao
+                WHERE status = 'processando' AND expira_em > :agora
+            )
+          GROUP BY aluno_id
+          ORDER BY MIN(id)
+          LIMIT :limite
+      )
+    RETURNING id, aluno_id, tipo, referencia_id, pontos, correto, descricao, criado_em
+"""
+
+# Acorda os trabalhadores deste processo quando há eventos novos
+_sinal = threading.Event()
+
+
+def criar_tabela(db):
+    """Cria a tabela da fila (para bancos criados antes dela) ou atualiza a de versões anteriores"""
+    linha = db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'eventos_gamificacao'"
+    ).fetchone()
+    if linha and 'inicio_aula' not in linha[0]:
+        # Tabela anterior ao evento de início de aula: o CHECK do tipo só muda recriando a tabela
+        db.execute("ALTER TABLE eventos_gamificacao RENAME TO eventos_gamificacao_antiga")
+        db.execute(CRIAR_TABELA)
+        db.execute("INSERT INTO eventos_gamificacao SELECT * FROM eventos_gamificacao_antiga")
+        db.execute("DROP TABLE eventos_gamificacao_antiga")
+    db.execute(CRIAR_TABELA)
+    db.execute(CRIAR_INDICE)
+    db.commit()
+
+
+def enfileirar(db, aluno_id: int, tipo: str, referencia_id: int, pontos: int = 0,
+               correto: bool = False, descricao: str = '') -> int:
+    """
+    Enfileira um evento na transação em andamento (sem commit)
+
+    Args:
+        db: Conexão da requisição
+        aluno_id (int): ID do aluno
+        tipo (str): 'exercicio', 'aula' (concluída) ou 'inicio_aula'
+        referencia_id (int): ID do exercício ou da aula
+        pontos (int): Pontos ganhos
+        correto (bool): Se a resposta do exercício está correta
+        descricao (str): Descrição do histórico de pontos
+
+    Returns:
+        int: ID do evento
+    """
+    cursor = db.cursor()
+    cursor.execute("""
+        INSERT INTO eventos_gamificacao (aluno_id, tipo, referencia_id, pontos, correto, descricao, criado_em)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (aluno_id, tipo, referencia_id, pontos, correto, descricao, time.time()))
+    return cursor.lastrowid
+
+
+def enfileirar_varios(db, eventos: Sequence[EventoGamificacao]) -> int:
+    """
+    Enfileira vários eventos com um único INSERT, na transação em andamento
+
+    Args:
+        db: Conexão da requisição
+        eventos (Sequence[EventoGamificacao]): Eventos (o momento é o de agora)
+
+    Returns:
+        int: Eventos enfileirados
+    """
+    agora = time.time()
+    return inserir_varios(db.cursor(), 'eventos_gamificacao', COLUNAS_EVENTO, [
+        (e.aluno_id, e.tipo, e.referencia_id, e.pontos, e.correto, e.descricao, agora) for e in eventos
+    ])
+
+
+def notificar():
+    """Avisa os trabalhadores do processo que há eventos (chamar após o commit)"""
+    _sinal.set()
+
+
+def reivindicar(db, trabalhador: str, limite: int = None,
+                agora: float = None) -> Tuple[str, Dict[int, List[EventoGamificacao]]]:
+    """
+    Reivindica os eventos disponíveis de até `limite` alunos
+
+    Alunos com eventos sendo processados por outro trabalhador ficam de fora,
+    para que os eventos de um aluno sejam aplicados em ordem.
+
+    Args:
+        db: Conexão do trabalhador
+        trabalhador (str): Nome do trabalhador (vai no token da reivindicação)
+        limite (int): Máximo de alunos (padrão: GAMIFICACAO_LOTE)
+        agora (float): Instante atual (epoch); padrão: time.time()
+
+    Returns:
+        Tuple[str, Dict[int, List[EventoGamificacao]]]: Token da reivindicação
+        e eventos por aluno, em ordem
+    """
+    agora = time.time() if agora is None else agora
+    token = f'{trabalhador}:{uuid.uuid4().hex}'
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        linhas = db.execute(REIVINDICAR_QUERY, {
+            'token': token, 'expira_em': agora + GAMIFICACAO_LEASE_S, 'agora': agora,
+            'limite': limite or GAMIFICACAO_LOTE,
+        }).fetchall()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    lotes: Dict[int, List[EventoGamificacao]] = OrderedDict()
+    for id_, aluno_id, tipo, referencia_id, pontos, correto, descricao, criado_em in sorted(linhas, key=lambda l: l[0]):
+        evento = EventoGamificacao(aluno_id=aluno_id, tipo=tipo, referencia_id=referencia_id, pontos=pontos,
+                                   correto=bool(correto), descricao=descricao,
+                                   momento=datetime.fromtimestamp(criado_em, timezone.utc), id=id_)
+        lotes.setdefault(aluno_id, []).append(evento)
+    return token, lotes
+
+
+def processar_lote(db, token: str, aluno_id: int, eventos: List[EventoGamificacao],
+                   agora: float = None) -> bool:
+    """
+    Aplica os eventos reivindicados de um aluno em uma única transação
+
+    Args:
+        db: Conexão do trabalhador
+        token (str): Token da reivindicação
+        aluno_id (int): ID do aluno
+        eventos (List[EventoGamificacao]): Eventos retornados por reivindicar()
+        agora (float): Instante atual (epoch); padrão: time.time()
+
+    Returns:
+        bool: True se os efeitos foram aplicados
+    """
+    ids = [e.id for e in eventos]
+    marcadores = ', '.join('?' * len(ids))
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        apagados = db.execute(
+            f"DELETE FROM eventos_gamificacao WHERE id IN ({marcadores}) AND reivindicado_por = ?",
+            (*ids, token)
+        ).rowcount
+        if apagados != len(ids):
+            # O prazo venceu e outro trabalhador ficou com (parte d)os eventos
+            db.rollback()
+            logger.warning(f"Eventos de gamificação do aluno {aluno_id} reivindicados por outro trabalhador")
+            return False
+
+        GamificacaoService(db).processar(aluno_id, eventos)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro ao processar gamificação do aluno {aluno_id}: {e}")
+        _devolver(db, ids, token, str(e), agora)
+        for evento in eventos:
+            metrics.incrementar('gamificacao_eventos_total', (evento.tipo, 'erro'))
+        return False
+
+    agora = time.time() if agora is None else agora
+    for evento in eventos:
+        metrics.incrementar('gamificacao_eventos_total', (evento.tipo, 'processado'))
+        metrics.observar('gamificacao_atraso_seconds', (evento.tipo,), agora - evento.momento.timestamp())
+    return True
+
+
+def _devolver(db, ids: List[int], token: str, erro: str, agora: float = None):
+    """Devolve eventos com erro para a fila (com espera crescente) ou os marca como 'falhou'"""
+    agora = time.time() if agora is None else agora
+    marcadores = ', '.join('?' * len(ids))
+    try:
+        db.execute(f"""
+            UPDATE eventos_gamificacao
+            SET status = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END,
+                expira_em = ? + ? * tentativas,
+                reivindicado_por = NULL, erro = ?
+            WHERE id IN ({marcadores}) AND reivindicado_por = ?
+        """, (GAMIFICACAO_MAX_TENTATIVAS, agora, GAMIFICACAO_INTERVALO_S, erro, *ids, token))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro ao devolver eventos de gamificação para a fila: {e}")
+
+
+def processar_pendentes(db, trabalhador: str, limite: int = None) -> int:
+    """
+    Reivindica e processa uma rodada de eventos
+
+    Returns:
+        int: Quantidade de eventos reivindicados (0 se a fila está vazia)
+    """
+    token, lotes = reivindicar(db, trabalhador, limite)
+    for aluno_id, eventos in lotes.items():
+        processar_lote(db, token, aluno_id, eventos)
+    return sum(len(eventos) for eventos in lotes.values())
+
+
+def pendentes(db) -> int:
+    """Eventos ainda não aplicados (pendentes ou em processamento)"""
+    return db.execute(
+        "SELECT COUNT(*) FROM eventos_gamificacao WHERE status != 'falhou'"
+    ).fetchone()[0]
+
+
+class TrabalhadorGamificacao(threading.Thread):
+    """Thread que processa a fila até ser parada"""
+
+    def __init__(self, db_manager, nome: str):
+        super().__init__(name=nome, daemon=True)
+        self.db_manager = db_manager
+        self._parar = threading.Event()
+
+    def run(self):
+        db = self.db_manager.connect()
+        try:
+            while not self._parar.is_set():
+                _sinal.clear()
+                try:
+                    reivindicados = processar_pendentes(db, self.name)
+                except Exception as e:
+                    logger.error(f"Erro no trabalhador {self.name}: {e}")
+                    reivindicados = 0
+                if not reivindicados:
+                    _sinal.wait(GAMIFICACAO_INTERVALO_S)
+        finally:
+            self.db_manager.release(db)
+
+    def parar(self):
+        """Termina a rodada em andamento e encerra a thread"""
+        self._parar.set()
+        _sinal.set()
+        self.join()
+
+
+_trabalhadores: List[TrabalhadorGamificacao] = []
+_trabalhadores_lock = threading.Lock()
+
+
+def iniciar_trabalhadores(db_manager, quantidade: int = None) -> int:
+    """
+    Cria a tabela da fila e inicia os trabalhadores deste processo (uma vez)
+
+    Args:
+        db_manager: DatabaseManager do arquivo SQLite
+        quantidade (int): Número de threads (padrão: GAMIFICACAO_WORKERS; 0 desliga)
+
+    Returns:
+        int: Trabalhadores em execução
+    """
+    quantidade = GAMIFICACAO_WORKERS if quantidade is None else quantidade
+    with _trabalhadores_lock:
+        if _trabalhadores or quantidade <= 0:
+            return len(_trabalhadores)
+
+        db = db_manager.connect()
+        try:
+            criar_tabela(db)
+        finally:
+            db_manager.release(db)
+
+        for i in range(quantidade):
+            trabalhador = TrabalhadorGamificacao(db_manager, f'gamificacao-{i + 1}')
+            trabalhador.start()
+            _trabalhadores.append(trabalhador)
+        logger.info(f"{quantidade} trabalhador(es) de gamificação iniciado(s)")
+        return quantidade
+
+
+def parar_trabalhadores():
+    """Para os trabalhadores deste processo"""
+    with _trabalhadores_lock:
+        for trabalhador in _trabalhadores:
+            trabalhador.parar()
+        _trabalhadores.clear()
@@ -0,0 +1,261 @@
+"""
+Serviço de gamificação dos alunos
+Aplica os efeitos de exercícios respondidos e aulas concluídas: pontos,
+sequência de estudos, atividade diária, metas semanais, conquistas e nível.
+Não faz commit; quem chama (o trabalhador da fila de gamificação) decide a
+transação
+"""
+from typing import List, Optional, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import logging
+
+from utils.database import adapt_query, inserir_varios
+from services.streak_service import StreakService, data_local
+from services.atividade_service import AtividadeDiariaService
+from services.nivel_service import NivelInfo, calcular_nivel
+
+logger = logging.getLogger(__name__)
+
+# Conquistas concedidas automaticamente: (nome, condição em progresso, mínimo, pontos)
+CONQUISTAS_AUTOMATICAS = (
+    ('Primeiro Passo', "status != 'nao_iniciado'", 1, 50),
+    ('Estudante Dedicado', "status = 'concluido'", 5, 100),
+)
+
+COLUNAS_PONTOS = ('aluno_id', 'pontos', 'tipo', 'descricao', 'referencia_id', 'referencia_tipo')
+
+# Pontos dos eventos levam o instante do evento, não o do processamento, para
+# que o rebuild de atividade_diaria os conte no mesmo dia que registrar()
+COLUNAS_PONTOS_EVENTO = COLUNAS_PONTOS + ('data_ganho',)
+
+
+@dataclass
+class EventoGamificacao:
+    """Exercício respondido, aula iniciada ou aula concluída por um aluno"""
+    aluno_id: int
+    tipo: str  # 'exercicio', 'aula' (concluída) ou 'inicio_aula'
+    referencia_id: int
+    pontos: int = 0
+    correto: bool = False
+    descricao: str = ''
+    momento: Optional[datetime] = None
+    id: Optional[int] = None  # ID na fila, quando vem de eventos_gamificacao
+
+
+@dataclass
+class ResultadoGamificacao:
+    """Efeitos aplicados para um aluno"""
+    aluno_id: int
+    pontos: int = 0
+    metas_concluidas: List[int] = field(default_factory=list)
+    conquistas: List[str] = field(default_factory=list)
+    nivel: Optional[NivelInfo] = None
+
+
+class GamificacaoService:
+    """Serviço que aplica as regras de gamificação na conexão recebida"""
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def processar(self, aluno_id: int, eventos: Sequence[EventoGamificacao]) -> ResultadoGamificacao:
+        """
+        Aplica um lote de eventos de um aluno
+
+        Sequência e atividade diária são gravadas uma vez por dia de estudo
+        (o dia em que cada evento aconteceu), os pontos em um único INSERT, e
+        metas, conquistas e nível são recalculados uma única vez para o lote.
+
+        Args:
+            aluno_id (int): ID do aluno
+            eventos (Sequence[EventoGamificacao]): Eventos do aluno, em ordem
+
+        Returns:
+            ResultadoGamificacao: Pontos, metas, conquistas e nível resultantes
+        """
+        resultado = ResultadoGamificacao(aluno_id=aluno_id)
+        streaks = StreakService(self.db)
+        atividade = AtividadeDiariaService(self.db)
+        exercicios_corretos = 0
+        aulas_concluidas = 0
+        linhas_pontos = []
+        # Contadores por dia de estudo: uma escrita de sequência e de atividade por dia, não por evento
+        dias = {}
+
+        for evento in eventos:
+            momento = evento.momento or datetime.now(timezone.utc)
+            if momento.tzinfo is None:
+                momento = momento.replace(tzinfo=timezone.utc)
+            data_ganho = momento.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            dia = dias.setdefault(data_local(momento),
+                                  {'momento': momento, 'aulas': 0, 'exercicios': 0, 'pontos': 0})
+            if evento.tipo == 'inicio_aula':
+                # Só marca o dia de estudo (sequência e atividade), sem pontos nem contadores
+                continue
+            dia['pontos'] += evento.pontos
+            if evento.tipo == 'aula':
+                # historico_pontos não aceita o tipo 'aula': a conclusão entra como bônus
+                linhas_pontos.append((aluno_id, evento.pontos, 'bonus', evento.descricao or 'Aula concluída',
+                                      evento.referencia_id, 'aula', data_ganho))
+                aulas_concluidas += 1
+                dia['aulas'] += 1
+            else:
+                dia['exercicios'] += 1
+                if evento.correto:
+                    linhas_pontos.append((aluno_id, evento.pontos, 'exercicio', evento.descricao,
+                                          evento.referencia_id, 'exercicio', data_ganho))
+                    exercicios_corretos += 1
+
+        for dia in dias.values():
+            streaks.registrar_atividade(aluno_id, dia['momento'], commit=False)
+            atividade.registrar(aluno_id, aulas=dia['aulas'], exercicios=dia['exercicios'], pontos=dia['pontos'],
+                                momento=dia['momento'], commit=False)
+
+        # Todos os pontos do lote em um único INSERT
+        inserir_varios(self.db.cursor(), 'historico_pontos', COLUNAS_PONTOS_EVENTO, linhas_pontos)
+        resultado.pontos = sum(linha[1] for linha in linhas_pontos)
+
+        if exercicios_corretos:
+            resultado.metas_concluidas += self.atualizar_progresso_metas(aluno_id, 'exercicios', exercicios_corretos)
+        if aulas_concluidas:
+            resultado.metas_concluidas += self.atualizar_progresso_metas(aluno_id, 'aulas', aulas_concluidas)
+
+        resultado.conquistas = self.verificar_conquistas(aluno_id)
+        resultado.nivel = self.atualizar_nivel(aluno_id)
+        return resultado
+
+    def registrar_pontos(self, aluno_id: int, pontos: int, tipo: str, descricao: str,
+                         referencia_id: Optional[int] = None, referencia_tipo: Optional[str] = None):
+        """Adiciona uma linha ao histórico de pontos"""
+        inserir_varios(self.db.cursor(), 'historico_pontos', COLUNAS_PONTOS,
+                       [(aluno_id, pontos, tipo, descricao, referencia_id, referencia_tipo)])
+
+    def atualizar_progresso_metas(self, aluno_id: int, tipo: str, valor: int = 1) -> List[int]:
+        """
+        Soma `valor` ao progresso das metas semanais ativas do tipo
+
+        Args:
+            aluno_id (int): ID do aluno
+            tipo (str): Tipo da meta ('exercicios', 'aulas', ...)
+            valor (int): Quanto somar
+
+        Returns:
+            List[int]: IDs das metas concluídas agora
+        """
+        cursor = self.db.cursor()
+        cursor.execute(adapt_query("""
+            SELECT id, valor_meta
+            FROM metas_semanais
+            WHERE tipo = %s AND ativa = 1 AND data_fim >= CURRENT_DATE
+        """, self.db), (tipo,))
+        metas = cursor.fetchall()
+
+        concluidas = []
+        for meta_id, valor_meta in metas:
+            cursor.execute(adapt_query("""
+                SELECT id, valor_atual, concluida
+                FROM progresso_metas
+                WHERE meta_id = %s AND aluno_id = %s
+            """, self.db), (meta_id, aluno_id))
+            progresso = cursor.fetchone()
+
+            if progresso:
+                novo_valor = progresso[1] + valor
+                concluida = novo_valor >= valor_meta
+                cursor.execute(adapt_query("""
+                    UPDATE progresso_metas
+                    SET valor_atual = %s, concluida = %s,
+                        data_conclusao = CASE WHEN %s AND concluida = 0 THEN CURRENT_TIMESTAMP ELSE data_conclusao END
+                    WHERE id = %s
+                """, self.db), (novo_valor, concluida, concluida, progresso[0]))
+                ja_concluida = bool(progresso[2])
+            else:
+                concluida = valor >= valor_meta
+                cursor.execute(adapt_query("""
+                    INSERT INTO progresso_metas (aluno_id, meta_id, valor_atual, concluida, data_conclusao)
+                    VALUES (%s, %s, %s, %s, CASE WHEN %s THEN CURRENT_TIMESTAMP ELSE NULL END)
+                """, self.db), (aluno_id, meta_id, valor, concluida, concluida))
+                ja_concluida = False
+
+            if concluida and not ja_concluida:
+                concluidas.append(meta_id)
+
+        return concluidas
+
+    def verificar_conquistas(self, aluno_id: int) -> List[str]:
+        """
+        Concede as conquistas automáticas que o aluno atingiu
+
+        Args:
+            aluno_id (int): ID do aluno
+
+        Returns:
+            List[str]: Nomes das conquistas concedidas agora
+        """
+        cursor = self.db.cursor()
+        concedidas = []
+
+        for nome, condicao, minimo, pontos in CONQUISTAS_AUTOMATICAS:
+            cursor.execute(adapt_query(
+                f"SELECT COUNT(*) FROM progresso WHERE aluno_id = %s AND {condicao}", self.db
+            ), (aluno_id,))
+            if cursor.fetchone()[0] < minimo:
+                continue
+
+            cursor.execute(adapt_query("SELECT id FROM conquistas WHERE nome = %s", self.db), (nome,))
+            conquista = cursor.fetchone()
+            if not conquista:
+                continue
+
+            cursor.execute(adapt_query("""
+                SELECT id FROM aluno_conquista
+                WHERE aluno_id = %s AND conquista_id = %s
+            """, self.db), (aluno_id, conquista[0]))
+            if cursor.fetchone():
+                continue
+
+            cursor.execute(adapt_query("""
+                INSERT INTO aluno_conquista (aluno_id, conquista_id)
+                VALUES (%s, %s)
+            """, self.db), (aluno_id, conquista[0]))
+            self.registrar_pontos(aluno_id, pontos, 'conquista', f'Conquista: {nome}', conquista[0], 'conquista')
+            concedidas.append(nome)
+
+        return concedidas
+
+    def atualizar_nivel(self, aluno_id: int) -> NivelInfo:
+        """
+        Recalcula o nível do aluno a partir do histórico de pontos
+
+        Args:
+            aluno_id (int): ID do aluno
+
+        Returns:
+            NivelInfo: Nível gravado em niveis_aluno
+        """
+        cursor = self.db.cursor()
+        cursor.execute(adapt_query("""
+            SELECT COALESCE(SUM(pontos), 0)
+            FROM historico_pontos
+            WHERE aluno_id = %s
+        """, self.db), (aluno_id,))
+        nivel = calcular_nivel(cursor.fetchone()[0])
+
+        cursor.execute(adapt_query("""
+            INSERT INTO niveis_aluno
+                (aluno_id, nivel_atual, pontos_totais, pontos_nivel_atual, pontos_proximo_nivel,
+                 titulo_nivel, cor_nivel, icone_nivel, ultima_atualizacao)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (aluno_id) DO UPDATE SET
+                nivel_atual = excluded.nivel_atual,
+                pontos_totais = excluded.pontos_totais,
+                pontos_nivel_atual = excluded.pontos_nivel_atual,
+                pontos_proximo_nivel = excluded.pontos_proximo_nivel,
+                titulo_nivel = excluded.titulo_nivel,
+                cor_nivel = excluded.cor_nivel,
+                icone_nivel = excluded.icone_nivel,
+                ultima_atualizacao = excluded.ultima_atualizacao
+        """, self.db), (aluno_id, nivel.nivel_atual, nivel.pontos_totais, nivel.pontos_nivel_atual,
+                        nivel.pontos_proximo_nivel, nivel.titulo, nivel.cor, nivel.icone))
+        return nivel
@@ -0,0 +1,55 @@
+"""
+Serviço de níveis dos alunos
+Converte os pontos totais de um aluno em nível, título, cor e ícone exibidos
+na gamificação (cada nível requer 100 pontos)
+"""
+from dataclasses import dataclass
+
+PONTOS_POR_NIVEL = 100
+
+# Título, cor e ícone dos primeiros níveis; a partir do último, "Nível N"
+NIVEIS = {
+    1: ('Iniciante', '#6c757d', 'fas fa-star'),
+    2: ('Aprendiz', '#28a745', 'fas fa-star'),
+    3: ('Estudante', '#007bff', 'fas fa-star'),
+    4: ('Avançado', '#6f42c1', 'fas fa-star'),
+    5: ('Mestre', '#fd7e14', 'fas fa-crown'),
+}
+COR_NIVEL_ALTO = '#dc3545'
+ICONE_NIVEL_ALTO = 'fas fa-crown'
+
+
+@dataclass
+class NivelInfo:
+    """Nível de um aluno calculado a partir dos pontos totais"""
+    nivel_atual: int
+    pontos_totais: int
+    pontos_nivel_atual: int
+    pontos_proximo_nivel: int
+    titulo: str
+    cor: str
+    icone: str
+
+
+def calcular_nivel(pontos_totais: int) -> NivelInfo:
+    """
+    Calcula nível, título, cor e ícone para um total de pontos
+
+    Args:
+        pontos_totais (int): Soma dos pontos do aluno
+
+    Returns:
+        NivelInfo: Dados do nível
+    """
+    nivel_atual = (pontos_totais // PONTOS_POR_NIVEL) + 1
+    titulo, cor, icone = NIVEIS.get(nivel_atual, (f'Nível {nivel_atual}', COR_NIVEL_ALTO, ICONE_NIVEL_ALTO))
+
+    return NivelInfo(
+        nivel_atual=nivel_atual,
+        pontos_totais=pontos_totais,
+        pontos_nivel_atual=pontos_totais % PONTOS_POR_NIVEL,
+        pontos_proximo_nivel=PONTOS_POR_NIVEL,
+        titulo=titulo,
+        cor=cor,
+        icone=icone
+    )
@@ -0,0 +1,185 @@
+"""
+Serviço de questionário por aula
+Corrige de uma vez todas as respostas de uma aula contra o gabarito, carregado
+em uma única consulta, e grava respostas, progresso e eventos de gamificação
+com INSERTs de várias linhas na transação de quem chama.
+O gabarito fica no cache de conteúdo já com as alternativas lidas, marcado
+com o updated_at da aula; a correção só lê essa versão (uma consulta pela
+chave primária) e não interpreta texto
+"""
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import logging
+
+from utils import alternativas, cache_conteudo
+from utils.database import adapt_query, inserir_varios
+from services import fila_gamificacao
+from services.gamificacao_service import EventoGamificacao
+
+logger = logging.getLogger(__name__)
+
+GABARITO_QUERY = """
+    SELECT id, enunciado, alternativas, resposta_correta, pontos
+    FROM exercicios
+    WHERE aula_id = %s
+    ORDER BY id
+"""
+
+VERSAO_AULA_QUERY = "SELECT updated_at FROM aulas WHERE id = %s"
+
+COLUNAS_RESPOSTA = ('aluno_id', 'exercicio_id', 'resposta', 'esta_correta', 'pontos_ganhos')
+
+
+@dataclass
+class ItemGabarito:
+    """Exercício da aula com a resposta correta"""
+    exercicio_id: int
+    enunciado: str
+    alternativas: List[str]
+    resposta_correta: str
+    pontos: int
+
+
+@dataclass
+class Correcao:
+    """Resposta do aluno a um exercício, já corrigida"""
+    exercicio_id: int
+    resposta: str
+    correta: bool
+    pontos: int
+    resposta_correta: str
+
+
+@dataclass
+class ResultadoQuiz:
+    """Correção das respostas de uma aula"""
+    aula_id: int
+    correcoes: List[Correcao] = field(default_factory=list)
+
+    @property
+    def acertos(self) -> int:
+        return sum(1 for c in self.correcoes if c.correta)
+
+    @property
+    def pontos(self) -> int:
+        return sum(c.pontos for c in self.correcoes)
+
+    def por_exercicio(self) -> Dict[int, Correcao]:
+        """Correções indexadas pelo ID do exercício (para o template)"""
+        return {c.exercicio_id: c for c in self.correcoes}
+
+
+def corrigir(aula_id: int, gabarito: Sequence[ItemGabarito],
+             respostas: Dict[int, Optional[str]]) -> ResultadoQuiz:
+    """
+    Corrige as respostas em memória
+
+    Exercícios sem resposta ficam de fora (não contam como erro).
+
+    Args:
+        aula_id (int): ID da aula
+        gabarito (Sequence[ItemGabarito]): Exercícios da aula
+        respostas (Dict[int, Optional[str]]): Resposta por ID do exercício
+
+    Returns:
+        ResultadoQuiz: Correções, na ordem do gabarito
+    """
+    resultado = ResultadoQuiz(aula_id=aula_id)
+    for item in gabarito:
+        resposta = respostas.get(item.exercicio_id)
+        if not resposta:
+            continue
+        correta = resposta == item.resposta_correta
+        resultado.correcoes.append(Correcao(
+            exercicio_id=item.exercicio_id,
+            resposta=resposta,
+            correta=correta,
+            pontos=(item.pontos or 0) if correta else 0,
+            resposta_correta=item.resposta_correta
+        ))
+    return resultado
+
+
+class QuizService:
+    """Serviço para corrigir e registrar as respostas de uma aula"""
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def carregar_gabarito(self, aula_id: int, versao=None) -> List[ItemGabarito]:
+        """
+        Gabarito da aula pelo cache de conteúdo (uma consulta na falta)
+
+        O gabarito guardado só é usado se for da versão atual da aula, para que
+        uma edição feita em outro worker valha na próxima correção.
+
+        Args:
+            aula_id (int): ID da aula
+            versao: updated_at da aula, se quem chama já o leu (senão é lido aqui)
+
+        Returns:
+            List[ItemGabarito]: Exercícios em ordem de ID
+        """
+        if versao is None:
+            cursor = self.db.cursor()
+            cursor.execute(adapt_query(VERSAO_AULA_QUERY, self.db), (aula_id,))
+            aula = cursor.fetchone()
+            if not aula:
+                return []
+            versao = aula[0]
+
+        def carregar():
+            cursor = self.db.cursor()
+            cursor.execute(adapt_query(GABARITO_QUERY, self.db), (aula_id,))
+            gabarito = [
+                ItemGabarito(
+                    exercicio_id=row[0],
+                    enunciado=row[1],
+                    alternativas=alternativas.ler(row[2]),
+                    resposta_correta=row[3],
+                    pontos=row[4]
+                )
+                for row in cursor.fetchall()
+            ]
+            return gabarito, aula_id
+
+        return cache_conteudo.obter('gabarito', aula_id, carregar, versao)
+
+    def registrar_respostas(self, aluno_id: int, correcoes: Sequence[Correcao]) -> int:
+        """Grava as respostas corrigidas com um único INSERT (sem commit)"""
+        return inserir_varios(self.db.cursor(), 'respostas_alunos', COLUNAS_RESPOSTA, [
+            (aluno_id, c.exercicio_id, c.resposta, c.correta, c.pontos) for c in correcoes
+        ])
+
+    def registrar(self, aluno_id: int, resultado: ResultadoQuiz, titulo_aula: str):
+        """
+        Grava respostas, progresso e eventos de gamificação (sem commit)
+
+        São três comandos, qualquer que seja o número de exercícios: as
+        respostas e os eventos vão em INSERTs de várias linhas, e a fila de
+        gamificação aplica pontos, metas, conquistas e nível uma vez para o
+        lote inteiro.
+
+        Args:
+            aluno_id (int): ID do aluno
+            resultado (ResultadoQuiz): Correção retornada por corrigir()
+            titulo_aula (str): Título da aula (descrição no histórico de pontos)
+        """
+        self.registrar_respostas(aluno_id, resultado.correcoes)
+
+        cursor = self.db.cursor()
+        cursor.execute(adapt_query("""
+            INSERT INTO progresso (aluno_id, aula_id, status, pontuacao, ultima_atividade)
+            VALUES (%s, %s, 'em_andamento', %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (aluno_id, aula_id) DO UPDATE SET
+                status = CASE WHEN progresso.status = 'concluido' THEN 'concluido' ELSE 'em_andamento' END,
+                pontuacao = excluded.pontuacao,
+                ultima_atividade = excluded.ultima_atividade
+        """, self.db), (aluno_id, resultado.aula_id, resultado.pontos))
+
+        fila_gamificacao.enfileirar_varios(self.db, [
+            EventoGamificacao(aluno_id=aluno_id, tipo='exercicio', referencia_id=c.exercicio_id,
+                              pontos=c.pontos, correto=c.correta,
+                              descricao=f'Exercício correto: {titulo_aula}')
+            for c in resultado.correcoes
+        ])
@@ -0,0 +1,295 @@
+"""
+Serviço de sequência de estudos (streak) dos alunos
+Mantém, para cada aluno, a sequência atual, a maior sequência e o último dia
+de atividade, atualizados em O(1) a cada atividade registrada. rebuild()
+recalcula a tabela a partir dos dias em atividade_diaria (backfill)
+"""
+from typing import Iterable, Optional
+from dataclasses import dataclass
+from datetime import date, datetime, timezone, tzinfo
+import os
+import logging
+
+from utils.database import adapt_query, inserir_varios, row_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Fuso horário da escola: define em que momento um "dia de estudo" vira
+SCHOOL_TIMEZONE = os.getenv('SCHOOL_TIMEZONE', 'America/Sao_Paulo')
+
+STREAK_QUERY = """
+    SELECT streak_atual, maior_streak, ultima_atividade
+    FROM streaks_alunos
+    WHERE aluno_id = %s
+"""
+
+# Dias com atividade de um aluno no histórico bruto do PostgreSQL, para quem
+# ainda não tem linha em streaks_alunos. Parâmetros: fuso, aluno_id, aluno_id
+DIAS_ATIVOS_QUERY = """
+    SELECT DISTINCT (momento AT TIME ZONE 'UTC' AT TIME ZONE %s)::date AS dia
+    FROM (
+        SELECT updated_at AS momento FROM progresso_alunos WHERE aluno_id = %s
+        UNION ALL
+        SELECT created_at FROM respostas_alunos WHERE aluno_id = %s
+    ) atividades
+    WHERE momento IS NOT NULL
+    ORDER BY dia
+"""
+
+COLUNAS_STREAK = ('aluno_id', 'streak_atual', 'maior_streak', 'ultima_atividade')
+
+
+@dataclass
+class StreakInfo:
+    """Sequência de dias de estudo de um aluno"""
+    aluno_id: int
+    streak_atual: int = 0
+    maior_streak: int = 0
+    ultima_atividade: Optional[date] = None
+
+
+def get_school_timezone() -> tzinfo:
+    """
+    Obtém o fuso horário configurado para a escola
+
+    Returns:
+        tzinfo: Fuso horário da escola (UTC se não estiver disponível)
+    """
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(SCHOOL_TIMEZONE)
+    except Exception as e:
+        logger.warning(f"Fuso horário {SCHOOL_TIMEZONE} indisponível, usando UTC: {e}")
+        return timezone.utc
+
+
+def data_local(momento: Optional[datetime] = None) -> date:
+    """
+    Converte um instante para o dia correspondente no fuso da escola
+
+    Timestamps sem fuso são tratados como UTC, que é como o banco os grava
+    (CURRENT_TIMESTAMP).
+
+    Args:
+        momento (Optional[datetime]): Instante da atividade (padrão: agora)
+
+    Returns:
+        date: Dia da atividade no fuso da escola
+    """
+    tz = get_school_timezone()
+    if momento is None:
+        return datetime.now(tz).date()
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    return momento.astimezone(tz).date()
+
+
+def calcular_streak(info: StreakInfo, dia: date) -> StreakInfo:
+    """
+    Calcula a nova sequência após uma atividade no dia informado
+
+    Args:
+        info (StreakInfo): Sequência armazenada
+        dia (date): Dia (no fuso da escola) da nova atividade
+
+    Returns:
+        StreakInfo: Nova sequência (a mesma instância se nada mudou)
+    """
+    if info.ultima_atividade is None:
+        streak_atual = 1
+    else:
+        dias = (dia - info.ultima_atividade).days
+        if dias <= 0:
+            # Mesmo dia ou evento atrasado: a sequência não muda
+            return info
+        streak_atual = info.streak_atual + 1 if dias == 1 else 1
+
+    return StreakInfo(
+        aluno_id=info.aluno_id,
+        streak_atual=streak_atual,
+        maior_streak=max(info.maior_streak, streak_atual),
+        ultima_atividade=dia
+    )
+
+
+def streak_vigente(info: StreakInfo, hoje: Optional[date] = None) -> int:
+    """
+    Retorna a sequência atual considerando que ela se quebra após um dia sem estudo
+
+    Args:
+        info (StreakInfo): Sequência armazenada
+        hoje (Optional[date]): Dia de referência (padrão: hoje no fuso da escola)
+
+    Returns:
+        int: Número de dias consecutivos ainda válidos
+    """
+    if info.ultima_atividade is None:
+        return 0
+    hoje = hoje or data_local()
+    if (hoje - info.ultima_atividade).days > 1:
+        return 0
+    return info.streak_atual
+
+
+def streak_de_dias(aluno_id: int, dias: Iterable) -> StreakInfo:
+    """
+    Calcula a sequência a partir dos dias com atividade
+
+    Args:
+        aluno_id (int): ID do aluno
+        dias (Iterable): Dias com atividade (date ou texto ISO), em qualquer ordem
+
+    Returns:
+        StreakInfo: A mesma sequência que registrar_atividade produziria
+    """
+    info = StreakInfo(aluno_id=aluno_id)
+    for dia in sorted({_parse_date(dia) for dia in dias if dia is not None}):
+        info = calcular_streak(info, dia)
+    return info
+
+
+def _parse_date(value) -> Optional[date]:
+    """Normaliza datas vindas do SQLite (texto) ou do PostgreSQL (date)"""
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def streak_from_row(aluno_id: int, row: Optional[dict]) -> StreakInfo:
+    """
+    Monta a sequência a partir de uma linha de streaks_alunos
+
+    Args:
+        aluno_id (int): ID do aluno
+        row (Optional[dict]): Linha retornada por STREAK_QUERY (ou None)
+
+    Returns:
+        StreakInfo: Sequência do aluno (zerada se ainda não houver registro)
+    """
+    if not row:
+        return StreakInfo(aluno_id=aluno_id)
+
+    return StreakInfo(
+        aluno_id=aluno_id,
+        streak_atual=row['streak_atual'] or 0,
+        maior_streak=row['maior_streak'] or 0,
+        ultima_atividade=_parse_date(row['ultima_atividade'])
+    )
+
+
+class StreakService:
+    """Serviço para leitura e atualização das sequências de estudo"""
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def get_streak(self, aluno_id: int) -> StreakInfo:
+        """
+        Busca a sequência armazenada de um aluno
+
+        Args:
+            aluno_id (int): ID do aluno
+
+        Returns:
+            StreakInfo: Sequência do aluno (zerada se ainda não houver registro)
+        """
+        try:
+            cursor = self.db.cursor()
+
+            cursor.execute(adapt_query(STREAK_QUERY, self.db), (aluno_id,))
+            return streak_from_row(aluno_id, row_to_dict(cursor, cursor.fetchone()))
+
+        except Exception as e:
+            raise Exception(f"Erro ao buscar sequência do aluno {aluno_id}: {str(e)}")
+
+    def registrar_atividade(self, aluno_id: int, momento: Optional[datetime] = None,
+                            commit: bool = True) -> StreakInfo:
+        """
+        Registra uma atividade do aluno e atualiza a sequência
+
+        Faz no máximo uma leitura e uma escrita; atividades repetidas no mesmo
+        dia não geram escrita.
+
+        Args:
+            aluno_id (int): ID do aluno
+            momento (Optional[datetime]): Instante da atividade (padrão: agora)
+            commit (bool): False para gravar dentro da transação de quem chama
+
+        Returns:
+            StreakInfo: Sequência atualizada
+        """
+        atual = self.get_streak(aluno_id)
+        novo = calcular_streak(atual, data_local(momento))
+
+        if novo is atual:
+            return atual
+
+        try:
+            cursor = self.db.cursor()
+
+            query = """
+                INSERT INTO streaks_alunos
+                    (aluno_id, streak_atual, maior_streak, ultima_atividade, updated_at)
+                VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (aluno_id) DO UPDATE SET
+                    streak_atual = excluded.streak_atual,
+                    maior_streak = excluded.maior_streak,
+                    ultima_atividade = excluded.ultima_atividade,
+                    updated_at = excluded.updated_at
+            """
+
+            cursor.execute(adapt_query(query, self.db), (
+                aluno_id, novo.streak_atual, novo.maior_streak, novo.ultima_atividade.isoformat()
+            ))
+            if commit:
+                self.db.commit()
+
+            return novo
+
+        except Exception as e:
+            if commit:
+                self.db.rollback()
+            raise Exception(f"Erro ao registrar atividade do aluno {aluno_id}: {str(e)}")
+
+    def rebuild(self, commit: bool = True) -> int:
+        """
+        Recalcula todas as sequências a partir dos dias em atividade_diaria
+
+        Cada atividade registrada também grava a atividade diária do dia, então
+        os dias com linha em atividade_diaria são os dias de estudo. Reconstrua
+        atividade_diaria antes (rebuild_atividade_diaria.py faz as duas).
+
+        Args:
+            commit (bool): False para gravar dentro da transação de quem chama
+                (migrações)
+
+        Returns:
+            int: Número de alunos com sequência gravada
+        """
+        try:
+            cursor = self.db.cursor()
+            cursor.execute("SELECT aluno_id, data FROM atividade_diaria ORDER BY aluno_id, data")
+
+            dias_por_aluno = {}
+            for row in cursor.fetchall():
+                row = row_to_dict(cursor, row)
+                dias_por_aluno.setdefault(row['aluno_id'], []).append(row['data'])
+
+            linhas = []
+            for aluno_id, dias in dias_por_aluno.items():
+                info = streak_de_dias(aluno_id, dias)
+                linhas.append((aluno_id, info.streak_atual, info.maior_streak, info.ultima_atividade.isoformat()))
+
+            cursor.execute("DELETE FROM streaks_alunos")
+            inserir_varios(cursor, 'streaks_alunos', COLUNAS_STREAK, linhas)
+            if commit:
+                self.db.commit()
+            logger.info(f"streaks_alunos reconstruída: {len(linhas)} alunos")
+            return len(linhas)
+
+        except Exception as e:
+            if commit:
+                self.db.rollback()
+            raise Exception(f"Erro ao reconstruir sequências: {str(e)}")
@@ -0,0 +1,293 @@
+"""
+Tempo assistido das aulas, acumulado em memória (SQLite)
+
+O player envia um heartbeat a cada poucos segundos com o tempo assistido desde
+o anterior. Gravar cada um seria uma escrita por aluno a cada poucos segundos,
+disputando o único escritor do SQLite com as respostas dos exercícios. Aqui os
+heartbeats só somam o tempo por (aluno, aula) em memória; uma thread grava os
+totais a cada TEMPO_ASSISTIDO_FLUSH_S segundos com um único upsert de várias
+linhas em progresso.tempo_assistido, e os minutos completados em
+atividade_diaria. A conclusão da aula grava o tempo pendente daquele aluno
+antes de marcá-la como concluída.
+
+Limites e falhas:
+- no máximo TEMPO_ASSISTIDO_MAX_PARES pares ficam pendentes; ao atingir o
+  limite a gravação é antecipada e, até ela terminar, heartbeats de pares
+  novos são descartados (os dos pares já pendentes continuam somando);
+- cada heartbeat conta no máximo TEMPO_ASSISTIDO_MAX_DELTA_S segundos;
+- se a gravação falha, os totais voltam para a memória e entram na próxima;
+- ao encerrar o processo (atexit) o pendente é gravado. Uma queda do processo
+  perde no máximo o tempo acumulado desde a última gravação.
+
+As métricas tempo_assistido_* em /metrics mostram quantos heartbeats chegaram
+e quantas escritas foram evitadas (heartbeats menos linhas gravadas).
+"""
+import atexit
+import os
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.atividade_service import AtividadeDiariaService
+from services.streak_service import data_local
+from utils import metrics
+from utils.database import inserir_varios
+
+logger = logging.getLogger(__name__)
+
+TEMPO_ASSISTIDO_FLUSH_S = float(os.getenv('TEMPO_ASSISTIDO_FLUSH_S', '10'))
+TEMPO_ASSISTIDO_MAX_PARES = int(os.getenv('TEMPO_ASSISTIDO_MAX_PARES', '10000'))
+TEMPO_ASSISTIDO_MAX_DELTA_S = float(os.getenv('TEMPO_ASSISTIDO_MAX_DELTA_S', '60'))
+
+COLUNAS_PROGRESSO = ('aluno_id', 'aula_id', 'status', 'tempo_assistido', 'ultima_atividade')
+
+UPSERT_CONFLITO = """
+    ON CONFLICT (aluno_id, aula_id) DO UPDATE SET
+        tempo_assistido = COALESCE(progresso.tempo_assistido, 0) + excluded.tempo_assistido,
+        ultima_atividade = MAX(COALESCE(progresso.ultima_atividade, ''), excluded.ultima_atividade)
+"""
+
+Par = Tuple[int, int]
+
+
+class Pendente:
+    """Tempo acumulado de um par (aluno, aula) desde a última gravação"""
+    __slots__ = ('segundos', 'heartbeats', 'ultimo')
+
+    def __init__(self, segundos: float = 0.0, heartbeats: int = 0, ultimo: float = 0.0):
+        self.segundos = segundos
+        self.heartbeats = heartbeats
+        self.ultimo = ultimo
+
+
+class AcumuladorTempo:
+    """Totais pendentes por (aluno, aula), limitados e seguros entre threads"""
+
+    def __init__(self, max_pares: int = TEMPO_ASSISTIDO_MAX_PARES,
+                 max_delta_s: float = TEMPO_ASSISTIDO_MAX_DELTA_S):
+        self.max_pares = max_pares
+        self.max_delta_s = max_delta_s
+        self._pendentes: Dict[Par, Pendente] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, aluno_id: int, aula_id: int, segundos: float,
+                  agora: Optional[float] = None) -> str:
+        """
+        Soma um heartbeat ao par
+
+        Args:
+            aluno_id (int): ID do aluno
+            aula_id (int): ID da aula
+            segundos (float): Tempo assistido desde o heartbeat anterior
+            agora (Optional[float]): Instante do heartbeat (epoch)
+
+        Returns:
+            str: 'aceito', 'cheio' (aceito, e o limite de pares foi atingido)
+            ou 'descartado' (par novo com o limite atingido)
+        """
+        segundos = min(max(float(segundos), 0.0), self.max_delta_s)
+        agora = time.time() if agora is None else agora
+        par = (aluno_id, aula_id)
+        with self._lock:
+            pendente = self._pendentes.get(par)
+            if pendente is None:
+                if len(self._pendentes) >= self.max_pares:
+                    return 'descartado'
+                pendente = self._pendentes[par] = Pendente()
+            pendente.segundos += segundos
+            pendente.heartbeats += 1
+            pendente.ultimo = max(pendente.ultimo, agora)
+            return 'cheio' if len(self._pendentes) >= self.max_pares else 'aceito'
+
+    def retirar(self, pares: Optional[Iterable[Par]] = None) -> Dict[Par, Pendente]:
+        """Remove e retorna os totais pendentes (todos ou só os pares indicados)"""
+        with self._lock:
+            if pares is None:
+                retirados, self._pendentes = self._pendentes, {}
+                return retirados
+            return {par: self._pendentes.pop(par) for par in pares if par in self._pendentes}
+
+    def devolver(self, retirados: Dict[Par, Pendente]):
+        """Devolve totais cuja gravação falhou (somando aos que chegaram depois)"""
+        with self._lock:
+            for par, pendente in retirados.items():
+                atual = self._pendentes.setdefault(par, Pendente())
+                atual.segundos += pendente.segundos
+                atual.heartbeats += pendente.heartbeats
+                atual.ultimo = max(atual.ultimo, pendente.ultimo)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pendentes)
+
+
+def gravar(db, retirados: Dict[Par, Pendente]) -> int:
+    """
+    Soma os totais em progresso.tempo_assistido com um upsert (sem commit)
+
+    Os minutos completados (a parte inteira do total em minutos que avançou)
+    entram em atividade_diaria no dia do último heartbeat, também com um
+    único upsert. Pares de aulas que não existem são ignorados.
+
+    Returns:
+        int: Linhas gravadas em progresso
+    """
+    aulas = sorted({aula_id for _, aula_id in retirados})
+    alunos = sorted({aluno_id for aluno_id, _ in retirados})
+    existentes = {linha[0] for linha in db.execute(
+        f"SELECT id FROM aulas WHERE id IN ({', '.join('?' * len(aulas))})", aulas)}
+    anteriores = {(linha[0], linha[1]): linha[2] or 0 for linha in db.execute(
+        f"""SELECT aluno_id, aula_id, tempo_assistido FROM progresso
+            WHERE aula_id IN ({', '.join('?' * len(aulas))}) AND aluno_id IN ({', '.join('?' * len(alunos))})""",
+        aulas + alunos)}
+
+    linhas: List[tuple] = []
+    minutos: Dict[Tuple[int, object], int] = {}
+    for (aluno_id, aula_id), pendente in retirados.items():
+        if aula_id not in existentes:
+            continue
+        momento = datetime.fromtimestamp(pendente.ultimo, timezone.utc)
+        segundos = int(round(pendente.segundos))
+        linhas.append((aluno_id, aula_id, 'em_andamento', segundos, momento.strftime('%Y-%m-%d %H:%M:%S')))
+
+        antes = anteriores.get((aluno_id, aula_id), 0)
+        chave = (aluno_id, data_local(momento))
+        minutos[chave] = minutos.get(chave, 0) + (antes + segundos) // 60 - antes // 60
+
+    gravadas = inserir_varios(db.cursor(), 'progresso', COLUNAS_PROGRESSO, linhas, conflito=UPSERT_CONFLITO)
+    AtividadeDiariaService(db).registrar_minutos(minutos)
+    return gravadas
+
+
+_acumulador = AcumuladorTempo()
+_sinal = threading.Event()
+
+
+def registrar(aluno_id: int, aula_id: int, segundos: float) -> str:
+    """Soma um heartbeat no acumulador do processo (veja AcumuladorTempo.registrar)"""
+    resultado = _acumulador.registrar(aluno_id, aula_id, segundos)
+    metrics.incrementar('tempo_assistido_heartbeats_total', (resultado,))
+    if resultado == 'cheio':
+        _sinal.set()
+    return resultado
+
+
+def descarregar(db, pares: Optional[Iterable[Par]] = None, motivo: str = 'periodico') -> int:
+    """
+    Grava e confirma o tempo pendente (todo ou só o dos pares indicados)
+
+    Args:
+        db: Conexão SQLite
+        pares (Optional[Iterable[Par]]): Pares (aluno_id, aula_id); None grava todos
+        motivo (str): Rótulo das métricas ('periodico', 'limite', 'conclusao',
+            'requisicao' ou 'encerramento')
+
+    Returns:
+        int: Linhas gravadas (0 se não havia pendente ou a gravação falhou)
+    """
+    retirados = _acumulador.retirar(pares)
+    if not retirados:
+        return 0
+    try:
+        linhas = gravar(db, retirados)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        _acumulador.devolver(retirados)
+        metrics.incrementar('tempo_assistido_falhas_total')
+        logger.error(f"Erro ao gravar tempo assistido ({len(retirados)} pares devolvidos): {e}")
+        return 0
+
+    heartbeats = sum(p.heartbeats for p in retirados.values())
+    metrics.incrementar('tempo_assistido_linhas_gravadas_total', (motivo,), linhas)
+    metrics.incrementar('tempo_assistido_escritas_evitadas_total', (), heartbeats - linhas)
+    return linhas
+
+
+def descarregar_aula(db, aluno_id: int, aula_id: int) -> int:
+    """Grava o tempo pendente de um aluno em uma aula (ao concluí-la)"""
+    return descarregar(db, [(aluno_id, aula_id)], motivo='conclusao')
+
+
+def pendentes() -> int:
+    """Pares com tempo ainda não gravado neste processo"""
+    return len(_acumulador)
+
+
+class DescarregadorTempo(threading.Thread):
+    """Thread que grava o tempo acumulado periodicamente ou ao atingir o limite"""
+
+    def __init__(self, db_manager, intervalo: float = TEMPO_ASSISTIDO_FLUSH_S):
+        super().__init__(name='tempo-assistido', daemon=True)
+        self.db_manager = db_manager
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.is_set():
+            antecipada = _sinal.wait(self.intervalo)
+            _sinal.clear()
+            self._descarregar('limite' if antecipada and not self._parar.is_set() else 'periodico')
+
+    def _descarregar(self, motivo: str):
+        try:
+            db = self.db_manager.connect()
+        except Exception as e:
+            logger.error(f"Erro ao conectar para gravar tempo assistido: {e}")
+            return
+        try:
+            descarregar(db, motivo=motivo)
+        finally:
+            self.db_manager.release(db)
+
+    def parar(self):
+        """Encerra a thread e grava o que ainda está pendente"""
+        self._parar.set()
+        _sinal.set()
+        self.join()
+        self._descarregar('encerramento')
+
+
+_descarregador: Optional[DescarregadorTempo] = None
+_descarregador_lock = threading.Lock()
+
+
+def iniciar(db_manager, intervalo: float = None) -> bool:
+    """
+    Inicia a gravação periódica deste processo (uma vez)
+
+    Args:
+        db_manager: DatabaseManager do arquivo SQLite
+        intervalo (float): Segundos entre gravações (padrão: TEMPO_ASSISTIDO_FLUSH_S;
+            0 desliga a thread e cada heartbeat é gravado na requisição)
+
+    Returns:
+        bool: True se a thread está em execução
+    """
+    global _descarregador
+    intervalo = TEMPO_ASSISTIDO_FLUSH_S if intervalo is None else intervalo
+    with _descarregador_lock:
+        if _descarregador is not None or intervalo <= 0:
+            return _descarregador is not None
+        _descarregador = DescarregadorTempo(db_manager, intervalo)
+        _descarregador.start()
+        atexit.register(parar)
+        logger.info(f"Tempo assistido gravado a cada {intervalo:g}s")
+        return True
+
+
+def em_execucao() -> bool:
+    """Se a gravação periódica está ativa neste processo"""
+    return _descarregador is not None
+
+
+def parar():
+    """Para a gravação periódica, gravando o pendente"""
+    global _descarregador
+    with _descarregador_lock:
+        if _descarregador is None:
+            return
+        _descarregador.parar()
+        _descarregador = None
@@ -6,6 +6,63 @@ from typing import List, Dict, Optional, Tuple
 import sqlite3
 from datetime import datetime
 
+from utils.database import PaginaKeyset, PaginacaoKeyset, adapt_query
+
+# Versões dos dados servidos pela API de turmas, incrementadas por triggers a
+# cada alteração nas tabelas de que as respostas dependem; os recursos as
+# comparam com o ETag do cliente antes das consultas (utils.http_condicional).
+# 'turmas' cobre turma, matrículas, aulas e professor; 'progresso' só as
+# estatísticas (média, exercícios), para que o progresso dos alunos não
+# invalide o detalhe e a lista de alunos das turmas.
+VERSAO_DDL = """
+    CREATE TABLE IF NOT EXISTS versoes_recursos (
+        recurso TEXT PRIMARY KEY,
+        versao INTEGER NOT NULL DEFAULT 0,
+        atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT OR IGNORE INTO versoes_recursos (recurso) VALUES ('turmas');
+    INSERT OR IGNORE INTO versoes_recursos (recurso) VALUES ('progresso');
+"""
+
+# Recurso -> tabela -> eventos que mudam alguma resposta que depende dele
+GATILHOS_VERSAO = {
+    'turmas': {
+        'turmas': ('INSERT', 'UPDATE', 'DELETE'),
+        'aluno_turma': ('INSERT', 'UPDATE', 'DELETE'),
+        'aulas': ('INSERT', 'DELETE', 'UPDATE OF serie, professor_id'),
+        'users': ('UPDATE OF username, email, first_name, last_name',),
+    },
+    'progresso': {
+        'progresso': ('INSERT', 'DELETE', 'UPDATE OF pontuacao'),
+    },
+}
+
+# Triggers de versões anteriores (progresso incrementava a versão das turmas)
+GATILHOS_REMOVIDOS = (
+    'versao_turmas_progresso_insert',
+    'versao_turmas_progresso_delete',
+    'versao_turmas_progresso_update',
+)
+
+
+def criar_versao_turmas(db: sqlite3.Connection) -> None:
+    """Cria (se necessário) as versões das turmas e os triggers que as incrementam"""
+    db.executescript(VERSAO_DDL)
+    for nome in GATILHOS_REMOVIDOS:
+        db.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    for recurso, tabelas in GATILHOS_VERSAO.items():
+        for tabela, eventos in tabelas.items():
+            for evento in eventos:
+                db.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS versao_{recurso}_{tabela}_{evento.split()[0].lower()}
+                    AFTER {evento} ON {tabela}
+                    BEGIN
+                        UPDATE versoes_recursos SET versao = versao + 1, atualizado_em = CURRENT_TIMESTAMP
+                        WHERE recurso = '{recurso}';
+                    END
+                """)
+    db.commit()
+
 
 class TurmaService:
     """Serviço para operações relacionadas às turmas"""
@@ -13,6 +70,31 @@ class TurmaService:
     def __init__(self, db_connection: sqlite3.Connection):
         self.db = db_connection
     
+    def versao(self, *recursos: str) -> Optional[Tuple[int, ...]]:
+        """
+        Versões atuais dos dados de turmas (uma leitura pela chave primária)
+        
+        Args:
+            *recursos: Versões de que a resposta depende ('turmas', 'progresso')
+            
+        Returns:
+            Optional[Tuple[int, ...]]: Uma versão por recurso, na ordem pedida, ou
+            None se o banco ainda não tem a tabela de versões
+        """
+        recursos = recursos or ('turmas',)
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(
+                f"SELECT recurso, versao FROM versoes_recursos WHERE recurso IN ({', '.join('?' * len(recursos))})",
+                recursos
+            )
+            versoes = dict(cursor.fetchall())
+        except sqlite3.OperationalError:
+            return None
+        if any(recurso not in versoes for recurso in recursos):
+            return None
+        return tuple(versoes[recurso] for recurso in recursos)
+    
     def get_turmas_with_stats(self) -> List[Tuple]:
         """
         Busca todas as turmas com estatísticas completas
@@ -47,6 +129,61 @@ class TurmaService:
         except Exception as e:
             raise Exception(f"Erro ao buscar turmas: {str(e)}")
     
+    def get_turmas_with_stats_page(self, cursor: Optional[str] = None, por_pagina: int = 20) -> PaginaKeyset:
+        """
+        Busca uma página de turmas com estatísticas (mais recentes primeiro)
+        
+        A página de turmas é escolhida antes das junções, pela chave
+        (created_at, id): as estatísticas só são calculadas para as turmas da
+        página, e o custo não cresce com a profundidade.
+        
+        Args:
+            cursor (Optional[str]): Token da página anterior (None = primeira)
+            por_pagina (int): Turmas por página
+            
+        Returns:
+            PaginaKeyset: Tuplas no formato de get_turmas_with_stats e o cursor da próxima página
+            
+        Raises:
+            ValueError: Cursor inválido
+        """
+        paginacao = PaginacaoKeyset([('t.created_at', 'DESC'), ('t.id', 'DESC')], cursor, por_pagina)
+        filtro, params = paginacao.filtro()
+        
+        try:
+            cursor_db = self.db.cursor()
+            
+            query = f"""
+                SELECT 
+                    t.id, t.nome, t.serie, t.created_at,
+                    u.username as professor,
+                    COUNT(at.aluno_id) as total_alunos,
+                    COUNT(a.id) as total_aulas,
+                    AVG(p.pontuacao) as media_progresso
+                FROM (
+                    SELECT t.* FROM turmas t
+                    WHERE {filtro}
+                    ORDER BY {paginacao.order_by()}
+                    LIMIT {paginacao.limite}
+                ) t
+                JOIN users u ON t.professor_id = u.id
+                LEFT JOIN aluno_turma at ON t.id = at.turma_id 
+                    AND (at.status = 'ativo' OR at.status IS NULL)
+                LEFT JOIN aulas a ON t.serie = a.serie 
+                    AND t.professor_id = a.professor_id
+                LEFT JOIN progresso p ON a.id = p.aula_id
+                GROUP BY t.id, t.nome, t.serie, t.created_at, u.username
+                ORDER BY {paginacao.order_by()}
+            """
+            
+            cursor_db.execute(adapt_query(query, self.db), params)
+            turmas = [tuple(row) for row in cursor_db.fetchall()]
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar turmas: {str(e)}")
+        
+        return paginacao.pagina(turmas, chave=lambda turma: (turma[3], turma[0]))
+    
     def get_turma_by_id(self, turma_id: int) -> Optional[Dict]:
         """
         Busca uma turma específica por ID
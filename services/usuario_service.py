@@ -0,0 +1,251 @@
+"""
+Serviço de busca de usuários para a administração
+Busca por nome de usuário, email e nome completo, com filtros por tipo e
+situação e paginação por chave, usando índices em vez de varrer a tabela:
+
+- PostgreSQL: índice GIN de trigramas (pg_trgm) sobre o texto pesquisável
+  (migração 0006), que atende LIKE '%termo%';
+- SQLite: tabela FTS5 com o tokenizador trigram (users_fts), mantida por
+  triggers e criada na primeira busca em bancos antigos.
+
+Termos com menos de 3 caracteres não formam trigramas; para eles a busca é
+por prefixo do nome de usuário ou do email.
+
+A listagem é ordenada por id decrescente (ids são gerados em ordem de
+cadastro, então equivale a "mais recentes primeiro"). Com uma única chave
+inteira, o SQLite percorre o índice FTS já nessa ordem e para ao completar a
+página, em vez de ordenar todos os usuários que contêm o termo.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import logging
+import sqlite3
+
+from utils.database import PaginaKeyset, PaginacaoKeyset, adapt_query, is_sqlite_connection
+
+logger = logging.getLogger(__name__)
+
+TIPOS_USUARIO = ('aluno', 'professor', 'admin')
+
+# Tamanho mínimo do termo para a busca por trigramas
+TAMANHO_MINIMO_TRIGRAMA = 3
+
+# Texto pesquisável no PostgreSQL: deve ser idêntico à expressão do índice idx_users_busca_trgm
+TEXTO_BUSCA_POSTGRES = "lower(u.username || ' ' || u.email || ' ' || u.first_name || ' ' || u.last_name)"
+
+# Tabela FTS5 sem conteúdo próprio (o texto fica em users) e triggers que a
+# mantêm em dia; em tabelas FTS sem conteúdo a remoção é o comando 'delete'
+SQLITE_FTS_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, email, nome, content='', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, username, email, nome)
+        VALUES (new.id, new.username, new.email, new.first_name || ' ' || new.last_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, email, nome)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name || ' ' || old.last_name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, email, first_name, last_name ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, username, email, nome)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name || ' ' || old.last_name);
+        INSERT INTO users_fts (rowid, username, email, nome)
+        VALUES (new.id, new.username, new.email, new.first_name || ' ' || new.last_name);
+    END;
+"""
+
+# Bancos SQLite cujo índice de busca já foi verificado neste processo
+_bancos_com_fts = set()
+
+
+def criar_indice_busca_sqlite(db: sqlite3.Connection) -> bool:
+    """
+    Cria (se necessário) a tabela users_fts e preenche com os usuários existentes
+
+    Args:
+        db (sqlite3.Connection): Conexão com o banco
+
+    Returns:
+        bool: True se a busca FTS5 está disponível
+    """
+    existe = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+    ).fetchone()
+    if existe:
+        return True
+
+    try:
+        db.executescript(SQLITE_FTS_DDL)
+        db.execute("""
+            INSERT INTO users_fts (rowid, username, email, nome)
+            SELECT id, username, email, first_name || ' ' || last_name FROM users
+        """)
+        db.commit()
+        logger.info("Índice de busca de usuários (FTS5) criado")
+        return True
+    except sqlite3.OperationalError as e:
+        # SQLite sem FTS5 ou sem o tokenizador trigram (anterior à 3.34)
+        db.rollback()
+        logger.warning(f"Busca FTS5 indisponível, usando LIKE: {e}")
+        return False
+
+
+def _escapar_like(termo: str) -> str:
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@dataclass
+class FiltroUsuarios:
+    """Critérios da busca de usuários"""
+    termo: str = ''
+    user_type: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    @classmethod
+    def de_args(cls, args) -> 'FiltroUsuarios':
+        """
+        Monta o filtro a partir dos parâmetros da URL (q, tipo, ativo)
+
+        Valores desconhecidos são ignorados.
+        """
+        tipo = args.get('tipo') or None
+        ativo = args.get('ativo')
+        return cls(
+            termo=(args.get('q') or '').strip()[:100],
+            user_type=tipo if tipo in TIPOS_USUARIO else None,
+            is_active={'1': True, '0': False}.get(ativo),
+        )
+
+    def como_args(self) -> dict:
+        """Parâmetros de URL que reproduzem o filtro (para os links de paginação)"""
+        args = {}
+        if self.termo:
+            args['q'] = self.termo
+        if self.user_type:
+            args['tipo'] = self.user_type
+        if self.is_active is not None:
+            args['ativo'] = '1' if self.is_active else '0'
+        return args
+
+
+class UsuarioService:
+    """Serviço para a listagem e busca de usuários"""
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+        self.sqlite = is_sqlite_connection(db_connection)
+
+    def _fts_disponivel(self) -> bool:
+        banco = self.db.execute("PRAGMA database_list").fetchone()[2] or ':memory:'
+        if banco in _bancos_com_fts:
+            return True
+        if criar_indice_busca_sqlite(self.db):
+            if banco != ':memory:':
+                _bancos_com_fts.add(banco)
+            return True
+        return False
+
+    def _condicao_termo(self, termo: str):
+        """
+        Condição SQL e parâmetros da busca textual
+
+        Returns:
+            tuple: (condição, parâmetros, usa_fts); com usa_fts a condição é
+            sobre a tabela users_fts (alias f), que deve conduzir a consulta
+        """
+        termo = termo.lower()
+        if len(termo) < TAMANHO_MINIMO_TRIGRAMA:
+            prefixo = _escapar_like(termo) + '%'
+            return ("(lower(u.username) LIKE %s ESCAPE '\\' OR lower(u.email) LIKE %s ESCAPE '\\')",
+                    [prefixo, prefixo], False)
+
+        if self.sqlite:
+            if self._fts_disponivel():
+                # Frase entre aspas: o trigram casa o termo em qualquer posição
+                return "users_fts MATCH %s", ['"' + termo.replace('"', '""') + '"'], True
+            contem = '%' + _escapar_like(termo) + '%'
+            return ("lower(u.username || ' ' || u.email || ' ' || u.first_name || ' ' || u.last_name) "
+                    "LIKE %s ESCAPE '\\'", [contem], False)
+
+        return f"{TEXTO_BUSCA_POSTGRES} LIKE %s ESCAPE '\\'", ['%' + _escapar_like(termo) + '%'], False
+
+    def buscar(self, filtro: FiltroUsuarios, cursor: Optional[str] = None, por_pagina: int = 50) -> PaginaKeyset:
+        """
+        Busca uma página de usuários, dos mais recentes para os mais antigos
+
+        Cada item é uma tupla (id, username, email, user_type, created_at,
+        first_name, last_name, contador, is_active), em que contador é o
+        número de turmas do aluno (matrículas ativas) ou do professor.
+
+        Args:
+            filtro (FiltroUsuarios): Termo e filtros
+            cursor (Optional[str]): Token da página anterior
+            por_pagina (int): Usuários por página
+
+        Returns:
+            PaginaKeyset: Usuários da página e o cursor da próxima
+
+        Raises:
+            ValueError: Cursor inválido
+        """
+        condicoes, params = [], []
+        usa_fts = False
+        if filtro.termo:
+            condicao, valores, usa_fts = self._condicao_termo(filtro.termo)
+            condicoes.append(condicao)
+            params.extend(valores)
+
+        # Com FTS a chave é o rowid do índice, para que ele seja lido já na
+        # ordem da página; o cursor é o mesmo (o id do último usuário)
+        chave = 'f.rowid' if usa_fts else 'u.id'
+        paginacao = PaginacaoKeyset([(chave, 'DESC')], cursor, por_pagina)
+        filtro_keyset, params_keyset = paginacao.filtro()
+        condicoes.append(filtro_keyset)
+        params.extend(params_keyset)
+
+        if filtro.user_type:
+            condicoes.append("u.user_type = %s")
+            params.append(filtro.user_type)
+        if filtro.is_active is not None:
+            condicoes.append("u.is_active = %s")
+            params.append(filtro.is_active)
+
+        # O app SQLite guarda as turmas dos alunos em aluno_turma; o PostgreSQL, em matriculas
+        if self.sqlite:
+            turmas_aluno = """
+                SELECT COUNT(*) FROM aluno_turma at
+                WHERE at.aluno_id = u.id AND (at.status = 'ativo' OR at.status IS NULL)
+            """
+        else:
+            turmas_aluno = """
+                SELECT COUNT(*) FROM matriculas m
+                WHERE m.aluno_id = u.id AND (m.status = 'ativa' OR m.status IS NULL)
+            """
+
+        origem = "users_fts f CROSS JOIN users u ON u.id = f.rowid" if usa_fts else "users u"
+        query = f"""
+            SELECT
+                u.id, u.username, u.email, u.user_type, u.created_at,
+                u.first_name, u.last_name,
+                CASE
+                    WHEN u.user_type = 'aluno' THEN ({turmas_aluno})
+                    WHEN u.user_type = 'professor' THEN (
+                        SELECT COUNT(*) FROM turmas t
+                        WHERE t.professor_id = u.id
+                    )
+                    ELSE 0
+                END as contador,
+                u.is_active
+            FROM {origem}
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY {paginacao.order_by()}
+            LIMIT {paginacao.limite}
+        """
+        cur = self.db.cursor()
+        try:
+            cur.execute(adapt_query(query, self.db), tuple(params))
+            usuarios = [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+        return paginacao.pagina(usuarios, chave=lambda usuario: (usuario[0],))
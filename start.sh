@@ -23,16 +23,13 @@ else
     echo "✅ DATABASE_URL configurada: ${DATABASE_URL:0:20}..."
 fi
 
-# Verificar se init_db_postgres.py existe
-if [ ! -f "init_db_postgres.py" ]; then
-    echo "❌ ERRO: init_db_postgres.py não encontrado!"
-    echo "📋 Arquivos Python disponíveis:"
-    ls -la *.py
+# As migrações pendentes são aplicadas pelo gunicorn.conf.py (hook on_starting),
+# no próprio processo do gunicorn; com o esquema atual isso é uma única consulta
+if [ ! -f "gunicorn.conf.py" ]; then
+    echo "❌ ERRO: gunicorn.conf.py não encontrado!"
     exit 1
 fi
-
-echo "🐍 Executando init_db_postgres.py..."
-python init_db_postgres.py
+echo "✅ Migrações serão verificadas na inicialização do gunicorn"
 
 echo ""
 echo "🌐 =========================================="
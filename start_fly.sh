@@ -7,11 +7,7 @@ echo "🚀 Iniciando Educa Fácil no Fly.io..."
 if [ -n "$FLY_APP_NAME" ]; then
     echo "✅ Detectado ambiente Fly.io: $FLY_APP_NAME"
     
-    # Inicializar banco de dados
-    echo "🗄️ Inicializando banco de dados..."
-    python init_db_postgres.py
-    
-    # Iniciar aplicação
+    # Iniciar aplicação (migrações pendentes aplicadas pelo gunicorn.conf.py)
     echo "🌐 Iniciando aplicação..."
     gunicorn --bind 0.0.0.0:8080 --workers 2 --timeout 120 app_postgres:app
 else
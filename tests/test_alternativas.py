@@ -0,0 +1,67 @@
+"""
+Testes unitários para a leitura e o armazenamento das alternativas
+"""
+import sqlite3
+
+import pytest
+
+from utils import alternativas
+
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória com exercícios no formato antigo"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE exercicios (id INTEGER PRIMARY KEY, alternativas TEXT NOT NULL);
+        INSERT INTO exercicios VALUES (1, '7|8|9'), (2, '["a", "b"]'), (3, '{"A": "x", "B": "y"}');
+    """)
+    yield conn
+    conn.close()
+
+
+class TestLer:
+    """Testes para os formatos aceitos"""
+
+    @pytest.mark.parametrize('valor, esperado', [
+        ('7|8| 9 ', ['7', '8', '9']),
+        ('["x = 4", "x = 5"]', ['x = 4', 'x = 5']),
+        ('{"A": "Gato", "B": "Vaca"}', ['Gato', 'Vaca']),
+        ('"1|2"', ['1', '2']),
+        ('Sim\nNão\n', ['Sim', 'Não']),
+        (['a', 'b'], ['a', 'b']),
+        ({'A': 'a'}, ['a']),
+        ('[quebrado|x', ['[quebrado', 'x']),
+        ('', []),
+        (None, []),
+    ])
+    def test_formatos(self, valor, esperado):
+        assert alternativas.ler(valor) == esperado
+
+    def test_serializar(self):
+        assert alternativas.serializar('5x²|7x') == '["5x²", "7x"]'
+
+    def test_como_opcoes(self):
+        assert alternativas.como_opcoes('a|b') == {'A': 'a', 'B': 'b'}
+        assert alternativas.como_opcoes('{"B": "5"}') == {'B': '5'}
+        assert alternativas.como_opcoes(['x']) == {'A': 'x'}
+
+
+class TestConverterSqlite:
+    """Testes para a conversão dos bancos antigos"""
+
+    def test_converte_e_valida(self, db):
+        assert alternativas.converter_sqlite(db) == 2
+        assert db.execute("SELECT alternativas FROM exercicios ORDER BY id").fetchall() == [
+            ('["7", "8", "9"]',), ('["a", "b"]',), ('["x", "y"]',)
+        ]
+
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute("INSERT INTO exercicios VALUES (4, 'a|b')")
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute("UPDATE exercicios SET alternativas = '{}' WHERE id = 1")
+        db.execute("INSERT INTO exercicios VALUES (4, '[\"ok\"]')")
+
+    def test_segunda_vez_nao_faz_nada(self, db):
+        alternativas.converter_sqlite(db)
+        assert alternativas.converter_sqlite(db) == 0
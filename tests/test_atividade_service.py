@@ -0,0 +1,231 @@
+"""
+Testes unitários para AtividadeDiariaService
+"""
+import os
+
+import pytest
+import sqlite3
+from datetime import date, datetime
+from services.atividade_service import PONTOS_AULA, AtividadeDiariaService, distribuir_minutos
+
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória com as tabelas usadas pela agregação"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY, username TEXT, first_name TEXT, last_name TEXT
+        );
+        CREATE TABLE aluno_turma (aluno_id INTEGER, turma_id INTEGER, status TEXT);
+        CREATE TABLE progresso (
+            aluno_id INTEGER, aula_id INTEGER, ultima_atividade TIMESTAMP, tempo_assistido INTEGER
+        );
+        CREATE TABLE historico_pontos (
+            aluno_id INTEGER, pontos INTEGER, tipo TEXT, referencia_tipo TEXT, data_ganho TIMESTAMP
+        );
+        CREATE TABLE respostas_alunos (
+            aluno_id INTEGER, exercicio_id INTEGER, pontos_ganhos INTEGER, created_at TIMESTAMP
+        );
+        CREATE TABLE atividade_diaria (
+            aluno_id INTEGER NOT NULL,
+            data DATE NOT NULL,
+            aulas INTEGER NOT NULL DEFAULT 0,
+            exercicios INTEGER NOT NULL DEFAULT 0,
+            pontos INTEGER NOT NULL DEFAULT 0,
+            minutos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (aluno_id, data)
+        );
+        INSERT INTO users VALUES (1, 'ana', 'Ana', 'Costa'), (2, 'joao', 'João', 'Pereira');
+        INSERT INTO aluno_turma VALUES (1, 10, 'ativo'), (2, 10, 'ativo');
+    """)
+    yield conn
+    conn.close()
+
+
+class TestAtividadeDiariaService:
+    """Testes para AtividadeDiariaService"""
+
+    def test_registrar_acumula_no_mesmo_dia(self, db):
+        """Escritas no mesmo dia somam na mesma linha"""
+        service = AtividadeDiariaService(db)
+        service.registrar(1, exercicios=1, pontos=10, momento=datetime(2024, 3, 11, 15, 0))
+        service.registrar(1, exercicios=1, pontos=5, momento=datetime(2024, 3, 11, 16, 0))
+        service.registrar(1, aulas=1, momento=datetime(2024, 3, 12, 15, 0))
+
+        tendencia = service.get_tendencia(1, dias=7, hoje=date(2024, 3, 12))
+
+        assert len(tendencia) == 2
+        assert tendencia[0]['exercicios'] == 2
+        assert tendencia[0]['pontos'] == 15
+        assert tendencia[1]['aulas'] == 1
+
+    def test_tendencia_respeita_janela(self, db):
+        """Dias fora da janela não são retornados"""
+        service = AtividadeDiariaService(db)
+        service.registrar(1, pontos=10, momento=datetime(2024, 3, 1, 15, 0))
+        service.registrar(1, pontos=20, momento=datetime(2024, 3, 11, 15, 0))
+
+        heatmap = service.get_heatmap(1, dias=7, hoje=date(2024, 3, 12))
+
+        assert heatmap == {'2024-03-11': 20}
+
+    def test_ranking_semanal(self, db):
+        """Ranking soma apenas a semana corrente e ordena por pontos"""
+        service = AtividadeDiariaService(db)
+        service.registrar(1, pontos=30, momento=datetime(2024, 3, 11, 15, 0))  # segunda
+        service.registrar(2, pontos=50, momento=datetime(2024, 3, 12, 15, 0))
+        service.registrar(1, pontos=100, momento=datetime(2024, 3, 8, 15, 0))  # semana anterior
+
+        ranking = service.get_ranking_semanal(10, hoje=date(2024, 3, 13))
+
+        assert [(r[0], r[3], r[4]) for r in ranking] == [('joao', 50, 1), ('ana', 30, 2)]
+
+    def test_rebuild_a_partir_do_historico(self, db):
+        """Rebuild conta respostas, aulas concluídas e minutos; outros pontos ficam de fora"""
+        db.executescript("""
+            INSERT INTO progresso VALUES (1, 100, '2024-03-11 15:00:00', 600);
+            INSERT INTO progresso VALUES (1, 101, '2024-03-11 15:30:00', 0);
+            INSERT INTO respostas_alunos VALUES (1, 7, 10, '2024-03-11 16:00:00');
+            INSERT INTO respostas_alunos VALUES (1, 8, 0, '2024-03-11 16:01:00');
+            INSERT INTO historico_pontos VALUES (1, 10, 'exercicio', 'exercicio', '2024-03-11 16:00:00');
+            INSERT INTO historico_pontos VALUES (1, 25, 'bonus', 'aula', '2024-03-11 16:30:00');
+            INSERT INTO historico_pontos VALUES (1, 50, 'conquista', NULL, '2024-03-11 16:30:00');
+        """)
+        service = AtividadeDiariaService(db)
+
+        total = service.rebuild()
+        linha = service.get_tendencia(1, dias=1, hoje=date(2024, 3, 11))[0]
+
+        assert total == 1
+        assert (linha['aulas'], linha['exercicios'], linha['pontos'], linha['minutos']) == (1, 2, 35, 10)
+
+    def test_rebuild_igual_ao_registrar(self, db):
+        """Os contadores do rebuild são os que as escritas incrementais teriam gravado"""
+        db.executescript("""
+            INSERT INTO respostas_alunos VALUES (1, 7, 10, '2024-03-11 16:00:00');
+            INSERT INTO historico_pontos VALUES (1, 25, 'bonus', 'aula', '2024-03-11 16:30:00');
+        """)
+        service = AtividadeDiariaService(db)
+        # Resposta e aula concluída (fila de gamificação), no mesmo dia
+        service.registrar(1, exercicios=1, pontos=10, momento=datetime(2024, 3, 11, 16, 0))
+        service.registrar(1, aulas=1, pontos=25, momento=datetime(2024, 3, 11, 16, 30))
+        incremental = service.get_tendencia(1, dias=1, hoje=date(2024, 3, 11))
+
+        service.rebuild()
+
+        assert service.get_tendencia(1, dias=1, hoje=date(2024, 3, 11)) == incremental
+
+    def test_rebuild_desde_filtra_no_fuso_da_escola(self, db):
+        """Dias anteriores ficam intactos; 02:00 UTC do dia 12 ainda é dia 11 em São Paulo"""
+        db.executescript("""
+            INSERT INTO respostas_alunos VALUES (1, 7, 10, '2024-03-12 02:00:00');
+            INSERT INTO respostas_alunos VALUES (1, 8, 5, '2024-03-12 15:00:00');
+        """)
+        service = AtividadeDiariaService(db)
+        service.registrar(1, exercicios=3, pontos=30, momento=datetime(2024, 3, 11, 15, 0))
+
+        assert service.rebuild(desde=date(2024, 3, 12)) == 1
+
+        tendencia = service.get_tendencia(1, dias=2, hoje=date(2024, 3, 12))
+        assert [(str(t['data']), t['exercicios'], t['pontos']) for t in tendencia] == [
+            ('2024-03-11', 3, 30), ('2024-03-12', 1, 5)
+        ]
+
+    def test_rebuild_desde_nao_conta_minutos_anteriores(self, db):
+        """Aula vista antes e depois do corte: só os minutos depois dele entram de novo"""
+        service = AtividadeDiariaService(db)
+        # 10 minutos no dia 11 e 5 no dia 12 da mesma aula; outra aula só no dia 11
+        service.registrar(1, minutos=10, momento=datetime(2024, 3, 11, 15, 0))
+        service.registrar(1, minutos=3, momento=datetime(2024, 3, 11, 16, 0))
+        service.registrar(1, minutos=5, momento=datetime(2024, 3, 12, 15, 0))
+        db.executescript("""
+            INSERT INTO progresso VALUES (1, 100, '2024-03-12 15:00:00', 900);
+            INSERT INTO progresso VALUES (1, 101, '2024-03-11 16:00:00', 180);
+        """)
+        incremental = service.get_tendencia(1, dias=2, hoje=date(2024, 3, 12))
+
+        service.rebuild(desde=date(2024, 3, 12))
+
+        assert service.get_tendencia(1, dias=2, hoje=date(2024, 3, 12)) == incremental
+        assert [t['minutos'] for t in incremental] == [13, 5]
+
+    def test_distribuir_minutos_desconta_das_aulas_mais_antigas(self):
+        """O que os dias mantidos já contam sai primeiro da aula com atividade mais antiga"""
+        janela = [
+            (1, '2024-03-12 15:00:00', date(2024, 3, 12), 20),
+            (1, '2024-03-13 15:00:00', date(2024, 3, 13), 10),
+            (2, '2024-03-12 15:00:00', date(2024, 3, 12), 0),
+        ]
+
+        assert distribuir_minutos(janela, {1: 25}) == {
+            (1, date(2024, 3, 12)): 0, (1, date(2024, 3, 13)): 5, (2, date(2024, 3, 12)): 0
+        }
+
+    def test_registrar_minutos(self, db):
+        """Minutos de vários alunos em um único upsert, somando aos já gravados"""
+        service = AtividadeDiariaService(db)
+        service.registrar(1, minutos=2, momento=datetime(2024, 3, 11, 15, 0))
+
+        assert service.registrar_minutos({(1, date(2024, 3, 11)): 3, (2, date(2024, 3, 11)): 0}) == 1
+
+        assert db.execute("SELECT aluno_id, minutos FROM atividade_diaria").fetchall() == [(1, 5)]
+
+
+@pytest.mark.skipif(not os.getenv('TEST_DATABASE_URL'), reason='TEST_DATABASE_URL (PostgreSQL) não definida')
+class TestRebuildPostgres:
+    """Rebuild no PostgreSQL, em tabelas temporárias (desfeitas ao final)"""
+
+    @pytest.fixture
+    def pg(self):
+        psycopg = pytest.importorskip('psycopg')
+        conn = psycopg.connect(os.environ['TEST_DATABASE_URL'])
+        conn.execute("""
+            CREATE TEMP TABLE progresso_alunos (
+                aluno_id INTEGER, aula_id INTEGER, tempo_gasto INTEGER,
+                data_conclusao TIMESTAMP, updated_at TIMESTAMP
+            );
+            CREATE TEMP TABLE respostas_alunos (
+                aluno_id INTEGER, exercicio_id INTEGER, pontos_ganhos INTEGER, created_at TIMESTAMP
+            );
+            CREATE TEMP TABLE atividade_diaria (
+                aluno_id INTEGER NOT NULL, data DATE NOT NULL,
+                aulas INTEGER NOT NULL DEFAULT 0, exercicios INTEGER NOT NULL DEFAULT 0,
+                pontos INTEGER NOT NULL DEFAULT 0, minutos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (aluno_id, data)
+            );
+        """)
+        yield conn
+        conn.rollback()
+        conn.close()
+
+    def linhas(self, pg):
+        return pg.execute(
+            "SELECT aluno_id, data, aulas, exercicios, pontos, minutos FROM atividade_diaria ORDER BY data"
+        ).fetchall()
+
+    def test_rebuild_igual_ao_registrar(self, pg):
+        """Aula concluída conta PONTOS_AULA, como o bônus da fila de gamificação"""
+        service = AtividadeDiariaService(pg)
+        service.registrar(1, exercicios=1, pontos=10, momento=datetime(2024, 3, 12, 16, 0), commit=False)
+        service.registrar(1, aulas=1, pontos=PONTOS_AULA, minutos=15, momento=datetime(2024, 3, 12, 16, 30),
+                          commit=False)
+        pg.execute("INSERT INTO progresso_alunos VALUES (1, 100, 15, '2024-03-12 16:30:00', '2024-03-12 16:30:00')")
+        pg.execute("INSERT INTO respostas_alunos VALUES (1, 7, 10, '2024-03-12 16:00:00')")
+        incremental = self.linhas(pg)
+
+        service.rebuild(commit=False)
+
+        assert self.linhas(pg) == incremental
+
+    def test_rebuild_desde_nao_conta_minutos_anteriores(self, pg):
+        """Aula vista antes e depois do corte: só os minutos depois dele entram de novo"""
+        service = AtividadeDiariaService(pg)
+        service.registrar(1, minutos=10, momento=datetime(2024, 3, 11, 15, 0), commit=False)
+        service.registrar(1, minutos=5, momento=datetime(2024, 3, 12, 15, 0), commit=False)
+        pg.execute("INSERT INTO progresso_alunos VALUES (1, 100, 15, NULL, '2024-03-12 15:00:00')")
+        incremental = self.linhas(pg)
+
+        service.rebuild(desde=date(2024, 3, 12), commit=False)
+
+        assert self.linhas(pg) == incremental
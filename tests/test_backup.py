@@ -0,0 +1,146 @@
+"""
+Testes unitários para os backups online do SQLite e a restauração
+"""
+import gzip
+import os
+import sqlite3
+import graphlib
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.backup import backup_sqlite, nome_backup, ordem_de_carga, restaurar_sqlite, rotacionar
+from utils.database import DatabaseManager
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = str(tmp_path / 'escola.db')
+    db = sqlite3.connect(caminho)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("CREATE TABLE pontos (aluno_id INTEGER PRIMARY KEY, total INTEGER NOT NULL)")
+    db.executemany("INSERT INTO pontos VALUES (?, ?)", [(i, i * 10) for i in range(1, 2001)])
+    db.commit()
+    db.close()
+    return caminho
+
+
+def _total(caminho):
+    db = sqlite3.connect(caminho)
+    try:
+        return db.execute("SELECT COUNT(*), SUM(total) FROM pontos").fetchone()
+    finally:
+        db.close()
+
+
+class TestBackupSQLite:
+    """Testes para backup_sqlite e rotacionar"""
+
+    def test_backup_em_passos(self, banco, tmp_path):
+        """A cópia em passos pequenos tem todos os dados e informa a vazão"""
+        resultado = backup_sqlite(banco, str(tmp_path / 'copia.db'), paginas=1, pausa=0)
+
+        assert resultado.caminho == str(tmp_path / 'copia.db')
+        assert resultado.bytes == os.path.getsize(resultado.caminho)
+        assert resultado.bytes_por_segundo > 0
+        assert _total(resultado.caminho) == _total(banco)
+        assert not os.path.exists(resultado.caminho + '.tmp')
+
+    def test_backup_comprimido(self, banco, tmp_path):
+        """Com comprimir o arquivo recebe .gz e descomprime para um banco válido"""
+        resultado = backup_sqlite(banco, str(tmp_path / 'copia.db'), comprimir=True, pausa=0)
+        assert resultado.caminho.endswith('copia.db.gz')
+
+        restaurado = tmp_path / 'restaurado.db'
+        with gzip.open(resultado.caminho, 'rb') as f:
+            restaurado.write_bytes(f.read())
+        assert _total(str(restaurado)) == _total(banco)
+
+    def test_backup_com_escritas_concorrentes(self, banco, tmp_path):
+        """Escritas durante a cópia não impedem que ela termine nem a corrompem"""
+        parar = threading.Event()
+
+        def escrever():
+            db = sqlite3.connect(banco, timeout=5)
+            aluno_id = 10000
+            while not parar.is_set():
+                db.execute("INSERT INTO pontos VALUES (?, 1)", (aluno_id,))
+                db.commit()
+                aluno_id += 1
+            db.close()
+
+        escritor = threading.Thread(target=escrever)
+        escritor.start()
+        try:
+            resultado = backup_sqlite(banco, str(tmp_path / 'copia.db'), paginas=1, pausa=0.001)
+        finally:
+            parar.set()
+            escritor.join()
+
+        db = sqlite3.connect(resultado.caminho)
+        assert db.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+        assert db.execute("SELECT COUNT(*) FROM pontos WHERE aluno_id <= 2000").fetchone()[0] == 2000
+        db.close()
+
+    def test_rotacionar_mantem_os_mais_recentes(self, tmp_path):
+        """Apenas os N backups mais novos com o prefixo permanecem"""
+        base = datetime(2024, 3, 1, 12, 0, 0)
+        nomes = [nome_backup('escola', '.db', base + timedelta(hours=h)) for h in range(5)]
+        for nome in nomes + ['outro_20240101T000000.db']:
+            (tmp_path / nome).write_bytes(b'x')
+
+        removidos = rotacionar(str(tmp_path), 'escola_', 2)
+
+        assert sorted(os.path.basename(r) for r in removidos) == nomes[:3]
+        assert sorted(os.listdir(tmp_path)) == sorted(nomes[3:] + ['outro_20240101T000000.db'])
+
+    def test_database_manager_backup(self, banco, tmp_path):
+        """backup_database usa a cópia online e aplica a rotação"""
+        manager = DatabaseManager(banco, modo='producao')
+        destino = tmp_path / 'backups'
+        destino.mkdir()
+        (destino / 'escola_20000101T000000.db.gz').write_bytes(b'antigo')
+
+        assert manager.backup_database(str(destino / nome_backup('escola', '.db')), comprimir=True, manter=1)
+
+        arquivos = os.listdir(destino)
+        assert len(arquivos) == 1 and arquivos[0].endswith('.db.gz')
+        assert arquivos[0] != 'escola_20000101T000000.db.gz'
+
+
+class TestRestauracao:
+    """Testes para restaurar_sqlite e a ordem de carga do PostgreSQL"""
+
+    def test_restaurar_sqlite_substitui_o_banco(self, banco, tmp_path):
+        """O backup comprimido volta por cima de um banco alterado depois dele"""
+        resultado = backup_sqlite(banco, str(tmp_path / 'copia.db'), comprimir=True, pausa=0)
+        esperado = _total(banco)
+
+        db = sqlite3.connect(banco)
+        db.execute("DELETE FROM pontos WHERE aluno_id > 10")
+        db.execute("CREATE TABLE depois (id INTEGER)")
+        db.commit()
+        db.close()
+
+        restaurar_sqlite(resultado.caminho, banco)
+
+        assert _total(banco) == esperado
+        db = sqlite3.connect(banco)
+        assert db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'depois'").fetchone()[0] == 0
+        db.close()
+        # O arquivo descomprimido temporário foi removido
+        assert [n for n in os.listdir(tmp_path) if not n.startswith(('escola.db', 'copia.db'))] == []
+
+    def test_ordem_de_carga_respeita_chaves_estrangeiras(self):
+        referencias = [('matriculas', 'users'), ('matriculas', 'turmas'), ('turmas', 'users'),
+                       ('forum_respostas', 'forum_respostas'), ('forum_respostas', 'users'),
+                       ('fora_do_backup', 'users')]
+
+        ordem = ordem_de_carga(['turmas', 'matriculas', 'forum_respostas', 'users'], referencias)
+
+        assert ordem == ['users', 'forum_respostas', 'turmas', 'matriculas']
+
+    def test_ordem_de_carga_com_ciclo(self):
+        with pytest.raises(graphlib.CycleError):
+            ordem_de_carga(['a', 'b'], [('a', 'b'), ('b', 'a')])
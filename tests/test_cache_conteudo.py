@@ -0,0 +1,119 @@
+"""
+Testes unitários para o cache de conteúdo de aulas e exercícios
+"""
+import threading
+
+from utils.cache_conteudo import CacheConteudo, tamanho_aproximado
+
+
+class Carregador:
+    """Conta as cargas e retorna o conteúdo de `valores`"""
+
+    def __init__(self, valores):
+        self.valores = valores
+        self.cargas = 0
+
+    def para(self, chave_id, aula_id=None):
+        def carregar():
+            self.cargas += 1
+            valor = self.valores.get(chave_id)
+            return None if valor is None else (valor, aula_id if aula_id is not None else chave_id)
+        return carregar
+
+
+class TestCacheConteudo:
+    """Testes para leitura, versão, invalidação e limite de tamanho"""
+
+    def test_carrega_uma_vez(self):
+        cache = CacheConteudo(1024 * 1024)
+        carregador = Carregador({1: ('Frações', ['ex1', 'ex2'])})
+
+        assert cache.obter('aula', 1, carregador.para(1)) == ('Frações', ['ex1', 'ex2'])
+        assert cache.obter('aula', 1, carregador.para(1)) == ('Frações', ['ex1', 'ex2'])
+        assert carregador.cargas == 1
+
+    def test_nao_guarda_inexistente(self):
+        cache = CacheConteudo(1024 * 1024)
+        carregador = Carregador({})
+
+        assert cache.obter('aula', 9, carregador.para(9)) is None
+        carregador.valores[9] = 'Criada depois'
+        assert cache.obter('aula', 9, carregador.para(9)) == 'Criada depois'
+
+    def test_versao_diferente_recarrega(self):
+        cache = CacheConteudo(1024 * 1024)
+        carregador = Carregador({1: 'v1'})
+        cache.obter('aula', 1, carregador.para(1), versao='2025-01-01 10:00:00')
+
+        carregador.valores[1] = 'v2'
+        assert cache.obter('aula', 1, carregador.para(1), versao='2025-01-01 10:00:00') == 'v1'
+        assert cache.obter('aula', 1, carregador.para(1), versao='2025-01-02 08:00:00') == 'v2'
+        assert cache.obter('aula', 1, carregador.para(1)) == 'v2'
+        assert carregador.cargas == 2
+
+    def test_invalidar_aula_descarta_exercicios(self):
+        cache = CacheConteudo(1024 * 1024)
+        carregador = Carregador({1: 'aula 1', 10: 'exercício 10', 20: 'exercício 20'})
+        cache.obter('aula', 1, carregador.para(1))
+        cache.obter('exercicio', 10, carregador.para(10, aula_id=1))
+        cache.obter('exercicio', 20, carregador.para(20, aula_id=2))
+
+        assert cache.invalidar_aula(1) == 2
+        assert cache.estatisticas()['entradas'] == 1
+        assert cache.bytes == tamanho_aproximado('exercício 20')
+
+    def test_carga_anterior_a_invalidacao_nao_e_guardada(self):
+        cache = CacheConteudo(1024 * 1024)
+
+        def carregar():
+            # O professor edita a aula enquanto ela é lida do banco
+            cache.invalidar_aula(1)
+            return 'antigo', 1
+
+        assert cache.obter('aula', 1, carregar) == 'antigo'
+        assert cache.estatisticas()['entradas'] == 0
+
+    def test_descarta_menos_usado(self):
+        valor = 'x' * 1000
+        cache = CacheConteudo(tamanho_aproximado(valor) * 2)
+        carregador = Carregador({1: valor, 2: valor, 3: valor})
+        cache.obter('aula', 1, carregador.para(1))
+        cache.obter('aula', 2, carregador.para(2))
+        cache.obter('aula', 1, carregador.para(1))
+        cache.obter('aula', 3, carregador.para(3))
+
+        assert carregador.cargas == 3
+        cache.obter('aula', 1, carregador.para(1))
+        assert carregador.cargas == 3
+        cache.obter('aula', 2, carregador.para(2))
+        assert carregador.cargas == 4
+        assert cache.bytes <= cache.limite_bytes
+
+    def test_limite_zero_desliga(self):
+        cache = CacheConteudo(0)
+        carregador = Carregador({1: 'aula'})
+
+        assert cache.obter('aula', 1, carregador.para(1)) == 'aula'
+        assert cache.obter('aula', 1, carregador.para(1)) == 'aula'
+        assert carregador.cargas == 2
+
+    def test_concorrente(self):
+        cache = CacheConteudo(64 * 1024)
+        carregador = Carregador({i: f'aula {i}' * 50 for i in range(200)})
+
+        def ler(deslocamento):
+            for i in range(1000):
+                chave = (i * 7 + deslocamento) % 200
+                assert cache.obter('aula', chave, carregador.para(chave)) == f'aula {chave}' * 50
+                if i % 97 == 0:
+                    cache.invalidar_aula(chave)
+
+        threads = [threading.Thread(target=ler, args=(d,)) for d in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert 0 <= cache.bytes <= cache.limite_bytes
+        assert cache.bytes == sum(tamanho_aproximado(f'aula {i}' * 50)
+                                  for (_, i) in list(cache._entradas))
@@ -0,0 +1,166 @@
+"""
+Testes unitários para a compressão das respostas e os estáticos com hash
+"""
+import gzip
+import json
+
+import pytest
+from flask import Flask, jsonify, url_for
+
+import build_static
+from utils import compressao
+
+CSS = ('.card { padding: 1rem; margin: 0 auto; }\n' * 100).encode()
+
+
+def criar_app(pasta_static):
+    """App mínimo com respostas grandes, pequenas e fora da lista de tipos"""
+    app = Flask(__name__, static_folder=str(pasta_static))
+
+    @app.route('/grande')
+    def grande():
+        return '<p>conteúdo repetido</p>' * 200
+
+    @app.route('/pequena')
+    def pequena():
+        return '<p>ok</p>'
+
+    @app.route('/api')
+    def api():
+        return jsonify(itens=[{'id': i, 'nome': f'Aula {i}'} for i in range(200)])
+
+    @app.route('/imagem')
+    def imagem():
+        return app.response_class(b'\x89PNG' * 1000, mimetype='image/png')
+
+    @app.route('/versionada')
+    def versionada():
+        resposta = app.make_response('<p>versão</p>' * 200)
+        resposta.set_etag('abc123')
+        return resposta
+
+    @app.route('/link')
+    def link():
+        return url_for('static', filename='css/base.css')
+
+    compressao.init_app(app)
+    return app
+
+
+@pytest.fixture
+def pasta_static(tmp_path):
+    """Pasta static com um CSS comprimível e um arquivo pequeno"""
+    pasta = tmp_path / 'static'
+    (pasta / 'css').mkdir(parents=True)
+    (pasta / 'css' / 'base.css').write_bytes(CSS)
+    (pasta / 'robots.txt').write_bytes(b'User-agent: *\n')
+    return pasta
+
+
+@pytest.fixture
+def client(pasta_static):
+    """Cliente de um app sem build dos estáticos"""
+    return criar_app(pasta_static).test_client()
+
+
+class TestRespostasDinamicas:
+    """Testes para a compressão após cada requisição"""
+
+    def test_comprime_com_gzip(self, client):
+        resposta = client.get('/grande', headers={'Accept-Encoding': 'gzip'})
+        assert resposta.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resposta.headers['Vary']
+        assert int(resposta.headers['Content-Length']) < 200 * len('<p>conteúdo repetido</p>')
+        assert gzip.decompress(resposta.data).decode() == '<p>conteúdo repetido</p>' * 200
+
+    def test_json_da_api(self, client):
+        resposta = client.get('/api', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert resposta.headers['Content-Encoding'] == 'gzip'
+        assert len(json.loads(gzip.decompress(resposta.data))['itens']) == 200
+
+    def test_sem_accept_encoding(self, client):
+        resposta = client.get('/grande')
+        assert 'Content-Encoding' not in resposta.headers
+        assert 'Accept-Encoding' in resposta.headers['Vary']
+
+    def test_abaixo_do_minimo(self, client):
+        resposta = client.get('/pequena', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in resposta.headers
+        assert resposta.data == b'<p>ok</p>'
+
+    def test_tipo_fora_da_lista(self, client):
+        resposta = client.get('/imagem', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in resposta.headers
+
+    def test_etag_forte_vira_fraco(self, client):
+        resposta = client.get('/versionada', headers={'Accept-Encoding': 'gzip'})
+        assert resposta.headers['ETag'] == 'W/"abc123"'
+
+    def test_desligada(self, client, monkeypatch):
+        monkeypatch.setattr(compressao, 'COMPRESSAO', False)
+        resposta = client.get('/grande', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in resposta.headers
+
+    def test_hooks_registrados_antes_veem_a_resposta_comprimida(self, pasta_static):
+        """Métricas e profiler são registrados antes: rodam depois da compressão"""
+        app = Flask(__name__, static_folder=str(pasta_static))
+        vistos = []
+        app.after_request(lambda resposta: vistos.append(resposta.headers.get('Content-Encoding')) or resposta)
+        app.add_url_rule('/grande', 'grande', lambda: '<p>conteúdo repetido</p>' * 200)
+        compressao.init_app(app)
+
+        app.test_client().get('/grande', headers={'Accept-Encoding': 'gzip'})
+        assert vistos == ['gzip']
+
+    def test_brotli_preferido(self, client):
+        if compressao.brotli is None:
+            pytest.skip('pacote brotli não instalado')
+        resposta = client.get('/grande', headers={'Accept-Encoding': 'gzip, br'})
+        assert resposta.headers['Content-Encoding'] == 'br'
+
+
+class TestEstaticos:
+    """Testes para os estáticos com hash e pré-comprimidos"""
+
+    def test_sem_build_usa_nome_original(self, client):
+        assert client.get('/link').data == b'/static/css/base.css'
+        resposta = client.get('/static/css/base.css')
+        assert resposta.data == CSS
+        assert 'immutable' not in resposta.headers.get('Cache-Control', '')
+
+    def test_build_gera_manifesto_e_versoes(self, pasta_static):
+        manifesto = build_static.construir(str(pasta_static))
+
+        nome = manifesto['css/base.css']
+        assert nome.startswith('dist/css/base.') and nome.endswith('.css')
+        assert (pasta_static / nome).read_bytes() == CSS
+        assert gzip.decompress((pasta_static / (nome + '.gz')).read_bytes()) == CSS
+        # Arquivo pequeno: copiado com hash, sem versão comprimida
+        assert not (pasta_static / (manifesto['robots.txt'] + '.gz')).exists()
+        assert json.loads((pasta_static / 'dist' / 'manifest.json').read_text()) == manifesto
+
+    def test_hash_muda_com_o_conteudo(self, pasta_static):
+        antes = build_static.construir(str(pasta_static))['css/base.css']
+        (pasta_static / 'css' / 'base.css').write_bytes(CSS + b'.novo {}\n')
+        depois = build_static.construir(str(pasta_static))
+        assert depois['css/base.css'] != antes
+        assert not (pasta_static / antes).exists()
+
+    def test_serve_pre_comprimido_com_cache_imutavel(self, pasta_static):
+        manifesto = build_static.construir(str(pasta_static))
+        client = criar_app(pasta_static).test_client()
+
+        caminho = client.get('/link').data.decode()
+        assert caminho == '/static/' + manifesto['css/base.css']
+
+        resposta = client.get(caminho, headers={'Accept-Encoding': 'gzip'})
+        assert resposta.headers['Content-Encoding'] == 'gzip'
+        assert resposta.headers['Cache-Control'] == compressao.CACHE_IMUTAVEL
+        assert resposta.mimetype == 'text/css'
+        assert gzip.decompress(resposta.data) == CSS
+        resposta.close()
+
+        resposta = client.get(caminho)
+        assert 'Content-Encoding' not in resposta.headers
+        assert resposta.data == CSS
+        resposta.close()
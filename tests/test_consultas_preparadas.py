@@ -0,0 +1,88 @@
+"""
+Testes unitários para o registro de consultas preparadas
+"""
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from utils import consultas_preparadas
+
+
+class CursorFalso:
+    """Cursor que apenas registra as chamadas de execute (como um cursor psycopg)"""
+
+    def __init__(self):
+        self.chamadas = []
+
+    def execute(self, query, params=None, **kwargs):
+        self.chamadas.append((query, params, kwargs))
+
+
+@pytest.fixture
+def ativas():
+    yield
+    consultas_preparadas.definir_ativas(True)
+
+
+class TestRegistro:
+    """Testes para registrar e obter"""
+
+    def test_registrar_retorna_nome(self):
+        nome = consultas_preparadas.registrar('teste_registro', 'SELECT %s')
+        assert nome == 'teste_registro'
+        assert consultas_preparadas.obter(nome) == 'SELECT %s'
+        assert nome in consultas_preparadas.nomes()
+
+    def test_nome_repetido_com_outro_sql(self):
+        consultas_preparadas.registrar('teste_repetido', 'SELECT 1')
+        consultas_preparadas.registrar('teste_repetido', 'SELECT 1')  # o mesmo SQL é aceito
+        with pytest.raises(ValueError):
+            consultas_preparadas.registrar('teste_repetido', 'SELECT 2')
+
+    def test_benchmark_cobre_todas_as_consultas(self):
+        """Toda consulta quente tem parâmetros de exemplo no benchmark, na quantidade certa"""
+        from benchmarks.bench_consultas_preparadas import PARAMETROS
+        amostra = dict(aluno_id=1, username='a', professor_id=2, aula_id=3, turma_id=4,
+                       exercicio_id=5, exercicio_aula_id=3)
+        for nome in consultas_preparadas.nomes():
+            if nome.startswith('teste_'):
+                continue
+            assert nome in PARAMETROS
+            assert consultas_preparadas.obter(nome).count('%s') == len(PARAMETROS[nome](amostra))
+
+
+class TestExecutar:
+    """Testes para executar e configurar_conexao"""
+
+    def test_psycopg_prepara(self, ativas):
+        cur = CursorFalso()
+        consultas_preparadas.executar(cur, consultas_preparadas.USUARIO_POR_ID, (7,))
+        sql, params, kwargs = cur.chamadas[0]
+        assert sql == consultas_preparadas.obter('usuario_por_id')
+        assert params == (7,) and kwargs == {'prepare': True}
+
+    def test_psycopg_desligado(self, ativas):
+        consultas_preparadas.definir_ativas(False)
+        cur = CursorFalso()
+        consultas_preparadas.executar(cur, consultas_preparadas.ADMIN_TOTAL_TURMAS)
+        assert cur.chamadas[0][2] == {'prepare': False}
+
+    def test_sqlite_adapta_placeholders(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE aulas (id INTEGER, professor_id INTEGER)")
+        conn.executemany("INSERT INTO aulas VALUES (?, ?)", [(1, 9), (2, 9), (3, 8)])
+        cur = consultas_preparadas.executar(conn.cursor(), consultas_preparadas.PROFESSOR_TOTAL_AULAS, (9,))
+        assert cur.fetchone() == (2,)
+        conn.close()
+
+    def test_configurar_conexao(self, ativas):
+        conn = SimpleNamespace(prepare_threshold=5, prepared_max=4)
+        consultas_preparadas.configurar_conexao(conn)
+        assert conn.prepare_threshold == 5
+        assert conn.prepared_max >= len(consultas_preparadas.nomes())
+
+        consultas_preparadas.definir_ativas(False)
+        conn = SimpleNamespace(prepare_threshold=5, prepared_max=100)
+        consultas_preparadas.configurar_conexao(conn)
+        assert conn.prepare_threshold is None
@@ -0,0 +1,98 @@
+"""
+Testes unitários para o DatabaseManager no modo produção do SQLite
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from utils.database import DatabaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    caminho = str(tmp_path / 'escola.db')
+    db = sqlite3.connect(caminho)
+    db.execute("CREATE TABLE pontos (aluno_id INTEGER PRIMARY KEY, total INTEGER NOT NULL)")
+    db.commit()
+    db.close()
+    return DatabaseManager(caminho, modo='producao')
+
+
+class TestDatabaseManagerProducao:
+    """Testes para conexões por thread, WAL e o escritor único"""
+
+    def test_conexao_por_thread(self, manager):
+        """A mesma thread reutiliza a conexão; outra thread recebe a sua"""
+        with manager.get_connection() as a, manager.get_connection() as b:
+            assert a is b
+            assert a.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert a.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+        outras = []
+        t = threading.Thread(target=lambda: outras.append(manager.connect()))
+        t.start()
+        t.join()
+        assert outras[0] is not a
+
+    def test_escritas_concorrentes(self, manager):
+        """Escritas de várias threads são todas gravadas pelo escritor"""
+        def escrever(aluno_id):
+            for _ in range(20):
+                manager.execute_update(
+                    "INSERT INTO pontos VALUES (?, 1) ON CONFLICT (aluno_id) DO UPDATE SET total = total + 1",
+                    (aluno_id,)
+                )
+
+        threads = [threading.Thread(target=escrever, args=(i % 4,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        linhas = manager.execute_query("SELECT aluno_id, total FROM pontos ORDER BY aluno_id")
+        assert [l['total'] for l in linhas] == [40, 40, 40, 40]
+        assert manager.writer().transacoes <= manager.writer().escritas
+
+    def test_falha_isolada(self, manager):
+        """Uma escrita inválida falha sozinha, sem desfazer as outras"""
+        manager.execute_update("INSERT INTO pontos VALUES (1, 10)")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            manager.execute_update("INSERT INTO pontos VALUES (1, 99)")
+        manager.execute_many("INSERT INTO pontos VALUES (?, ?)", [(2, 5), (3, 7)])
+
+        assert manager.execute_query("SELECT SUM(total) AS soma FROM pontos")[0]['soma'] == 22
+
+    def test_transacao_no_escritor(self, manager):
+        """Várias escritas de uma função entram juntas; a que falha é desfeita inteira"""
+        def transferir(conn):
+            conn.execute("INSERT INTO pontos VALUES (1, 10)")
+            conn.execute("INSERT INTO pontos VALUES (2, 20)")
+            return 'ok'
+
+        def falhar(conn):
+            conn.execute("INSERT INTO pontos VALUES (3, 30)")
+            conn.execute("INSERT INTO pontos VALUES (1, 99)")
+
+        assert manager.execute_transaction(transferir) == 'ok'
+        with pytest.raises(sqlite3.IntegrityError):
+            manager.execute_transaction(falhar)
+
+        linhas = manager.execute_query("SELECT aluno_id, total FROM pontos ORDER BY aluno_id")
+        assert [(l['aluno_id'], l['total']) for l in linhas] == [(1, 10), (2, 20)]
+
+
+def test_transacao_modo_simples(tmp_path):
+    """No modo simples a função roda na conexão dada, com commit ou rollback"""
+    manager = DatabaseManager(str(tmp_path / 'escola.db'), modo='simples')
+    with manager.get_connection() as conn:
+        conn.execute("CREATE TABLE pontos (aluno_id INTEGER PRIMARY KEY, total INTEGER NOT NULL)")
+        conn.commit()
+
+        manager.execute_transaction(lambda c: c.execute("INSERT INTO pontos VALUES (1, 10)"), conn)
+        with pytest.raises(sqlite3.IntegrityError):
+            manager.execute_transaction(lambda c: c.executemany(
+                "INSERT INTO pontos VALUES (?, ?)", [(2, 5), (1, 99)]), conn)
+
+        assert [tuple(l) for l in conn.execute("SELECT aluno_id, total FROM pontos")] == [(1, 10)]
@@ -0,0 +1,192 @@
+"""
+Testes unitários para a fila de gamificação e GamificacaoService
+"""
+import pytest
+import sqlite3
+from datetime import date, timedelta
+
+from services import fila_gamificacao
+from services.gamificacao_service import GamificacaoService
+
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória com as tabelas de gamificação e a fila"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE progresso (
+            aluno_id INTEGER, aula_id INTEGER, status TEXT, UNIQUE(aluno_id, aula_id)
+        );
+        CREATE TABLE historico_pontos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            aluno_id INTEGER NOT NULL,
+            pontos INTEGER NOT NULL,
+            tipo TEXT NOT NULL CHECK (tipo IN ('exercicio', 'meta', 'conquista', 'bonus', 'penalidade')),
+            descricao TEXT NOT NULL,
+            referencia_id INTEGER,
+            referencia_tipo TEXT,
+            data_ganho TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE conquistas (id INTEGER PRIMARY KEY, nome TEXT UNIQUE);
+        CREATE TABLE aluno_conquista (id INTEGER PRIMARY KEY, aluno_id INTEGER, conquista_id INTEGER);
+        CREATE TABLE metas_semanais (
+            id INTEGER PRIMARY KEY, tipo TEXT, valor_meta INTEGER, ativa BOOLEAN, data_fim DATE
+        );
+        CREATE TABLE progresso_metas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, aluno_id INTEGER, meta_id INTEGER,
+            valor_atual INTEGER DEFAULT 0, concluida BOOLEAN DEFAULT 0, data_conclusao TIMESTAMP,
+            UNIQUE(aluno_id, meta_id)
+        );
+        CREATE TABLE niveis_aluno (
+            aluno_id INTEGER UNIQUE, nivel_atual INTEGER, pontos_totais INTEGER, pontos_nivel_atual INTEGER,
+            pontos_proximo_nivel INTEGER, titulo_nivel TEXT, cor_nivel TEXT, icone_nivel TEXT,
+            ultima_atualizacao TIMESTAMP
+        );
+        CREATE TABLE streaks_alunos (
+            aluno_id INTEGER PRIMARY KEY, streak_atual INTEGER, maior_streak INTEGER,
+            ultima_atividade DATE, updated_at TIMESTAMP
+        );
+        CREATE TABLE atividade_diaria (
+            aluno_id INTEGER NOT NULL, data DATE NOT NULL,
+            aulas INTEGER NOT NULL DEFAULT 0, exercicios INTEGER NOT NULL DEFAULT 0,
+            pontos INTEGER NOT NULL DEFAULT 0, minutos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (aluno_id, data)
+        );
+        INSERT INTO conquistas VALUES (1, 'Primeiro Passo'), (2, 'Estudante Dedicado');
+    """)
+    conn.execute("INSERT INTO metas_semanais VALUES (1, 'exercicios', 2, 1, ?)",
+                 ((date.today() + timedelta(days=7)).isoformat(),))
+    fila_gamificacao.criar_tabela(conn)
+    yield conn
+    conn.close()
+
+
+def responder(db, aluno_id, exercicio_id, pontos=10, correto=True):
+    """Simula a rota fazer_exercicio: progresso e evento na mesma transação"""
+    db.execute("INSERT OR REPLACE INTO progresso VALUES (?, 1, 'em_andamento')", (aluno_id,))
+    fila_gamificacao.enfileirar(db, aluno_id, 'exercicio', exercicio_id, pontos=pontos if correto else 0,
+                                correto=correto, descricao=f'Exercício {exercicio_id}')
+    db.commit()
+
+
+def pontos(db, aluno_id):
+    return db.execute("SELECT COALESCE(SUM(pontos), 0) FROM historico_pontos WHERE aluno_id = ?",
+                      (aluno_id,)).fetchone()[0]
+
+
+class TestFilaGamificacao:
+    """Testes para reivindicação e processamento dos eventos"""
+
+    def test_processa_lote_do_aluno(self, db):
+        """Eventos do aluno geram pontos, atividade, sequência, meta, conquista e nível"""
+        responder(db, 1, 10)
+        responder(db, 1, 11)
+        responder(db, 1, 12, correto=False)
+
+        assert fila_gamificacao.processar_pendentes(db, 'teste') == 3
+        assert fila_gamificacao.pendentes(db) == 0
+
+        # 2 exercícios certos (20) + conquista Primeiro Passo (50)
+        assert pontos(db, 1) == 70
+        assert db.execute("SELECT exercicios, pontos FROM atividade_diaria").fetchone() == (3, 20)
+        assert db.execute("SELECT streak_atual FROM streaks_alunos").fetchone() == (1,)
+        assert db.execute("SELECT valor_atual, concluida FROM progresso_metas").fetchone() == (2, 1)
+        assert db.execute("SELECT conquista_id FROM aluno_conquista").fetchall() == [(1,)]
+        assert db.execute("SELECT nivel_atual, pontos_totais FROM niveis_aluno").fetchone() == (1, 70)
+
+    def test_fila_vazia(self, db):
+        assert fila_gamificacao.processar_pendentes(db, 'teste') == 0
+
+    def test_aula_concluida_entra_como_bonus(self, db):
+        """historico_pontos não aceita o tipo 'aula'"""
+        fila_gamificacao.enfileirar(db, 1, 'aula', 5, pontos=25, descricao='Aula concluída')
+        db.commit()
+
+        fila_gamificacao.processar_pendentes(db, 'teste')
+
+        assert db.execute(
+            "SELECT tipo, referencia_tipo FROM historico_pontos WHERE referencia_id = 5"
+        ).fetchone() == ('bonus', 'aula')
+
+    def test_inicio_de_aula_marca_o_dia_sem_pontos(self, db):
+        """Iniciar uma aula conta para a sequência e a atividade, não para os pontos"""
+        fila_gamificacao.enfileirar(db, 1, 'inicio_aula', 5)
+        db.commit()
+
+        assert fila_gamificacao.processar_pendentes(db, 'teste') == 1
+
+        assert pontos(db, 1) == 0
+        assert db.execute("SELECT streak_atual FROM streaks_alunos").fetchone() == (1,)
+        assert db.execute("SELECT aulas, exercicios, pontos FROM atividade_diaria").fetchone() == (0, 0, 0)
+
+    def test_tabela_anterior_aceita_inicio_de_aula(self):
+        """Bancos com a fila antiga: a tabela é recriada com o novo tipo, sem perder eventos"""
+        conn = sqlite3.connect(':memory:')
+        conn.execute(fila_gamificacao.CRIAR_TABELA.replace(", 'inicio_aula'", ''))
+        fila_gamificacao.enfileirar(conn, 1, 'exercicio', 10, pontos=10, correto=True)
+        conn.commit()
+
+        fila_gamificacao.criar_tabela(conn)
+        fila_gamificacao.enfileirar(conn, 1, 'inicio_aula', 5)
+
+        assert conn.execute("SELECT tipo FROM eventos_gamificacao ORDER BY id").fetchall() == [
+            ('exercicio',), ('inicio_aula',)
+        ]
+        conn.close()
+
+    def test_aluno_em_processamento_fica_de_fora(self, db):
+        """Um aluno não é reivindicado por dois trabalhadores ao mesmo tempo"""
+        responder(db, 1, 10)
+        token, lotes = fila_gamificacao.reivindicar(db, 'a', agora=1000.0)
+        responder(db, 1, 11)
+        responder(db, 2, 10)
+
+        _, outros = fila_gamificacao.reivindicar(db, 'b', agora=1001.0)
+
+        assert list(lotes) == [1]
+        assert list(outros) == [2]
+
+    def test_prazo_vencido_aplica_uma_vez(self, db):
+        """Se o prazo venceu e outro trabalhador assumiu, o primeiro desiste"""
+        responder(db, 1, 10)
+        token_a, lotes_a = fila_gamificacao.reivindicar(db, 'a', agora=1000.0)
+        token_b, lotes_b = fila_gamificacao.reivindicar(
+            db, 'b', agora=1000.0 + fila_gamificacao.GAMIFICACAO_LEASE_S + 1
+        )
+
+        assert fila_gamificacao.processar_lote(db, token_b, 1, lotes_b[1])
+        assert not fila_gamificacao.processar_lote(db, token_a, 1, lotes_a[1])
+        assert pontos(db, 1) == 60
+
+    def test_erro_devolve_e_depois_falha(self, db, monkeypatch):
+        """Eventos com erro voltam para a fila até o máximo de tentativas"""
+        monkeypatch.setattr(fila_gamificacao, 'GAMIFICACAO_MAX_TENTATIVAS', 2)
+
+        def falhar(self, aluno_id, eventos):
+            raise RuntimeError('falha simulada')
+
+        monkeypatch.setattr(GamificacaoService, 'processar', falhar)
+        responder(db, 1, 10)
+
+        for tentativa in range(2):
+            agora = 1000.0 + tentativa * 100
+            token, lotes = fila_gamificacao.reivindicar(db, 'teste', agora=agora)
+            assert not fila_gamificacao.processar_lote(db, token, 1, lotes[1], agora=agora)
+
+        assert db.execute(
+            "SELECT status, tentativas, erro FROM eventos_gamificacao"
+        ).fetchone() == ('falhou', 2, 'falha simulada')
+        assert fila_gamificacao.pendentes(db) == 0
+        assert db.execute("SELECT COUNT(*) FROM progresso").fetchone() == (1,)
+
+    def test_espera_antes_de_nova_tentativa(self, db, monkeypatch):
+        """Evento devolvido só volta a ser reivindicado após a espera"""
+        monkeypatch.setattr(GamificacaoService, 'processar', lambda *a: 1 / 0)
+        responder(db, 1, 10)
+        token, lotes = fila_gamificacao.reivindicar(db, 'teste', agora=1000.0)
+        fila_gamificacao.processar_lote(db, token, 1, lotes[1], agora=1000.0)
+
+        assert fila_gamificacao.reivindicar(db, 'teste', agora=1000.0)[1] == {}
+        assert list(fila_gamificacao.reivindicar(
+            db, 'teste', agora=1000.0 + fila_gamificacao.GAMIFICACAO_INTERVALO_S
+        )[1]) == [1]
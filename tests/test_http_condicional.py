@@ -0,0 +1,88 @@
+"""
+Testes unitários para o GET condicional (ETag / Last-Modified)
+"""
+from datetime import datetime
+
+import pytest
+from flask import Flask, flash
+
+from utils import http_condicional
+
+
+@pytest.fixture
+def app():
+    """App mínimo com uma rota que conta quantas vezes gerou o corpo"""
+    app = Flask(__name__)
+    app.secret_key = 'teste'
+    app.geracoes = 0
+
+    @app.route('/recurso/<int:versao>')
+    def recurso(versao):
+        etag = http_condicional.gerar_etag('recurso', versao)
+        ultima = datetime(2024, 3, 1, 12, 0, 0, 500)
+        nao_modificada = http_condicional.nao_modificado(etag, ultima)
+        if nao_modificada:
+            return nao_modificada
+        app.geracoes += 1
+        return http_condicional.aplicar({'versao': versao}, etag, ultima)
+
+    @app.route('/avisar')
+    def avisar():
+        flash('Salvo')
+        return ''
+
+    return app
+
+
+class TestGerarEtag:
+    """Testes para o cálculo do validador"""
+
+    def test_muda_com_as_partes(self):
+        gerar = http_condicional.gerar_etag
+        assert gerar('aula', 1, '2024-01-01') == gerar('aula', 1, '2024-01-01')
+        assert gerar('aula', 1, '2024-01-01') != gerar('aula', 1, '2024-01-02')
+        assert gerar('a', 'b') != gerar('ab')
+
+
+class TestNaoModificado:
+    """Testes para as respostas 304"""
+
+    def test_if_none_match(self, app):
+        cliente = app.test_client()
+        primeira = cliente.get('/recurso/1')
+        assert primeira.status_code == 200
+        assert primeira.headers['Cache-Control'] == 'private, no-cache'
+        assert primeira.headers['Last-Modified'] == 'Fri, 01 Mar 2024 12:00:00 GMT'
+
+        segunda = cliente.get('/recurso/1', headers={'If-None-Match': primeira.headers['ETag']})
+        assert segunda.status_code == 304
+        assert segunda.data == b''
+        assert segunda.headers['ETag'] == primeira.headers['ETag']
+        assert app.geracoes == 1
+
+    def test_versao_nova(self, app):
+        cliente = app.test_client()
+        etag = cliente.get('/recurso/1').headers['ETag']
+
+        assert cliente.get('/recurso/2', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_if_modified_since(self, app):
+        cliente = app.test_client()
+
+        assert cliente.get('/recurso/1', headers={
+            'If-Modified-Since': 'Fri, 01 Mar 2024 12:00:00 GMT'}).status_code == 304
+        assert cliente.get('/recurso/1', headers={
+            'If-Modified-Since': 'Fri, 01 Mar 2024 11:59:59 GMT'}).status_code == 200
+
+    def test_if_none_match_tem_precedencia(self, app):
+        resposta = app.test_client().get('/recurso/1', headers={
+            'If-None-Match': 'W/"outro"', 'If-Modified-Since': 'Fri, 01 Mar 2024 12:00:00 GMT'})
+        assert resposta.status_code == 200
+
+    def test_mensagem_flash_pendente(self, app):
+        """A página é gerada para mostrar a mensagem"""
+        cliente = app.test_client()
+        etag = cliente.get('/recurso/1').headers['ETag']
+        cliente.get('/avisar')
+
+        assert cliente.get('/recurso/1', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,66 @@
+"""
+Testes unitários para os logs estruturados
+"""
+import json
+import logging
+
+from flask import Flask
+
+from utils import logging_config
+from utils.logging_config import FormatadorJSON, _QueueHandlerLeve
+
+
+class TestLoggingConfig:
+    """Testes para a formatação JSON e o id da requisição"""
+
+    def test_formatador_json(self):
+        """Mensagem, nível, extras e traceback vão para uma linha JSON"""
+        try:
+            raise ValueError('falhou')
+        except ValueError:
+            import sys
+            record = logging.LogRecord('app', logging.ERROR, __file__, 1, 'Erro em %s', ('login',), sys.exc_info())
+        record.aluno_id = 7
+
+        dados = json.loads(FormatadorJSON().format(record))
+
+        assert dados['msg'] == 'Erro em login'
+        assert dados['level'] == 'ERROR'
+        assert dados['aluno_id'] == 7
+        assert 'ValueError: falhou' in dados['exc']
+
+    def test_fila_resolve_mensagem_na_origem(self):
+        """O registro enfileirado já tem a mensagem e o id da requisição resolvidos"""
+        import queue
+        fila = queue.SimpleQueue()
+        handler = _QueueHandlerLeve(fila)
+        record = logging.LogRecord('app', logging.INFO, __file__, 1, 'Aula %s', (3,), None)
+
+        token = logging_config._request_id.set('abc123')
+        try:
+            handler.emit(record)
+        finally:
+            logging_config._request_id.reset(token)
+
+        enfileirado = fila.get_nowait()
+        assert enfileirado.msg == 'Aula 3' and enfileirado.args is None
+        assert enfileirado.request_id == 'abc123'
+
+    def test_request_id_flask(self):
+        """O id recebido no cabeçalho é usado e devolvido; sem cabeçalho, é gerado"""
+        app = Flask(__name__)
+        logging_config.init_app(app)
+        vistos = []
+
+        @app.route('/')
+        def index():
+            vistos.append(logging_config.request_id_atual())
+            return 'ok'
+
+        client = app.test_client()
+        resposta = client.get('/', headers={'X-Request-ID': 'req-1'})
+        gerado = client.get('/').headers['X-Request-ID']
+
+        assert resposta.headers['X-Request-ID'] == 'req-1'
+        assert vistos == ['req-1', gerado]
+        assert logging_config.request_id_atual() is None
@@ -0,0 +1,63 @@
+"""
+Testes unitários para as métricas HTTP (/metrics)
+"""
+import pytest
+from flask import Flask, render_template_string
+
+from utils import metrics, sql_instrumentation
+
+
+@pytest.fixture
+def client():
+    metrics.limpar()
+    app = Flask(__name__)
+    sql_instrumentation.init_app(app, cabecalho=False)
+    metrics.init_app(app)
+
+    @app.route('/aula/<int:aula_id>')
+    def ver_aula(aula_id):
+        return render_template_string('Aula {{ aula_id }}', aula_id=aula_id)
+
+    @app.route('/erro')
+    def erro():
+        return 'falhou', 503
+
+    return app.test_client()
+
+
+class TestMetrics:
+    """Testes para a coleta e a exposição das métricas"""
+
+    def test_contadores_e_histogramas(self, client):
+        """Requisições são contadas por endpoint, método e status"""
+        client.get('/aula/1')
+        client.get('/aula/2')
+        client.get('/erro')
+
+        texto = client.get('/metrics').get_data(as_text=True)
+
+        assert 'http_requests_total{endpoint="ver_aula",method="GET",status="200"} 2' in texto
+        assert 'http_requests_total{endpoint="erro",method="GET",status="503"} 1' in texto
+        assert 'http_request_duration_seconds_bucket{endpoint="ver_aula",status="200",le="+Inf"} 2' in texto
+        assert 'http_request_duration_seconds_count{endpoint="erro",status="503"} 1' in texto
+        assert 'template_render_seconds_count{template="string"} 2' in texto
+
+    def test_em_andamento(self, client):
+        """A própria leitura de /metrics está em andamento; as anteriores não"""
+        client.get('/aula/1')
+
+        assert 'http_requests_in_flight 1\n' in client.get('/metrics').get_data(as_text=True)
+
+    def test_pool_registrado(self, client):
+        """Estatísticas de pools registrados são expostas"""
+        metrics.registrar_pool('teste', lambda: {'pool_size': 4, 'requests_waiting': 0})
+
+        texto = client.get('/metrics').get_data(as_text=True)
+
+        assert 'db_pool{pool="teste",metric="pool_size"} 4' in texto
+
+    def test_acesso_remoto_negado(self, client):
+        """/metrics só responde a endereços permitidos"""
+        resposta = client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'})
+
+        assert resposta.status_code == 404
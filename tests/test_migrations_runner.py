@@ -0,0 +1,57 @@
+"""
+Testes unitários para o executor de migrações versionadas
+"""
+import pytest
+from migrations.runner import (
+    MigrationError, carregar_migracoes, migracoes_pendentes
+)
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    """Diretório com duas migrações e um arquivo ignorado"""
+    (tmp_path / '0001_inicial.sql').write_text('CREATE TABLE a (id INTEGER);')
+    (tmp_path / '0002_dados.py').write_text('def upgrade(cur):\n    pass\n')
+    (tmp_path / 'LEIAME.txt').write_text('não é migração')
+    return tmp_path
+
+
+class TestMigrationsRunner:
+    """Testes para leitura e comparação das migrações"""
+
+    def test_carregar_em_ordem(self, diretorio):
+        """Apenas arquivos NNNN_nome.sql|py são lidos, em ordem de versão"""
+        migracoes = carregar_migracoes(str(diretorio))
+
+        assert [m.version for m in migracoes] == [1, 2]
+        assert migracoes[1].is_python
+        assert len(migracoes[0].checksum) == 64
+
+    def test_versao_duplicada(self, diretorio):
+        """Duas migrações com a mesma versão são rejeitadas"""
+        (diretorio / '0002_outra.sql').write_text('SELECT 1;')
+
+        with pytest.raises(MigrationError):
+            carregar_migracoes(str(diretorio))
+
+    def test_pendentes(self, diretorio):
+        """Só as versões ainda não registradas ficam pendentes"""
+        migracoes = carregar_migracoes(str(diretorio))
+
+        pendentes = migracoes_pendentes(migracoes, {1: migracoes[0].checksum})
+
+        assert [m.version for m in pendentes] == [2]
+        assert migracoes_pendentes(migracoes, {m.version: m.checksum for m in migracoes}) == []
+
+    def test_migracao_alterada(self, diretorio):
+        """Alterar uma migração já aplicada interrompe a execução"""
+        migracoes = carregar_migracoes(str(diretorio))
+
+        with pytest.raises(MigrationError):
+            migracoes_pendentes(migracoes, {1: '0' * 64})
+
+    def test_migracoes_do_projeto(self):
+        """As migrações do projeto carregam sem versões duplicadas"""
+        migracoes = carregar_migracoes()
+
+        assert [m.version for m in migracoes] == list(range(1, len(migracoes) + 1))
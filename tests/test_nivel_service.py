@@ -0,0 +1,33 @@
+"""
+Testes unitários para o cálculo de níveis dos alunos
+"""
+from services.nivel_service import calcular_nivel
+
+
+class TestNivelService:
+    """Testes para calcular_nivel"""
+
+    def test_primeiro_nivel(self):
+        """Sem pontos o aluno é Iniciante"""
+        nivel = calcular_nivel(0)
+
+        assert nivel.nivel_atual == 1
+        assert nivel.titulo == 'Iniciante'
+        assert nivel.pontos_proximo_nivel == 100
+
+    def test_nivel_intermediario(self):
+        """Cada 100 pontos sobem um nível e o resto fica no nível atual"""
+        nivel = calcular_nivel(450)
+
+        assert nivel.nivel_atual == 5
+        assert nivel.titulo == 'Mestre'
+        assert nivel.icone == 'fas fa-crown'
+        assert nivel.pontos_nivel_atual == 50
+
+    def test_niveis_altos(self):
+        """Acima do último título nomeado usa 'Nível N'"""
+        nivel = calcular_nivel(1234)
+
+        assert nivel.nivel_atual == 13
+        assert nivel.titulo == 'Nível 13'
+        assert nivel.cor == '#dc3545'
@@ -0,0 +1,141 @@
+"""
+Testes unitários para iter_query e a paginação por chave (keyset)
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from services.turma_service import TurmaService
+from utils.database import (
+    DatabaseManager, PaginacaoKeyset, codificar_cursor, decodificar_cursor, iter_query, paginar_keyset
+)
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, created_at TEXT)")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?)",
+                     [(i, f'user{i % 7}', f'2024-03-{1 + i % 5:02d} 10:00:00') for i in range(1, 101)])
+    yield conn
+    conn.close()
+
+
+def _todas_as_paginas(db, ordem, por_pagina):
+    ids, cursor = [], None
+    while True:
+        pagina = paginar_keyset(db, "SELECT * FROM users", ordem=ordem, cursor=cursor, por_pagina=por_pagina)
+        ids.extend(row['id'] for row in pagina.itens)
+        if not pagina.tem_mais:
+            return ids
+        cursor = pagina.proximo_cursor
+
+
+class TestIterQuery:
+    """Testes para a iteração em lotes"""
+
+    def test_tipos_de_linha(self, db):
+        """dict, tuple e row trazem as mesmas linhas"""
+        query = "SELECT id, username FROM users WHERE id <= %s ORDER BY id"
+        dicts = list(iter_query(db, query, (3,), tamanho_lote=2))
+        tuplas = list(iter_query(db, query, (3,), tamanho_lote=2, tipo='tuple'))
+        linhas = list(iter_query(db, query, (3,), tamanho_lote=2, tipo='row'))
+
+        assert dicts == [{'id': 1, 'username': 'user1'}, {'id': 2, 'username': 'user2'},
+                         {'id': 3, 'username': 'user3'}]
+        assert tuplas == [(1, 'user1'), (2, 'user2'), (3, 'user3')]
+        assert linhas[2].username == 'user3' and linhas[2] == (3, 'user3')
+
+    def test_tipo_invalido(self, db):
+        with pytest.raises(ValueError):
+            list(iter_query(db, "SELECT id FROM users", tipo='lista'))
+
+    def test_database_manager(self, tmp_path):
+        """DatabaseManager.iter_query percorre o resultado inteiro em lotes"""
+        caminho = str(tmp_path / 'escola.db')
+        conn = sqlite3.connect(caminho)
+        conn.execute("CREATE TABLE pontos (aluno_id INTEGER PRIMARY KEY)")
+        conn.executemany("INSERT INTO pontos VALUES (?)", [(i,) for i in range(1, 1001)])
+        conn.commit()
+        conn.close()
+
+        linhas = DatabaseManager(caminho).iter_query("SELECT aluno_id FROM pontos", tamanho_lote=64, tipo='tuple')
+        assert sum(aluno_id for (aluno_id,) in linhas) == 500500
+
+
+class TestPaginacaoKeyset:
+    """Testes para PaginacaoKeyset e paginar_keyset"""
+
+    @pytest.mark.parametrize('ordem', [
+        [('created_at', 'DESC'), ('id', 'DESC')],
+        [('username', 'ASC'), ('id', 'DESC')],
+        [('id', 'ASC')],
+    ])
+    def test_paginas_cobrem_tudo_na_ordem(self, db, ordem):
+        """Percorrer as páginas dá o mesmo resultado que um ORDER BY sem paginação"""
+        order_by = ', '.join(f"{c} {d}" for c, d in ordem)
+        esperado = [row[0] for row in db.execute(f"SELECT id FROM users ORDER BY {order_by}")]
+        assert _todas_as_paginas(db, ordem, 13) == esperado
+
+    def test_ultima_pagina_sem_cursor(self, db):
+        pagina = paginar_keyset(db, "SELECT * FROM users", ordem=[('id', 'ASC')], por_pagina=100)
+        assert len(pagina.itens) == 100
+        assert pagina.proximo_cursor is None
+
+    def test_cursor_preserva_tipos(self):
+        valores = (datetime(2024, 3, 1, 12, 30), 42, 'texto')
+        assert decodificar_cursor(codificar_cursor(valores), 3) == valores
+
+    @pytest.mark.parametrize('token', ['nao-e-base64!', codificar_cursor((1,)), codificar_cursor(({'x': 1}, 2))])
+    def test_cursor_invalido(self, token):
+        with pytest.raises(ValueError):
+            PaginacaoKeyset([('created_at', 'DESC'), ('id', 'DESC')], token)
+
+    def test_coluna_invalida(self):
+        with pytest.raises(ValueError):
+            PaginacaoKeyset([('id; DROP TABLE users', 'ASC')])
+
+    def test_filtro_direcoes_misturadas(self):
+        paginacao = PaginacaoKeyset([('nome', 'ASC'), ('id', 'DESC')], codificar_cursor(('b', 7)))
+        assert paginacao.filtro() == ("((nome > %s) OR (nome = %s AND id < %s))", ('b', 'b', 7))
+
+
+class TestTurmasPaginadas:
+    """Testes para TurmaService.get_turmas_with_stats_page"""
+
+    @pytest.fixture
+    def service(self):
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT);
+            CREATE TABLE turmas (id INTEGER PRIMARY KEY, nome TEXT, serie INTEGER,
+                                 professor_id INTEGER, created_at TEXT);
+            CREATE TABLE aluno_turma (aluno_id INTEGER, turma_id INTEGER, status TEXT);
+            CREATE TABLE aulas (id INTEGER PRIMARY KEY, serie INTEGER, professor_id INTEGER);
+            CREATE TABLE progresso (aula_id INTEGER, pontuacao REAL);
+            INSERT INTO users VALUES (1, 'prof');
+        """)
+        conn.executemany("INSERT INTO turmas VALUES (?, ?, 6, 1, ?)",
+                         [(i, f'Turma {i}', f'2024-03-{1 + i // 3:02d}') for i in range(1, 12)])
+        conn.executemany("INSERT INTO aluno_turma VALUES (?, ?, 'ativo')", [(a, 5) for a in range(3)])
+        yield TurmaService(conn)
+        conn.close()
+
+    def test_paginas(self, service):
+        primeira = service.get_turmas_with_stats_page(por_pagina=4)
+        assert [t[0] for t in primeira.itens] == [11, 10, 9, 8]
+
+        ids, cursor = [], None
+        while True:
+            pagina = service.get_turmas_with_stats_page(cursor, por_pagina=4)
+            ids.extend(t[0] for t in pagina.itens)
+            if not pagina.tem_mais:
+                break
+            cursor = pagina.proximo_cursor
+        assert ids == list(range(11, 0, -1))
+
+    def test_estatisticas_da_pagina(self, service):
+        pagina = service.get_turmas_with_stats_page(por_pagina=20)
+        turma_5 = next(t for t in pagina.itens if t[0] == 5)
+        assert turma_5[4] == 'prof' and turma_5[5] == 3
@@ -0,0 +1,83 @@
+"""
+Testes unitários para o profiler por amostragem
+"""
+import threading
+import time
+from collections import Counter
+
+from flask import Flask
+from flask_login import LoginManager
+
+from utils import profiler
+from utils.profiler import Amostrador, ArmazenamentoPerfis
+
+
+def trabalho_lento(parar):
+    while not parar.is_set():
+        sum(range(1000))
+
+
+class TestProfiler:
+    """Testes para amostragem, armazenamento e integração com o Flask"""
+
+    def test_amostrador(self):
+        """As pilhas da thread alvo são coletadas enquanto ela está registrada"""
+        parar = threading.Event()
+        alvo = threading.Thread(target=trabalho_lento, args=(parar,))
+        alvo.start()
+        amostrador = Amostrador(0.001)
+        try:
+            amostrador.iniciar(alvo.ident)
+            time.sleep(0.05)
+            pilhas = amostrador.parar(alvo.ident)
+        finally:
+            parar.set()
+            alvo.join()
+
+        assert sum(pilhas.values()) > 0
+        assert all('trabalho_lento (test_profiler.py:' in pilha for pilha in pilhas)
+
+    def test_armazenamento_limitado(self, tmp_path):
+        """Só os perfis mais recentes são mantidos; a listagem vem do mais lento"""
+        armazenamento = ArmazenamentoPerfis(str(tmp_path), maximo=2)
+        for duracao in (30, 10, 20):
+            armazenamento.salvar(Counter({'main;view': 3}), {'endpoint': 'ver_aula', 'duracao_ms': duracao})
+            time.sleep(0.001)
+
+        perfis = armazenamento.listar()
+
+        assert [p['duracao_ms'] for p in perfis] == [20, 10]
+        assert len(list(tmp_path.iterdir())) == 4
+        assert open(armazenamento.caminho(perfis[0]['nome'])).read() == 'main;view 3\n'
+        assert armazenamento.caminho('../segredo') is None
+
+    def test_amostragem_por_taxa(self, tmp_path):
+        """Com taxa 1 toda requisição é perfilada e recebe X-Profile-Id"""
+        app = Flask(__name__)
+        LoginManager(app)
+        profiler.init_app(app, taxa=1.0, diretorio=str(tmp_path))
+
+        @app.route('/lenta')
+        def lenta():
+            time.sleep(0.02)
+            return 'ok'
+
+        resposta = app.test_client().get('/lenta')
+
+        assert resposta.headers['X-Profile-Id'].endswith('ms')
+        assert app.extensions['profiler'].listar()[0]['endpoint'] == 'lenta'
+
+    def test_flag_ignorada_sem_admin(self, tmp_path):
+        """Sem usuário administrador o parâmetro _profile é ignorado"""
+        app = Flask(__name__)
+        LoginManager(app)
+        profiler.init_app(app, taxa=0, diretorio=str(tmp_path))
+
+        @app.route('/')
+        def index():
+            return 'ok'
+
+        resposta = app.test_client().get('/?_profile=1')
+
+        assert 'X-Profile-Id' not in resposta.headers
+        assert not list(tmp_path.iterdir())
@@ -0,0 +1,144 @@
+"""
+Testes unitários para QuizService e a correção em lote
+"""
+import pytest
+import sqlite3
+
+from services import fila_gamificacao
+from services.quiz_service import ItemGabarito, QuizService, corrigir
+from utils import cache_conteudo, database
+
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória com exercícios, progresso, respostas e a fila"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE aulas (id INTEGER PRIMARY KEY, updated_at TIMESTAMP);
+        CREATE TABLE exercicios (
+            id INTEGER PRIMARY KEY, enunciado TEXT, alternativas TEXT, resposta_correta TEXT,
+            aula_id INTEGER, pontos INTEGER
+        );
+        CREATE TABLE progresso (
+            aluno_id INTEGER, aula_id INTEGER, status TEXT, pontuacao INTEGER,
+            ultima_atividade TIMESTAMP, UNIQUE(aluno_id, aula_id)
+        );
+        CREATE TABLE respostas_alunos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, aluno_id INTEGER, exercicio_id INTEGER,
+            resposta TEXT, esta_correta BOOLEAN, pontos_ganhos INTEGER DEFAULT 0
+        );
+        INSERT INTO aulas VALUES (7, '2024-03-11 10:00:00'), (8, '2024-03-11 10:00:00');
+        INSERT INTO exercicios VALUES
+            (1, '2 + 2', '3|4|5', '4', 7, 10),
+            (2, '3 x 3', '6|9', '9', 7, 20),
+            (3, '10 / 2', '["5", "2"]', '5', 7, 10),
+            (4, 'Outra aula', 'a|b', 'a', 8, 10);
+    """)
+    fila_gamificacao.criar_tabela(conn)
+    cache_conteudo.limpar()
+    yield conn
+    conn.close()
+    cache_conteudo.limpar()
+
+
+class TestCorrigir:
+    """Testes para a correção em memória"""
+
+    def test_corrige_e_ignora_sem_resposta(self):
+        gabarito = [ItemGabarito(1, '2 + 2', ['3', '4'], '4', 10),
+                    ItemGabarito(2, '3 x 3', ['6', '9'], '9', 20),
+                    ItemGabarito(3, '10 / 2', ['5', '2'], '5', 10)]
+
+        resultado = corrigir(7, gabarito, {1: '4', 2: '6', 3: None})
+
+        assert [(c.exercicio_id, c.correta, c.pontos) for c in resultado.correcoes] == [(1, True, 10), (2, False, 0)]
+        assert resultado.acertos == 1
+        assert resultado.pontos == 10
+        assert resultado.por_exercicio()[2].resposta_correta == '9'
+
+
+class TestQuizService:
+    """Testes para o gabarito e a gravação em lote"""
+
+    def test_carregar_gabarito(self, db):
+        gabarito = QuizService(db).carregar_gabarito(7)
+
+        assert [item.exercicio_id for item in gabarito] == [1, 2, 3]
+        assert gabarito[0].alternativas == ['3', '4', '5']
+        assert gabarito[2].alternativas == ['5', '2']
+
+    def test_gabarito_fica_no_cache(self, db):
+        """A segunda correção só lê a versão da aula até ela ser invalidada"""
+        service = QuizService(db)
+        service.carregar_gabarito(7)
+
+        comandos = []
+        db.set_trace_callback(comandos.append)
+        assert service.carregar_gabarito(7)[1].alternativas == ['6', '9']
+        assert service.carregar_gabarito(7, versao='2024-03-11 10:00:00')[0].exercicio_id == 1
+        assert len(comandos) == 1
+
+        cache_conteudo.invalidar_aula(7)
+        service.carregar_gabarito(7)
+        db.set_trace_callback(None)
+        assert len(comandos) == 3
+
+    def test_gabarito_recarregado_com_nova_versao(self, db):
+        """Edição feita em outro worker: o updated_at muda e o gabarito é relido"""
+        service = QuizService(db)
+        service.carregar_gabarito(7)
+
+        db.execute("UPDATE exercicios SET resposta_correta = '5' WHERE id = 1")
+        db.execute("UPDATE aulas SET updated_at = '2024-03-11 11:00:00' WHERE id = 7")
+
+        assert service.carregar_gabarito(7)[0].resposta_correta == '5'
+
+    def test_gabarito_de_aula_inexistente(self, db):
+        assert QuizService(db).carregar_gabarito(99) == []
+
+    def test_registrar_grava_em_lote(self, db):
+        """Respostas, progresso e eventos do questionário inteiro"""
+        service = QuizService(db)
+        resultado = corrigir(7, service.carregar_gabarito(7), {1: '4', 2: '9', 3: '2'})
+
+        comandos = []
+        db.set_trace_callback(comandos.append)
+        service.registrar(5, resultado, 'Matemática')
+        db.set_trace_callback(None)
+        db.commit()
+
+        assert len([c for c in comandos if c.lstrip().startswith('INSERT')]) == 3
+        assert db.execute(
+            "SELECT exercicio_id, esta_correta, pontos_ganhos FROM respostas_alunos ORDER BY exercicio_id"
+        ).fetchall() == [(1, 1, 10), (2, 1, 20), (3, 0, 0)]
+        assert db.execute("SELECT status, pontuacao FROM progresso").fetchone() == ('em_andamento', 30)
+
+        token, lotes = fila_gamificacao.reivindicar(db, 'teste')
+        assert [(e.referencia_id, e.correto, e.pontos) for e in lotes[5]] == [(1, True, 10), (2, True, 20), (3, False, 0)]
+
+    def test_registrar_mantem_aula_concluida(self, db):
+        db.execute("INSERT INTO progresso VALUES (5, 7, 'concluido', 0, NULL)")
+        service = QuizService(db)
+        service.registrar(5, corrigir(7, service.carregar_gabarito(7), {1: '4'}), 'Matemática')
+
+        assert db.execute("SELECT status, pontuacao FROM progresso").fetchone() == ('concluido', 10)
+
+
+class TestInserirVarios:
+    """Testes para o INSERT de várias linhas"""
+
+    def test_divide_em_comandos(self, db, monkeypatch):
+        monkeypatch.setattr(database, 'LINHAS_POR_INSERT', 2)
+        comandos = []
+        db.set_trace_callback(comandos.append)
+
+        total = database.inserir_varios(db.cursor(), 'respostas_alunos', ('aluno_id', 'exercicio_id', 'resposta'),
+                                        [(1, i, 'x') for i in range(5)])
+
+        db.set_trace_callback(None)
+        assert total == 5
+        assert len([c for c in comandos if c.startswith('INSERT')]) == 3
+        assert db.execute("SELECT COUNT(*) FROM respostas_alunos").fetchone() == (5,)
+
+    def test_sem_linhas(self, db):
+        assert database.inserir_varios(db.cursor(), 'respostas_alunos', ('aluno_id',), []) == 0
@@ -0,0 +1,100 @@
+"""
+Testes das rotas de escrita do aluno no app SQLite com SQLITE_MODE=producao
+
+No modo produção as transações rodam na thread do escritor único, sem
+contexto de requisição: as rotas não podem usar current_user dentro delas.
+"""
+import json
+import sqlite3
+
+import pytest
+
+import app_old
+import init_db
+from models_postgres import User
+from utils import cache_conteudo, database
+from utils.database import DatabaseManager
+
+
+@pytest.fixture
+def caminho(tmp_path, monkeypatch):
+    """Banco com o esquema do init_db, um aluno, uma aula e um exercício"""
+    monkeypatch.chdir(tmp_path)
+    init_db.create_database()
+    db = sqlite3.connect('escola_para_todos.db')
+    db.executescript("""
+        INSERT INTO users (id, username, email, password_hash, first_name, last_name, user_type)
+        VALUES (1, 'prof', 'prof@x', '-', 'Paula', 'Reis', 'professor'),
+               (2, 'aluno', 'aluno@x', '-', 'Ana', 'Souza', 'aluno');
+        INSERT INTO aulas (id, titulo, disciplina, serie, professor_id) VALUES (1, 'Frações', 'Matemática', '5', 1);
+    """)
+    db.execute("INSERT INTO exercicios (id, enunciado, alternativas, resposta_correta, aula_id, pontos) "
+               "VALUES (1, 'Quanto é 1/2 + 1/2?', ?, '1', 1, 10)", (json.dumps(['1', '2']),))
+    db.commit()
+    db.close()
+    return str(tmp_path / 'escola_para_todos.db')
+
+
+@pytest.fixture
+def client(caminho, monkeypatch):
+    """Cliente logado como o aluno, com o app no modo producao"""
+    monkeypatch.setattr(app_old, 'db_manager', DatabaseManager(caminho, modo='producao'))
+    monkeypatch.setattr(app_old.login_manager, '_user_callback', lambda user_id: User(
+        id=int(user_id), username='aluno', email='aluno@x', first_name='Ana', last_name='Souza',
+        user_type='aluno'
+    ))
+    # Os testes olham só o banco, não as páginas
+    monkeypatch.setattr(app_old, 'render_template', lambda *args, **kwargs: '')
+    cache_conteudo.limpar()
+
+    cliente = app_old.app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['_user_id'] = '2'
+        sessao['_fresh'] = True
+    yield cliente
+
+    escritor = database._escritores.pop(caminho, None)
+    if escritor is not None:
+        escritor.parar()
+    cache_conteudo.limpar()
+
+
+def consultar(caminho, query):
+    db = sqlite3.connect(caminho)
+    try:
+        return db.execute(query).fetchall()
+    finally:
+        db.close()
+
+
+class TestEscritasNoModoProducao:
+    """As transações das rotas gravam pelo escritor, com o aluno da requisição"""
+
+    def test_iniciar_aula(self, client, caminho):
+        client.post('/student/aula/1/iniciar')
+
+        assert consultar(caminho, "SELECT aluno_id, aula_id, status FROM progresso") == [(2, 1, 'em_andamento')]
+        assert consultar(caminho, "SELECT aluno_id, tipo FROM eventos_gamificacao") == [(2, 'inicio_aula')]
+
+    def test_fazer_exercicio(self, client, caminho):
+        client.post('/student/exercicio/1', data={'resposta': '1'})
+
+        assert consultar(caminho, "SELECT aluno_id, aula_id, pontuacao FROM progresso") == [(2, 1, 10)]
+        assert consultar(caminho, "SELECT aluno_id, exercicio_id, esta_correta FROM respostas_alunos") == [(2, 1, 1)]
+        assert consultar(caminho, "SELECT aluno_id, tipo, pontos FROM eventos_gamificacao") == [(2, 'exercicio', 10)]
+
+    def test_student_quiz(self, client, caminho):
+        client.post('/student/aula/1/quiz', data={'resposta_1': '2'})
+
+        assert consultar(caminho, "SELECT aluno_id, aula_id, pontuacao FROM progresso") == [(2, 1, 0)]
+        assert consultar(caminho, "SELECT aluno_id, exercicio_id, esta_correta FROM respostas_alunos") == [(2, 1, 0)]
+        assert consultar(caminho, "SELECT aluno_id, tipo FROM eventos_gamificacao") == [(2, 'exercicio')]
+
+    def test_concluir_aula(self, client, caminho):
+        client.post('/student/aula/1/iniciar')
+        client.post('/student/aula/1/concluir')
+
+        assert consultar(caminho, "SELECT status FROM progresso WHERE aluno_id = 2") == [('concluido',)]
+        assert consultar(caminho, "SELECT tipo, pontos FROM eventos_gamificacao ORDER BY id") == [
+            ('inicio_aula', 0), ('aula', app_old.PONTOS_AULA)
+        ]
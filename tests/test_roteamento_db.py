@@ -0,0 +1,112 @@
+"""
+Testes unitários para o roteamento de leituras e escritas (réplica de leitura)
+"""
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, g
+
+from utils import roteamento_db
+
+
+class TestLeituraAposEscrita:
+    """Testes para a janela de leitura das próprias escritas"""
+
+    def test_sem_escrita_le_da_replica(self):
+        assert not roteamento_db.leitura_no_primario({})
+        assert not roteamento_db.leitura_no_primario(None)
+
+    def test_janela_apos_escrita(self, monkeypatch):
+        monkeypatch.setattr(roteamento_db, 'REPLICA_LEITURA_APOS_ESCRITA_S', 5)
+        sessao = {}
+        roteamento_db.marcar_escrita(sessao, agora=1000.0)
+        assert roteamento_db.leitura_no_primario(sessao, agora=1004.9)
+        assert not roteamento_db.leitura_no_primario(sessao, agora=1005.1)
+
+    def test_dsn_leitura(self, monkeypatch):
+        monkeypatch.setenv('DATABASE_URL', 'postgresql://primario/escola')
+        monkeypatch.delenv('DATABASE_REPLICA_URL', raising=False)
+        assert roteamento_db.dsn_leitura({}) == 'postgresql://primario/escola'
+
+        monkeypatch.setenv('DATABASE_REPLICA_URL', 'postgresql://replica/escola')
+        assert roteamento_db.dsn_leitura({}) == 'postgresql://replica/escola'
+
+        sessao = {}
+        roteamento_db.marcar_escrita(sessao)
+        assert roteamento_db.dsn_leitura(sessao) == 'postgresql://primario/escola'
+
+
+class TestIntencao:
+    """Testes para a declaração de intenção das rotas"""
+
+    def test_somente_leitura(self):
+        app = Flask(__name__)
+
+        @roteamento_db.somente_leitura
+        def relatorio():
+            return roteamento_db.intencao_atual()
+
+        with app.test_request_context('/'):
+            assert roteamento_db.intencao_atual() == roteamento_db.INTENCAO_ESCRITA
+            assert relatorio() == roteamento_db.INTENCAO_LEITURA
+            assert g.intencao_db == roteamento_db.INTENCAO_LEITURA
+
+
+class TestGetDbPostgres:
+    """Testes para get_db do app_postgres, sem abrir conexões de verdade"""
+
+    @pytest.fixture
+    def app_postgres(self, monkeypatch):
+        app_postgres = pytest.importorskip('app_postgres')
+        monkeypatch.setenv('DATABASE_REPLICA_URL', 'postgresql://replica/escola')
+
+        def conectar(papel):
+            chave = 'db' if papel == 'primario' else 'db_leitura'
+            return g.setdefault(chave, SimpleNamespace(papel=papel, close=lambda: None))
+
+        monkeypatch.setattr(app_postgres, '_conectar', conectar)
+        return app_postgres
+
+    def test_roteamento(self, app_postgres):
+        with app_postgres.app.test_request_context('/'):
+            assert app_postgres.get_db().papel == 'primario'
+            assert app_postgres.get_db(roteamento_db.INTENCAO_LEITURA).papel == 'replica'
+            g.intencao_db = roteamento_db.INTENCAO_LEITURA
+            assert app_postgres.get_db().papel == 'replica'
+
+    def test_leitura_apos_escrita_vai_ao_primario(self, app_postgres):
+        with app_postgres.app.test_request_context('/'):
+            from flask import session
+            roteamento_db.marcar_escrita(session)
+            assert app_postgres.get_db(roteamento_db.INTENCAO_LEITURA).papel == 'primario'
+
+    def test_replica_indisponivel(self, app_postgres, monkeypatch):
+        def conectar(papel):
+            if papel == 'replica':
+                raise OSError('sem conexão')
+            return SimpleNamespace(papel=papel, close=lambda: None)
+
+        monkeypatch.setattr(app_postgres, '_conectar', conectar)
+        with app_postgres.app.test_request_context('/'):
+            assert app_postgres.get_db(roteamento_db.INTENCAO_LEITURA).papel == 'primario'
+            assert g.replica_indisponivel
+
+    def test_devolve_ao_pool_sem_transacao_aberta(self, app_postgres):
+        """Leituras deixam a transação aberta: close_db a desfaz antes do putconn"""
+        from psycopg.pq import TransactionStatus
+
+        eventos = []
+
+        def conexao(status):
+            return SimpleNamespace(info=SimpleNamespace(transaction_status=status),
+                                   rollback=lambda: eventos.append(('rollback', status)))
+
+        pool = SimpleNamespace(putconn=lambda conn: eventos.append(('putconn', conn.info.transaction_status)))
+        with app_postgres.app.app_context():
+            g.db = conexao(TransactionStatus.INTRANS)
+            g.db_leitura = conexao(TransactionStatus.IDLE)
+            g.db_pools = {'db': pool, 'db_leitura': pool}
+            app_postgres.close_db()
+
+        assert eventos == [('rollback', TransactionStatus.INTRANS), ('putconn', TransactionStatus.INTRANS),
+                           ('putconn', TransactionStatus.IDLE)]
@@ -0,0 +1,75 @@
+"""
+Testes unitários para a instrumentação de SQL por requisição
+"""
+import sqlite3
+
+from flask import Flask
+
+from utils import sql_instrumentation
+from utils.database import is_sqlite_connection
+from utils.sql_instrumentation import (
+    EstatisticasSQL, InstrumentedSQLiteConnection, encerrar_coleta, iniciar_coleta, normalizar_sql
+)
+
+
+def conectar():
+    db = sqlite3.connect(':memory:', factory=InstrumentedSQLiteConnection)
+    db.execute("CREATE TABLE aulas (id INTEGER PRIMARY KEY, titulo TEXT)")
+    db.executemany("INSERT INTO aulas (titulo) VALUES (?)", [(f'Aula {i}',) for i in range(10)])
+    return db
+
+
+class TestSQLInstrumentation:
+    """Testes para a coleta de consultas"""
+
+    def test_normalizar_sql(self):
+        """Consultas que diferem só nos valores têm o mesmo formato"""
+        a = normalizar_sql("SELECT *  FROM aulas\n WHERE id = 1 AND titulo = 'x'")
+        b = normalizar_sql("SELECT * FROM aulas WHERE id = 42 AND titulo = 'outra'")
+
+        assert a == b == "SELECT * FROM aulas WHERE id = ? AND titulo = ?"
+        assert normalizar_sql("SELECT 1 WHERE id IN (%s, %s, %s)") == "SELECT ? WHERE id IN (?...)"
+
+    def test_conexao_continua_sqlite(self):
+        """A conexão instrumentada ainda é reconhecida como sqlite3"""
+        assert is_sqlite_connection(conectar())
+
+    def test_coleta_e_n_mais_1(self):
+        """Consultas repetidas dentro da coleta são contadas e apontadas como N+1"""
+        db = conectar()
+        token = iniciar_coleta()
+        try:
+            for aula_id in range(1, 7):
+                db.cursor().execute("SELECT titulo FROM aulas WHERE id = ?", (aula_id,)).fetchone()
+            db.execute("SELECT COUNT(*) FROM aulas")
+        finally:
+            estatisticas = encerrar_coleta(token)
+
+        assert estatisticas.consultas == 7
+        assert estatisticas.suspeitas_n_mais_1(limite=5) == [("SELECT titulo FROM aulas WHERE id = ?", 6)]
+        assert len(estatisticas.mais_lentas()) == 5
+
+    def test_fora_da_coleta(self):
+        """Sem coleta ativa as consultas não são registradas"""
+        estatisticas = EstatisticasSQL()
+        conectar().execute("SELECT 1")
+
+        assert estatisticas.consultas == 0
+        assert sql_instrumentation.estatisticas_atuais() is None
+
+    def test_cabecalho_flask(self):
+        """Os totais da requisição vão para os cabeçalhos"""
+        app = Flask(__name__)
+        sql_instrumentation.init_app(app, cabecalho=True)
+        db = conectar()
+
+        @app.route('/aulas')
+        def aulas():
+            for aula_id in range(1, 4):
+                db.execute("SELECT titulo FROM aulas WHERE id = ?", (aula_id,))
+            return 'ok'
+
+        resposta = app.test_client().get('/aulas')
+
+        assert resposta.headers['X-SQL-Stats'].startswith('consultas=3;')
+        assert resposta.headers['Server-Timing'].startswith('db;dur=')
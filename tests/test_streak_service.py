@@ -0,0 +1,140 @@
+"""
+Testes unitários para StreakService
+"""
+import pytest
+import sqlite3
+from datetime import date, datetime, timezone
+from services.streak_service import (
+    StreakService, StreakInfo, calcular_streak, streak_vigente, data_local, streak_from_row, streak_de_dias
+)
+
+
+class TestCalcularStreak:
+    """Testes para o cálculo incremental da sequência"""
+
+    def test_primeira_atividade(self):
+        """Primeira atividade inicia a sequência em 1"""
+        info = calcular_streak(StreakInfo(aluno_id=1), date(2024, 3, 10))
+
+        assert info.streak_atual == 1
+        assert info.maior_streak == 1
+        assert info.ultima_atividade == date(2024, 3, 10)
+
+    def test_dia_seguinte_incrementa(self):
+        """Atividade no dia seguinte incrementa a sequência"""
+        info = StreakInfo(1, streak_atual=3, maior_streak=3, ultima_atividade=date(2024, 3, 10))
+        novo = calcular_streak(info, date(2024, 3, 11))
+
+        assert novo.streak_atual == 4
+        assert novo.maior_streak == 4
+
+    def test_mesmo_dia_nao_altera(self):
+        """Atividades repetidas no mesmo dia retornam a mesma instância"""
+        info = StreakInfo(1, streak_atual=2, maior_streak=5, ultima_atividade=date(2024, 3, 10))
+
+        assert calcular_streak(info, date(2024, 3, 10)) is info
+
+    def test_dia_pulado_reinicia(self):
+        """Um dia sem estudo reinicia a sequência mas preserva a maior"""
+        info = StreakInfo(1, streak_atual=7, maior_streak=7, ultima_atividade=date(2024, 3, 10))
+        novo = calcular_streak(info, date(2024, 3, 12))
+
+        assert novo.streak_atual == 1
+        assert novo.maior_streak == 7
+
+    def test_streak_vigente_expira(self):
+        """Sequência deixa de valer após um dia inteiro sem atividade"""
+        info = StreakInfo(1, streak_atual=4, maior_streak=4, ultima_atividade=date(2024, 3, 10))
+
+        assert streak_vigente(info, date(2024, 3, 11)) == 4
+        assert streak_vigente(info, date(2024, 3, 12)) == 0
+
+    def test_data_local_usa_fuso_da_escola(self):
+        """Meia-noite UTC ainda é o dia anterior em São Paulo"""
+        momento = datetime(2024, 3, 11, 1, 30, tzinfo=timezone.utc)
+
+        assert data_local(momento) == date(2024, 3, 10)
+
+    def test_streak_from_row(self):
+        """Linhas do SQLite (texto) e ausência de registro são normalizadas"""
+        row = {'streak_atual': 2, 'maior_streak': 5, 'ultima_atividade': '2024-03-10'}
+
+        assert streak_from_row(1, row).ultima_atividade == date(2024, 3, 10)
+        assert streak_from_row(1, None) == StreakInfo(aluno_id=1)
+
+    def test_streak_de_dias(self):
+        """Dias fora de ordem e repetidos dão a mesma sequência que o cálculo incremental"""
+        info = streak_de_dias(1, ['2024-03-12', date(2024, 3, 5), date(2024, 3, 6), '2024-03-11', '2024-03-12'])
+
+        assert (info.streak_atual, info.maior_streak) == (2, 2)
+        assert info.ultima_atividade == date(2024, 3, 12)
+        assert streak_de_dias(1, []) == StreakInfo(aluno_id=1)
+
+
+class TestStreakService:
+    """Testes para StreakService com SQLite em memória"""
+
+    @pytest.fixture
+    def db(self):
+        """Banco SQLite em memória com a tabela de streaks"""
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE streaks_alunos (
+                aluno_id INTEGER PRIMARY KEY,
+                streak_atual INTEGER NOT NULL DEFAULT 0,
+                maior_streak INTEGER NOT NULL DEFAULT 0,
+                ultima_atividade DATE,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE atividade_diaria (aluno_id INTEGER NOT NULL, data DATE NOT NULL);
+        """)
+        yield conn
+        conn.close()
+
+    def test_get_streak_sem_registro(self, db):
+        """Aluno sem atividade tem sequência zerada"""
+        info = StreakService(db).get_streak(1)
+
+        assert info.streak_atual == 0
+        assert info.ultima_atividade is None
+
+    def test_registrar_atividade_dias_consecutivos(self, db):
+        """Atividades em dias consecutivos acumulam a sequência"""
+        service = StreakService(db)
+        for dia in (10, 11, 11, 12):
+            service.registrar_atividade(1, datetime(2024, 3, dia, 15, 0))
+
+        info = service.get_streak(1)
+        assert info.streak_atual == 3
+        assert info.maior_streak == 3
+        assert info.ultima_atividade == date(2024, 3, 12)
+
+    def test_registrar_atividade_mesmo_dia_nao_escreve(self, db):
+        """Segunda atividade no mesmo dia não executa escrita"""
+        service = StreakService(db)
+        service.registrar_atividade(1, datetime(2024, 3, 10, 15, 0))
+        total_antes = db.total_changes
+
+        service.registrar_atividade(1, datetime(2024, 3, 10, 18, 0))
+
+        assert db.total_changes == total_antes
+
+    def test_rebuild_a_partir_da_atividade_diaria(self, db):
+        """Rebuild recalcula as sequências pelos dias de atividade e substitui as antigas"""
+        db.executescript("""
+            INSERT INTO streaks_alunos (aluno_id, streak_atual, maior_streak) VALUES (9, 4, 4);
+            INSERT INTO atividade_diaria VALUES
+                (1, '2024-03-08'), (1, '2024-03-09'), (1, '2024-03-10'), (1, '2024-03-12'),
+                (2, '2024-03-12');
+        """)
+        service = StreakService(db)
+
+        assert service.rebuild() == 2
+
+        info = service.get_streak(1)
+        assert (info.streak_atual, info.maior_streak) == (1, 3)
+        assert info.ultima_atividade == date(2024, 3, 12)
+        assert service.get_streak(9) == StreakInfo(aluno_id=9)
+
+        # O cálculo incremental continua de onde o rebuild parou
+        assert service.registrar_atividade(1, datetime(2024, 3, 13, 15, 0)).streak_atual == 2
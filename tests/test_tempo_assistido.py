@@ -0,0 +1,166 @@
+"""
+Testes unitários para o acúmulo e a gravação do tempo assistido
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from services import tempo_assistido
+from services.tempo_assistido import AcumuladorTempo
+from utils import metrics
+
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória com aulas e progresso"""
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    conn.executescript("""
+        CREATE TABLE aulas (id INTEGER PRIMARY KEY);
+        CREATE TABLE progresso (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, aluno_id INTEGER, aula_id INTEGER,
+            status TEXT DEFAULT 'nao_iniciado', tempo_assistido INTEGER DEFAULT 0,
+            ultima_atividade TIMESTAMP, UNIQUE(aluno_id, aula_id)
+        );
+        CREATE TABLE atividade_diaria (
+            aluno_id INTEGER NOT NULL, data DATE NOT NULL,
+            aulas INTEGER NOT NULL DEFAULT 0, exercicios INTEGER NOT NULL DEFAULT 0,
+            pontos INTEGER NOT NULL DEFAULT 0, minutos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (aluno_id, data)
+        );
+        INSERT INTO aulas VALUES (1), (2);
+        INSERT INTO progresso (aluno_id, aula_id, status, tempo_assistido, ultima_atividade)
+            VALUES (5, 1, 'concluido', 100, '2030-01-01 00:00:00');
+    """)
+    tempo_assistido._acumulador.retirar()
+    metrics.limpar()
+    yield conn
+    tempo_assistido._acumulador.retirar()
+    conn.close()
+
+
+class FalhaNoCommit:
+    """Conexão que executa normalmente mas falha ao confirmar"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getattr__(self, nome):
+        return getattr(self.db, nome)
+
+    def commit(self):
+        raise sqlite3.OperationalError('database is locked')
+
+
+class TestAcumuladorTempo:
+    """Testes para a soma em memória e o limite de pares"""
+
+    def test_soma_por_par_e_limita_delta(self):
+        acumulador = AcumuladorTempo(max_pares=10, max_delta_s=30)
+        acumulador.registrar(5, 1, 10, agora=100)
+        acumulador.registrar(5, 1, 500, agora=110)
+        acumulador.registrar(5, 1, -3, agora=90)
+
+        pendente = acumulador.retirar()[(5, 1)]
+        assert (pendente.segundos, pendente.heartbeats, pendente.ultimo) == (40, 3, 110)
+        assert len(acumulador) == 0
+
+    def test_limite_de_pares(self):
+        acumulador = AcumuladorTempo(max_pares=2)
+
+        assert acumulador.registrar(1, 1, 5) == 'aceito'
+        assert acumulador.registrar(2, 1, 5) == 'cheio'
+        assert acumulador.registrar(3, 1, 5) == 'descartado'
+        assert acumulador.registrar(1, 1, 5) == 'cheio'
+        assert len(acumulador) == 2
+
+    def test_devolver_soma_ao_que_chegou_depois(self):
+        acumulador = AcumuladorTempo()
+        acumulador.registrar(5, 1, 10)
+        retirados = acumulador.retirar()
+        acumulador.registrar(5, 1, 4)
+
+        acumulador.devolver(retirados)
+
+        assert acumulador.retirar()[(5, 1)].segundos == 14
+
+    def test_threads(self):
+        acumulador = AcumuladorTempo()
+
+        def enviar():
+            for _ in range(1000):
+                acumulador.registrar(5, 1, 1)
+
+        threads = [threading.Thread(target=enviar) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert acumulador.retirar()[(5, 1)].heartbeats == 4000
+
+
+class TestDescarregar:
+    """Testes para a gravação em lote"""
+
+    def test_um_upsert_para_todos_os_pares(self, db):
+        for _ in range(6):
+            tempo_assistido.registrar(5, 1, 5)
+            tempo_assistido.registrar(6, 2, 10)
+        tempo_assistido.registrar(7, 99, 10)  # aula inexistente
+
+        comandos = []
+        db.set_trace_callback(comandos.append)
+        assert tempo_assistido.descarregar(db) == 2
+        db.set_trace_callback(None)
+
+        inserts = [c.split('(')[0].split()[-1] for c in comandos if c.lstrip().startswith('INSERT')]
+        assert inserts == ['progresso', 'atividade_diaria']
+        assert db.execute(
+            "SELECT aluno_id, aula_id, status, tempo_assistido FROM progresso ORDER BY aluno_id"
+        ).fetchall() == [(5, 1, 'concluido', 130), (6, 2, 'em_andamento', 60)]
+        # Minutos completados: 100s -> 130s e 0s -> 60s cruzam um minuto cada
+        assert db.execute(
+            "SELECT aluno_id, minutos FROM atividade_diaria ORDER BY aluno_id"
+        ).fetchall() == [(5, 1), (6, 1)]
+        assert tempo_assistido.pendentes() == 0
+
+        texto = metrics.gerar_texto()
+        assert 'tempo_assistido_linhas_gravadas_total{motivo="periodico"} 2' in texto
+        assert 'tempo_assistido_escritas_evitadas_total 11' in texto
+
+    def test_so_o_par_da_aula_concluida(self, db):
+        tempo_assistido.registrar(6, 1, 20)
+        tempo_assistido.registrar(6, 2, 20)
+
+        assert tempo_assistido.descarregar_aula(db, 6, 1) == 1
+        assert tempo_assistido.pendentes() == 1
+
+    def test_falha_devolve_para_a_memoria(self, db):
+        tempo_assistido.registrar(6, 1, 20)
+
+        assert tempo_assistido.descarregar(FalhaNoCommit(db)) == 0
+        assert tempo_assistido.pendentes() == 1
+        assert tempo_assistido.descarregar(db) == 1
+        assert db.execute("SELECT tempo_assistido FROM progresso WHERE aluno_id = 6").fetchone() == (20,)
+        # Menos de um minuto: nada em atividade_diaria
+        assert db.execute("SELECT COUNT(*) FROM atividade_diaria").fetchone() == (0,)
+
+
+class TestDescarregador:
+    """Testes para a thread de gravação"""
+
+    def test_parar_grava_o_pendente(self, db):
+        class Manager:
+            def connect(self):
+                return db
+
+            def release(self, conn):
+                pass
+
+        descarregador = tempo_assistido.DescarregadorTempo(Manager(), intervalo=60)
+        descarregador.start()
+        tempo_assistido.registrar(6, 2, 15)
+        descarregador.parar()
+
+        assert db.execute("SELECT tempo_assistido FROM progresso WHERE aluno_id = 6").fetchone() == (15,)
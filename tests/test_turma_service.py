@@ -5,7 +5,7 @@ import pytest
 import sqlite3
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-from services.turma_service import TurmaService
+from services.turma_service import TurmaService, criar_versao_turmas
 
 
 class TestTurmaService:
@@ -269,5 +269,76 @@ class TestTurmaService:
             mock_conn.rollback.assert_called_once()
 
 
+
+class TestVersaoTurmas:
+    """Testes para a versão das turmas mantida pelos triggers"""
+    
+    @pytest.fixture
+    def db(self):
+        """Banco SQLite em memória com as tabelas lidas pela API de turmas"""
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, email TEXT,
+                                first_name TEXT, last_name TEXT, is_active BOOLEAN);
+            CREATE TABLE turmas (id INTEGER PRIMARY KEY, nome TEXT, serie TEXT, professor_id INTEGER,
+                                 created_at TIMESTAMP);
+            CREATE TABLE aluno_turma (id INTEGER PRIMARY KEY, aluno_id INTEGER, turma_id INTEGER, status TEXT);
+            CREATE TABLE aulas (id INTEGER PRIMARY KEY, titulo TEXT, serie TEXT, professor_id INTEGER);
+            CREATE TABLE progresso (id INTEGER PRIMARY KEY, aluno_id INTEGER, aula_id INTEGER,
+                                    pontuacao INTEGER, tempo_assistido INTEGER);
+            INSERT INTO users VALUES (1, 'prof', 'p@x', 'P', 'R', 1);
+        """)
+        yield conn
+        conn.close()
+    
+    def test_sem_tabela_de_versoes(self, db):
+        """Banco antigo: sem versão, a API responde sempre por inteiro"""
+        assert TurmaService(db).versao() is None
+    
+    def test_alteracoes_incrementam(self, db):
+        """Só as alterações que mudam alguma resposta incrementam a versão"""
+        criar_versao_turmas(db)
+        criar_versao_turmas(db)
+        service = TurmaService(db)
+        assert service.versao('turmas', 'progresso') == (0, 0)
+        
+        db.execute("INSERT INTO turmas VALUES (1, 'A', '5', 1, '2024-01-01')")
+        db.execute("INSERT INTO aluno_turma VALUES (1, 2, 1, 'ativo')")
+        db.execute("INSERT INTO aulas VALUES (1, 'Frações', '5', 1)")
+        db.execute("UPDATE users SET first_name = 'Paula' WHERE id = 1")
+        assert service.versao('turmas', 'progresso') == (4, 0)
+        
+        db.execute("UPDATE progresso SET tempo_assistido = 300 WHERE id = 1")
+        db.execute("UPDATE aulas SET titulo = 'Frações II' WHERE id = 1")
+        db.execute("UPDATE users SET is_active = 0 WHERE id = 1")
+        assert service.versao('turmas', 'progresso') == (4, 0)
+    
+    def test_progresso_nao_invalida_as_turmas(self, db):
+        """Progresso dos alunos só muda a versão usada pelas estatísticas"""
+        criar_versao_turmas(db)
+        service = TurmaService(db)
+        
+        db.execute("INSERT INTO progresso VALUES (1, 2, 1, 10, 0)")
+        db.execute("UPDATE progresso SET pontuacao = 20 WHERE id = 1")
+        db.execute("UPDATE progresso SET tempo_assistido = 300 WHERE id = 1")
+        db.execute("DELETE FROM progresso WHERE id = 1")
+        assert service.versao('turmas', 'progresso') == (0, 3)
+        assert service.versao() == (0,)
+    
+    def test_remove_triggers_antigos(self, db):
+        """Bancos criados antes: o progresso deixa de incrementar a versão das turmas"""
+        criar_versao_turmas(db)
+        db.execute("""
+            CREATE TRIGGER versao_turmas_progresso_insert AFTER INSERT ON progresso
+            BEGIN
+                UPDATE versoes_recursos SET versao = versao + 1 WHERE recurso = 'turmas';
+            END
+        """)
+        criar_versao_turmas(db)
+        
+        db.execute("INSERT INTO progresso VALUES (1, 2, 1, 10, 0)")
+        assert TurmaService(db).versao('turmas', 'progresso') == (0, 1)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
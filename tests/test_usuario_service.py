@@ -0,0 +1,104 @@
+"""
+Testes unitários para a busca de usuários da administração (SQLite + FTS5)
+"""
+import sqlite3
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from services.usuario_service import FiltroUsuarios, UsuarioService, criar_indice_busca_sqlite
+
+USUARIOS = [
+    # id, username, email, first_name, last_name, user_type, is_active, created_at
+    (1, 'admin', 'admin@escola.com', 'Ana', 'Souza', 'admin', 1, '2024-01-01 08:00:00'),
+    (2, 'prof_carlos', 'carlos@escola.com', 'Carlos', 'Pereira', 'professor', 1, '2024-01-02 08:00:00'),
+    (3, 'joao.silva', 'joao@aluno.com', 'João', 'Silva', 'aluno', 1, '2024-01-03 08:00:00'),
+    (4, 'maria_s', 'maria@aluno.com', 'Maria', 'Silvestre', 'aluno', 0, '2024-01-04 08:00:00'),
+    (5, 'pedro100%', 'pedro@aluno.com', 'Pedro', 'Costa', 'aluno', 1, '2024-01-05 08:00:00'),
+]
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY, username TEXT, email TEXT, first_name TEXT, last_name TEXT,
+            user_type TEXT, is_active BOOLEAN, created_at TIMESTAMP
+        );
+        CREATE TABLE aluno_turma (aluno_id INTEGER, turma_id INTEGER, status TEXT);
+        CREATE TABLE turmas (id INTEGER PRIMARY KEY, professor_id INTEGER);
+        INSERT INTO turmas VALUES (1, 2), (2, 2);
+        INSERT INTO aluno_turma VALUES (3, 1, 'ativo'), (3, 2, 'inativo');
+    """)
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)", USUARIOS)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _ids(db, **filtro):
+    return [u[0] for u in UsuarioService(db).buscar(FiltroUsuarios(**filtro)).itens]
+
+
+class TestUsuarioService:
+    """Testes para UsuarioService.buscar"""
+
+    def test_sem_filtro_mais_recentes_primeiro(self, db):
+        assert _ids(db) == [5, 4, 3, 2, 1]
+
+    @pytest.mark.parametrize('termo, esperado', [
+        ('silv', [4, 3]),          # trecho do sobrenome
+        ('ESCOLA.COM', [2, 1]),    # email, sem diferenciar maiúsculas
+        ('carlos pe', [2]),        # nome completo
+        ('100%', [5]),             # caracteres especiais do LIKE são literais
+        ('jo', [3]),               # termo curto: prefixo do usuário ou email
+        ('xyz', []),
+    ])
+    def test_busca_textual(self, db, termo, esperado):
+        assert _ids(db, termo=termo) == esperado
+
+    def test_filtros(self, db):
+        assert _ids(db, user_type='aluno') == [5, 4, 3]
+        assert _ids(db, user_type='aluno', is_active=False) == [4]
+        assert _ids(db, termo='silv', is_active=True) == [3]
+
+    def test_contador_e_situacao(self, db):
+        usuarios = {u[0]: u for u in UsuarioService(db).buscar(FiltroUsuarios()).itens}
+        assert usuarios[3][7] == 1     # uma matrícula ativa
+        assert usuarios[2][7] == 2     # duas turmas do professor
+        assert usuarios[4][8] == 0     # inativo
+
+    def test_indice_acompanha_alteracoes(self, db):
+        """Os triggers mantêm o índice FTS em dia após inserir, alterar e excluir"""
+        assert criar_indice_busca_sqlite(db)
+        db.execute("INSERT INTO users VALUES (6, 'beatriz', 'bia@aluno.com', 'Beatriz', 'Lima', 'aluno', 1, "
+                   "'2024-01-06 08:00:00')")
+        db.execute("UPDATE users SET last_name = 'Rocha' WHERE id = 3")
+        db.execute("DELETE FROM users WHERE id = 4")
+
+        assert _ids(db, termo='beatriz') == [6]
+        assert _ids(db, termo='silvestre') == []
+        assert _ids(db, termo='rocha') == [3]
+
+    def test_paginacao_com_filtro(self, db):
+        service = UsuarioService(db)
+        primeira = service.buscar(FiltroUsuarios(user_type='aluno'), por_pagina=2)
+        segunda = service.buscar(FiltroUsuarios(user_type='aluno'), primeira.proximo_cursor, por_pagina=2)
+        assert [u[0] for u in primeira.itens] == [5, 4]
+        assert [u[0] for u in segunda.itens] == [3]
+        assert not segunda.tem_mais
+
+
+class TestFiltroUsuarios:
+    """Testes para a leitura dos parâmetros da URL"""
+
+    def test_de_args(self):
+        filtro = FiltroUsuarios.de_args(MultiDict({'q': '  maria ', 'tipo': 'aluno', 'ativo': '0'}))
+        assert filtro == FiltroUsuarios('maria', 'aluno', False)
+        assert filtro.como_args() == {'q': 'maria', 'tipo': 'aluno', 'ativo': '0'}
+
+    def test_valores_desconhecidos_ignorados(self):
+        filtro = FiltroUsuarios.de_args(MultiDict({'tipo': 'root', 'ativo': 'talvez'}))
+        assert filtro == FiltroUsuarios()
+        assert filtro.como_args() == {}
@@ -0,0 +1,125 @@
+"""
+Armazenamento e leitura das alternativas dos exercícios
+
+As alternativas ficavam como texto livre: no SQLite a coluna
+exercicios.alternativas ("JSON como TEXT") recebia 'a|b|c' e era separada a
+cada exibição e correção; no PostgreSQL exercicios.opcoes é JSONB, mas podia
+guardar um texto JSON em vez do objeto. A representação normalizada é:
+
+- SQLite: alternativas é um array JSON de textos, validado pelo JSON1 em
+  triggers de INSERT e UPDATE (o SQLite não acrescenta CHECK a uma tabela
+  existente); resposta_correta é o texto da alternativa certa.
+- PostgreSQL: opcoes é um objeto JSONB {letra: texto}, garantido por uma
+  CHECK constraint (migração 0007); resposta_correta é a letra.
+
+ler() aceita qualquer um dos formatos, inclusive o antigo com '|', e é usado
+uma única vez por exercício, na carga para o cache de conteúdo.
+"""
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+SEPARADOR_LEGADO = '|'
+
+TRIGGERS_SQLITE = """
+    CREATE TRIGGER IF NOT EXISTS exercicios_alternativas_insert
+    BEFORE INSERT ON exercicios
+    WHEN json_type(CASE WHEN json_valid(NEW.alternativas) THEN NEW.alternativas END) IS NOT 'array'
+    BEGIN
+        SELECT RAISE(ABORT, 'exercicios.alternativas deve ser um array JSON');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS exercicios_alternativas_update
+    BEFORE UPDATE OF alternativas ON exercicios
+    WHEN json_type(CASE WHEN json_valid(NEW.alternativas) THEN NEW.alternativas END) IS NOT 'array'
+    BEGIN
+        SELECT RAISE(ABORT, 'exercicios.alternativas deve ser um array JSON');
+    END;
+"""
+
+
+def ler(valor: Any) -> List[str]:
+    """
+    Converte as alternativas guardadas em uma lista de textos
+
+    Args:
+        valor: Lista ou dict já decodificados (JSONB), texto JSON, texto
+            antigo separado por '|' (ou uma por linha, como no formulário
+            do professor) ou None
+
+    Returns:
+        List[str]: Alternativas na ordem em que foram cadastradas
+    """
+    if valor is None:
+        return []
+    if isinstance(valor, dict):
+        return [str(texto) for texto in valor.values()]
+    if isinstance(valor, (list, tuple)):
+        return [str(texto) for texto in valor]
+
+    texto = str(valor).strip()
+    if not texto:
+        return []
+    if texto[0] in '[{"':
+        try:
+            return ler(json.loads(texto))
+        except ValueError:
+            pass
+    separador = SEPARADOR_LEGADO if SEPARADOR_LEGADO in texto else '\n'
+    return [parte.strip() for parte in texto.split(separador) if parte.strip()]
+
+
+def serializar(valor: Any) -> str:
+    """Alternativas (em qualquer formato aceito por ler) como array JSON"""
+    return json.dumps(ler(valor), ensure_ascii=False)
+
+
+def como_opcoes(valor: Any) -> Dict[str, str]:
+    """
+    Alternativas como o objeto {letra: texto} do PostgreSQL
+
+    Um objeto é mantido como está; listas e textos recebem as letras A, B, C...
+    """
+    if isinstance(valor, str) and valor.strip().startswith(('{', '"')):
+        try:
+            valor = json.loads(valor)
+        except ValueError:
+            pass
+    if isinstance(valor, dict):
+        return {str(letra): str(texto) for letra, texto in valor.items()}
+    return {chr(ord('A') + i): texto for i, texto in enumerate(ler(valor))}
+
+
+def converter_sqlite(db: sqlite3.Connection) -> int:
+    """
+    Converte as alternativas antigas para array JSON e cria os triggers
+
+    Seguro para rodar a cada inicialização: se os triggers já existem, só
+    uma consulta ao sqlite_master é feita.
+
+    Args:
+        db (sqlite3.Connection): Conexão com o banco
+
+    Returns:
+        int: Número de exercícios convertidos
+    """
+    existe = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'exercicios_alternativas_insert'"
+    ).fetchone()
+    if existe:
+        return 0
+
+    linhas = db.execute("""
+        SELECT id, alternativas FROM exercicios
+        WHERE json_type(CASE WHEN json_valid(alternativas) THEN alternativas END) IS NOT 'array'
+    """).fetchall()
+    db.executemany('UPDATE exercicios SET alternativas = ? WHERE id = ?',
+                   [(serializar(linha[1]), linha[0]) for linha in linhas])
+    db.executescript(TRIGGERS_SQLITE)
+    db.commit()
+    if linhas:
+        logger.info(f"Alternativas de {len(linhas)} exercícios convertidas para JSON")
+    return len(linhas)
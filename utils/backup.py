@@ -0,0 +1,397 @@
+"""
+Backups online do banco de dados e restauração
+
+Cada backup é uma cópia completa (não incremental), feita sem bloquear a
+aplicação.
+
+SQLite: usa a API de backup online do SQLite, copiando algumas páginas por
+passo e pausando entre os passos, para que as requisições não fiquem
+bloqueadas durante a cópia. Em WAL (modo produção do DatabaseManager) a cópia
+lê um único snapshot e é consistente mesmo com escritas em andamento, ao
+contrário de copiar o arquivo. restaurar_sqlite copia o backup de volta pela
+mesma API.
+
+PostgreSQL: exporta cada tabela com COPY ... TO STDOUT em fluxo, dentro de uma
+única transação REPEATABLE READ somente leitura (todas as tabelas refletem o
+mesmo instante) e sem bloquear as escritas. O manifest.json guarda as colunas
+de cada tabela, o valor de cada sequência e as migrações aplicadas (o esquema
+é o das migrações em migrations/versions até essa versão). restaurar_postgres
+cria o esquema com o executor de migrações, carrega as tabelas com COPY FROM
+na ordem das chaves estrangeiras e ajusta as sequências com setval.
+
+Os dois podem gravar comprimido (gzip) e manter apenas os N backups mais
+recentes no diretório de destino.
+"""
+import graphlib
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Páginas copiadas por passo e pausa entre passos do backup SQLite
+PAGINAS_POR_PASSO = int(os.getenv('BACKUP_PAGINAS_POR_PASSO', '256'))
+PAUSA_ENTRE_PASSOS = float(os.getenv('BACKUP_PAUSA_MS', '5')) / 1000
+
+TAMANHO_BLOCO = 1024 * 1024
+
+# Tabela do executor de migrações: recriada pelas migrações, não pelo backup
+TABELA_VERSAO = 'schema_version'
+
+
+@dataclass
+class ResultadoBackup:
+    """Resumo de um backup"""
+    caminho: str
+    bytes: int
+    segundos: float
+    tabelas: List[str] = field(default_factory=list)
+
+    @property
+    def bytes_por_segundo(self) -> float:
+        return self.bytes / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (f"{self.caminho}: {self.bytes / 1024 / 1024:.1f} MB em {self.segundos:.2f}s "
+                f"({self.bytes_por_segundo / 1024 / 1024:.1f} MB/s)")
+
+
+def _comprimir(origem: str, destino: str):
+    """Comprime um arquivo em blocos para não carregá-lo inteiro na memória"""
+    with open(origem, 'rb') as entrada, gzip.open(destino, 'wb', compresslevel=6) as saida:
+        shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO)
+
+
+def backup_sqlite(database_path: str, destino: str, comprimir: bool = False,
+                  paginas: int = None, pausa: float = None) -> ResultadoBackup:
+    """
+    Copia um banco SQLite em uso pela API de backup online
+
+    Args:
+        database_path (str): Banco de origem
+        destino (str): Arquivo de destino (recebe .gz se comprimir)
+        comprimir (bool): Gravar comprimido com gzip
+        paginas (int): Páginas copiadas por passo (padrão: BACKUP_PAGINAS_POR_PASSO)
+        pausa (float): Segundos de pausa entre os passos (padrão: BACKUP_PAUSA_MS)
+
+    Returns:
+        ResultadoBackup: Caminho final, tamanho e duração
+    """
+    paginas = paginas or PAGINAS_POR_PASSO
+    pausa = PAUSA_ENTRE_PASSOS if pausa is None else pausa
+    final = destino + '.gz' if comprimir and not destino.endswith('.gz') else destino
+    temporario = final + '.tmp'
+
+    inicio = time.perf_counter()
+    origem = sqlite3.connect(database_path, isolation_level=None)
+    copia = sqlite3.connect(temporario)
+    try:
+        # Uma escrita de outra conexão entre dois passos faz o SQLite recomeçar
+        # a cópia do zero; sob escrita contínua ela nunca terminaria. Em WAL a
+        # origem fica presa a um snapshot (transação de leitura), que não
+        # bloqueia os escritores. No modo rollback um leitor aberto bloquearia
+        # os commits, então a cópia apenas cede entre os passos.
+        wal = origem.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+        if wal:
+            origem.execute("BEGIN")
+            origem.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        origem.backup(copia, pages=paginas, sleep=pausa)
+        if wal:
+            origem.execute("COMMIT")
+    finally:
+        copia.close()
+        origem.close()
+
+    try:
+        if comprimir:
+            _comprimir(temporario, temporario + '.gz')
+            os.remove(temporario)
+            os.replace(temporario + '.gz', final)
+        else:
+            os.replace(temporario, final)
+    except Exception:
+        for resto in (temporario, temporario + '.gz'):
+            if os.path.exists(resto):
+                os.remove(resto)
+        raise
+
+    resultado = ResultadoBackup(final, os.path.getsize(final), time.perf_counter() - inicio)
+    logger.info(f"Backup SQLite criado em {resultado}")
+    return resultado
+
+
+def backup_postgres(db, destino_dir: str, comprimir: bool = True,
+                    tabelas: Optional[List[str]] = None) -> ResultadoBackup:
+    """
+    Exporta as tabelas do PostgreSQL com COPY em fluxo, uma por arquivo
+
+    Cria destino_dir com <tabela>.copy(.gz) no formato texto do COPY e um
+    manifest.json com as colunas de cada tabela, o valor de cada sequência e
+    as migrações aplicadas (para restaurar com restaurar_postgres).
+
+    Args:
+        db: Conexão psycopg (não deve estar em transação)
+        destino_dir (str): Diretório do backup (criado)
+        comprimir (bool): Gravar cada tabela comprimida com gzip
+        tabelas (Optional[List[str]]): Tabelas a exportar (padrão: todas do schema public)
+
+    Returns:
+        ResultadoBackup: Diretório, bytes gravados e duração
+    """
+    inicio = time.perf_counter()
+    temporario = destino_dir + '.tmp'
+    os.makedirs(temporario, exist_ok=True)
+    manifesto = {'criado_em': datetime.utcnow().isoformat(timespec='seconds'), 'tabelas': {},
+                 'sequencias': {}, 'migracoes': {}}
+    total = 0
+
+    autocommit = db.autocommit
+    db.autocommit = False
+    try:
+        cur = db.cursor()
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        if tabelas is None:
+            cur.execute("""
+                SELECT tablename FROM pg_tables WHERE schemaname = 'public' ORDER BY tablename
+            """)
+            tabelas = [row['tablename'] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+
+        for tabela in tabelas:
+            cur.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position
+            """, (tabela,))
+            colunas = [row['column_name'] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+
+            arquivo = os.path.join(temporario, tabela + ('.copy.gz' if comprimir else '.copy'))
+            abrir = gzip.open if comprimir else open
+            with abrir(arquivo, 'wb') as saida:
+                with cur.copy(f'COPY "{tabela}" TO STDOUT') as copy:
+                    for bloco in copy:
+                        saida.write(bloco)
+            total += os.path.getsize(arquivo)
+            manifesto['tabelas'][tabela] = {'arquivo': os.path.basename(arquivo), 'colunas': colunas}
+
+        # Sequências e versão do esquema, no mesmo snapshot das tabelas
+        cur.execute("""
+            SELECT sequencename, last_value FROM pg_sequences
+            WHERE schemaname = 'public' ORDER BY sequencename
+        """)
+        for row in cur.fetchall():
+            nome, valor = (row['sequencename'], row['last_value']) if isinstance(row, dict) else row
+            manifesto['sequencias'][nome] = valor
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL AS existe", (TABELA_VERSAO,))
+        row = cur.fetchone()
+        if row['existe'] if isinstance(row, dict) else row[0]:
+            cur.execute(f"SELECT version, checksum FROM {TABELA_VERSAO} ORDER BY version")
+            for row in cur.fetchall():
+                versao, checksum = (row['version'], row['checksum']) if isinstance(row, dict) else row
+                manifesto['migracoes'][str(versao)] = checksum.strip()
+        db.rollback()
+    except Exception:
+        db.rollback()
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    finally:
+        db.autocommit = autocommit
+
+    with open(os.path.join(temporario, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2)
+    if os.path.exists(destino_dir):
+        shutil.rmtree(destino_dir)
+    os.replace(temporario, destino_dir)
+
+    resultado = ResultadoBackup(destino_dir, total, time.perf_counter() - inicio, list(tabelas))
+    logger.info(f"Backup PostgreSQL criado em {resultado} ({len(tabelas)} tabelas)")
+    return resultado
+
+
+def restaurar_sqlite(backup: str, database_path: str) -> ResultadoBackup:
+    """
+    Restaura um backup de backup_sqlite (comprimido ou não) em database_path
+
+    A cópia usa a API de backup online: o banco de destino pode estar aberto,
+    mas todo o seu conteúdo é substituído pelo do backup.
+
+    Args:
+        backup (str): Arquivo .db ou .db.gz gerado por backup_sqlite
+        database_path (str): Banco de destino
+
+    Returns:
+        ResultadoBackup: Banco restaurado, tamanho e duração
+    """
+    inicio = time.perf_counter()
+    temporario = None
+    if backup.endswith('.gz'):
+        descritor, temporario = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(os.path.abspath(database_path)))
+        with gzip.open(backup, 'rb') as entrada, os.fdopen(descritor, 'wb') as saida:
+            shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO)
+
+    origem = sqlite3.connect(temporario or backup)
+    destino = sqlite3.connect(database_path)
+    try:
+        if origem.execute("PRAGMA integrity_check").fetchone()[0] != 'ok':
+            raise ValueError(f"Backup corrompido: {backup}")
+        origem.backup(destino)
+    finally:
+        destino.close()
+        origem.close()
+        if temporario:
+            os.remove(temporario)
+
+    resultado = ResultadoBackup(database_path, os.path.getsize(database_path), time.perf_counter() - inicio)
+    logger.info(f"Backup {backup} restaurado em {resultado}")
+    return resultado
+
+
+def ordem_de_carga(tabelas: Iterable[str], referencias: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    Tabelas em uma ordem em que cada uma vem depois das que ela referencia
+
+    Args:
+        tabelas (Iterable[str]): Tabelas a carregar
+        referencias (Iterable[Tuple[str, str]]): (tabela, tabela referenciada) de cada chave estrangeira
+
+    Returns:
+        List[str]: Tabelas em ordem de carga (empates em ordem alfabética)
+
+    Raises:
+        graphlib.CycleError: Se as chaves estrangeiras formam um ciclo entre tabelas
+    """
+    tabelas = sorted(tabelas)
+    dependencias: Dict[str, set] = {tabela: set() for tabela in tabelas}
+    for tabela, referencia in referencias:
+        # Autorreferências são verificadas no fim do COPY, não precisam de ordem
+        if tabela in dependencias and referencia in dependencias and tabela != referencia:
+            dependencias[tabela].add(referencia)
+
+    ordenador = graphlib.TopologicalSorter(dependencias)
+    ordenador.prepare()
+    ordem = []
+    while ordenador.is_active():
+        prontas = sorted(ordenador.get_ready())
+        ordem.extend(prontas)
+        ordenador.done(*prontas)
+    return ordem
+
+
+def restaurar_postgres(db, origem_dir: str) -> ResultadoBackup:
+    """
+    Restaura um backup de backup_postgres, substituindo os dados das tabelas
+
+    1. Aplica as migrações até a última do backup (esquema igual ao do backup;
+       as seguintes são aplicadas depois, na inicialização do app).
+    2. Em uma única transação: TRUNCATE das tabelas do backup, COPY FROM de
+       cada uma na ordem das chaves estrangeiras e setval das sequências.
+
+    Args:
+        db: Conexão psycopg (não deve estar em transação)
+        origem_dir (str): Diretório criado por backup_postgres
+
+    Returns:
+        ResultadoBackup: Diretório, bytes lidos e duração
+
+    Raises:
+        ValueError: Se o banco de destino tem um esquema diferente do backup
+    """
+    from migrations.runner import migrar, versoes_aplicadas
+
+    inicio = time.perf_counter()
+    with open(os.path.join(origem_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifesto = json.load(f)
+    migracoes = {int(v): c for v, c in manifesto.get('migracoes', {}).items()}
+
+    if migracoes:
+        cur = db.cursor()
+        aplicadas = versoes_aplicadas(cur)
+        db.commit()
+        posteriores = sorted(v for v in aplicadas if v > max(migracoes))
+        if posteriores:
+            raise ValueError(f"O banco já tem migrações posteriores ao backup ({posteriores}); "
+                             "restaure em um banco vazio")
+        migrar(db, ate=max(migracoes))
+        cur = db.cursor()
+        aplicadas = {v: c.strip() for v, c in versoes_aplicadas(cur).items()}
+        db.commit()
+        if aplicadas != migracoes:
+            raise ValueError("As migrações em disco não são as do backup; restaure com a versão do código "
+                             "que fez o backup")
+
+    tabelas = [t for t in manifesto['tabelas'] if t != TABELA_VERSAO]
+    total = 0
+    autocommit = db.autocommit
+    db.autocommit = False
+    try:
+        cur = db.cursor()
+        cur.execute("""
+            SELECT conrelid::regclass::text AS tabela, confrelid::regclass::text AS referencia
+            FROM pg_constraint
+            WHERE contype = 'f' AND connamespace = 'public'::regnamespace
+        """)
+        referencias = [(row['tabela'], row['referencia']) if isinstance(row, dict) else tuple(row)
+                       for row in cur.fetchall()]
+        ordem = ordem_de_carga(tabelas, referencias)
+
+        if ordem:
+            cur.execute("TRUNCATE " + ", ".join(f'"{t}"' for t in ordem) + " RESTART IDENTITY")
+        for tabela in ordem:
+            info = manifesto['tabelas'][tabela]
+            arquivo = os.path.join(origem_dir, info['arquivo'])
+            colunas = ", ".join(f'"{c}"' for c in info['colunas'])
+            abrir = gzip.open if arquivo.endswith('.gz') else open
+            with abrir(arquivo, 'rb') as entrada:
+                with cur.copy(f'COPY "{tabela}" ({colunas}) FROM STDIN') as copy:
+                    while bloco := entrada.read(TAMANHO_BLOCO):
+                        copy.write(bloco)
+            total += os.path.getsize(arquivo)
+
+        for sequencia, valor in manifesto.get('sequencias', {}).items():
+            # Sequência nunca usada: o próximo nextval devolve 1
+            cur.execute("SELECT setval(%s::regclass, %s, %s)",
+                        (f'"{sequencia}"', valor if valor is not None else 1, valor is not None))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.autocommit = autocommit
+
+    resultado = ResultadoBackup(origem_dir, total, time.perf_counter() - inicio, ordem)
+    logger.info(f"Backup PostgreSQL restaurado de {resultado} ({len(ordem)} tabelas)")
+    return resultado
+
+
+def rotacionar(diretorio: str, prefixo: str, manter: int) -> List[str]:
+    """
+    Apaga os backups mais antigos com o prefixo, mantendo os `manter` mais recentes
+
+    Os nomes gerados por nome_backup() ordenam cronologicamente.
+
+    Returns:
+        List[str]: Caminhos removidos
+    """
+    if manter <= 0 or not os.path.isdir(diretorio):
+        return []
+    backups = sorted(n for n in os.listdir(diretorio) if n.startswith(prefixo) and not n.endswith('.tmp'))
+    removidos = []
+    for nome in backups[:max(0, len(backups) - manter)]:
+        caminho = os.path.join(diretorio, nome)
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho)
+        else:
+            os.remove(caminho)
+        removidos.append(caminho)
+    return removidos
+
+
+def nome_backup(prefixo: str, extensao: str = '', momento: datetime = None) -> str:
+    """Nome com data e hora (UTC), por exemplo escola_20240301T120000.db"""
+    return f"{prefixo}_{(momento or datetime.utcnow()):%Y%m%dT%H%M%S}{extensao}"
@@ -0,0 +1,174 @@
+"""
+Cache em memória do conteúdo de aulas e exercícios
+
+O conteúdo de uma aula (dados da aula, lista de exercícios, próximas aulas,
+gabarito) e de um exercício só muda quando o professor o edita, mas ver_aula,
+ver_exercicio, student_aula_view, fazer_exercicio e student_quiz o buscavam no
+banco a cada visualização. Aqui ele fica guardado por processo, chaveado pelo
+tipo e ID e marcado com a versão (updated_at da aula) vista na hora da carga;
+no banco continuam só as consultas do progresso de cada aluno. As alternativas
+dos exercícios são guardadas já lidas (utils.alternativas), sem interpretar
+texto a cada exibição ou correção.
+
+Validade:
+- As rotas de edição e exclusão do professor chamam invalidar_aula(), que
+  descarta a aula e todos os exercícios dela neste processo.
+- As rotas passam o updated_at atual da aula como versao (lido junto com o
+  progresso do aluno ou, nas correções de fazer_exercicio e student_quiz, por
+  uma consulta pela chave primária); se for diferente do guardado, o conteúdo
+  é recarregado. Assim uma edição feita em outro worker (ou direto no banco)
+  aparece assim que o updated_at da aula muda. Por isso as rotas que alteram
+  exercícios também atualizam o updated_at da aula a que eles pertencem.
+- Quando a entrada traz dados de outras linhas, a versão também as cobre: a
+  página da aula no app_postgres (turma, professor e próximas aulas) usa ainda
+  o updated_at da turma e do professor e o maior updated_at e o total das
+  aulas da turma (consultas_preparadas.PROGRESSO_NA_AULA).
+
+O tamanho é limitado pelo total aproximado em bytes (CACHE_CONTEUDO_MAX_MB),
+descartando primeiro as entradas usadas há mais tempo. CACHE_CONTEUDO_MAX_MB=0
+desliga o cache.
+"""
+import dataclasses
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTEUDO_MAX_MB = float(os.getenv('CACHE_CONTEUDO_MAX_MB', '32'))
+
+# Função de carga: retorna (valor, aula_id) ou None se o conteúdo não existe
+Carregador = Callable[[], Optional[Tuple[Any, int]]]
+
+
+def tamanho_aproximado(valor: Any) -> int:
+    """Bytes ocupados por um valor e pelos dicts, listas, tuplas e dataclasses dentro dele"""
+    total = sys.getsizeof(valor)
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        total += tamanho_aproximado(vars(valor))
+    elif isinstance(valor, dict):
+        total += sum(tamanho_aproximado(k) + tamanho_aproximado(v) for k, v in valor.items())
+    elif isinstance(valor, (list, tuple, set, frozenset)):
+        total += sum(tamanho_aproximado(item) for item in valor)
+    return total
+
+
+class CacheConteudo:
+    """LRU de conteúdo limitado em bytes, seguro entre threads"""
+
+    def __init__(self, limite_bytes: int):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        # (tipo, id) -> (versao, valor, aula_id, tamanho); a ordem é a do uso
+        self._entradas: 'OrderedDict[Tuple[str, int], tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: uma carga que começou antes dela
+        # pode ter lido o conteúdo antigo e não é guardada
+        self._geracao = 0
+
+    def obter(self, tipo: str, chave_id: int, carregar: Carregador, versao: Hashable = None):
+        """
+        Retorna o conteúdo do cache ou o carrega do banco
+
+        Args:
+            tipo (str): 'aula' ou 'exercicio'
+            chave_id (int): ID da aula ou do exercício
+            carregar (Carregador): Busca o conteúdo; retorna (valor, aula_id)
+                ou None se ele não existe (o que não é guardado)
+            versao (Hashable): updated_at atual da aula, se a rota já o leu;
+                None aceita qualquer versão guardada
+
+        Returns:
+            O valor guardado ou carregado, ou None se o conteúdo não existe
+        """
+        chave = (tipo, chave_id)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and (versao is None or entrada[0] == versao):
+                self._entradas.move_to_end(chave)
+                metrics.incrementar('cache_conteudo_total', (tipo, 'acerto'))
+                return entrada[1]
+            geracao = self._geracao
+
+        metrics.incrementar('cache_conteudo_total', (tipo, 'falta' if entrada is None else 'versao'))
+        carregado = carregar()
+        if carregado is None:
+            return None
+        valor, aula_id = carregado
+
+        tamanho = tamanho_aproximado(valor)
+        if tamanho > self.limite_bytes:
+            return valor
+        with self._lock:
+            if geracao != self._geracao:
+                return valor
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= anterior[3]
+            self._entradas[chave] = (versao, valor, aula_id, tamanho)
+            self.bytes += tamanho
+            while self.bytes > self.limite_bytes:
+                (tipo_descartado, _), descartada = self._entradas.popitem(last=False)
+                self.bytes -= descartada[3]
+                metrics.incrementar('cache_conteudo_descartes_total', (tipo_descartado,))
+        return valor
+
+    def invalidar_aula(self, aula_id: int) -> int:
+        """
+        Descarta a aula e os exercícios dela
+
+        Args:
+            aula_id (int): ID da aula editada ou excluída
+
+        Returns:
+            int: Número de entradas descartadas
+        """
+        with self._lock:
+            self._geracao += 1
+            chaves = [chave for chave, entrada in self._entradas.items()
+                      if entrada[2] == aula_id or chave == ('aula', aula_id)]
+            for chave in chaves:
+                self.bytes -= self._entradas.pop(chave)[3]
+        if chaves:
+            logger.debug(f"Cache de conteúdo: {len(chaves)} entradas da aula {aula_id} descartadas")
+        return len(chaves)
+
+    def limpar(self):
+        """Descarta todo o conteúdo"""
+        with self._lock:
+            self._geracao += 1
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Entradas e bytes ocupados, para /metrics"""
+        with self._lock:
+            return {'entradas': len(self._entradas), 'bytes': self.bytes, 'limite_bytes': self.limite_bytes}
+
+
+_cache = CacheConteudo(int(CACHE_CONTEUDO_MAX_MB * 1024 * 1024))
+
+
+def obter(tipo: str, chave_id: int, carregar: Carregador, versao: Hashable = None):
+    """Conteúdo do cache do processo (veja CacheConteudo.obter)"""
+    return _cache.obter(tipo, chave_id, carregar, versao)
+
+
+def invalidar_aula(aula_id: int) -> int:
+    """Descarta do cache do processo a aula e os exercícios dela"""
+    return _cache.invalidar_aula(aula_id)
+
+
+def limpar():
+    """Esvazia o cache do processo (usado nos testes)"""
+    _cache.limpar()
+
+
+def estatisticas() -> Dict[str, float]:
+    """Entradas e bytes do cache do processo"""
+    return _cache.estatisticas()
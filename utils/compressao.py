@@ -0,0 +1,172 @@
+"""
+Compressão das respostas e arquivos estáticos pré-comprimidos
+
+Páginas como admin_relatorios.html (24KB) e as respostas JSON da API saíam sem
+compressão; em dados móveis lentos isso é a maior parte do tempo de carga.
+
+- Respostas dinâmicas: após cada requisição, corpos de pelo menos
+  COMPRESSAO_MIN_BYTES com um tipo da lista COMPRESSAO_TIPOS são comprimidos
+  com brotli (se o pacote estiver instalado e o cliente aceitar) ou gzip.
+  Respostas em streaming, parciais ou já codificadas passam intactas.
+- Estáticos: build_static.py grava em static/dist/ cópias com o hash do
+  conteúdo no nome, mais as versões .gz e .br, e o manifest.json que liga o
+  nome original ao nome com hash. url_for('static', filename=...) passa a
+  gerar o nome com hash, servido com Cache-Control immutable (o conteúdo de
+  um nome nunca muda), usando o arquivo pré-comprimido quando o cliente aceita.
+  O fly.toml não tem [[statics]] para static/dist de propósito: o Fly os
+  serviria sem compressão e sem o Cache-Control immutable.
+- init_app deve ser chamada depois dos outros init_app que têm after_request
+  (métricas, profiler): o Flask os roda na ordem inversa do registro, então a
+  compressão roda antes deles.
+
+COMPRESSAO=false desliga a compressão das respostas dinâmicas.
+"""
+import gzip
+import json
+import logging
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from utils import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSAO = os.getenv('COMPRESSAO', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+COMPRESSAO_MIN_BYTES = int(os.getenv('COMPRESSAO_MIN_BYTES', '1024'))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv('COMPRESSAO_NIVEL_GZIP', '6'))
+COMPRESSAO_NIVEL_BROTLI = int(os.getenv('COMPRESSAO_NIVEL_BROTLI', '5'))
+
+COMPRESSAO_TIPOS = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+})
+
+# Arquivos com hash no nome (gerados por build_static.py)
+DIRETORIO_DIST = 'dist'
+MANIFESTO = 'manifest.json'
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+# Codificação -> extensão do arquivo pré-comprimido, na ordem de preferência
+EXTENSOES = {'br': '.br', 'gzip': '.gz'}
+
+
+def escolher_codificacao(accept_encoding) -> Optional[str]:
+    """
+    Codificação a usar, pela preferência do servidor: br, depois gzip
+
+    Args:
+        accept_encoding: request.accept_encodings (werkzeug MIMEAccept)
+
+    Returns:
+        Optional[str]: 'br', 'gzip' ou None
+    """
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def comprimir(dados: bytes, codificacao: str) -> bytes:
+    """Comprime com a codificação escolhida (nível de compressão dinâmica)"""
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=COMPRESSAO_NIVEL_BROTLI)
+    return gzip.compress(dados, compresslevel=COMPRESSAO_NIVEL_GZIP, mtime=0)
+
+
+def deve_comprimir(response) -> bool:
+    """Se a resposta é elegível: completa, do tipo permitido, grande e não codificada"""
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+        and response.mimetype in COMPRESSAO_TIPOS
+        and (response.content_length or 0) >= COMPRESSAO_MIN_BYTES
+    )
+
+
+def carregar_manifesto(static_folder: str) -> Dict[str, str]:
+    """Nome original -> nome com hash (relativo a static/), ou {} sem build"""
+    caminho = os.path.join(static_folder, DIRETORIO_DIST, MANIFESTO)
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifesto de estáticos ilegível ({caminho}): {e}")
+        return {}
+
+
+def init_app(app):
+    """
+    Comprime as respostas e serve os estáticos com hash de um app Flask
+
+    Args:
+        app: Aplicação Flask
+    """
+    from flask import request, send_from_directory
+
+    manifesto = carregar_manifesto(app.static_folder) if app.static_folder else {}
+
+    @app.url_defaults
+    def _nome_com_hash(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifesto:
+            values['filename'] = manifesto[values['filename']]
+
+    def servir_estatico(filename):
+        """Arquivo estático, pré-comprimido se existir a versão .br/.gz"""
+        if not filename.startswith(DIRETORIO_DIST + '/'):
+            return send_from_directory(app.static_folder, filename,
+                                       max_age=app.get_send_file_max_age(filename))
+
+        # O .br existe se o build tinha brotli, mesmo que este processo não tenha
+        nome, codificacao = filename, None
+        for opcao, extensao in EXTENSOES.items():
+            if request.accept_encodings[opcao] and os.path.isfile(os.path.join(app.static_folder, filename + extensao)):
+                nome, codificacao = filename + extensao, opcao
+                break
+
+        # Content-Type do arquivo original, não o do .gz/.br
+        tipo = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(app.static_folder, nome, mimetype=tipo)
+        if codificacao:
+            response.headers['Content-Encoding'] = codificacao
+            response.headers.pop('Content-Disposition', None)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = CACHE_IMUTAVEL
+        return response
+
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = servir_estatico
+
+    @app.after_request
+    def _comprimir(response):
+        if not COMPRESSAO or not deve_comprimir(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao(request.accept_encodings)
+        if codificacao is None:
+            return response
+
+        original = response.get_data()
+        comprimido = comprimir(original, codificacao)
+        if len(comprimido) >= len(original):
+            return response
+        response.set_data(comprimido)
+        response.headers['Content-Encoding'] = codificacao
+        # O ETag identifica o conteúdo, não os bytes: continua válido como fraco
+        etag, fraco = response.get_etag()
+        if etag and not fraco:
+            response.set_etag(etag, weak=True)
+
+        metrics.incrementar('http_response_bytes_total', (codificacao, 'original'), len(original))
+        metrics.incrementar('http_response_bytes_total', (codificacao, 'enviado'), len(comprimido))
+        return response
@@ -0,0 +1,276 @@
+"""
+Registro de consultas preparadas para as rotas mais acessadas
+
+As consultas quentes (login, carga do usuário a cada requisição, contadores
+dos dashboards e leitura de aulas e exercícios) ficam registradas aqui com um
+nome. No PostgreSQL, executar() as envia com prepare=True: o psycopg prepara
+a consulta na primeira execução em cada conexão e, nas seguintes, só envia os
+parâmetros, sem o servidor analisar e planejar o texto de novo. Como as
+consultas preparadas pertencem à conexão, o ganho aparece entre requisições
+quando as conexões vêm de um pool (DB_POOL_MAX_SIZE em app_postgres).
+
+PREPARED_STATEMENTS=false desliga a preparação (inclusive a automática do
+psycopg), para comparar nos benchmarks (benchmarks/bench_consultas_preparadas.py
+e benchmarks/load_test.py --sem-preparadas) ou usar um PgBouncer em modo
+transação anterior à versão 1.21.
+
+No SQLite executar() apenas adapta os placeholders; o módulo sqlite3 já
+reaproveita as consultas compiladas pelo seu cache de statements.
+"""
+import os
+import sqlite3
+from typing import Dict, List
+
+from utils import metrics
+from utils.database import adapt_query
+
+PREPARED_STATEMENTS = os.getenv('PREPARED_STATEMENTS', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+
+_consultas: Dict[str, str] = {}
+
+
+def registrar(nome: str, sql: str) -> str:
+    """
+    Registra uma consulta quente
+
+    Args:
+        nome (str): Nome único da consulta
+        sql (str): Consulta com placeholders '%s'
+
+    Returns:
+        str: O próprio nome, para uso em executar()
+
+    Raises:
+        ValueError: Nome já registrado com outra consulta
+    """
+    existente = _consultas.get(nome)
+    if existente is not None and existente != sql:
+        raise ValueError(f"Consulta '{nome}' já registrada com outro SQL")
+    _consultas[nome] = sql
+    return nome
+
+
+def obter(nome: str) -> str:
+    """SQL de uma consulta registrada"""
+    return _consultas[nome]
+
+
+def nomes() -> List[str]:
+    """Nomes das consultas registradas, em ordem alfabética"""
+    return sorted(_consultas)
+
+
+def ativas() -> bool:
+    """Indica se as consultas registradas são preparadas"""
+    return PREPARED_STATEMENTS
+
+
+def definir_ativas(ativo: bool):
+    """Liga ou desliga a preparação (para os benchmarks; vale para novas conexões)"""
+    global PREPARED_STATEMENTS
+    PREPARED_STATEMENTS = ativo
+
+
+def configurar_conexao(conn):
+    """
+    Ajusta uma conexão psycopg recém-aberta
+
+    Com a preparação desligada, desativa também a preparação automática do
+    psycopg (após prepare_threshold execuções), para que a comparação seja
+    entre "tudo preparado" e "nada preparado". Serve como `configure` de
+    psycopg_pool.ConnectionPool.
+    """
+    if not PREPARED_STATEMENTS:
+        conn.prepare_threshold = None
+    elif conn.prepared_max is not None and conn.prepared_max < 2 * len(_consultas):
+        # Espaço para as consultas quentes mais as preparadas automaticamente
+        conn.prepared_max = 2 * len(_consultas)
+
+
+def executar(cur, nome: str, params: tuple = ()):
+    """
+    Executa uma consulta registrada no cursor
+
+    Args:
+        cur: Cursor sqlite3 ou psycopg
+        nome (str): Nome da consulta
+        params (tuple): Parâmetros
+
+    Returns:
+        O cursor, para encadear fetchone()/fetchall()
+    """
+    sql = _consultas[nome]
+    if isinstance(cur, sqlite3.Cursor):
+        cur.execute(adapt_query(sql, cur.connection), params)
+        return cur
+    cur.execute(sql, params, prepare=PREPARED_STATEMENTS)
+    metrics.incrementar('db_prepared_executions_total', (nome, 'sim' if PREPARED_STATEMENTS else 'nao'))
+    return cur
+
+
+# =====================================================
+# Consultas quentes
+# =====================================================
+
+# Usuários (Flask-Login carrega o usuário em toda requisição autenticada)
+USUARIO_POR_ID = registrar('usuario_por_id', """
+    SELECT id, username, email, first_name, last_name, user_type, is_active, created_at, updated_at
+    FROM users WHERE id = %s
+""")
+USUARIO_LOGIN = registrar('usuario_login', """
+    SELECT id, username, email, first_name, last_name, user_type, is_active, created_at, updated_at, password_hash
+    FROM users WHERE username = %s
+""")
+
+# Dashboard do administrador
+ADMIN_USUARIOS_POR_TIPO = registrar('admin_usuarios_por_tipo',
+                                    'SELECT user_type, COUNT(*) FROM users GROUP BY user_type')
+ADMIN_TOTAL_TURMAS = registrar('admin_total_turmas', 'SELECT COUNT(*) FROM turmas')
+ADMIN_TOTAL_AULAS = registrar('admin_total_aulas', 'SELECT COUNT(*) FROM aulas')
+ADMIN_TOTAL_MATRICULAS = registrar('admin_total_matriculas', 'SELECT COUNT(*) FROM matriculas')
+ADMIN_TOTAL_EXERCICIOS = registrar('admin_total_exercicios', 'SELECT COUNT(*) FROM exercicios')
+
+# Dashboard do professor
+PROFESSOR_TOTAL_AULAS = registrar('professor_total_aulas', 'SELECT COUNT(*) FROM aulas WHERE professor_id = %s')
+PROFESSOR_TOTAL_TURMAS = registrar('professor_total_turmas', 'SELECT COUNT(*) FROM turmas WHERE professor_id = %s')
+PROFESSOR_TOTAL_ALUNOS = registrar('professor_total_alunos', """
+    SELECT COUNT(DISTINCT m.aluno_id)
+    FROM matriculas m
+    JOIN turmas t ON m.turma_id = t.id
+    WHERE t.professor_id = %s
+""")
+PROFESSOR_TOTAL_EXERCICIOS = registrar('professor_total_exercicios', """
+    SELECT COUNT(*)
+    FROM exercicios e
+    JOIN aulas a ON e.aula_id = a.id
+    WHERE a.professor_id = %s
+""")
+PROFESSOR_AULAS_RECENTES = registrar('professor_aulas_recentes', """
+    SELECT id, titulo, disciplina, serie, created_at
+    FROM aulas
+    WHERE professor_id = %s
+    ORDER BY created_at DESC
+    LIMIT 5
+""")
+PROFESSOR_TURMAS_RECENTES = registrar('professor_turmas_recentes', """
+    SELECT id, nome, serie, created_at
+    FROM turmas
+    WHERE professor_id = %s
+    ORDER BY created_at DESC
+    LIMIT 5
+""")
+
+# Dashboard do aluno
+ALUNO_TOTAL_AULAS = registrar('aluno_total_aulas', """
+    SELECT COUNT(*) as total_aulas
+    FROM aulas a
+    JOIN matriculas m ON a.turma_id = m.turma_id
+    WHERE m.aluno_id = %s AND m.status = 'ativa' AND a.is_active = true
+""")
+ALUNO_AULAS_EM_PROGRESSO = registrar('aluno_aulas_em_progresso', """
+    SELECT COUNT(*) as aulas_em_progresso
+    FROM progresso_alunos
+    WHERE aluno_id = %s AND status = 'em_progresso'
+""")
+ALUNO_AULAS_CONCLUIDAS = registrar('aluno_aulas_concluidas', """
+    SELECT COUNT(*) as aulas_concluidas
+    FROM progresso_alunos
+    WHERE aluno_id = %s AND status = 'concluida'
+""")
+ALUNO_TOTAL_PONTOS = registrar('aluno_total_pontos', """
+    SELECT COALESCE(SUM(e.pontos), 0) as total_pontos
+    FROM progresso_alunos pa
+    JOIN aulas a ON pa.aula_id = a.id
+    JOIN exercicios e ON a.id = e.aula_id
+    WHERE pa.aluno_id = %s AND pa.status = 'concluida'
+""")
+ALUNO_AULAS_DISPONIVEIS = registrar('aluno_aulas_disponiveis', """
+    SELECT a.id, a.titulo, a.descricao, a.duracao_minutos,
+           t.nome as turma_nome, COALESCE(pa.status, 'não iniciada') as progresso_status
+    FROM aulas a
+    JOIN turmas t ON a.turma_id = t.id
+    JOIN matriculas m ON t.id = m.turma_id
+    LEFT JOIN progresso_alunos pa ON a.id = pa.aula_id AND pa.aluno_id = %s
+    WHERE m.aluno_id = %s AND m.status = 'ativa' AND a.is_active = true
+    ORDER BY a.titulo
+""")
+ALUNO_TURMAS = registrar('aluno_turmas', """
+    SELECT t.id, t.nome, t.descricao
+    FROM turmas t
+    JOIN matriculas m ON t.id = m.turma_id
+    WHERE m.aluno_id = %s AND m.status = 'ativa'
+""")
+
+# Aulas e exercícios
+AULA_POR_ID = registrar('aula_por_id', """
+    SELECT a.*, t.nome as turma_nome, u.first_name, u.last_name
+    FROM aulas a
+    LEFT JOIN turmas t ON a.turma_id = t.id
+    LEFT JOIN users u ON a.professor_id = u.id
+    WHERE a.id = %s AND a.is_active = true
+""")
+EXERCICIOS_DA_AULA = registrar('exercicios_da_aula', """
+    SELECT id, titulo, pergunta, opcoes, resposta_correta, tipo, pontos
+    FROM exercicios
+    WHERE aula_id = %s AND is_active = true
+    ORDER BY id
+""")
+# Progresso do aluno mais a versão do conteúdo da página da aula (última
+# alteração na aula, nos exercícios, na turma, no professor e nas aulas da
+# turma, de onde vêm as próximas aulas), usada pelo cache de
+# utils.cache_conteudo e pelo ETag. Sem linha: a aula não existe ou está inativa
+PROGRESSO_NA_AULA = registrar('progresso_na_aula', """
+    SELECT a.updated_at as aula_updated_at,
+           (SELECT MAX(e.updated_at) FROM exercicios e WHERE e.aula_id = a.id) as exercicios_updated_at,
+           t.updated_at as turma_updated_at, u.updated_at as professor_updated_at,
+           ta.updated_at as aulas_turma_updated_at, ta.total as aulas_turma_total,
+           pa.status, pa.data_inicio, pa.data_conclusao, pa.tempo_gasto
+    FROM aulas a
+    LEFT JOIN turmas t ON a.turma_id = t.id
+    LEFT JOIN users u ON a.professor_id = u.id
+    CROSS JOIN LATERAL (
+        SELECT MAX(o.updated_at) as updated_at, COUNT(*) as total
+        FROM aulas o WHERE o.turma_id = a.turma_id
+    ) ta
+    LEFT JOIN progresso_alunos pa ON pa.aula_id = a.id AND pa.aluno_id = %s
+    WHERE a.id = %s AND a.is_active = true
+""")
+PROXIMAS_AULAS = registrar('proximas_aulas', """
+    SELECT id, titulo, disciplina, duracao_minutos
+    FROM aulas
+    WHERE turma_id = %s AND ordem > %s AND is_active = true
+    ORDER BY ordem
+    LIMIT 5
+""")
+EXERCICIO_POR_ID = registrar('exercicio_por_id', """
+    SELECT e.*, a.titulo as aula_titulo, a.id as aula_id
+    FROM exercicios e
+    JOIN aulas a ON e.aula_id = a.id
+    WHERE e.id = %s AND e.is_active = true
+""")
+PROGRESSO_NO_EXERCICIO = registrar('progresso_no_exercicio', """
+    SELECT e.aula_id, a.updated_at as aula_updated_at,
+           (SELECT MAX(ex.updated_at) FROM exercicios ex WHERE ex.aula_id = e.aula_id) as exercicios_updated_at,
+           pa.status, pa.data_inicio, pa.data_conclusao, pa.tempo_gasto
+    FROM exercicios e
+    JOIN aulas a ON e.aula_id = a.id
+    LEFT JOIN progresso_alunos pa ON pa.aula_id = e.aula_id AND pa.aluno_id = %s
+    WHERE e.id = %s AND e.is_active = true
+""")
+ESTATISTICAS_EXERCICIOS_AULA = registrar('estatisticas_exercicios_aula', """
+    SELECT
+        COUNT(CASE WHEN ra.esta_correta = true THEN 1 END) as acertos,
+        COUNT(CASE WHEN ra.esta_correta = false THEN 1 END) as erros,
+        COALESCE(SUM(CASE WHEN ra.esta_correta = true THEN e.pontos END), 0) as pontos_ganhos,
+        COUNT(CASE WHEN ra.esta_correta = true THEN 1 END) as sequencia
+    FROM exercicios e
+    LEFT JOIN respostas_alunos ra ON e.id = ra.exercicio_id AND ra.aluno_id = %s
+    WHERE e.aula_id = %s
+""")
+PROXIMOS_EXERCICIOS = registrar('proximos_exercicios', """
+    SELECT id, titulo, tipo, pontos
+    FROM exercicios
+    WHERE aula_id = %s AND id != %s AND is_active = true
+    ORDER BY id
+    LIMIT 5
+""")
@@ -1,19 +1,221 @@
 """
 Utilitários para operações de banco de dados
 """
+import base64
+import json
+import os
+import re
 import sqlite3
-from typing import Optional, List, Dict, Any
+import threading
+import queue
+from collections import namedtuple
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Callable, Iterator, Sequence, Tuple
 from contextlib import contextmanager
 import logging
 
+from utils import metrics
+from utils.sql_instrumentation import InstrumentedSQLiteConnection
+
 logger = logging.getLogger(__name__)
 
+# Modo do SQLite: 'simples' abre uma conexão por operação; 'producao' reutiliza
+# uma conexão por thread, usa WAL e serializa as escritas em um único escritor
+SQLITE_MODE = os.getenv('SQLITE_MODE', 'producao' if os.getenv('FLASK_ENV') == 'production' else 'simples')
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Pragmas aplicados a cada conexão no modo produção
+PRAGMAS_PRODUCAO = (
+    ('journal_mode', 'WAL'),            # leitores não bloqueiam o escritor (e vice-versa)
+    ('synchronous', 'NORMAL'),          # seguro com WAL; fsync só nos checkpoints
+    ('cache_size', '-20000'),           # ~20 MB de cache de páginas por conexão
+    ('mmap_size', '268435456'),         # leituras via mmap (até 256 MB)
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', str(SQLITE_BUSY_TIMEOUT_MS)),
+)
+
+# Escritas agrupadas em uma única transação pelo escritor
+GRUPO_MAXIMO_ESCRITAS = int(os.getenv('SQLITE_GROUP_COMMIT_MAX', '64'))
+
+
+def _conectar(database_path: str, producao: bool, **kwargs) -> sqlite3.Connection:
+    """Abre uma conexão instrumentada com sqlite3.Row (e pragmas no modo produção)"""
+    conn = sqlite3.connect(database_path, factory=InstrumentedSQLiteConnection,
+                           timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, **kwargs)
+    conn.row_factory = sqlite3.Row
+    if producao:
+        for pragma, valor in PRAGMAS_PRODUCAO:
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+class EscritorSQLite:
+    """
+    Único escritor de um arquivo SQLite, com group commit
+
+    As escritas são enfileiradas e executadas por uma thread dedicada. Tudo o
+    que estiver na fila quando o escritor fica livre (até GRUPO_MAXIMO_ESCRITAS)
+    é gravado em uma única transação, com um SAVEPOINT por escrita para que a
+    falha de uma não desfaça as outras. Quem enfileira espera o commit.
+
+    Uma escrita é uma query (executar) ou uma função que recebe a conexão do
+    escritor e faz várias escritas como uma unidade (transacao).
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self._fila: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._rodar, name='sqlite-escritor', daemon=True)
+        self._thread.start()
+        self.transacoes = 0
+        self.escritas = 0
+
+    def executar(self, query: str, params=(), muitos: bool = False) -> int:
+        """
+        Executa uma escrita e espera o commit
+
+        Returns:
+            int: Linhas afetadas
+        """
+        def escrever(conn):
+            return (conn.executemany(query, params) if muitos else conn.execute(query, params)).rowcount
+
+        return self.transacao(escrever)
+
+    def transacao(self, funcao: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Executa funcao(conn) no commit em grupo e espera o commit
+
+        A função roda dentro de um SAVEPOINT: se levantar exceção, só as suas
+        escritas são desfeitas e a exceção volta para quem chamou. Ela não deve
+        chamar commit() nem rollback() na conexão.
+
+        Returns:
+            Any: Retorno da função
+        """
+        futuro = Future()
+        self._fila.put((funcao, futuro))
+        return futuro.result()
+
+    def parar(self):
+        """Processa o que já está na fila e encerra a thread"""
+        self._fila.put(None)
+        self._thread.join()
+
+    def _rodar(self):
+        conn = _conectar(self.database_path, producao=True, isolation_level=None, check_same_thread=False)
+        try:
+            while True:
+                item = self._fila.get()
+                if item is None:
+                    return
+                grupo = [item]
+                while len(grupo) < GRUPO_MAXIMO_ESCRITAS:
+                    try:
+                        proximo = self._fila.get_nowait()
+                    except queue.Empty:
+                        break
+                    if proximo is None:
+                        self._fila.put(None)
+                        break
+                    grupo.append(proximo)
+                self._gravar(conn, grupo)
+        finally:
+            conn.close()
+
+    def _gravar(self, conn, grupo):
+        resultados = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for funcao, futuro in grupo:
+                conn.execute("SAVEPOINT escrita")
+                try:
+                    retorno = funcao(conn)
+                    conn.execute("RELEASE escrita")
+                    resultados.append((futuro, retorno, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO escrita")
+                    conn.execute("RELEASE escrita")
+                    resultados.append((futuro, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Erro no commit em grupo ({len(grupo)} escritas): {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, futuro in grupo:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        self.transacoes += 1
+        self.escritas += len(grupo)
+        for futuro, retorno, erro in resultados:
+            if erro is not None:
+                futuro.set_exception(erro)
+            else:
+                futuro.set_result(retorno)
+
+
+# Conexões por thread e escritores, compartilhados por todos os gerenciadores do mesmo arquivo
+_local = threading.local()
+_escritores: Dict[str, EscritorSQLite] = {}
+_escritores_lock = threading.Lock()
+
 
 class DatabaseManager:
     """Gerenciador de conexões com banco de dados"""
     
-    def __init__(self, database_path: str = 'escola_para_todos.db'):
+    def __init__(self, database_path: str = 'escola_para_todos.db', modo: str = None):
         self.database_path = database_path
+        self.modo = modo or SQLITE_MODE
+    
+    @property
+    def producao(self) -> bool:
+        return self.modo == 'producao'
+    
+    def connect(self) -> sqlite3.Connection:
+        """
+        Obtém uma conexão: nova no modo simples, a da thread no modo produção
+        
+        Devolva-a com release() ao terminar.
+        
+        Returns:
+            sqlite3.Connection: Conexão com o banco
+        """
+        if not self.producao:
+            return _conectar(self.database_path, producao=False)
+        
+        conexoes = getattr(_local, 'conexoes', None)
+        if conexoes is None:
+            conexoes = _local.conexoes = {}
+        conn = conexoes.get(self.database_path)
+        if conn is None:
+            conn = conexoes[self.database_path] = _conectar(self.database_path, producao=True)
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Fecha a conexão (modo simples) ou desfaz o que ficou sem commit (modo produção)"""
+        if not self.producao:
+            conn.close()
+        elif conn.in_transaction:
+            conn.rollback()
+    
+    def writer(self) -> EscritorSQLite:
+        """Escritor único deste arquivo (criado na primeira escrita)"""
+        escritor = _escritores.get(self.database_path)
+        if escritor is None:
+            with _escritores_lock:
+                escritor = _escritores.get(self.database_path)
+                if escritor is None:
+                    escritor = _escritores[self.database_path] = EscritorSQLite(self.database_path)
+                    metrics.registrar_pool(f'sqlite_escritor:{os.path.basename(self.database_path)}', lambda: {
+                        'transacoes': escritor.transacoes, 'escritas': escritor.escritas
+                    })
+        return escritor
     
     @contextmanager
     def get_connection(self):
@@ -25,8 +227,7 @@ class DatabaseManager:
         """
         conn = None
         try:
-            conn = sqlite3.connect(self.database_path)
-            conn.row_factory = sqlite3.Row
+            conn = self.connect()
             yield conn
         except Exception as e:
             logger.error(f"Erro na conexão com banco: {e}")
@@ -35,7 +236,7 @@ class DatabaseManager:
             raise
         finally:
             if conn:
-                conn.close()
+                self.release(conn)
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
@@ -55,7 +256,38 @@ class DatabaseManager:
             
             # Converter para lista de dicionários
             return [dict(row) for row in results]
-    
+
+    def iter_query(self, query: str, params: tuple = (), tamanho_lote: int = None,
+                   tipo: str = 'dict') -> Iterator:
+        """
+        Executa uma query SELECT e devolve os resultados aos poucos
+
+        Ao contrário de execute_query, não carrega o resultado inteiro na
+        memória: as linhas são buscadas em lotes enquanto são consumidas.
+
+        Args:
+            query (str): Query SQL a ser executada
+            params (tuple): Parâmetros da query
+            tamanho_lote (int): Linhas buscadas por vez (padrão: TAMANHO_LOTE)
+            tipo (str): 'dict', 'tuple' ou 'row' (namedtuple com os nomes das colunas)
+
+        Yields:
+            Linhas convertidas para o tipo pedido
+        """
+        with self.get_connection() as conn:
+            yield from iter_query(conn, query, params, tamanho_lote or TAMANHO_LOTE, tipo)
+
+    def paginate(self, query: str, params: tuple = (), ordem: Sequence[Tuple[str, str]] = (('id', 'ASC'),),
+                 cursor: Optional[str] = None, por_pagina: int = 20, tipo: str = 'dict') -> 'PaginaKeyset':
+        """
+        Busca uma página da query com paginação por chave (veja paginar_keyset)
+
+        Returns:
+            PaginaKeyset: Itens e cursor da próxima página
+        """
+        with self.get_connection() as conn:
+            return paginar_keyset(conn, query, params, ordem, cursor, por_pagina, tipo)
+
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
         Executa uma query de UPDATE/INSERT/DELETE
@@ -67,12 +299,46 @@ class DatabaseManager:
         Returns:
             int: Número de linhas afetadas
         """
+        if self.producao:
+            return self.writer().executar(query, params)
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             conn.commit()
             return cursor.rowcount
     
+    def execute_transaction(self, funcao: Callable[[sqlite3.Connection], Any],
+                            conn: Optional[sqlite3.Connection] = None) -> Any:
+        """
+        Executa as escritas de funcao(conn) como uma transação
+
+        No modo produção vão para o escritor único (commit em grupo com as
+        escritas das outras requisições); no modo simples, rodam em conn (ou
+        em uma conexão nova) com commit ao final e rollback em caso de erro.
+        A função não deve chamar commit() nem rollback().
+
+        Args:
+            funcao (Callable): Recebe a conexão e faz as escritas
+            conn (Optional[sqlite3.Connection]): Conexão da requisição (modo simples)
+
+        Returns:
+            Any: Retorno da função
+        """
+        if self.producao:
+            return self.writer().transacao(funcao)
+
+        if conn is None:
+            with self.get_connection() as nova:
+                return self.execute_transaction(funcao, nova)
+        try:
+            retorno = funcao(conn)
+            conn.commit()
+            return retorno
+        except Exception:
+            conn.rollback()
+            raise
+
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
         """
         Executa a mesma query com múltiplos conjuntos de parâmetros
@@ -84,6 +350,9 @@ class DatabaseManager:
         Returns:
             int: Número total de linhas afetadas
         """
+        if self.producao:
+            return self.writer().executar(query, params_list, muitos=True)
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.executemany(query, params_list)
@@ -120,20 +389,34 @@ class DatabaseManager:
         query = "PRAGMA table_info(?)"
         return self.execute_query(query, (table_name,))
     
-    def backup_database(self, backup_path: str) -> bool:
+    def backup_database(self, backup_path: str, comprimir: bool = False, manter: int = None) -> bool:
         """
-        Cria backup do banco de dados
-        
+        Cria backup (cópia completa) do banco de dados sem bloquear as escritas
+
+        Usa a API de backup online do SQLite (utils.backup.backup_sqlite), que
+        copia o banco em passos e gera uma cópia consistente mesmo com
+        escritas em andamento.
+
         Args:
             backup_path (str): Caminho para o arquivo de backup
-            
+            comprimir (bool): Gravar comprimido com gzip (acrescenta .gz)
+            manter (int): Se informado, mantém só os `manter` backups mais
+                recentes do diretório com o mesmo prefixo (o nome até o último
+                '_', como em utils.backup.nome_backup)
+
         Returns:
             bool: True se backup criado com sucesso
         """
+        from utils.backup import backup_sqlite, rotacionar
+
         try:
-            import shutil
-            shutil.copy2(self.database_path, backup_path)
-            logger.info(f"Backup criado em: {backup_path}")
+            resultado = backup_sqlite(self.database_path, backup_path, comprimir=comprimir)
+            logger.info(f"Backup criado em: {resultado.caminho} "
+                        f"({resultado.bytes_por_segundo / 1024 / 1024:.1f} MB/s)")
+            if manter:
+                diretorio, nome = os.path.split(os.path.abspath(backup_path))
+                prefixo = nome.rsplit('_', 1)[0] + '_' if '_' in nome else os.path.splitext(nome)[0]
+                rotacionar(diretorio, prefixo, manter)
             return True
         except Exception as e:
             logger.error(f"Erro ao criar backup: {e}")
@@ -163,7 +446,7 @@ def get_db_manager() -> DatabaseManager:
     Factory function para obter instância do DatabaseManager
     
     Returns:
-        DatabaseManager: Instância configurada
+        DatabaseManager: Instância configurada (modo definido por SQLITE_MODE)
     """
     return DatabaseManager()
 
@@ -221,6 +504,89 @@ def build_where_clause(conditions: Dict[str, Any]) -> tuple:
     return "", ()
 
 
+def is_sqlite_connection(conn) -> bool:
+    """
+    Verifica se a conexão é do SQLite (placeholders '?') ou PostgreSQL ('%s')
+    
+    Args:
+        conn: Conexão sqlite3 ou psycopg
+        
+    Returns:
+        bool: True se a conexão for sqlite3
+    """
+    return isinstance(conn, sqlite3.Connection)
+
+
+def adapt_query(query: str, conn) -> str:
+    """
+    Adapta os placeholders de uma query escrita com '%s' para o dialeto da conexão
+    
+    Args:
+        query (str): Query SQL com placeholders '%s'
+        conn: Conexão sqlite3 ou psycopg
+        
+    Returns:
+        str: Query pronta para ser executada na conexão
+    """
+    if is_sqlite_connection(conn):
+        return query.replace('%s', '?')
+    return query
+
+
+def row_to_dict(cursor, row) -> Optional[Dict[str, Any]]:
+    """
+    Converte uma linha (tupla, sqlite3.Row ou dict_row) em dicionário
+    
+    Args:
+        cursor: Cursor que produziu a linha
+        row: Linha retornada pelo fetch
+        
+    Returns:
+        Optional[Dict[str, Any]]: Linha como dicionário ou None
+    """
+    if row is None:
+        return None
+    if isinstance(row, dict):
+        return row
+    if isinstance(row, sqlite3.Row):
+        return dict(row)
+    columns = [col[0] for col in cursor.description]
+    return dict(zip(columns, row))
+
+
+# Linhas por comando em inserir_varios (o SQLite limita os parâmetros por comando)
+LINHAS_POR_INSERT = 200
+
+
+def inserir_varios(cursor, tabela: str, colunas: Sequence[str], linhas: Sequence[tuple],
+                   conflito: str = '') -> int:
+    """
+    Insere várias linhas com um único INSERT ... VALUES (...), (...)
+
+    Uma ida ao banco por até LINHAS_POR_INSERT linhas, em vez de uma por linha
+    como em executemany no psycopg.
+
+    Args:
+        cursor: Cursor sqlite3 ou psycopg
+        tabela (str): Tabela de destino
+        colunas (Sequence[str]): Colunas preenchidas
+        linhas (Sequence[tuple]): Valores, na ordem das colunas
+        conflito (str): Cláusula ON CONFLICT opcional (para upserts; as
+            linhas de um mesmo lote não podem repetir a chave)
+
+    Returns:
+        int: Linhas inseridas
+    """
+    marcador = '(' + ', '.join(['%s'] * len(colunas)) + ')'
+    for inicio in range(0, len(linhas), LINHAS_POR_INSERT):
+        lote = linhas[inicio:inicio + LINHAS_POR_INSERT]
+        query = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES " + ', '.join([marcador] * len(lote))
+        if conflito:
+            query += ' ' + conflito
+        cursor.execute(adapt_query(query, cursor.connection), [valor for linha in lote for valor in linha])
+    return len(linhas)
+
+
 def paginate_query(base_query: str, page: int = 1, per_page: int = 20) -> str:
     """
     Adiciona paginação a uma query SQL
@@ -232,6 +598,283 @@ def paginate_query(base_query: str, page: int = 1, per_page: int = 20) -> str:
         
     Returns:
         str: Query com LIMIT e OFFSET
+    
+    Prefira paginar_keyset: com OFFSET o banco percorre e descarta todas as
+    linhas das páginas anteriores, e páginas fundas ficam cada vez mais lentas.
     """
     offset = (page - 1) * per_page
     return f"{base_query} LIMIT {per_page} OFFSET {offset}"
+
+
+# =====================================================
+# Iteração em lotes e paginação por chave (keyset)
+# =====================================================
+
+TAMANHO_LOTE = 500
+
+_COLUNA_ORDENACAO = re.compile(r'^[A-Za-z_][\w.]*$')
+
+
+def _conversor_linhas(colunas: List[str], tipo: str) -> Callable:
+    """
+    Função que converte linhas (tupla, sqlite3.Row ou dict_row) para o tipo pedido
+    
+    Args:
+        colunas (List[str]): Nomes das colunas do resultado
+        tipo (str): 'dict', 'tuple' ou 'row' (namedtuple com os nomes das colunas)
+    """
+    def como_tupla(row):
+        return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+    
+    if tipo == 'tuple':
+        return como_tupla
+    if tipo == 'row':
+        linha = namedtuple('Linha', colunas, rename=True)
+        return lambda row: linha._make(como_tupla(row))
+    if tipo == 'dict':
+        return lambda row: row if isinstance(row, dict) else dict(zip(colunas, como_tupla(row)))
+    raise ValueError(f"Tipo de linha inválido: {tipo}")
+
+
+def iter_cursor(cursor, tamanho_lote: int = TAMANHO_LOTE, tipo: str = 'dict') -> Iterator:
+    """
+    Percorre o resultado de um cursor em lotes de fetchmany
+    
+    Args:
+        cursor: Cursor já executado
+        tamanho_lote (int): Linhas buscadas por vez
+        tipo (str): 'dict', 'tuple' ou 'row'
+        
+    Yields:
+        Linhas convertidas para o tipo pedido
+    """
+    converter = _conversor_linhas([col[0] for col in cursor.description], tipo)
+    while True:
+        lote = cursor.fetchmany(tamanho_lote)
+        if not lote:
+            return
+        for row in lote:
+            yield converter(row)
+
+
+def iter_query(conn, query: str, params: tuple = (), tamanho_lote: int = TAMANHO_LOTE,
+               tipo: str = 'dict') -> Iterator:
+    """
+    Executa uma query e devolve as linhas aos poucos, sem fetchall
+    
+    No PostgreSQL usa um cursor no servidor, que traz `tamanho_lote` linhas
+    por ida ao banco; no SQLite as linhas já são lidas sob demanda.
+    
+    Args:
+        conn: Conexão sqlite3 ou psycopg
+        query (str): Query SQL com placeholders '%s'
+        params (tuple): Parâmetros da query
+        tamanho_lote (int): Linhas buscadas por vez
+        tipo (str): 'dict', 'tuple' ou 'row' (namedtuple com os nomes das colunas)
+        
+    Yields:
+        Linhas convertidas para o tipo pedido
+    """
+    if is_sqlite_connection(conn):
+        cursor = conn.cursor()
+    else:
+        # Em autocommit o cursor no servidor precisa sobreviver fora de transação
+        cursor = conn.cursor(name=f'iter_{id(conn):x}_{threading.get_ident():x}',
+                             withhold=conn.autocommit)
+        cursor.itersize = tamanho_lote
+    try:
+        cursor.execute(adapt_query(query, conn), params)
+        yield from iter_cursor(cursor, tamanho_lote, tipo)
+    finally:
+        cursor.close()
+
+
+def _valor_json(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {'n': str(valor)}
+    return valor
+
+
+def _valor_python(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        if 'd' in valor:
+            return date.fromisoformat(valor['d'])
+        if 'n' in valor:
+            return Decimal(valor['n'])
+        raise ValueError("Valor de cursor inválido")
+    return valor
+
+
+def codificar_cursor(valores: tuple) -> str:
+    """Codifica os valores da última linha de uma página em um token opaco"""
+    dados = json.dumps([_valor_json(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(token: str, quantidade: int) -> tuple:
+    """
+    Decodifica um token de codificar_cursor
+    
+    Args:
+        token (str): Token recebido do cliente
+        quantidade (int): Número de colunas de ordenação esperado
+        
+    Returns:
+        tuple: Valores das colunas de ordenação
+        
+    Raises:
+        ValueError: Token malformado ou de outra ordenação
+    """
+    try:
+        dados = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        valores = json.loads(dados)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+    if not isinstance(valores, list) or len(valores) != quantidade:
+        raise ValueError("Cursor de paginação inválido")
+    return tuple(_valor_python(v) for v in valores)
+
+
+@dataclass
+class PaginaKeyset:
+    """Uma página de resultados e o cursor para a próxima"""
+    itens: list
+    proximo_cursor: Optional[str]
+    
+    @property
+    def tem_mais(self) -> bool:
+        return self.proximo_cursor is not None
+
+
+class PaginacaoKeyset:
+    """
+    Paginação por chave: WHERE (colunas) após a última linha vista, em vez de OFFSET
+    
+    O custo de cada página não depende de quão fundo o usuário foi, desde que
+    exista um índice nas colunas de ordenação. A última coluna deve ser única
+    (normalmente o id) para desempatar, e nenhuma delas pode ser NULL.
+    
+    Uso em queries próprias:
+        pag = PaginacaoKeyset([('t.created_at', 'DESC'), ('t.id', 'DESC')], cursor, 20)
+        filtro, params = pag.filtro()
+        sql = f"... WHERE {filtro} ORDER BY {pag.order_by()} LIMIT {pag.limite}"
+        pagina = pag.pagina(linhas, chave=lambda row: (row['created_at'], row['id']))
+    """
+    
+    def __init__(self, ordem: Sequence[Tuple[str, str]], cursor: Optional[str] = None,
+                 por_pagina: int = 20, maximo: int = 100):
+        """
+        Args:
+            ordem: Colunas de ordenação e direção, ex. [('created_at', 'DESC'), ('id', 'DESC')]
+            cursor (Optional[str]): Token da página anterior (None = primeira página)
+            por_pagina (int): Itens por página (limitado a `maximo`)
+            maximo (int): Maior tamanho de página aceito
+            
+        Raises:
+            ValueError: Coluna, direção ou cursor inválidos
+        """
+        self.ordem = []
+        for coluna, direcao in ordem:
+            direcao = direcao.upper()
+            if not _COLUNA_ORDENACAO.match(coluna) or direcao not in ('ASC', 'DESC'):
+                raise ValueError(f"Ordenação inválida: {coluna} {direcao}")
+            self.ordem.append((coluna, direcao))
+        self.valores = decodificar_cursor(cursor, len(self.ordem)) if cursor else None
+        self.por_pagina = max(1, min(int(por_pagina), maximo))
+    
+    @property
+    def limite(self) -> int:
+        """LIMIT da query: uma linha a mais indica que há próxima página"""
+        return self.por_pagina + 1
+    
+    def order_by(self) -> str:
+        """Conteúdo do ORDER BY"""
+        return ', '.join(f"{coluna} {direcao}" for coluna, direcao in self.ordem)
+    
+    def filtro(self) -> Tuple[str, tuple]:
+        """
+        Condição que seleciona as linhas depois do cursor (placeholders '%s')
+        
+        Returns:
+            tuple: (condição SQL, parâmetros); '1 = 1' na primeira página
+        """
+        if self.valores is None:
+            return '1 = 1', ()
+        
+        colunas = [coluna for coluna, _ in self.ordem]
+        direcoes = {direcao for _, direcao in self.ordem}
+        if len(direcoes) == 1:
+            # Comparação de tuplas: usa o índice composto diretamente
+            operador = '<' if direcoes == {'DESC'} else '>'
+            marcadores = ', '.join(['%s'] * len(colunas))
+            return f"({', '.join(colunas)}) {operador} ({marcadores})", self.valores
+        
+        # Direções misturadas: (a > x) OR (a = x AND b < y) OR ...
+        termos, params = [], []
+        for i, (coluna, direcao) in enumerate(self.ordem):
+            iguais = [f"{c} = %s" for c in colunas[:i]]
+            iguais.append(f"{coluna} {'<' if direcao == 'DESC' else '>'} %s")
+            termos.append('(' + ' AND '.join(iguais) + ')')
+            params.extend(self.valores[:i + 1])
+        return '(' + ' OR '.join(termos) + ')', tuple(params)
+    
+    def pagina(self, linhas: list, chave: Callable) -> PaginaKeyset:
+        """
+        Monta a página a partir das até `limite` linhas buscadas
+        
+        Args:
+            linhas (list): Linhas retornadas pela query com LIMIT self.limite
+            chave (Callable): Extrai de uma linha os valores das colunas de ordenação
+        """
+        if len(linhas) <= self.por_pagina:
+            return PaginaKeyset(list(linhas), None)
+        itens = list(linhas[:self.por_pagina])
+        return PaginaKeyset(itens, codificar_cursor(chave(itens[-1])))
+
+
+def paginar_keyset(conn, query: str, params: tuple = (), ordem: Sequence[Tuple[str, str]] = (('id', 'ASC'),),
+                   cursor: Optional[str] = None, por_pagina: int = 20, tipo: str = 'dict') -> PaginaKeyset:
+    """
+    Busca uma página de uma query com paginação por chave
+    
+    A query é usada como subconsulta; as colunas de `ordem` são nomes de
+    colunas do seu resultado. O banco aplica o filtro dentro da subconsulta,
+    então um índice nessas colunas continua sendo usado.
+    
+    Args:
+        conn: Conexão sqlite3 ou psycopg
+        query (str): SELECT sem ORDER BY/LIMIT, com placeholders '%s'
+        params (tuple): Parâmetros da query
+        ordem: Colunas de ordenação e direção; a última deve ser única
+        cursor (Optional[str]): Token da página anterior
+        por_pagina (int): Itens por página
+        tipo (str): 'dict', 'tuple' ou 'row'
+        
+    Returns:
+        PaginaKeyset: Itens e cursor da próxima página
+    """
+    paginacao = PaginacaoKeyset(ordem, cursor, por_pagina)
+    filtro, params_filtro = paginacao.filtro()
+    sql = (f"SELECT * FROM ({query}) AS pagina WHERE {filtro} "
+           f"ORDER BY {paginacao.order_by()} LIMIT {paginacao.limite}")
+    
+    cur = conn.cursor()
+    try:
+        cur.execute(adapt_query(sql, conn), tuple(params) + tuple(params_filtro))
+        colunas = [col[0] for col in cur.description]
+        indices = [colunas.index(coluna) for coluna, _ in paginacao.ordem]
+        linhas = list(iter_cursor(cur, paginacao.limite, 'tuple'))
+    finally:
+        cur.close()
+    
+    pagina = paginacao.pagina(linhas, chave=lambda row: tuple(row[i] for i in indices))
+    if tipo != 'tuple':
+        converter = _conversor_linhas(colunas, tipo)
+        pagina.itens = [converter(row) for row in pagina.itens]
+    return pagina
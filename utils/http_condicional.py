@@ -0,0 +1,125 @@
+"""
+GET condicional (ETag / Last-Modified) para páginas e recursos da API
+
+Cada rota calcula um validador a partir dos carimbos de versão que já tem à
+mão (updated_at da aula, versão das turmas, versão do cache) e chama
+nao_modificado() antes das consultas pesadas e da renderização. Se o cliente
+mandou If-None-Match com o mesmo ETag (ou If-Modified-Since não anterior ao
+Last-Modified), recebe 304 sem corpo; caso contrário a resposta completa
+sai com os validadores (aplicar()) para a próxima vez. Last-Modified tem
+precisão de um segundo: só o passe quem não muda duas vezes no mesmo segundo
+(as versões das turmas, por exemplo, vão só com ETag).
+
+As respostas são de usuários autenticados: vão com Cache-Control private,
+no-cache, e o ETag das páginas inclui o usuário e a versão do deploy
+(FLY_IMAGE_REF ou APP_VERSION), já que o layout e o menu mudam com eles.
+Com mensagens flash pendentes a página é sempre gerada, para não as perder.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from flask import Response, make_response, request, session
+from werkzeug.http import http_date, quote_etag
+
+VERSAO_APP = os.getenv('FLY_IMAGE_REF') or os.getenv('APP_VERSION', '')
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def gerar_etag(*partes: Any) -> str:
+    """
+    ETag (sem aspas) a partir dos carimbos de versão de um recurso
+
+    Args:
+        *partes: Valores que mudam quando o conteúdo muda (IDs, updated_at, versões)
+
+    Returns:
+        str: Hash curto das partes e da versão do deploy
+    """
+    texto = '\x1f'.join(str(parte) for parte in (VERSAO_APP,) + partes)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:32]
+
+
+def _normalizar_data(momento: Any) -> Optional[datetime]:
+    """datetime (ou texto do SQLite) em UTC, sem microssegundos; None se não der"""
+    if momento is None:
+        return None
+    if not isinstance(momento, datetime):
+        try:
+            momento = datetime.fromisoformat(str(momento))
+        except ValueError:
+            return None
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    return momento.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def cabecalhos(etag: str, ultima_modificacao: Any = None) -> Dict[str, str]:
+    """
+    ETag, Last-Modified e Cache-Control de uma resposta
+
+    Para os recursos do Flask-RESTful, que retornam (dados, status, cabeçalhos).
+
+    Args:
+        etag (str): Valor de gerar_etag()
+        ultima_modificacao: datetime ou texto ISO da última alteração (opcional)
+
+    Returns:
+        Dict[str, str]: Cabeçalhos HTTP
+    """
+    valores = {'ETag': quote_etag(etag, weak=True), 'Cache-Control': CACHE_CONTROL}
+    momento = _normalizar_data(ultima_modificacao)
+    if momento is not None:
+        valores['Last-Modified'] = http_date(momento)
+    return valores
+
+
+def nao_modificado(etag: str, ultima_modificacao: Any = None) -> Optional[Response]:
+    """
+    Resposta 304 se o cliente já tem esta versão
+
+    Args:
+        etag (str): Valor de gerar_etag()
+        ultima_modificacao: datetime ou texto ISO da última alteração (opcional)
+
+    Returns:
+        Optional[Response]: 304 com os validadores, ou None se a resposta deve ser gerada
+    """
+    if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+        return None
+
+    if request.if_none_match:
+        # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    else:
+        momento = _normalizar_data(ultima_modificacao)
+        if momento is None or request.if_modified_since is None or request.if_modified_since < momento:
+            return None
+
+    return Response(status=304, headers=cabecalhos(etag, ultima_modificacao))
+
+
+def aplicar(resposta, etag: str, ultima_modificacao: Any = None) -> Response:
+    """
+    Acrescenta os validadores a uma resposta completa
+
+    Args:
+        resposta: Response do Flask ou o que make_response aceita (HTML, dict)
+        etag (str): Valor de gerar_etag()
+        ultima_modificacao: datetime ou texto ISO da última alteração (opcional)
+
+    Returns:
+        Response: A resposta com os cabeçalhos
+    """
+    resposta = make_response(resposta)
+    resposta.headers.update(cabecalhos(etag, ultima_modificacao))
+    return resposta
+
+
+def etag_usuario(usuario, *partes: Any) -> str:
+    """ETag de uma página renderizada para o usuário logado (o menu depende dele)"""
+    return gerar_etag(getattr(usuario, 'id', None), getattr(usuario, 'first_name', None),
+                      getattr(usuario, 'user_type', None), *partes)
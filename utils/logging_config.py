@@ -0,0 +1,167 @@
+"""
+Configuração de logs estruturados e não bloqueantes
+
+Os handlers da aplicação ficam atrás de uma fila: a thread da requisição só
+enfileira o registro (QueueHandler) e uma thread dedicada (QueueListener)
+formata e escreve no stdout. Assim a requisição nunca espera pela escrita.
+
+Em produção a saída é uma linha JSON por registro, com o id da requisição
+(cabeçalho X-Request-ID, gerado quando ausente). Mensagens de debug devem usar
+argumentos (logger.debug("... %s", valor)) em vez de f-strings: abaixo do nível
+configurado o logger as descarta antes de qualquer formatação.
+
+Variáveis de ambiente:
+    LOG_LEVEL   Nível mínimo (padrão: INFO em produção, DEBUG fora dela)
+    LOG_FORMAT  json ou texto (padrão: json em produção, texto fora dela)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+_request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Atributos padrão de LogRecord (o restante vem de extra= e vai para o JSON)
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+
+def request_id_atual() -> Optional[str]:
+    """Id da requisição em andamento (None fora de uma requisição)"""
+    return _request_id.get()
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            dados['request_id'] = request_id
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith('_'):
+                dados[chave] = valor
+        if record.exc_text:
+            dados['exc'] = record.exc_text
+        elif record.exc_info:
+            dados['exc'] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato legível para desenvolvimento"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not getattr(record, 'request_id', None):
+            record.request_id = '-'
+        return super().format(record)
+
+
+class _QueueHandlerLeve(logging.handlers.QueueHandler):
+    """
+    Enfileira o registro sem formatá-lo na thread que gerou o log
+
+    Só a mensagem (msg % args), o traceback e o id da requisição são resolvidos
+    aqui, porque dependem do estado da thread; o JSON é montado pelo listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = _request_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _producao() -> bool:
+    return os.getenv('FLASK_ENV') == 'production'
+
+
+def configurar_logging(nivel: str = None, formato: str = None, stream=None):
+    """
+    Direciona o logger raiz para a fila e inicia a thread de escrita
+
+    Pode ser chamada mais de uma vez; só a primeira chamada tem efeito.
+
+    Args:
+        nivel (str): Nível mínimo (padrão: LOG_LEVEL)
+        formato (str): 'json' ou 'texto' (padrão: LOG_FORMAT)
+        stream: Destino dos logs (padrão: stdout)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    nivel = (nivel or os.getenv('LOG_LEVEL') or ('INFO' if _producao() else 'DEBUG')).upper()
+    formato = (formato or os.getenv('LOG_FORMAT') or ('json' if _producao() else 'texto')).lower()
+
+    saida = logging.StreamHandler(stream or sys.stdout)
+    saida.setFormatter(FormatadorJSON() if formato == 'json' else FormatadorTexto())
+
+    fila = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(_QueueHandlerLeve(fila))
+    raiz.setLevel(nivel)
+
+    # O log de acesso do servidor de desenvolvimento repete cada requisição
+    logging.getLogger('werkzeug').setLevel(max(logging.getLogger('werkzeug').level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logging)
+
+
+def parar_logging():
+    """Esvazia a fila e encerra a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_app(app):
+    """
+    Atribui um id a cada requisição de um app Flask
+
+    O id vem do cabeçalho X-Request-ID (quando enviado por um proxy) ou é
+    gerado, e é devolvido no mesmo cabeçalho da resposta.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _definir_request_id():
+        request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+        g._request_id_token = _request_id.set(request_id[:64])
+
+    @app.after_request
+    def _devolver_request_id(response):
+        request_id = _request_id.get()
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
+
+    @app.teardown_request
+    def _limpar_request_id(e=None):
+        token = g.pop('_request_id_token', None)
+        if token is not None:
+            _request_id.reset(token)
@@ -0,0 +1,283 @@
+"""
+Métricas HTTP no formato de texto do Prometheus
+
+Coleta, por endpoint do Flask e status, o número de requisições e histogramas
+de latência, além de requisições em andamento, tempo de renderização de
+templates, tempo no banco (a partir de utils.sql_instrumentation) e
+estatísticas dos pools de conexão registrados. Tudo é exposto em /metrics.
+
+Cada thread grava apenas nos seus próprios contadores, sem locks no caminho
+da requisição; os contadores de todas as threads são somados só quando
+/metrics é lido. As métricas são por processo: com vários workers do
+gunicorn, cada um expõe as suas.
+
+Por padrão /metrics só responde a requisições locais (METRICS_ALLOWED_IPS).
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (segundos) dos buckets de latência
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_TEMPLATE = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+METRICS_ALLOWED_IPS = {
+    ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+}
+
+
+class _ContadoresThread:
+    """Contadores gravados por uma única thread"""
+
+    __slots__ = ('contadores', 'histogramas', 'em_andamento', 'templates')
+
+    def __init__(self):
+        self.contadores: Dict[tuple, float] = {}
+        self.histogramas: Dict[tuple, list] = {}
+        self.em_andamento = 0
+        self.templates: List[float] = []  # pilha de inícios de renderização
+
+
+_local = threading.local()
+_todas_threads: List[_ContadoresThread] = []
+_registro_lock = threading.Lock()
+_pools: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+
+def _contadores() -> _ContadoresThread:
+    try:
+        return _local.contadores
+    except AttributeError:
+        contadores = _local.contadores = _ContadoresThread()
+        with _registro_lock:
+            _todas_threads.append(contadores)
+        return contadores
+
+
+def incrementar(nome: str, rotulos: tuple = (), valor: float = 1):
+    """Soma `valor` a um contador"""
+    contadores = _contadores().contadores
+    chave = (nome, rotulos)
+    contadores[chave] = contadores.get(chave, 0) + valor
+
+
+def observar(nome: str, rotulos: tuple, valor: float, buckets: tuple = BUCKETS_LATENCIA):
+    """Registra uma observação em um histograma"""
+    histogramas = _contadores().histogramas
+    chave = (nome, rotulos, buckets)
+    serie = histogramas.get(chave)
+    if serie is None:
+        # Um contador por bucket, mais +Inf, soma e total
+        serie = histogramas[chave] = [0] * (len(buckets) + 1) + [0.0, 0]
+    serie[bisect_left(buckets, valor)] += 1
+    serie[-2] += valor
+    serie[-1] += 1
+
+
+def registrar_pool(nome: str, estatisticas: Callable[[], Dict[str, float]]):
+    """
+    Registra um pool de conexões para ser exposto em /metrics
+
+    Args:
+        nome (str): Nome do pool (rótulo "pool")
+        estatisticas (Callable): Função que retorna {métrica: valor},
+            como psycopg_pool.ConnectionPool.get_stats
+    """
+    _pools[nome] = estatisticas
+
+
+def limpar():
+    """Zera todas as métricas (usado nos testes)"""
+    with _registro_lock:
+        for contadores in _todas_threads:
+            contadores.contadores.clear()
+            contadores.histogramas.clear()
+            contadores.em_andamento = 0
+
+
+# =====================================================
+# Exposição
+# =====================================================
+
+def _formatar_rotulos(nomes: tuple, valores: tuple) -> str:
+    if not nomes:
+        return ''
+    pares = ','.join(
+        '{}="{}"'.format(n, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for n, v in zip(nomes, valores)
+    )
+    return '{' + pares + '}'
+
+
+# Nome da métrica -> (tipo, ajuda, nomes dos rótulos)
+DEFINICOES = {
+    'http_requests_total': ('counter', 'Requisições atendidas', ('endpoint', 'method', 'status')),
+    'http_request_duration_seconds': ('histogram', 'Latência das requisições', ('endpoint', 'status')),
+    'http_request_db_seconds_total': ('counter', 'Tempo no banco durante as requisições', ('endpoint',)),
+    'http_request_seconds_total': ('counter', 'Tempo total das requisições', ('endpoint',)),
+    'http_request_db_queries_total': ('counter', 'Consultas SQL executadas nas requisições', ('endpoint',)),
+    'template_render_seconds': ('histogram', 'Tempo de renderização de templates', ('template',)),
+    'http_response_bytes_total': ('counter', 'Bytes das respostas comprimidas, antes e depois da compressão',
+                                  ('codificacao', 'etapa')),
+    'db_connections_opened_total': ('counter', 'Conexões abertas com o banco fora de pools', ()),
+    'db_prepared_executions_total': ('counter', 'Execuções das consultas quentes registradas',
+                                     ('consulta', 'preparada')),
+    'gamificacao_eventos_total': ('counter', 'Eventos de gamificação aplicados pelos trabalhadores',
+                                  ('tipo', 'resultado')),
+    'gamificacao_atraso_seconds': ('histogram', 'Tempo entre a resposta e a aplicação da gamificação', ('tipo',)),
+    'cache_conteudo_total': ('counter', 'Leituras do cache de conteúdo de aulas e exercícios', ('tipo', 'resultado')),
+    'cache_conteudo_descartes_total': ('counter', 'Entradas descartadas do cache de conteúdo por falta de espaço',
+                                       ('tipo',)),
+    'tempo_assistido_heartbeats_total': ('counter', 'Heartbeats do player recebidos', ('resultado',)),
+    'tempo_assistido_linhas_gravadas_total': ('counter', 'Linhas de progresso gravadas com o tempo assistido',
+                                              ('motivo',)),
+    'tempo_assistido_escritas_evitadas_total': ('counter', 'Heartbeats somados em memória sem escrita própria', ()),
+    'tempo_assistido_falhas_total': ('counter', 'Gravações do tempo assistido desfeitas e devolvidas à memória', ()),
+}
+
+
+def _agregar():
+    contadores: Dict[tuple, float] = {}
+    histogramas: Dict[tuple, list] = {}
+    em_andamento = 0
+    with _registro_lock:
+        threads = list(_todas_threads)
+    for t in threads:
+        em_andamento += t.em_andamento
+        for chave, valor in list(t.contadores.items()):
+            contadores[chave] = contadores.get(chave, 0) + valor
+        for chave, serie in list(t.histogramas.items()):
+            total = histogramas.get(chave)
+            if total is None:
+                histogramas[chave] = list(serie)
+            else:
+                for i, v in enumerate(serie):
+                    total[i] += v
+    return contadores, histogramas, em_andamento
+
+
+def gerar_texto() -> str:
+    """Gera todas as métricas no formato de texto do Prometheus"""
+    contadores, histogramas, em_andamento = _agregar()
+    linhas = [
+        '# HELP http_requests_in_flight Requisições em andamento',
+        '# TYPE http_requests_in_flight gauge',
+        f'http_requests_in_flight {em_andamento}',
+    ]
+
+    for nome, (tipo, ajuda, rotulos) in DEFINICOES.items():
+        linhas.append(f'# HELP {nome} {ajuda}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        if tipo == 'counter':
+            for (n, valores), valor in sorted(contadores.items()):
+                if n == nome:
+                    linhas.append(f'{nome}{_formatar_rotulos(rotulos, valores)} {valor:g}')
+        else:
+            for (n, valores, buckets), serie in sorted(histogramas.items()):
+                if n != nome:
+                    continue
+                acumulado = 0
+                for limite, quantidade in zip(buckets + ('+Inf',), serie):
+                    acumulado += quantidade
+                    rotulo = _formatar_rotulos(rotulos + ('le',), valores + (limite,))
+                    linhas.append(f'{nome}_bucket{rotulo} {acumulado}')
+                base = _formatar_rotulos(rotulos, valores)
+                linhas.append(f'{nome}_sum{base} {serie[-2]:.6f}')
+                linhas.append(f'{nome}_count{base} {serie[-1]}')
+
+    # Fração do tempo das requisições gasta no banco, por endpoint
+    linhas.append('# HELP http_request_db_time_share Fração do tempo das requisições gasta no banco')
+    linhas.append('# TYPE http_request_db_time_share gauge')
+    for (n, valores), total in sorted(contadores.items()):
+        if n == 'http_request_seconds_total' and total:
+            banco = contadores.get(('http_request_db_seconds_total', valores), 0)
+            linhas.append(f'http_request_db_time_share{_formatar_rotulos(("endpoint",), valores)} {banco / total:.4f}')
+
+    if _pools:
+        linhas.append('# HELP db_pool Estatísticas dos pools de conexão')
+        linhas.append('# TYPE db_pool gauge')
+        for pool, estatisticas in sorted(_pools.items()):
+            try:
+                valores = estatisticas() or {}
+            except Exception as e:
+                logger.warning(f"Erro ao ler estatísticas do pool {pool}: {e}")
+                continue
+            for metrica, valor in sorted(valores.items()):
+                linhas.append(f'db_pool{_formatar_rotulos(("pool", "metric"), (pool, metrica))} {valor:g}')
+
+    return '\n'.join(linhas) + '\n'
+
+
+# =====================================================
+# Integração com o Flask
+# =====================================================
+
+def init_app(app):
+    """
+    Instrumenta as requisições e templates de um app Flask e registra /metrics
+
+    Args:
+        app: Aplicação Flask
+    """
+    from flask import Response, abort, before_render_template, g, request, template_rendered
+
+    from utils.sql_instrumentation import estatisticas_atuais
+
+    @app.before_request
+    def _iniciar_metricas():
+        g._metricas_inicio = time.perf_counter()
+        _contadores().em_andamento += 1
+
+    @app.after_request
+    def _registrar_metricas(response):
+        inicio = g.pop('_metricas_inicio', None)
+        if inicio is None:
+            return response
+        _contadores().em_andamento -= 1
+
+        duracao = time.perf_counter() - inicio
+        endpoint = request.endpoint or 'desconhecido'
+        status = response.status_code
+        incrementar('http_requests_total', (endpoint, request.method, status))
+        observar('http_request_duration_seconds', (endpoint, status), duracao)
+        incrementar('http_request_seconds_total', (endpoint,), duracao)
+
+        estatisticas = estatisticas_atuais()
+        if estatisticas is not None and estatisticas.consultas:
+            incrementar('http_request_db_seconds_total', (endpoint,), estatisticas.tempo)
+            incrementar('http_request_db_queries_total', (endpoint,), estatisticas.consultas)
+        return response
+
+    @app.teardown_request
+    def _finalizar_metricas(e=None):
+        # Exceção não tratada: after_request não rodou
+        inicio = g.pop('_metricas_inicio', None)
+        if inicio is not None:
+            _contadores().em_andamento -= 1
+            endpoint = request.endpoint or 'desconhecido'
+            incrementar('http_requests_total', (endpoint, request.method, 500))
+            observar('http_request_duration_seconds', (endpoint, 500), time.perf_counter() - inicio)
+
+    def _inicio_template(sender, template, context, **extra):
+        _contadores().templates.append(time.perf_counter())
+
+    def _fim_template(sender, template, context, **extra):
+        pilha = _contadores().templates
+        if pilha:
+            observar('template_render_seconds', (template.name or 'string',),
+                     time.perf_counter() - pilha.pop(), BUCKETS_TEMPLATE)
+
+    before_render_template.connect(_inicio_template, app, weak=False)
+    template_rendered.connect(_fim_template, app, weak=False)
+
+    @app.route('/metrics')
+    def metrics():
+        """Métricas no formato de texto do Prometheus (apenas acesso local)"""
+        if request.remote_addr not in METRICS_ALLOWED_IPS:
+            abort(404)
+        return Response(gerar_texto(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,227 @@
+"""
+Profiler por amostragem sob demanda
+
+Um administrador pode perfilar uma requisição enviando o cabeçalho
+X-Profile: 1 ou o parâmetro ?_profile=1; uma fração do tráfego também pode
+ser perfilada automaticamente (PROFILER_SAMPLE_RATE, ex.: 0.01 = 1%).
+
+Enquanto houver requisições sendo perfiladas, uma thread amostra a pilha de
+cada uma a cada PROFILER_INTERVAL_MS. O resultado é gravado no formato de
+pilhas colapsadas ("a;b;c 12"), aceito por flamegraph.pl e speedscope, em
+PROFILER_DIR, que guarda no máximo PROFILER_MAX_FILES perfis (os mais antigos
+são apagados). A página /admin/profiler lista os perfis mais lentos.
+
+Com o profiler desligado o custo por requisição é um teste de flag: o usuário
+só é consultado quando o cabeçalho ou o parâmetro estão presentes.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join('instance', 'profiles'))
+PROFILER_MAX_FILES = int(os.getenv('PROFILER_MAX_FILES', '200'))
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+
+CABECALHO = 'X-Profile'
+PARAMETRO = '_profile'
+EXTENSAO = '.collapsed'
+
+_NOME_VALIDO = re.compile(r'^[\w.-]+$')
+
+
+class Amostrador:
+    """Amostra periodicamente a pilha das threads registradas"""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._alvos: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self, thread_id: int) -> Counter:
+        """Passa a amostrar a thread; a thread de amostragem sobe se necessário"""
+        contagem = Counter()
+        with self._lock:
+            self._alvos[thread_id] = contagem
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, name='profiler', daemon=True)
+                self._thread.start()
+        return contagem
+
+    def parar(self, thread_id: int) -> Counter:
+        """Deixa de amostrar a thread e retorna as pilhas coletadas"""
+        with self._lock:
+            return self._alvos.pop(thread_id, Counter())
+
+    def _rodar(self):
+        while True:
+            with self._lock:
+                if not self._alvos:
+                    self._thread = None
+                    return
+                alvos = list(self._alvos.items())
+            frames = sys._current_frames()
+            for thread_id, contagem in alvos:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    contagem[pilha_colapsada(frame)] += 1
+            del frames
+            time.sleep(self.intervalo)
+
+
+def pilha_colapsada(frame) -> str:
+    """Pilha do frame, da raiz até ele, no formato 'funcao (arquivo:linha);...'"""
+    partes = []
+    while frame is not None:
+        codigo = frame.f_code
+        partes.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    partes.reverse()
+    return ';'.join(partes)
+
+
+class ArmazenamentoPerfis:
+    """Diretório limitado com os perfis (.collapsed) e seus metadados (.json)"""
+
+    def __init__(self, diretorio: str, maximo: int):
+        self.diretorio = diretorio
+        self.maximo = maximo
+        self._lock = threading.Lock()
+
+    def salvar(self, pilhas: Counter, metadados: dict) -> str:
+        """Grava um perfil e apaga os mais antigos além do limite; retorna o nome"""
+        momento = datetime.utcnow()
+        endpoint = re.sub(r'[^\w.-]', '_', metadados.get('endpoint') or 'desconhecido')
+        nome = f"{momento:%Y%m%dT%H%M%S%f}_{endpoint}_{metadados['duracao_ms']:.0f}ms"
+        metadados = dict(metadados, nome=nome, momento=momento.isoformat(timespec='seconds'),
+                         amostras=sum(pilhas.values()))
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = os.path.join(self.diretorio, nome)
+        with open(caminho + EXTENSAO, 'w', encoding='utf-8') as f:
+            for pilha, quantidade in pilhas.most_common():
+                f.write(f"{pilha} {quantidade}\n")
+        with open(caminho + '.json', 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, ensure_ascii=False)
+
+        self._limitar()
+        return nome
+
+    def _limitar(self):
+        with self._lock:
+            perfis = sorted(n for n in os.listdir(self.diretorio) if n.endswith('.json'))
+            for antigo in perfis[:max(0, len(perfis) - self.maximo)]:
+                base = os.path.join(self.diretorio, antigo[:-len('.json')])
+                for extensao in ('.json', EXTENSAO):
+                    try:
+                        os.remove(base + extensao)
+                    except FileNotFoundError:
+                        pass
+
+    def listar(self, limite: int = 50) -> List[dict]:
+        """Metadados dos perfis, do mais lento para o mais rápido"""
+        if not os.path.isdir(self.diretorio):
+            return []
+        perfis = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith('.json'):
+                try:
+                    with open(os.path.join(self.diretorio, nome), encoding='utf-8') as f:
+                        perfis.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        perfis.sort(key=lambda p: p.get('duracao_ms', 0), reverse=True)
+        return perfis[:limite]
+
+    def caminho(self, nome: str) -> Optional[str]:
+        """Caminho do arquivo .collapsed de um perfil (None se inválido)"""
+        if not _NOME_VALIDO.match(nome):
+            return None
+        caminho = os.path.join(self.diretorio, nome + EXTENSAO)
+        return caminho if os.path.isfile(caminho) else None
+
+
+def init_app(app, taxa: float = None, diretorio: str = None, maximo: int = None):
+    """
+    Ativa o profiler sob demanda em um app Flask e registra as páginas de administração
+
+    Args:
+        app: Aplicação Flask
+        taxa (float): Fração das requisições perfiladas automaticamente (padrão: PROFILER_SAMPLE_RATE)
+        diretorio (str): Onde os perfis são gravados (padrão: PROFILER_DIR)
+        maximo (int): Quantidade máxima de perfis guardados (padrão: PROFILER_MAX_FILES)
+    """
+    from flask import abort, g, render_template, request, send_file
+    from flask_login import current_user
+    from auth import admin_required
+
+    taxa = PROFILER_SAMPLE_RATE if taxa is None else taxa
+    amostrador = Amostrador(PROFILER_INTERVAL_MS / 1000)
+    armazenamento = ArmazenamentoPerfis(diretorio or PROFILER_DIR, maximo or PROFILER_MAX_FILES)
+    app.extensions['profiler'] = armazenamento
+
+    def _solicitado_por_admin() -> bool:
+        if request.headers.get(CABECALHO) != '1' and request.args.get(PARAMETRO) != '1':
+            return False
+        return current_user.is_authenticated and current_user.is_admin
+
+    @app.before_request
+    def _iniciar_perfil():
+        if (taxa and random.random() < taxa) or _solicitado_por_admin():
+            thread_id = threading.get_ident()
+            g._perfil = (time.perf_counter(), thread_id, amostrador.iniciar(thread_id))
+
+    @app.after_request
+    def _salvar_perfil(response):
+        perfil = g.pop('_perfil', None)
+        if perfil is None:
+            return response
+        inicio, thread_id, _ = perfil
+        pilhas = amostrador.parar(thread_id)
+        try:
+            nome = armazenamento.salvar(pilhas, {
+                'endpoint': request.endpoint,
+                'metodo': request.method,
+                'caminho': request.full_path.rstrip('?'),
+                'status': response.status_code,
+                'duracao_ms': round((time.perf_counter() - inicio) * 1000, 1),
+            })
+            response.headers['X-Profile-Id'] = nome
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o perfil: {e}")
+        return response
+
+    @app.teardown_request
+    def _descartar_perfil(e=None):
+        # Exceção não tratada: after_request não rodou
+        perfil = g.pop('_perfil', None)
+        if perfil is not None:
+            amostrador.parar(perfil[1])
+
+    @app.route('/admin/profiler')
+    @admin_required
+    def admin_profiler():
+        """Perfis capturados, do mais lento para o mais rápido"""
+        return render_template('admin_profiler.html', perfis=armazenamento.listar(),
+                               taxa=taxa, maximo=armazenamento.maximo)
+
+    @app.route('/admin/profiler/<nome>')
+    @admin_required
+    def admin_profiler_download(nome):
+        """Baixa um perfil no formato de pilhas colapsadas"""
+        caminho = armazenamento.caminho(nome)
+        if caminho is None:
+            abort(404)
+        return send_file(os.path.abspath(caminho), mimetype='text/plain', as_attachment=True,
+                         download_name=nome + EXTENSAO)
@@ -0,0 +1,100 @@
+"""
+Roteamento de leituras e escritas entre o PostgreSQL primário e uma réplica
+
+Rotas que só leem (relatórios, ranking, fórum, IA) declaram a intenção com
+@somente_leitura; nelas get_db() do app_postgres entrega uma conexão com a
+réplica em DATABASE_REPLICA_URL, quando configurada. Todo o resto continua no
+primário (DATABASE_URL).
+
+Leitura das próprias escritas: uma requisição que altera dados marca na sessão
+o momento da escrita e, por REPLICA_LEITURA_APOS_ESCRITA_S segundos, as
+leituras daquele usuário voltam para o primário, para que ele não veja a
+resposta, o progresso ou o voto que acabou de enviar desaparecer por causa do
+atraso de replicação.
+
+Para testar localmente basta apontar DATABASE_REPLICA_URL para outra instância
+ou para o mesmo banco com outra string de conexão (por exemplo, outro
+application_name); as conexões de leitura são abertas como read only, então
+uma escrita em rota marcada como leitura falha mesmo nesse caso.
+"""
+import os
+import time
+from functools import wraps
+from typing import Optional
+
+INTENCAO_LEITURA = 'leitura'
+INTENCAO_ESCRITA = 'escrita'
+
+# Chave da sessão com o instante (epoch) da última escrita do usuário
+CHAVE_ULTIMA_ESCRITA = '_ultima_escrita'
+
+REPLICA_LEITURA_APOS_ESCRITA_S = float(os.getenv('REPLICA_LEITURA_APOS_ESCRITA_S', '5'))
+
+# Métodos HTTP que não alteram dados
+METODOS_SEGUROS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def dsn_primario() -> str:
+    """String de conexão do primário: DATABASE_URL do Render ou configuração local"""
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        return database_url
+    import psycopg
+    return psycopg.conninfo.make_conninfo(
+        host=os.getenv('DB_HOST', 'localhost'),
+        dbname=os.getenv('DB_NAME', 'escola_para_todos'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', 'postgres')
+    )
+
+
+def dsn_replica() -> Optional[str]:
+    """String de conexão da réplica (None se não configurada)"""
+    return os.getenv('DATABASE_REPLICA_URL') or None
+
+
+def marcar_escrita(sessao, agora: float = None):
+    """Registra na sessão que o usuário acabou de escrever"""
+    sessao[CHAVE_ULTIMA_ESCRITA] = round(time.time() if agora is None else agora, 3)
+
+
+def leitura_no_primario(sessao, agora: float = None) -> bool:
+    """
+    Indica se as leituras do usuário ainda devem ir para o primário
+
+    Args:
+        sessao: Sessão do Flask (ou o dicionário decodificado do cookie)
+        agora (float): Instante atual (epoch); padrão: time.time()
+
+    Returns:
+        bool: True durante REPLICA_LEITURA_APOS_ESCRITA_S após a última escrita
+    """
+    ultima = sessao.get(CHAVE_ULTIMA_ESCRITA) if sessao else None
+    if not ultima:
+        return False
+    agora = time.time() if agora is None else agora
+    return agora - float(ultima) < REPLICA_LEITURA_APOS_ESCRITA_S
+
+
+def dsn_leitura(sessao) -> str:
+    """String de conexão para uma leitura do usuário da sessão"""
+    replica = dsn_replica()
+    if replica and not leitura_no_primario(sessao):
+        return replica
+    return dsn_primario()
+
+
+def intencao_atual() -> str:
+    """Intenção declarada pela rota em andamento (escrita se não declarada)"""
+    from flask import g
+    return g.get('intencao_db', INTENCAO_ESCRITA)
+
+
+def somente_leitura(f):
+    """Declara que a rota só lê do banco (get_db() pode usar a réplica)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        from flask import g
+        g.intencao_db = INTENCAO_LEITURA
+        return f(*args, **kwargs)
+    return decorated_function
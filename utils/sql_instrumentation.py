@@ -0,0 +1,263 @@
+"""
+Instrumentação de SQL por requisição
+
+Conexões abertas com as fábricas deste módulo (sqlite3 e psycopg) medem cada
+execute e acumulam, para a requisição em andamento, o número de consultas, o
+tempo total no banco e as consultas mais lentas. Ao final da requisição:
+
+- formatos de consulta repetidos muitas vezes são registrados como suspeitas
+  de N+1 (o mesmo SELECT executado uma vez por item de uma lista);
+- consultas acima de SLOW_QUERY_MS vão para o log de consultas lentas;
+- em desenvolvimento, os totais são enviados nos cabeçalhos X-SQL-Stats e
+  Server-Timing (visível na aba de rede do navegador).
+
+As subclasses preservam isinstance(conn, sqlite3.Connection), usado por
+utils.database.is_sqlite_connection.
+"""
+import heapq
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Consultas a partir deste tempo entram no log de consultas lentas
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+
+# Quantas execuções do mesmo formato na mesma requisição indicam um N+1
+N_PLUS_ONE_LIMITE = int(os.getenv('N_PLUS_ONE_LIMITE', '5'))
+
+# Quantas consultas mais lentas são guardadas por requisição
+CONSULTAS_LENTAS_POR_REQUISICAO = 5
+
+_coletor_atual: ContextVar[Optional['EstatisticasSQL']] = ContextVar('estatisticas_sql', default=None)
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_ESPACOS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql: str) -> str:
+    """
+    Reduz uma consulta ao seu formato: sem literais, placeholders e espaços extras
+
+    Args:
+        sql (str): Consulta SQL
+
+    Returns:
+        str: Formato da consulta (consultas iguais a menos dos valores coincidem)
+    """
+    formato = _ESPACOS.sub(' ', sql).strip()
+    formato = formato.replace('%s', '?')
+    formato = _LITERAIS.sub('?', formato)
+    return _LISTAS.sub('(?...)', formato)
+
+
+class EstatisticasSQL:
+    """Consultas executadas durante uma requisição"""
+
+    __slots__ = ('consultas', 'tempo', 'formatos', 'lentas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+        self.formatos = Counter()
+        self.lentas: List[Tuple[float, str]] = []
+
+    def registrar(self, sql: str, duracao: float):
+        """Contabiliza uma execução"""
+        self.consultas += 1
+        self.tempo += duracao
+        self.formatos[sql] += 1
+        if len(self.lentas) < CONSULTAS_LENTAS_POR_REQUISICAO:
+            heapq.heappush(self.lentas, (duracao, sql))
+        elif duracao > self.lentas[0][0]:
+            heapq.heapreplace(self.lentas, (duracao, sql))
+
+    def mais_lentas(self) -> List[Tuple[float, str]]:
+        """Consultas mais lentas da requisição, da mais lenta para a mais rápida"""
+        return sorted(((d, normalizar_sql(s)) for d, s in self.lentas), reverse=True)
+
+    def suspeitas_n_mais_1(self, limite: int = None) -> List[Tuple[str, int]]:
+        """
+        Formatos de consulta repetidos pelo menos `limite` vezes
+
+        Returns:
+            List[Tuple[str, int]]: (formato, execuções), do mais repetido ao menos
+        """
+        limite = limite or N_PLUS_ONE_LIMITE
+        repetidos = Counter()
+        for sql, vezes in self.formatos.items():
+            repetidos[normalizar_sql(sql)] += vezes
+        return [(formato, vezes) for formato, vezes in repetidos.most_common() if vezes >= limite]
+
+    def resumo(self) -> Dict:
+        """Totais da requisição em formato serializável"""
+        return {
+            'consultas': self.consultas,
+            'tempo_ms': round(self.tempo * 1000, 2),
+            'mais_lentas': [
+                {'ms': round(d * 1000, 2), 'sql': s} for d, s in self.mais_lentas()
+            ],
+            'n_mais_1': [
+                {'sql': s, 'vezes': v} for s, v in self.suspeitas_n_mais_1()
+            ],
+        }
+
+
+def estatisticas_atuais() -> Optional[EstatisticasSQL]:
+    """Estatísticas da requisição em andamento (None fora de uma requisição)"""
+    return _coletor_atual.get()
+
+
+def iniciar_coleta() -> object:
+    """Inicia a coleta para o contexto atual; retorna o token para encerrar"""
+    return _coletor_atual.set(EstatisticasSQL())
+
+
+def encerrar_coleta(token) -> Optional[EstatisticasSQL]:
+    """Encerra a coleta iniciada com iniciar_coleta"""
+    estatisticas = _coletor_atual.get()
+    _coletor_atual.reset(token)
+    return estatisticas
+
+
+def registrar_execucao(sql, duracao: float):
+    """Registra uma execução na requisição atual e no log de consultas lentas"""
+    if not isinstance(sql, str):
+        sql = str(sql)
+    coletor = _coletor_atual.get()
+    if coletor is not None:
+        coletor.registrar(sql, duracao)
+    if duracao * 1000 >= SLOW_QUERY_MS:
+        logger.warning(f"Consulta lenta ({duracao * 1000:.1f}ms): {normalizar_sql(sql)}")
+
+
+# =====================================================
+# SQLite
+# =====================================================
+
+class InstrumentedSQLiteCursor(sqlite3.Cursor):
+    """Cursor sqlite3 que mede cada execute"""
+
+    def execute(self, sql, parameters=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            registrar_execucao(sql, time.perf_counter() - inicio)
+
+    def executemany(self, sql, seq_of_parameters):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            registrar_execucao(sql, time.perf_counter() - inicio)
+
+
+class InstrumentedSQLiteConnection(sqlite3.Connection):
+    """
+    Conexão sqlite3 cujos cursores são instrumentados
+
+    Uso: sqlite3.connect(caminho, factory=InstrumentedSQLiteConnection)
+    """
+
+    def cursor(self, factory=InstrumentedSQLiteCursor):
+        return super().cursor(factory)
+
+    # Connection.execute cria o cursor internamente, sem passar por cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# =====================================================
+# PostgreSQL (psycopg 3)
+# =====================================================
+
+try:
+    import psycopg
+
+    class InstrumentedPsycopgCursor(psycopg.Cursor):
+        """
+        Cursor psycopg que mede cada execute
+
+        Uso: psycopg.connect(..., cursor_factory=InstrumentedPsycopgCursor)
+        """
+
+        def execute(self, query, params=None, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return super().execute(query, params, **kwargs)
+            finally:
+                registrar_execucao(query, time.perf_counter() - inicio)
+
+        def executemany(self, query, params_seq, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return super().executemany(query, params_seq, **kwargs)
+            finally:
+                registrar_execucao(query, time.perf_counter() - inicio)
+
+except ImportError:
+    InstrumentedPsycopgCursor = None
+
+
+# =====================================================
+# Integração com o Flask
+# =====================================================
+
+def _cabecalho_ativo() -> bool:
+    padrao = 'false' if os.getenv('FLASK_ENV') == 'production' else 'true'
+    return os.getenv('SQL_STATS_HEADER', padrao).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def init_app(app, cabecalho: bool = None):
+    """
+    Ativa a coleta por requisição em um app Flask
+
+    Args:
+        app: Aplicação Flask
+        cabecalho (bool): Enviar os totais nos cabeçalhos da resposta
+            (padrão: SQL_STATS_HEADER, ligado fora de produção)
+    """
+    from flask import g, request
+
+    enviar_cabecalho = _cabecalho_ativo() if cabecalho is None else cabecalho
+
+    @app.before_request
+    def _iniciar_estatisticas_sql():
+        g._sql_token = iniciar_coleta()
+
+    @app.after_request
+    def _relatar_estatisticas_sql(response):
+        estatisticas = estatisticas_atuais()
+        if estatisticas is None or not estatisticas.consultas:
+            return response
+
+        for formato, vezes in estatisticas.suspeitas_n_mais_1():
+            logger.warning(f"Possível N+1 em {request.endpoint}: {vezes}x {formato}")
+
+        if enviar_cabecalho:
+            tempo_ms = estatisticas.tempo * 1000
+            response.headers['X-SQL-Stats'] = (
+                f"consultas={estatisticas.consultas}; tempo_ms={tempo_ms:.1f}; "
+                f"n_mais_1={len(estatisticas.suspeitas_n_mais_1())}"
+            )
+            response.headers.add('Server-Timing', f'db;dur={tempo_ms:.1f};desc="{estatisticas.consultas} consultas"')
+        return response
+
+    @app.teardown_request
+    def _encerrar_estatisticas_sql(e=None):
+        token = g.pop('_sql_token', None)
+        if token is not None:
+            encerrar_coleta(token)